@@ -0,0 +1,102 @@
+import asyncio
+import logging
+
+import can
+
+__copyright__ = "Copyright 2020, EPC Power Corp."
+__license__ = "GPLv2+"
+
+
+logger = logging.getLogger(__name__)
+
+
+class BusProxy:
+    """Transport connecting a python-can bus to :mod:`asyncio` protocols.
+
+    Received messages are collected by a :class:`can.AsyncBufferedReader`
+    attached to a :class:`can.Notifier` running against ``loop`` and then
+    handed to each protocol's ``data_received()`` from within the loop.
+    Plain listeners, such as an :class:`epyqlib.canneo.Neo`, may be passed
+    in ``listeners`` and are also called from within the loop.
+    """
+
+    def __init__(self, bus, protocols=(), listeners=(), loop=None, transmit=True):
+        if loop is None:
+            loop = asyncio.get_event_loop()
+
+        self.bus = bus
+        self.loop = loop
+        self.transmit = transmit
+        self.protocols = []
+
+        self.reader = can.AsyncBufferedReader(loop=self.loop)
+        self.notifier = can.Notifier(
+            bus=self.bus,
+            listeners=[self.reader, *listeners],
+            loop=self.loop,
+        )
+
+        for protocol in protocols:
+            self.add_protocol(protocol)
+
+        self._task = self.loop.create_task(self._dispatch())
+
+    def add_protocol(self, protocol):
+        self.protocols.append(protocol)
+        protocol.connection_made(self)
+
+    def remove_protocol(self, protocol):
+        self.protocols.remove(protocol)
+
+    def add_listener(self, listener):
+        self.notifier.add_listener(listener)
+
+    def remove_listener(self, listener):
+        self.notifier.remove_listener(listener)
+
+    async def _dispatch(self):
+        async for message in self.reader:
+            for protocol in tuple(self.protocols):
+                try:
+                    protocol.data_received(message)
+                except Exception:
+                    logger.exception("Protocol failed handling %s", message)
+
+    def write(self, message):
+        return self._send(message)
+
+    def write_passive(self, message):
+        return self._send(message, passive=True)
+
+    def send(self, msg, on_success=None):
+        return self._send(msg, on_success=on_success)
+
+    def send_passive(self, msg, on_success=None):
+        return self._send(msg, on_success=on_success, passive=True)
+
+    def _send(self, msg, on_success=None, passive=False):
+        if not (self.transmit or passive):
+            return False
+
+        try:
+            self.bus.send(msg)
+        except can.CanError:
+            logger.debug("Failed to send %s", msg, exc_info=True)
+            return False
+
+        if on_success is not None:
+            on_success()
+
+        return True
+
+    def reset(self):
+        if hasattr(self.bus, "reset"):
+            self.bus.reset()
+
+    def reconnect(self):
+        # the python-can bus is owned by the caller so it is only reset
+        self.reset()
+
+    def close(self):
+        self._task.cancel()
+        self.notifier.stop()
@@ -0,0 +1,418 @@
+import asyncio
+import logging
+
+from epyqlib.twisted.cancalibrationprotocol import (
+    AddressExtension,
+    BootloaderReply,
+    CommandCode,
+    CommandStatus,
+    DspCode,
+    HandlerBusy,
+    HandlerState,
+    HostCommand,
+    InvalidSection,
+    Packet,
+    Password,
+    UnexpectedMessageReceived,
+    bootloader_can_id,
+    chunkit,
+    crc,
+    endianness_swap_2byte,
+)
+import epyqlib.utils.twisted
+
+__copyright__ = "Copyright 2020, EPC Power Corp."
+__license__ = "GPLv2+"
+
+
+logger = logging.getLogger(__name__)
+
+
+class Handler:
+    """:mod:`asyncio` implementation of the CCP bootloader protocol.
+
+    The command methods are coroutines mirroring those of
+    :class:`epyqlib.twisted.cancalibrationprotocol.Handler`.
+    """
+
+    def __init__(
+        self,
+        endianness,
+        tx_id=bootloader_can_id,
+        rx_id=bootloader_can_id,
+        extended=True,
+    ):
+        self._transport = None
+
+        self._tx_id = tx_id
+        self._rx_id = rx_id
+        self._extended = extended
+
+        self._send_counter = -1
+
+        self._state = HandlerState.idle
+        self._previous_state = self._state
+
+        self._lock = asyncio.Lock()
+        self._replies = None
+
+        self.continuous_crc = None
+        self.messages_sent = 0
+
+        self.endianness = endianness
+
+    @property
+    def state(self):
+        return self._state
+
+    @state.setter
+    def state(self, new_state):
+        logger.debug("Entering state {}".format(new_state))
+        self._previous_state = self._state
+        self._state = new_state
+
+    def connection_made(self, transport):
+        self._transport = transport
+        logger.debug("Handler.connection_made(): {}".format(transport))
+
+    def _require_state(self, state, action):
+        if self.state is not state:
+            raise HandlerBusy("{} requested while {}".format(action, self.state.name))
+
+    async def connect(self, station_address=1, timeout=None):
+        self._require_state(HandlerState.idle, action="Connect")
+
+        packet = HostCommand(code=CommandCode.connect, arbitration_id=self._tx_id)
+        packet.payload[0] = station_address
+        (reply,) = await self._transact(
+            packet=packet,
+            state=HandlerState.connecting,
+            count_towards_total=False,
+            timeout=timeout,
+        )
+
+        logger.debug(
+            "Bootloader version: {major}.{minor}".format(
+                major=reply.payload[0], minor=reply.payload[1]
+            )
+        )
+
+        dsp_code = (int(reply.payload[2]) << 8) + int(reply.payload[3])
+
+        try:
+            dsp_code = DspCode(dsp_code)
+        except ValueError:
+            pass
+        else:
+            logger.debug("DSP Part ID: {}".format(dsp_code.name))
+
+        self.state = HandlerState.connected
+        return "successfully connected"
+
+    async def disconnect(self, end_of_session=0):
+        self._require_state(HandlerState.connected, action="Disconnect")
+
+        packet = HostCommand(code=CommandCode.disconnect, arbitration_id=self._tx_id)
+        # EndOfSession rather than a temporary disconnect
+        packet.payload[0] = end_of_session
+        await self._transact(packet=packet, state=HandlerState.disconnecting)
+
+        self.state = HandlerState.idle
+        return "successfully disconnected"
+
+    async def set_mta(self, address_extension, address):
+        if not isinstance(address_extension, AddressExtension):
+            raise TypeError(
+                "Expected AddressExtension, got: {}".format(type(address_extension))
+            )
+
+        self._require_state(HandlerState.connected, action="Set MTA")
+
+        packet = HostCommand(code=CommandCode.set_mta, arbitration_id=self._tx_id)
+        # always zero for Oz bootloader
+        packet.payload[0] = 0
+        packet.payload[1] = address_extension
+        packet.payload[2:6] = address.to_bytes(4, self.endianness)
+
+        await self._transact(packet=packet, state=HandlerState.setting_mta)
+
+        self.state = HandlerState.connected
+        return "successfully set MTA"
+
+    async def unlock(self, section):
+        if not isinstance(section, Password):
+            raise InvalidSection(
+                "Invalid section password specified: {} - {}".format(
+                    section.name, section.value
+                )
+            )
+
+        packet = HostCommand(code=CommandCode.unlock, arbitration_id=self._tx_id)
+        packet.payload[0] = 2
+        packet.payload[1:3] = section.value.to_bytes(2, self.endianness)
+
+        (reply,) = await self._transact(packet=packet, state=HandlerState.unlocking)
+
+        self.state = HandlerState.connected
+        return "successfully unlocked {}".format(reply.payload[1])
+
+    async def download(self, data):
+        # TODO: figure out the correct way to handle endianness, especially
+        #       in regard to odd-length data
+        length = len(data)
+        if length > 5 or length % 2 != 0:
+            raise TypeError("Invalid data length {}".format(length))
+
+        self._require_state(HandlerState.connected, action="Download")
+
+        packet = HostCommand(code=CommandCode.download, arbitration_id=self._tx_id)
+        swapped_data = tuple(endianness_swap_2byte(data))
+        packet.payload[0] = len(swapped_data)
+        packet.payload[1 : len(swapped_data) + 1] = swapped_data
+
+        await self._transact(packet=packet, state=HandlerState.downloading)
+
+        self.state = HandlerState.connected
+        return "successfully downloaded"
+
+    async def download_6(self, data):
+        if len(data) != 6:
+            raise TypeError("Invalid data length {}".format(len(data)))
+
+        self._require_state(HandlerState.connected, action="Download")
+
+        packet = HostCommand(code=CommandCode.download_6, arbitration_id=self._tx_id)
+        packet.payload[:] = endianness_swap_2byte(data)
+
+        await self._transact(packet=packet, state=HandlerState.download_6ing)
+
+        self.state = HandlerState.connected
+        return "successfully download_6ed"
+
+    # TODO: magic number 5!
+    async def upload(self, number_of_bytes=5, block_transfer=False):
+        # TODO: magic number 5! and 255!
+        maximum = 5 if not block_transfer else 255
+
+        if not 1 <= number_of_bytes <= maximum:
+            raise TypeError("Invalid byte count requested: {}".format(number_of_bytes))
+
+        self._require_state(HandlerState.connected, action="Upload")
+
+        packet = HostCommand(code=CommandCode.upload, arbitration_id=self._tx_id)
+        packet.payload[0] = number_of_bytes
+
+        # TODO: magic number 5!
+        replies = await self._transact(
+            packet=packet,
+            state=HandlerState.uploading,
+            replies=-(-number_of_bytes // 5),
+        )
+
+        data = bytearray()
+        for reply in replies:
+            bytes_received = min(number_of_bytes - len(data), 5)
+            data.extend(reply.payload[0:bytes_received])
+
+        self.state = HandlerState.connected
+        return data
+
+    async def build_checksum(self, checksum, length):
+        # length is in bytes, not addresses
+
+        self._require_state(HandlerState.connected, action="Build checksum")
+
+        packet = HostCommand(
+            code=CommandCode.build_checksum, arbitration_id=self._tx_id
+        )
+        packet.payload[:4] = length.to_bytes(4, self.endianness)
+        packet.payload[4:] = checksum.to_bytes(2, self.endianness)
+
+        (reply,) = await self._transact(
+            packet=packet,
+            state=HandlerState.building_checksum,
+        )
+
+        # TODO: consider verifying returned CRC data beyond just
+        #       accepting the embedded side's decision to ack
+
+        self.state = HandlerState.connected
+        return "successfully unlocked {}".format(reply.payload[1])
+
+    async def clear_memory(self):
+        length = 0xFF
+
+        self._require_state(HandlerState.connected, action="Clear memory")
+
+        packet = HostCommand(code=CommandCode.clear_memory, arbitration_id=self._tx_id)
+        packet.payload[:4] = length.to_bytes(4, self.endianness)
+
+        (reply,) = await self._transact(
+            packet=packet,
+            state=HandlerState.clearing_memory,
+        )
+
+        self.state = HandlerState.connected
+        return "successfully unlocked {}".format(reply.payload[1])
+
+    async def download_block(self, address_extension, address, data):
+        await self.set_mta(address_extension=address_extension, address=address)
+
+        block_crc = None
+        block_length = 0
+        block_counter = 0
+
+        for chunk in chunkit(it=data, n=6):
+            chunk = tuple(chunk)
+            length = len(chunk)
+
+            block_crc = crc(data=endianness_swap_2byte(chunk), crc=block_crc)
+            self.continuous_crc = crc(
+                data=endianness_swap_2byte(chunk), crc=self.continuous_crc
+            )
+            logger.debug("Continuous CRC: {:04X}".format(self.continuous_crc))
+            block_length += length
+
+            block_counter += 1
+            if block_counter >= 5:
+                block_counter = 0
+
+            if length == 6:
+                await self.download_6(data=chunk)
+            else:
+                await self.download(data=chunk)
+
+            address += length / 2
+            if int(address) != address:
+                # TODO: do this better or at least a unique exception
+                raise Exception("ack")
+            address = int(address)
+
+            if block_counter == 0:
+                await self.build_checksum(checksum=block_crc, length=block_length)
+                block_crc = None
+                block_length = 0
+                await self.set_mta(
+                    address_extension=address_extension,
+                    address=address,
+                )
+
+            # a short chunk is the last one and, as with the Twisted
+            # implementation, is not followed by a trailing checksum
+            if length < 6:
+                return
+
+        if block_crc is not None:
+            await self.build_checksum(checksum=block_crc, length=block_length)
+
+    async def upload_block(self, address_extension, address, octets, progress=None):
+        await self.set_mta(address=address, address_extension=address_extension)
+
+        data = bytearray()
+
+        remaining = octets
+        update_period = octets // 100  # 1%
+        since_update = 0
+        while remaining > 0:
+            # TODO: magic number 255!
+            number_of_bytes = min(255, remaining)
+            block = await self.upload(
+                number_of_bytes=number_of_bytes, block_transfer=True
+            )
+            remaining -= number_of_bytes
+
+            if progress is not None:
+                since_update += number_of_bytes
+                if since_update >= update_period:
+                    progress.update(octets - remaining)
+                    since_update = 0
+            data.extend(block)
+
+        return data
+
+    async def _transact(
+        self,
+        packet,
+        state,
+        count_towards_total=True,
+        timeout=None,
+        replies=1,
+    ):
+        if self._lock.locked():
+            raise HandlerBusy("Request made while {}".format(self.state.name))
+
+        async with self._lock:
+            if timeout is None:
+                timeout = packet.command_code.timeout
+
+            if self._send_counter < 255:
+                self._send_counter += 1
+            else:
+                self._send_counter = 0
+
+            packet.command_counter = self._send_counter
+
+            self.state = state
+            self._replies = asyncio.Queue()
+
+            try:
+                logger.debug("Message to be sent: {}".format(packet))
+                self._transport.write(packet.message)
+
+                if count_towards_total:
+                    self.messages_sent += 1
+
+                received = []
+                while len(received) < replies:
+                    try:
+                        reply = await asyncio.wait_for(
+                            self._replies.get(),
+                            timeout=timeout,
+                        )
+                    except asyncio.TimeoutError as e:
+                        message = "Handler timed out while in state: {}".format(
+                            self.state
+                        )
+                        logger.debug(message)
+                        if self._previous_state in [HandlerState.idle]:
+                            self.state = self._previous_state
+                        raise epyqlib.utils.twisted.RequestTimeoutError(message) from e
+
+                    self._check_reply(reply)
+                    received.append(reply)
+            finally:
+                self._replies = None
+
+        return received
+
+    def _check_reply(self, packet):
+        if not isinstance(packet, BootloaderReply):
+            raise UnexpectedMessageReceived("Not a bootloader reply: {}".format(packet))
+
+        if self.state not in [HandlerState.connecting, HandlerState.connected]:
+            if packet.command_counter != self._send_counter:
+                raise UnexpectedMessageReceived(
+                    "Reply out of sequence: expected {} but got {} - {}".format(
+                        self._send_counter, packet.command_counter, packet
+                    )
+                )
+
+        logger.debug("packet received: {}".format(packet.command_return_code.name))
+
+        if packet.command_return_code is not CommandStatus.acknowledge:
+            raise UnexpectedMessageReceived(
+                "Bootloader should ack while {}, instead: {} - {}".format(
+                    self.state.name, packet.command_return_code.name, packet
+                )
+            )
+
+    def data_received(self, msg):
+        if not (
+            msg.arbitration_id == self._rx_id and msg.is_extended_id == self._extended
+        ):
+            return
+
+        if self._replies is None:
+            return
+
+        self._replies.put_nowait(Packet.from_message(message=msg))
@@ -0,0 +1,332 @@
+import asyncio
+import collections
+import heapq
+import itertools
+import logging
+import time
+
+import epyqlib.nv
+import epyqlib.twisted.nvs
+from epyqlib.twisted.nvs import (
+    CanceledError,
+    Priority,
+    ReadOnlyError,
+    Request,
+    RequestTimeoutError,
+    SendFailedError,
+    State,
+)
+
+__copyright__ = "Copyright 2020, EPC Power Corp."
+__license__ = "GPLv2+"
+
+
+logger = logging.getLogger(__name__)
+
+
+class _Window:
+    """Bound the number of requests in flight, admitting waiters by
+    priority and then by arrival order."""
+
+    def __init__(self, size):
+        self.size = size
+        self.active = 0
+        self._waiters = []
+        self._counter = itertools.count()
+
+    async def acquire(self, priority):
+        if self.active < self.size and len(self._waiters) == 0:
+            self.active += 1
+            return
+
+        future = asyncio.get_event_loop().create_future()
+        entry = [priority, next(self._counter), future]
+        heapq.heappush(self._waiters, entry)
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # the slot was handed over just before the cancellation
+                self.release()
+            else:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            raise
+
+    def release(self):
+        while len(self._waiters) > 0:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+
+        self.active -= 1
+
+    def cancel_waiting(self, exception_factory):
+        waiters = self._waiters
+        self._waiters = []
+        for _, _, future in waiters:
+            if not future.done():
+                future.set_exception(exception_factory())
+
+
+class Protocol:
+    """:mod:`asyncio` implementation of the NV parameter protocol.
+
+    The request API mirrors :class:`epyqlib.twisted.nvs.Protocol` except that
+    coroutines are returned instead of deferreds.  Responses are matched by
+    multiplexer, meta and read/write so requests for different frames or metas
+    may be outstanding at the same time.  ``window`` limits how many are sent
+    before their responses arrive; a window of one reproduces the strictly
+    sequential behavior of the Twisted implementation.
+    """
+
+    def __init__(self, timeout=1, window=4):
+        self._timeout = timeout
+        self._window = _Window(size=window)
+        self._transport = None
+
+        self._locks = collections.defaultdict(asyncio.Lock)
+        self._pending = {}
+
+    @property
+    def in_flight(self):
+        return len(self._pending)
+
+    def connection_made(self, transport):
+        self._transport = transport
+        logger.debug("Protocol.connection_made(): {}".format(transport))
+
+    async def read(
+        self,
+        nv_signal,
+        meta,
+        priority=Priority.background,
+        passive=False,
+        all_values=False,
+    ):
+        return await self._read_write_request(
+            nv_signals=(nv_signal,),
+            read=True,
+            meta=meta,
+            priority=priority,
+            passive=passive,
+            all_values=all_values,
+        )
+
+    async def read_multiple(
+        self,
+        nv_signals,
+        meta,
+        priority=Priority.background,
+        passive=False,
+        all_values=False,
+    ):
+        return await self._read_write_request(
+            nv_signals=nv_signals,
+            read=True,
+            meta=meta,
+            priority=priority,
+            passive=passive,
+            all_values=all_values,
+        )
+
+    async def write(
+        self,
+        nv_signal,
+        meta,
+        priority=Priority.background,
+        passive=False,
+        ignore_read_only=False,
+        all_values=False,
+    ):
+        return await self.write_multiple(
+            nv_signals=(nv_signal,),
+            meta=meta,
+            priority=priority,
+            passive=passive,
+            ignore_read_only=ignore_read_only,
+            all_values=all_values,
+        )
+
+    async def write_multiple(
+        self,
+        nv_signals,
+        meta,
+        priority=Priority.background,
+        passive=False,
+        ignore_read_only=False,
+        all_values=False,
+    ):
+        if tuple(nv_signals)[0].frame.read_write.min > 0:
+            if ignore_read_only:
+                return
+            else:
+                raise ReadOnlyError()
+
+        return await self._read_write_request(
+            nv_signals=nv_signals,
+            read=False,
+            meta=meta,
+            priority=priority,
+            passive=passive,
+            all_values=all_values,
+        )
+
+    def cancel_queued(self):
+        """Fail all requests still waiting for a free slot in the window."""
+        self._window.cancel_waiting(CanceledError)
+
+    async def _read_write_request(
+        self, nv_signals, read, meta, priority, passive, all_values
+    ):
+        if not isinstance(nv_signals, dict):
+            nv_signals = {
+                s: (
+                    s.value
+                    if meta == epyqlib.nv.MetaEnum.value
+                    else getattr(s.meta, meta.name).value
+                )
+                for s in nv_signals
+            }
+
+        frame = tuple(nv_signals.keys())[0].frame
+
+        request = Request(
+            read=read,
+            meta=meta,
+            signals=nv_signals,
+            deferred=None,
+            priority=priority,
+            passive=passive,
+            all_values=all_values,
+            frame=frame,
+        )
+
+        # A frame/meta pair can only be distinguished in the responses from
+        # other frame/meta pairs so only one transaction per pair can be
+        # outstanding.  This also keeps the read half of a partial write
+        # together with the write half.
+        async with self._locks[self._key(request)]:
+            if read:
+                return await self._transact(request)
+
+            return await self._read_before_write(request)
+
+    def _key(self, request):
+        meta = request.meta
+        if request.frame.status_frame.meta_signal is None:
+            meta = None
+
+        return request.frame.status_frame, meta
+
+    async def _read_before_write(self, request):
+        skip_signals = set(request.frame.parameter_signals) - set(request.signals)
+
+        if len(skip_signals) == 0:
+            return await self._transact(request)
+
+        values, _ = await self._transact(
+            Request(
+                read=True,
+                meta=request.meta,
+                signals={s: None for s in request.frame.parameter_signals},
+                deferred=None,
+                priority=request.priority,
+                passive=request.passive,
+                all_values=True,
+                frame=request.frame,
+            ),
+        )
+
+        data = dict(request.signals)
+        for s, v in values.items():
+            s = s.set_signal
+            if s in request.frame.parameter_signals:
+                if s not in data:
+                    data[s] = s.from_human(v)
+
+        values, meta = await self._transact(
+            Request(
+                read=False,
+                meta=request.meta,
+                signals=data,
+                deferred=None,
+                priority=request.priority,
+                passive=request.passive,
+                all_values=True,
+                frame=request.frame,
+            ),
+        )
+
+        data = {
+            signal.status_signal: values[signal.status_signal]
+            for signal in request.signals
+        }
+
+        return data, meta
+
+    async def _transact(self, request):
+        await self._window.acquire(priority=request.priority)
+        try:
+            return await self._send_and_wait(request)
+        finally:
+            self._window.release()
+
+    async def _send_and_wait(self, request):
+        loop = asyncio.get_event_loop()
+
+        data = epyqlib.twisted.nvs.request_data(request)
+
+        if request.passive:
+            write = self._transport.write_passive
+        else:
+            write = self._transport.write
+
+        key = self._key(request)
+        future = loop.create_future()
+        request.deferred = future
+        self._pending[key] = request
+
+        try:
+            if not write(request.frame.to_message(data)):
+                raise SendFailedError()
+
+            request.send_time = time.time()
+
+            try:
+                value = await asyncio.wait_for(future, timeout=self._timeout)
+            except asyncio.TimeoutError as e:
+                raise self._timeout_error(request) from e
+        finally:
+            self._pending.pop(key, None)
+
+        return value, request.meta
+
+    def _timeout_error(self, request):
+        # TODO: report all requested signals
+        signal = tuple(request.signals)[0]
+        mux_name = signal.frame.mux_name
+
+        e = RequestTimeoutError(
+            state=State.reading if request.read else State.writing,
+            item=(
+                f"{mux_name}:{signal.name} "
+                f"({request.meta.name}, {request.send_time}, {time.time()}"
+            ),
+        )
+        logger.debug(str(e))
+
+        return e
+
+    def data_received(self, msg):
+        for request in tuple(self._pending.values()):
+            value = epyqlib.twisted.nvs.response_value(request=request, msg=msg)
+            if value is epyqlib.twisted.nvs.unmatched:
+                continue
+
+            if not request.deferred.done():
+                request.deferred.set_result(value)
+
+            return
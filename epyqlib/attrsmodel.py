@@ -1120,21 +1120,169 @@ class Model:
         self.droppable_from = set()
 
         self.connected_signals = {}
+        self._column_fields_by_type = {}
+
+        uneditable_highlight = QtGui.QColor("grey")
+        uneditable_highlight.setAlphaF(0.4)
+        droppable_highlight = QtGui.QColor("orange")
+        droppable_highlight.setAlphaF(0.4)
+        self._highlights = (uneditable_highlight, droppable_highlight)
 
         self.list_selection_roots = {}
 
-        self.add_drop_sources(*drop_sources)
+        self._batch_depth = 0
+        self._batch_parents = {}
+        self._batch_check_uuids = False
+
+        # drop sources are needed to display references while connecting
+        self.droppable_from.update(drop_sources)
 
         check_uuids(self.root)
 
-        self.pyqtify_connect(None, self.root)
+        with self._resetting():
+            self.pyqtify_connect(None, self.root)
         self.model.itemChanged.connect(self.item_changed)
 
+        self._check_shared_uuids()
+
     def add_drop_sources(self, *sources):
         self.droppable_from.update(sources)
-        roots = [model.root for model in {self} | self.droppable_from]
 
-        check_uuids(*roots)
+        self._check_shared_uuids()
+
+    def _check_shared_uuids(self):
+        """Check that no UUID is used by both this model and a drop source.
+        The UUID indexes are compared rather than walking each tree."""
+        seen = set()
+
+        for model in {self} | self.droppable_from:
+            uuids = model.uuid_to_node.keys() - {None}
+            duplicates = seen & uuids
+            if len(duplicates) > 0:
+                raise Exception("Duplicate uuid found: {}".format(min(duplicates)))
+
+            seen |= uuids
+
+    @contextlib.contextmanager
+    def _resetting(self):
+        """Present the changes made within the block to views as a single
+        model reset."""
+        self.model.beginResetModel()
+        blocked = self.model.blockSignals(True)
+        try:
+            yield
+        finally:
+            self.model.blockSignals(blocked)
+            self.model.endResetModel()
+
+    @contextlib.contextmanager
+    def batch(self):
+        """Defer item updates for children added and removed within the
+        block.
+
+        UUIDs are registered and released as nodes are added and removed so
+        lookups keep working inside the block.  On leaving the outermost
+        block the rows of each parent whose children changed are brought in
+        line with its children within a single model reset.  Missing UUIDs
+        are filled in with one pass over the tree.
+        """
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._apply_batch()
+
+    def _batch_changed(self, parent, children=()):
+        self._batch_parents[id(parent)] = parent
+
+        for child in children:
+            for node in child.nodes_by_filter(lambda node: True, collection=[]):
+                if node.uuid is None:
+                    self._batch_check_uuids = True
+                else:
+                    self.uuid_to_node[node.uuid] = node
+
+    def _apply_batch(self):
+        parents = list(self._batch_parents.values())
+        self._batch_parents = {}
+        check = self._batch_check_uuids
+        self._batch_check_uuids = False
+
+        if len(parents) == 0:
+            return
+
+        if check:
+            check_uuids(self.root)
+
+        with self._resetting():
+            for parent in parents:
+                item = self._live_item(parent)
+                if item is None:
+                    continue
+
+                children = {id(child) for child in parent.children}
+                for row in reversed(range(item.rowCount())):
+                    if id(self._row_node(item, row)) not in children:
+                        self._take_row(item=item, parent=parent, row=row)
+
+            for parent in parents:
+                item = self._live_item(parent)
+                if item is None:
+                    continue
+
+                for row, child in enumerate(parent.children):
+                    if row < item.rowCount() and self._row_node(item, row) is child:
+                        continue
+
+                    # moved within the parent
+                    for present in range(row + 1, item.rowCount()):
+                        if self._row_node(item, present) is child:
+                            self._take_row(item=item, parent=parent, row=present)
+                            break
+
+                    self.pyqtify_connect(parent, child)
+
+    def _live_item(self, node):
+        """The item of ``node`` if it is still shown by the model."""
+        if node is self.root:
+            return self.model.invisibleRootItem()
+
+        item = self.node_to_item.get(node)
+        if item is None or item.model() is not self.model:
+            return None
+
+        return item
+
+    def _row_node(self, item, row):
+        return item.child(row, 0).data(epyqlib.utils.qt.UserRoles.node)
+
+    def _take_row(self, item, parent, row):
+        """Remove a row, disconnecting the nodes it shows."""
+
+        def disconnect(item, parent):
+            node = self.node_from_item(item)
+            for row in range(item.rowCount()):
+                disconnect(item=item.child(row, 0), parent=node)
+
+            self._pyqtify_disconnect(parent=parent, child=node)
+            self.node_to_item.pop(node, None)
+
+        disconnect(item=item.child(row, 0), parent=parent)
+        self._forget_items(item.takeRow(row))
+
+    def _forget_items(self, items):
+        for item in items:
+            try:
+                del self._all_items_dict[
+                    (
+                        item.data(epyqlib.utils.qt.UserRoles.node),
+                        item.column(),
+                    )
+                ]
+            except KeyError:
+                pass
 
     def get_field(self, index):
         c = index.column()
@@ -1176,16 +1324,22 @@ class Model:
         setattr(node, field_name, datum)
 
     def pyqtify_connect(self, parent, child):
-        def visit(node, nodes):
-            if node is child:
-                this_parent = parent
-            else:
-                this_parent = node.tree_parent
-
-            nodes.append({"parent": this_parent, "child": node})
+        self.pyqtify_connect_children(parent=parent, children=[child])
 
+    def pyqtify_connect_children(self, parent, children):
         nodes = []
-        child.traverse(call_this=visit, payload=nodes, internal_nodes=True)
+
+        for child in children:
+
+            def visit(node, nodes, child=child):
+                if node is child:
+                    this_parent = parent
+                else:
+                    this_parent = node.tree_parent
+
+                nodes.append({"parent": this_parent, "child": node})
+
+            child.traverse(call_this=visit, payload=nodes, internal_nodes=True)
 
         self.uuid_to_node.update(
             {child.uuid: child for child in (d["child"] for d in nodes)}
@@ -1194,6 +1348,13 @@ class Model:
         for kwargs in nodes:
             self._pyqtify_connect(**kwargs)
 
+    def append_children(self, parent, children):
+        """Append ``children`` to ``parent`` with one model reset rather than
+        inserting and connecting each row as it is added."""
+        with self.batch():
+            parent.extend_children(children)
+            self._batch_changed(parent=parent, children=children)
+
     def item_from_node(self, node):
         if node is self.root:
             return self.model.invisibleRootItem()
@@ -1203,6 +1364,34 @@ class Model:
     def node_from_item(self, item):
         return item.data(epyqlib.utils.qt.UserRoles.node)
 
+    def _column_fields(self, type_):
+        """The field name, editability, presence and checkability of each
+        column for nodes of ``type_``."""
+        column_fields = self._column_fields_by_type.get(type_)
+        if column_fields is not None:
+            return column_fields
+
+        column_fields = []
+        for column in self.columns:
+            field_name = column.fields.get(type_)
+            if field_name is None:
+                column_fields.append((None, False, False, False))
+                continue
+
+            metadata = getattr(fields(type_), field_name)
+            column_fields.append(
+                (
+                    field_name,
+                    metadata.editable,
+                    True,
+                    metadata.converter == two_state_checkbox,
+                ),
+            )
+
+        self._column_fields_by_type[type_] = column_fields
+
+        return column_fields
+
     def _pyqtify_connect(self, parent, child):
         connections = {}
         connection_id = get_connection_id(parent=parent, child=child)
@@ -1227,25 +1416,15 @@ class Model:
 
             changed_signals = epyqlib.utils.qt.pyqtified(child).changed
 
-            uneditable_highlight = QtGui.QColor("grey")
-            uneditable_highlight.setAlphaF(0.4)
-            droppable_highlight = QtGui.QColor("orange")
-            droppable_highlight.setAlphaF(0.4)
+            uneditable_highlight, droppable_highlight = self._highlights
             droppable_row = hasattr(row, "addable_types") or hasattr(
                 row, "all_addable_types"
             )
 
-            for i, column in enumerate(self.columns):
-                field_name = column.fields.get(type(child))
-
+            for i, (field_name, editable, has_field, checkable) in enumerate(
+                self._column_fields(type(child)),
+            ):
                 item = QtGui.QStandardItem()
-                editable = False
-                has_field = False
-                field_for_column = column.fields.get(type(child))
-                if field_for_column is not None:
-                    metadata = getattr(fields(type(child)), field_for_column)
-                    editable = metadata.editable
-                    has_field = True
 
                 item.setEditable(editable)
                 if not editable and has_field:
@@ -1280,10 +1459,6 @@ class Model:
                 )
 
                 if field_name is not None:
-                    checkable = (
-                        getattr(fields(type(child)), field_name).converter
-                        == two_state_checkbox
-                    )
                     item.setCheckable(checkable)
 
                     def slot(
@@ -1390,30 +1565,34 @@ class Model:
         for signal, slot in connections.items():
             signal.disconnect(slot)
 
-        self.uuid_to_node.pop(child.uuid)
+        # already released if removed within a batch
+        if self.uuid_to_node.get(child.uuid) is child:
+            del self.uuid_to_node[child.uuid]
 
     def child_added(self, child, row):
         parent = child.tree_parent
 
+        if self._batch_depth > 0:
+            self._batch_changed(parent=parent, children=[child])
+            return
+
         self.pyqtify_connect(parent, child)
 
         if child.uuid is None:
             check_uuids(self.root)
 
     def deleted(self, parent, node, row):
+        if self._batch_depth > 0:
+            self._batch_changed(parent=parent)
+            for removed in node.nodes_by_filter(lambda node: True, collection=[]):
+                if self.uuid_to_node.get(removed.uuid) is removed:
+                    del self.uuid_to_node[removed.uuid]
+            return
+
         item = self.item_from_node(parent)
         taken_items = item.takeRow(row)
         self.node_to_item.pop(node)
-        for taken_item in taken_items:
-            try:
-                del self._all_items_dict[
-                    (
-                        taken_item.data(epyqlib.utils.qt.UserRoles.node),
-                        taken_item.column(),
-                    )
-                ]
-            except KeyError:
-                pass
+        self._forget_items(taken_items)
         self.pyqtify_disconnect(parent, node)
 
     def supportedDropActions(self):
@@ -1,17 +1,25 @@
 import collections
+import concurrent.futures
 import decimal
+import functools
+import io
 import json
 import os
 import pathlib
-import shutil
-import subprocess
 import tempfile
 import zipfile
 
 import attr
-import canmatrix.formats
 
-import epyqlib.device
+import epyqlib.utils.lazy
+import epyqlib.utils.zipcrypto
+
+epyqlib.utils.lazy.lazy_import("epyqlib.canneo")
+epyqlib.utils.lazy.lazy_import("epyqlib.device")
+epyqlib.utils.lazy.lazy_import("epyqlib.nv")
+epyqlib.utils.lazy.lazy_import("epyqlib.pm.valuesetmodel")
+epyqlib.utils.lazy.lazy_import("epyqlib.treenode")
+epyqlib.utils.lazy.lazy_import("epyqlib.utils.qt")
 
 
 class InvalidAutoParametersDeviceError(Exception):
@@ -25,6 +33,57 @@ class MultipleFoundError(Exception):
 raw_template = pathlib.Path(epyqlib.autodevice.__file__).with_name("template")
 
 
+@functools.lru_cache(maxsize=16)
+def serial_number_names(can_contents, can_suffix, configuration):
+    """Find the multiplexer and signal names of the serial number NV.
+
+    Only the symbols are scanned, picking the parameter signals the same way
+    :class:`epyqlib.nv.Nvs` does without building the full ``Neo`` and
+    ``Nvs`` trees.  The result is cached since every package built from the
+    same CAN file shares it.
+    """
+    import canmatrix.formats
+
+    if configuration is None:
+        configuration = "original"
+    configuration = epyqlib.nv.configurations[configuration]
+
+    (matrix,) = canmatrix.formats.load(
+        io.BytesIO(can_contents),
+        import_type=can_suffix[1:],
+    ).values()
+
+    excluded = {
+        "Multiplexor",
+        configuration.read_write_signal,
+        configuration.meta_signal,
+        "{}_MUX".format(configuration.set_frame),
+        configuration.to_nv_command,
+    }
+
+    found = []
+    for frame in matrix.frames:
+        if frame.name != configuration.set_frame:
+            continue
+
+        (multiplexor,) = (s for s in frame.signals if s.multiplex == "Multiplexor")
+
+        for signal in frame.signals:
+            if signal.multiplex not in multiplexor.values:
+                continue
+
+            if signal.name in excluded:
+                continue
+
+            name = signal.name.casefold()
+            if "serial" in name and "number" in name:
+                found.append((multiplexor.values[signal.multiplex], signal.name))
+
+    (names,) = found
+
+    return names
+
+
 def create_template_archive(path):
     with zipfile.ZipFile(path, "w") as z:
         for template_file in raw_template.iterdir():
@@ -108,6 +167,8 @@ class Builder:
         self._value_set = epyqlib.pm.valuesetmodel.loadp(path)
 
     def load_epp(self, parameters, can, can_suffix):
+        import canmatrix.formats
+
         (matrix,) = canmatrix.formats.load(
             can,
             import_type=can_suffix[1:],
@@ -137,8 +198,11 @@ class Builder:
                 )
 
     def get_or_create_parameter(self, name):
+        root = self._value_set.model.root
+        root.attribute_index("name")
+
         try:
-            nodes = self._value_set.model.root.nodes_by_attribute(
+            nodes = root.nodes_by_attribute(
                 attribute_value=name,
                 attribute_name="name",
             )
@@ -161,151 +225,129 @@ class Builder:
     def set_target(self, path):
         self._target = pathlib.Path(path)
 
-    def create(self, can_contents):
+    def package(self, can_contents):
+        """Collect the contents of the device package, a mapping of archive
+        names to file contents."""
         for access_input in self.access_parameters:
             access_input.node = self.get_or_create_parameter(access_input.node)
 
-        with tempfile.TemporaryDirectory() as temporary_directory:
-            temporary_directory = pathlib.Path(temporary_directory)
-            directory_path = temporary_directory / self._target.stem
-            directory_path.mkdir()
+        for access_input in self.access_parameters:
+            node = self.get_or_create_parameter(name=access_input.node.name)
 
-            for access_input in self.access_parameters:
-                node = self.get_or_create_parameter(name=access_input.node.name)
+            node.value = access_input.value
 
-                node.value = access_input.value
+        auto_value_set = self._template.raw_dict["auto_value_set"]
+        can_path = self._template.raw_dict["can_path"]
 
-            self._value_set.path = (
-                directory_path / self._template.raw_dict["auto_value_set"]
-            )
-            self._value_set.save()
+        files = collections.OrderedDict()
+        directory = pathlib.PurePosixPath(self._target.stem)
 
-            can_path = self._template.raw_dict["can_path"]
+        files[directory / auto_value_set] = self._value_set.dumps().encode("utf-8")
 
-            for file_name in self._template.referenced_files:
-                skips = (
-                    can_path,
-                    self._template.raw_dict["auto_value_set"],
-                )
-                if file_name in skips:
-                    continue
+        for file_name in self._template.referenced_files:
+            if file_name in (can_path, auto_value_set):
+                continue
 
-                file_path = pathlib.Path(file_name)
+            file_path = pathlib.Path(file_name)
+            files[directory / file_path.name] = (
+                self._template_path.parent / file_path.name
+            ).read_bytes()
 
-                shutil.copy(
-                    self._template_path.parent / file_path.name,
-                    directory_path,
-                )
+        with open(self._template_path) as f:
+            raw_dict = json.load(
+                f,
+                object_pairs_hook=collections.OrderedDict,
+            )
 
-            with open(self._template_path) as f:
-                raw_dict = json.load(
-                    f,
-                    object_pairs_hook=collections.OrderedDict,
-                )
+        keys_to_copy = (
+            "can_configuration",
+            "nv_configuration",
+            "node_id_type",
+            "access_level_path",
+            "access_password_path",
+            "nv_meta_enum",
+        )
+        for key in keys_to_copy:
+            if key in self._original_raw_dict:
+                raw_dict[key] = self._original_raw_dict[key]
 
-            keys_to_copy = (
-                "can_configuration",
-                "nv_configuration",
-                "node_id_type",
-                "access_level_path",
-                "access_password_path",
-                "nv_meta_enum",
-            )
-            for key in keys_to_copy:
-                if key in self._original_raw_dict:
-                    raw_dict[key] = self._original_raw_dict[key]
-
-            if isinstance(self.required_serial_number, decimal.Decimal):
-                raw_dict["required_serial_number"] = int(self.required_serial_number)
-            else:
-                raw_dict["required_serial_number"] = self.required_serial_number
-
-            can_path = directory_path / can_path
-            with open(can_path, "wb") as f:
-                f.write(can_contents)
-
-            (matrix,) = canmatrix.formats.loadp(os.fspath(can_path)).values()
-            neo = epyqlib.canneo.Neo(
-                matrix=matrix,
-                frame_class=epyqlib.nv.Frame,
-                signal_class=epyqlib.nv.Nv,
-                strip_summary=False,
-            )
-            nvs = epyqlib.nv.Nvs(
-                neo=neo,
-                configuration=self._original_raw_dict["nv_configuration"],
-            )
+        if isinstance(self.required_serial_number, decimal.Decimal):
+            raw_dict["required_serial_number"] = int(self.required_serial_number)
+        else:
+            raw_dict["required_serial_number"] = self.required_serial_number
 
-            (serial_nv,) = [
-                nv
-                for nv in nvs.all_nv()
-                if ("serial" in nv.name.casefold() and "number" in nv.name.casefold())
-            ]
+        files[directory / can_path] = can_contents
 
-            raw_dict["serial_number_names"] = (
-                serial_nv.frame.mux_name,
-                serial_nv.name,
-            )
+        raw_dict["serial_number_names"] = serial_number_names(
+            can_contents=can_contents,
+            can_suffix=pathlib.Path(can_path).suffix,
+            configuration=self._original_raw_dict["nv_configuration"],
+        )
 
-            target_epc_name = directory_path / "auto_parameters.epc"
-            with open(target_epc_name, "w") as f:
-                json.dump(raw_dict, f, indent=4)
+        files[directory / "auto_parameters.epc"] = json.dumps(
+            raw_dict,
+            indent=4,
+        ).encode("utf-8")
 
-            backup_path = None
-            if self._target.exists():
-                backup_path = temporary_directory / self._target.name
-                shutil.move(self._target, backup_path)
+        return collections.OrderedDict(
+            (os.fspath(name), contents) for name, contents in files.items()
+        )
 
-            try:
-                password_option = []
-                if len(self.archive_code) > 0:
-                    password_option = ["-p{}".format(self.archive_code)]
-
-                paths = (
-                    pathlib.Path("7z"),
-                    (
-                        pathlib.Path("C:")
-                        / os.sep
-                        / "Program Files"
-                        / "7-Zip"
-                        / "7z.exe"
-                    ),
-                    (
-                        pathlib.Path("C:")
-                        / os.sep
-                        / "Program Files (x86)"
-                        / "7-Zip"
-                        / "7z.exe"
-                    ),
-                )
-                for path in paths:
-                    try:
-                        subprocess.run(
-                            [
-                                os.fspath(path),
-                                "a",
-                                "-tzip",
-                                os.fspath(self._target),
-                                os.fspath(directory_path),
-                                *password_option,
-                            ],
-                            check=True,
-                        )
-                    except FileNotFoundError:
-                        continue
-                    else:
-                        break
-                else:
-                    raise Exception(
-                        "Unable to find 7z binary as any of: {}".format(
-                            paths,
-                        )
-                    )
-            except Exception as e:
-                if backup_path is not None:
-                    shutil.move(backup_path, self._target)
-
-                raise e
+    def create(self, can_contents):
+        write_archive(
+            target=self._target,
+            files=self.package(can_contents=can_contents),
+            archive_code=self.archive_code,
+        )
+
+        self.cleanup()
 
+    def cleanup(self):
         if self._temporary_directory is not None:
             self._temporary_directory.cleanup()
+            self._temporary_directory = None
+
+
+def write_archive(target, files, archive_code):
+    """Write ``files`` to the device package ``target``, encrypted with
+    ``archive_code`` if it is not empty.  An existing ``target`` is only
+    replaced once the new package is complete."""
+    epyqlib.utils.zipcrypto.write(
+        path=target,
+        files=files,
+        password=archive_code,
+    )
+
+
+def _write_package(package):
+    target, files, archive_code = package
+
+    write_archive(target=target, files=files, archive_code=archive_code)
+
+    return target
+
+
+def create_all(builds, processes=1):
+    """Build several device packages.
+
+    ``builds`` is an iterable of ``(builder, can_contents)`` pairs.  The
+    package contents are collected in turn since the value sets live in Qt
+    models, then the archives are compressed, encrypted and written in
+    ``processes`` worker processes.  Returns the targets written.
+    """
+    packages = []
+    for builder, can_contents in builds:
+        packages.append(
+            (
+                builder._target,
+                builder.package(can_contents=can_contents),
+                builder.archive_code,
+            )
+        )
+        builder.cleanup()
+
+    if processes <= 1 or len(packages) <= 1:
+        return list(map(_write_package, packages))
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(_write_package, packages))
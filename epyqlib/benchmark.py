@@ -0,0 +1,899 @@
+"""Protocol, trace file format and tree lookup throughput benchmarks.
+
+Each protocol scenario drives the same host side code used against real
+hardware, over a python-can ``virtual`` bus, with the device answered by
+:class:`epyqlib.simulateddevice.Device`.  The trace file formats of
+:mod:`epyqlib.utils.canlogio` are timed writing and reading generated
+frames.  Tree node and item model lookups are timed over a generated wide
+tree and table updates over a generated parameter model.  Results may be
+appended to a JSON lines history file so throughput can be tracked over
+time.
+"""
+
+import datetime
+import functools
+import io
+import json
+import logging
+import pathlib
+import random
+import struct
+import sys
+import tempfile
+import time
+
+import attr
+import can
+import click
+import numpy
+
+import epyqlib
+import epyqlib.busproxy
+import epyqlib.hildevice
+import epyqlib.nv
+import epyqlib.simulateddevice
+import epyqlib.treenode
+import epyqlib.utils.canlog
+import epyqlib.utils.canlogio
+import epyqlib.utils.twisted
+
+__copyright__ = "Copyright 2020, EPC Power Corp."
+__license__ = "GPLv2+"
+
+
+logger = logging.getLogger(__name__)
+
+
+@attr.s(frozen=True)
+class Result:
+    name = attr.ib()
+    quantity = attr.ib()
+    units = attr.ib()
+    seconds = attr.ib()
+
+    @property
+    def rate(self):
+        return self.quantity / self.seconds
+
+    def __str__(self):
+        return "{}: {} {} in {:.3f} seconds or {:.4g} {}/second".format(
+            self.name,
+            self.quantity,
+            self.units,
+            self.seconds,
+            self.rate,
+            self.units,
+        )
+
+
+@attr.s
+class Progress:
+    """Stand in for :class:`epyqlib.utils.qt.Progress` without a dialog."""
+
+    start = attr.ib(default=attr.Factory(time.monotonic))
+    value = attr.ib(default=0)
+    maximum = attr.ib(default=0)
+
+    def configure(self, minimum=0, maximum=0):
+        self.maximum = maximum
+
+    def update(self, value):
+        self.value = value
+
+    def elapsed(self):
+        return time.monotonic() - self.start
+
+    def complete(self, message=None):
+        if message is not None:
+            logger.debug(message)
+
+    def fail(self):
+        pass
+
+
+def synthetic_coff(data, address=0x8000):
+    """Build a minimal TI COFF image holding ``data`` at ``address``.
+
+    Only what :class:`epyqlib.ticoff.Coff` needs to read the loadable
+    section is present.  ``data`` is padded to a whole number of 16-bit
+    addresses.
+    """
+    data = bytes(data) + bytes(len(data) % 2)
+
+    header_size = struct.calcsize("<2H3L3H")
+    optional_header_size = struct.calcsize("<2H6L")
+    section_size = struct.calcsize("<8s9L2H")
+    data_pointer = header_size + optional_header_size + 2 * section_size
+
+    sections = [
+        (b".text", len(data) // 2, address, len(data) // 2, data_pointer, 0x20),
+        (b".stack", 0x100, 0, 0, 0, 0x80),
+    ]
+
+    stream = io.BytesIO()
+    stream.write(
+        struct.pack(
+            "<2H3L3H",
+            0xC2,
+            len(sections),
+            0,
+            data_pointer + len(data),
+            0,
+            optional_header_size,
+            0,
+            0x9D,
+        )
+    )
+    stream.write(struct.pack("<2H6L", 0x108, 0, len(data), 0, 0, address, 0, 0))
+    for name, virt_size, virt_addr, raw_data_size, raw_data_ptr, flags in sections:
+        stream.write(
+            struct.pack(
+                "<8s9L2H",
+                name,
+                virt_size,
+                virt_addr,
+                raw_data_size,
+                raw_data_ptr,
+                0,
+                0,
+                0,
+                0,
+                flags,
+                0,
+                0,
+            )
+        )
+    stream.write(data)
+    stream.seek(0)
+
+    return stream
+
+
+@attr.s
+class Bench:
+    """A simulated device and a host :class:`epyqlib.hildevice.Device`
+    connected through a virtual bus.
+    """
+
+    definition_path = attr.ib(converter=pathlib.Path)
+    link = attr.ib(default=attr.Factory(epyqlib.simulateddevice.Link))
+    channel = attr.ib(default="epyqlib_benchmark")
+    device = attr.ib(default=None)
+    host = attr.ib(default=None)
+    bus = attr.ib(default=None)
+
+    def start(self):
+        self.device = epyqlib.simulateddevice.Device.from_path(
+            path=self.definition_path,
+            bus=can.interface.Bus(bustype="virtual", channel=self.channel),
+            link=self.link,
+        )
+
+        self.bus = epyqlib.busproxy.BusProxy(
+            bus=can.interface.Bus(bustype="virtual", channel=self.channel),
+            auto_disconnect=False,
+        )
+
+        self.host = epyqlib.hildevice.Device(definition_path=self.definition_path)
+        self.host.load()
+        self.host.set_bus(bus=self.bus)
+
+    def stop(self):
+        self.bus.set_bus()
+
+        self.device.stop()
+        self.device.bus.shutdown()
+
+    async def read_all(self):
+        requests = self.device.nv_responder.requests
+        start = time.monotonic()
+        await self.host.nvs.read_all_from_device(background=True)
+        seconds = time.monotonic() - start
+
+        return Result(
+            name="read_all_from_device",
+            quantity=self.device.nv_responder.requests - requests,
+            units="requests",
+            seconds=seconds,
+        )
+
+    async def write_all(self):
+        # the host signals are not updated by the passive reads so explicit
+        # values are written
+        values = {
+            (nv, meta): nv.some_packable_value()
+            for nv in self.host.nvs.all_nv()
+            for meta in epyqlib.nv.meta_limits_first
+        }
+
+        requests = self.device.nv_responder.requests
+        start = time.monotonic()
+        await self.host.nvs.write_all_to_device(values=values, background=True)
+        seconds = time.monotonic() - start
+
+        return Result(
+            name="write_all_to_device",
+            quantity=self.device.nv_responder.requests - requests,
+            units="requests",
+            seconds=seconds,
+        )
+
+    async def pull_raw_log(self, octets):
+        import epyqlib.datalogger
+        from epyqlib.tabs.files.log_manager import LogManager
+
+        data = bytes(random.Random(0).getrandbits(8) for _ in range(octets))
+        self.device.set_log(data)
+
+        data_logger = epyqlib.datalogger.DataLogger(
+            nvs=self.host.nvs,
+            bus=self.bus,
+            device=self.host,
+            progress=Progress(),
+            tx_id=self.host.neo.frame_by_name("CCP").id,
+            rx_id=self.host.neo.frame_by_name("CCPResponse").id,
+        )
+
+        with tempfile.TemporaryDirectory() as directory:
+            directory = pathlib.Path(directory)
+            LogManager.init(files_dir=str(directory))
+
+            path = directory / "benchmark.raw"
+            start = time.monotonic()
+            await data_logger.pull_raw_log(path=path)
+            seconds = time.monotonic() - start
+
+            if path.read_bytes() != data:
+                raise Exception("Pulled log does not match the simulated log")
+
+        return Result(
+            name="DataLogger.pull_raw_log",
+            quantity=octets,
+            units="bytes",
+            seconds=seconds,
+        )
+
+    async def flash(self, octets, coff=None):
+        import epyqlib.flash
+
+        if coff is None:
+            data = bytes(random.Random(0).getrandbits(8) for _ in range(octets))
+            coff = synthetic_coff(data=data)
+
+        flasher = epyqlib.flash.Flasher(file=coff, bus=self.bus)
+        done = epyqlib.utils.twisted.signal_as_awaitable(flasher.done)
+        flasher.flash()
+        await done
+
+        if flasher.data_delta_time is None:
+            raise Exception("Flashing the simulated device failed")
+
+        return Result(
+            name="Flasher.flash",
+            quantity=flasher.download_bytes,
+            units="bytes",
+            seconds=flasher.data_delta_time,
+        )
+
+
+def random_frames(count, seed=0):
+    """Extended id frames with random contents about a millisecond apart."""
+    state = numpy.random.RandomState(seed)
+
+    frames = numpy.zeros(count, dtype=epyqlib.utils.canlog.frame_dtype)
+    frames["timestamp"] = numpy.cumsum(state.exponential(0.001, count))
+    frames["id"] = state.randint(0, 0x20000000, count)
+    frames["flags"] = epyqlib.utils.canlog.FrameFlags.extended
+    frames["dlc"] = state.randint(0, 9, count)
+    frames["data"] = state.randint(0, 256, (count, 8))
+
+    return frames
+
+
+def _write_text(frames, path, write, **kwargs):
+    with open(path, "w") as f:
+        write(frames, f, **kwargs)
+
+
+trace_formats = {
+    "trc_1_1": (
+        ".trc",
+        functools.partial(
+            _write_text,
+            write=epyqlib.utils.canlogio.write_trc,
+            version="1.1",
+        ),
+    ),
+    "trc_1_3": (
+        ".trc",
+        functools.partial(
+            _write_text,
+            write=epyqlib.utils.canlogio.write_trc,
+            version="1.3",
+        ),
+    ),
+    "candump": (
+        ".log",
+        functools.partial(_write_text, write=epyqlib.utils.canlogio.write_candump),
+    ),
+    "blf": (".blf", epyqlib.utils.canlogio.write_blf),
+    "asc": (".asc", epyqlib.utils.canlogio.write_asc),
+    "capture": (".cap", epyqlib.utils.canlogio.write_capture),
+    "indexed": (".cix", epyqlib.utils.canlogio.write_indexed),
+}
+
+
+def trace_format_results(frames, directory, selected=tuple(trace_formats)):
+    """Time writing then reading ``frames`` in each format.  Rates are in
+    megabytes of the file per second.
+    """
+    directory = pathlib.Path(directory)
+
+    for name in selected:
+        suffix, write = trace_formats[name]
+        path = directory / (name + suffix)
+
+        start = time.monotonic()
+        write(frames, path)
+        write_seconds = time.monotonic() - start
+
+        megabytes = path.stat().st_size / 1e6
+
+        start = time.monotonic()
+        read = epyqlib.utils.canlogio.concatenate(epyqlib.utils.canlogio.read(path))
+        read_seconds = time.monotonic() - start
+
+        if len(read) != len(frames):
+            raise Exception(
+                "{} read {} of {} frames".format(name, len(read), len(frames))
+            )
+
+        yield Result(
+            name="{} write".format(name),
+            quantity=round(megabytes, 3),
+            units="MB",
+            seconds=write_seconds,
+        )
+        yield Result(
+            name="{} read".format(name),
+            quantity=round(megabytes, 3),
+            units="MB",
+            seconds=read_seconds,
+        )
+
+
+class NamedNode(epyqlib.treenode.TreeNode):
+    def __init__(self, name, **kwargs):
+        self.name = name
+        super().__init__(**kwargs)
+
+
+def wide_tree(count, width=1000):
+    """A root with groups of ``width`` named leaves, ``count`` nodes total."""
+    root = NamedNode(name="root")
+    group = None
+
+    for i in range(count - 1):
+        if i % (width + 1) == 0:
+            group = NamedNode(name="group {}".format(i))
+            root.append_child(group)
+        else:
+            group.append_child(NamedNode(name="node {}".format(i)))
+
+    return root
+
+
+def tree_results(count, lookups=1000):
+    """Time row, parent and attribute lookups over a tree of ``count``
+    nodes.
+    """
+    import epyqlib.pyqabstractitemmodel
+
+    root = wide_tree(count=count)
+    nodes = list(epyqlib.treenode.subtree(root))[1:]
+
+    start = time.monotonic()
+    for node in nodes:
+        node.tree_parent.row_of_child(node)
+    yield Result(
+        name="TreeNode.row_of_child",
+        quantity=len(nodes),
+        units="lookups",
+        seconds=time.monotonic() - start,
+    )
+
+    model = epyqlib.pyqabstractitemmodel.PyQAbstractItemModel(root=root)
+    indexes = [model.index_from_node(node) for node in nodes]
+
+    start = time.monotonic()
+    for index in indexes:
+        model.parent(index)
+    yield Result(
+        name="PyQAbstractItemModel.parent",
+        quantity=len(indexes),
+        units="lookups",
+        seconds=time.monotonic() - start,
+    )
+
+    names = [node.name for node in random.Random(0).sample(nodes, lookups)]
+
+    start = time.monotonic()
+    for name in names[: max(1, lookups // 100)]:
+        root.nodes_by_attribute(attribute_value=name, attribute_name="name")
+    yield Result(
+        name="TreeNode.nodes_by_attribute",
+        quantity=max(1, lookups // 100),
+        units="lookups",
+        seconds=time.monotonic() - start,
+    )
+
+    start = time.monotonic()
+    root.attribute_index("name")
+    yield Result(
+        name="TreeNode.attribute_index",
+        quantity=len(nodes),
+        units="nodes",
+        seconds=time.monotonic() - start,
+    )
+
+    start = time.monotonic()
+    for name in names:
+        root.nodes_by_attribute(attribute_value=name, attribute_name="name")
+    yield Result(
+        name="TreeNode.nodes_by_attribute indexed",
+        quantity=lookups,
+        units="lookups",
+        seconds=time.monotonic() - start,
+    )
+
+
+def filter_model(count, width=1000):
+    """A two column item model of groups of ``width`` named and commented
+    rows, ``count`` rows total."""
+    import PyQt5.QtGui
+
+    model = PyQt5.QtGui.QStandardItemModel()
+    group = None
+
+    for i in range(count):
+        if i % (width + 1) == 0:
+            group = PyQt5.QtGui.QStandardItem("group {}".format(i))
+            model.appendRow([group, PyQt5.QtGui.QStandardItem("")])
+        else:
+            group.appendRow(
+                [
+                    PyQt5.QtGui.QStandardItem("parameter {}".format(i)),
+                    PyQt5.QtGui.QStandardItem("comment {}".format(i % 97)),
+                ]
+            )
+
+    return model
+
+
+filter_queries = ("parameter 12", "comment 5", "g*p 3", "missing")
+
+
+def filter_results(count, queries=filter_queries):
+    """Time building the search index over ``count`` rows, querying it and
+    refiltering a :class:`epyqlib.utils.qt.PySortFilterProxyModel`.
+    """
+    import epyqlib.utils.qt
+
+    model = filter_model(count=count)
+    proxy = epyqlib.utils.qt.PySortFilterProxyModel(
+        filter_column=0,
+        search_columns=(1,),
+    )
+
+    start = time.monotonic()
+    proxy.setSourceModel(model)
+    proxy.search_index.build()
+    yield Result(
+        name="SearchIndex build",
+        quantity=count,
+        units="rows",
+        seconds=time.monotonic() - start,
+    )
+
+    start = time.monotonic()
+    for query in queries:
+        proxy.search_index.query(query)
+    yield Result(
+        name="SearchIndex.query",
+        quantity=len(queries),
+        units="queries",
+        seconds=time.monotonic() - start,
+    )
+
+    start = time.monotonic()
+    for query in queries:
+        proxy.setFilterWildcard(query)
+        proxy.rowCount()
+    yield Result(
+        name="PySortFilterProxyModel filter",
+        quantity=len(queries),
+        units="queries",
+        seconds=time.monotonic() - start,
+    )
+
+
+def parameter_model_root(count, width=1000):
+    """A parameter model root with groups of ``width`` parameters,
+    ``count`` parameters total."""
+    import epyqlib.pm.parametermodel
+
+    root = epyqlib.pm.parametermodel.Root()
+    group = None
+
+    for i in range(count):
+        if i % width == 0:
+            group = epyqlib.pm.parametermodel.Group(name="group {}".format(i))
+            root.append_child(group)
+
+        group.append_child(
+            epyqlib.pm.parametermodel.Parameter(
+                name="parameter {}".format(i),
+                default=i,
+            ),
+        )
+
+    return root
+
+
+def value_set_results(count):
+    """Time populating a value set from a parameter model of ``count``
+    parameters then serializing it with graham and with the compiled
+    serializer."""
+    import graham
+
+    import epyqlib.pm.valuesetmodel
+    import epyqlib.utils.graham
+
+    root = parameter_model_root(count=count)
+    value_set = epyqlib.pm.valuesetmodel.create_blank()
+
+    start = time.monotonic()
+    epyqlib.pm.valuesetmodel.copy_parameter_data(
+        value_set=value_set,
+        base_node=root,
+    )
+    yield Result(
+        name="copy_parameter_data",
+        quantity=count,
+        units="parameters",
+        seconds=time.monotonic() - start,
+    )
+
+    root = value_set.model.root
+    schema = graham.schema(type(root))
+    s = graham.dumps(root, indent=4).data
+
+    for name, serialize in (
+        ("graham.dumps", lambda: graham.dumps(root, indent=4).data),
+        ("compiled dumps", lambda: epyqlib.utils.graham.dumps(root, indent=4)),
+        ("graham loads", lambda: schema.loads(s).data),
+        ("compiled loads", lambda: epyqlib.utils.graham.loads(type(root), s)),
+    ):
+        start = time.monotonic()
+        serialize()
+        yield Result(
+            name=name,
+            quantity=count,
+            units="parameters",
+            seconds=time.monotonic() - start,
+        )
+
+
+def table_root(count, length=5):
+    """A parameter model root holding a table over an enumeration of
+    ``count`` enumerators with two arrays of ``length`` elements."""
+    import epyqlib.attrsmodel
+    import epyqlib.pm.parametermodel as parametermodel
+
+    root = parametermodel.Root()
+    root.model = epyqlib.attrsmodel.Model(root=root, columns=parametermodel.columns)
+
+    enumerations = parametermodel.Enumerations(name="Enumerations")
+    root.append_child(enumerations)
+    enumeration = parametermodel.Enumeration(name="Rows")
+    enumerations.append_child(enumeration)
+    for i in range(count):
+        enumeration.append_child(
+            parametermodel.Enumerator(name="row {}".format(i), value=i),
+        )
+
+    table = parametermodel.Table(name="Table")
+    root.append_child(table)
+    table.append_child(
+        parametermodel.TableEnumerationReference(
+            name="Rows",
+            enumeration_uuid=enumeration.uuid,
+        ),
+    )
+    for name in ("x", "y"):
+        array = parametermodel.Array(name=name)
+        table.append_child(array)
+        array.append_child(parametermodel.Parameter(name=name))
+        array.length = length
+
+    return root, table, enumeration
+
+
+def table_results(count):
+    """Time updating a table over ``count`` enumerators after adding and
+    then removing a single enumerator."""
+    import epyqlib.pm.parametermodel
+
+    root, table, enumeration = table_root(count=count)
+
+    start = time.monotonic()
+    table.update()
+    yield Result(
+        name="table update (unchanged)",
+        quantity=count,
+        units="enumerators",
+        seconds=time.monotonic() - start,
+    )
+
+    enumerator = epyqlib.pm.parametermodel.Enumerator(name="extra", value=count)
+    enumeration.append_child(enumerator)
+    start = time.monotonic()
+    table.update()
+    yield Result(
+        name="table update (enumerator added)",
+        quantity=count,
+        units="enumerators",
+        seconds=time.monotonic() - start,
+    )
+
+    enumeration.remove_child(child=enumerator)
+    start = time.monotonic()
+    table.update()
+    yield Result(
+        name="table update (enumerator removed)",
+        quantity=count,
+        units="enumerators",
+        seconds=time.monotonic() - start,
+    )
+
+
+scenarios = ("read_all", "write_all", "pull_raw_log", "flash")
+
+
+def history_record(result, **parameters):
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "version": epyqlib.__version__,
+        "name": result.name,
+        "quantity": result.quantity,
+        "units": result.units,
+        "seconds": result.seconds,
+        "rate": result.rate,
+        **parameters,
+    }
+
+
+def write_history(path, results, **parameters):
+    with open(path, "a") as f:
+        for result in results:
+            f.write(json.dumps(history_record(result=result, **parameters)))
+            f.write("\n")
+
+
+async def run(bench, selected, log_octets, flash_octets, coff):
+    results = []
+
+    bench.start()
+    try:
+        for name in selected:
+            if name == "read_all":
+                result = await bench.read_all()
+            elif name == "write_all":
+                result = await bench.write_all()
+            elif name == "pull_raw_log":
+                result = await bench.pull_raw_log(octets=log_octets)
+            elif name == "flash":
+                result = await bench.flash(octets=flash_octets, coff=coff)
+
+            click.echo(str(result))
+            results.append(result)
+    finally:
+        bench.stop()
+
+    return results
+
+
+history_option = click.option(
+    "--history",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="JSON lines file each result is appended to",
+)
+
+
+def create_command():
+    @click.group()
+    def group():
+        """Measure throughput of protocols and trace file formats."""
+
+    @group.command()
+    @click.option(
+        "--device",
+        "definition_path",
+        type=click.Path(exists=True, dir_okay=False),
+        required=True,
+        help="Device definition (.epc) used for both the host and the device",
+    )
+    @click.option(
+        "--scenario",
+        "selected",
+        type=click.Choice(scenarios),
+        multiple=True,
+        help="Run only these scenarios, all by default",
+    )
+    @click.option("--latency", type=float, default=0, help="Seconds per response")
+    @click.option("--jitter", type=float, default=0, help="Seconds of +/- jitter")
+    @click.option("--loss", type=float, default=0, help="Response loss, 0 to 1")
+    @click.option("--seed", type=int, default=None)
+    @click.option("--log-octets", type=int, default=16 * 1024)
+    @click.option("--flash-octets", type=int, default=16 * 1024)
+    @click.option(
+        "--coff",
+        type=click.File("rb"),
+        default=None,
+        help="Image to flash instead of a generated one",
+    )
+    @history_option
+    def device(
+        definition_path,
+        selected,
+        latency,
+        jitter,
+        loss,
+        seed,
+        log_octets,
+        flash_octets,
+        coff,
+        history,
+    ):
+        """Measure protocol throughput against a simulated device."""
+        # TODO: CAMPid 03127876954165421679215396954697
+        if "twisted.internet.reactor" in sys.modules:
+            del sys.modules["twisted.internet.reactor"]
+
+        from PyQt5 import QtCore
+        import qt5reactor
+
+        app = QtCore.QCoreApplication.instance()
+        if app is None:
+            app = QtCore.QCoreApplication(sys.argv)
+
+        qt5reactor.install()
+
+        import twisted.internet.defer
+        from twisted.internet import reactor
+
+        link = epyqlib.simulateddevice.Link(
+            latency=latency,
+            jitter=jitter,
+            loss=loss,
+            random=random.Random(seed),
+        )
+        bench = Bench(definition_path=definition_path, link=link)
+
+        outcome = []
+
+        d = twisted.internet.defer.ensureDeferred(
+            run(
+                bench=bench,
+                selected=selected if len(selected) > 0 else scenarios,
+                log_octets=log_octets,
+                flash_octets=flash_octets,
+                coff=coff,
+            )
+        )
+        d.addCallback(outcome.append)
+        d.addErrback(epyqlib.utils.twisted.errbackhook)
+        d.addBoth(lambda _: reactor.stop())
+
+        reactor.run()
+
+        if len(outcome) == 0:
+            raise click.ClickException("Benchmark failed")
+
+        if history is not None:
+            write_history(
+                path=history,
+                results=outcome[0],
+                link=attr.asdict(link, filter=lambda a, v: a.name != "random"),
+            )
+
+    @group.command()
+    @click.option("--frames", "count", type=int, default=1_000_000)
+    @click.option(
+        "--format",
+        "selected",
+        type=click.Choice(trace_formats),
+        multiple=True,
+        help="Run only these formats, all by default",
+    )
+    @history_option
+    def formats(count, selected, history):
+        """Measure trace file read and write rates in MB/s."""
+        frames = random_frames(count=count)
+
+        with tempfile.TemporaryDirectory() as directory:
+            results = []
+            for result in trace_format_results(
+                frames=frames,
+                directory=directory,
+                selected=selected if len(selected) > 0 else tuple(trace_formats),
+            ):
+                click.echo(str(result))
+                results.append(result)
+
+        if history is not None:
+            write_history(path=history, results=results, frames=count)
+
+    @group.command()
+    @click.option("--nodes", "count", type=int, default=100_000)
+    @history_option
+    def tree(count, history):
+        """Measure tree node and item model lookup rates."""
+        results = []
+        for result in tree_results(count=count):
+            click.echo(str(result))
+            results.append(result)
+
+        if history is not None:
+            write_history(path=history, results=results, nodes=count)
+
+    @group.command(name="filter")
+    @click.option("--rows", "count", type=int, default=50_000)
+    @history_option
+    def filter_(count, history):
+        """Measure search index and filter proxy query latency."""
+        results = []
+        for result in filter_results(count=count):
+            click.echo(str(result))
+            results.append(result)
+
+        if history is not None:
+            write_history(path=history, results=results, rows=count)
+
+    @group.command(name="value-sets")
+    @click.option(
+        "--parameters",
+        "counts",
+        type=int,
+        multiple=True,
+        default=(10_000, 50_000),
+        show_default=True,
+    )
+    @history_option
+    def value_sets(counts, history):
+        """Measure populating and serializing value sets from parameter
+        models."""
+        for count in counts:
+            results = []
+            for result in value_set_results(count=count):
+                click.echo(str(result))
+                results.append(result)
+
+            if history is not None:
+                write_history(path=history, results=results, parameters=count)
+
+    @group.command()
+    @click.option("--enumerators", "count", type=int, default=1_000)
+    @history_option
+    def tables(count, history):
+        """Measure updating a table after editing one of its enumerations."""
+        results = []
+        for result in table_results(count=count):
+            click.echo(str(result))
+            results.append(result)
+
+        if history is not None:
+            write_history(path=history, results=results, enumerators=count)
+
+    return group
@@ -64,6 +64,8 @@ class BusProxy:
     ):
         self.filters = filters
         self.auto_disconnect = auto_disconnect
+        # listeners called directly from the python-can notifier thread
+        self.captures = []
 
         self.timeout = timeout
         self.notifier = NotifierProxy(self)
@@ -244,7 +246,9 @@ class BusProxy:
             self.set_filters(self.filters)
             if isinstance(self.bus, can.BusABC):
                 self.real_notifier = can.Notifier(
-                    bus=self.bus, listeners=[self.notifier], timeout=self.timeout
+                    bus=self.bus,
+                    listeners=[self.notifier, *self.captures],
+                    timeout=self.timeout,
                 )
             else:
                 self.bus.notifier.add(self.notifier)
@@ -280,6 +284,24 @@ class BusProxy:
                 if hasattr(self.bus, "reset"):
                     self.bus.reset()
 
+    def add_capture(self, listener):
+        """Add a :class:`can.Listener`, such as an
+        :class:`epyqlib.utils.canlog.Capture`, to be called from the python-can
+        notifier thread of the innermost proxy for every received message.
+        """
+        inner = self.inner_proxy()
+        inner.captures.append(listener)
+
+        if inner.real_notifier is not None:
+            inner.real_notifier.add_listener(listener)
+
+    def remove_capture(self, listener):
+        inner = self.inner_proxy()
+        inner.captures.remove(listener)
+
+        if inner.real_notifier is not None:
+            inner.real_notifier.remove_listener(listener)
+
     def inner_proxy(self):
         maybe = self
         while True:
@@ -1,13 +1,53 @@
+import importlib
+
 import click
 
-import epyqlib.cli.audit
-import epyqlib.pm.valueset
 
+class LazyGroup(click.Group):
+    """A group whose ``lazy_commands`` are only imported when used.
 
-@click.group()
-def cli():
-    pass
+    ``lazy_commands`` maps command names to the module name and the name of
+    either the command in it or the function in it which creates the
+    command.  This keeps the heavier dependencies of those commands out of
+    every other command.
+    """
+
+    def __init__(self, *args, lazy_commands=None, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        if lazy_commands is None:
+            lazy_commands = {}
+
+        self.lazy_commands = dict(lazy_commands)
 
+    def list_commands(self, ctx):
+        return sorted({*super().list_commands(ctx), *self.lazy_commands})
 
-cli.add_command(epyqlib.pm.valueset.group)
-cli.add_command(epyqlib.cli.audit.create_command(), name="audit")
+    def get_command(self, ctx, name):
+        if name not in self.lazy_commands:
+            return super().get_command(ctx, name)
+
+        module_name, factory_name = self.lazy_commands[name]
+        module = importlib.import_module(module_name)
+        command = getattr(module, factory_name)
+        if not isinstance(command, click.Command):
+            command = command()
+        self.add_command(command, name=name)
+        del self.lazy_commands[name]
+
+        return command
+
+
+@click.group(
+    cls=LazyGroup,
+    lazy_commands={
+        "benchmark": ("epyqlib.benchmark", "create_command"),
+        "replay": ("epyqlib.utils.canreplay", "create_command"),
+        "decode": ("epyqlib.utils.candecode", "create_command"),
+        "bus-stats": ("epyqlib.utils.canstats", "create_command"),
+        "value-sets": ("epyqlib.pm.valueset", "group"),
+        "audit": ("epyqlib.cli.audit", "create_command"),
+    },
+)
+def cli():
+    pass
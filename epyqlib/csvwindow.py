@@ -10,8 +10,11 @@ import logging
 import signal
 import sys
 
+import numpy
 from PyQt5 import QtChart, QtCore, QtGui, QtWidgets
 
+import epyqlib.utils.decimation
+
 # See file COPYING in this source tree
 __copyright__ = "Copyright 2017, EPC Power Corp."
 __license__ = "GPLv2+"
@@ -46,16 +49,31 @@ def main(args=None):
 
 
 def read_csv(filename):
+    """Read a CSV of numbers with a header row into a column array per
+    field name."""
     with open(filename, "r") as f:
-        reader = csv.DictReader(f)
-
-        data = {name: [] for name in reader.fieldnames}
+        (fieldnames,) = csv.reader([f.readline()])
+        text = f.read().strip()
+
+    rows = 0 if len(text) == 0 else text.count("\n") + 1
+    values = numpy.fromstring(text.replace("\n", ","), sep=",")
+
+    if len(values) != rows * len(fieldnames):
+        raise ValueError(
+            "Expected {} values in {} rows of {} columns but parsed {}".format(
+                rows * len(fieldnames),
+                rows,
+                len(fieldnames),
+                len(values),
+            )
+        )
 
-        for row in reader:
-            for k, v in row.items():
-                data[k].append(float(v))
+    columns = values.reshape(rows, len(fieldnames)).T
 
-    return data
+    return {
+        name: numpy.ascontiguousarray(column)
+        for name, column in zip(fieldnames, columns)
+    }
 
 
 # class Chart(QtChart.QChart):
@@ -150,6 +168,8 @@ class CheckableChart:
         self.series = QtChart.QLineSeries()
         self.chart.addSeries(self.series)
         self.chart.createDefaultAxes()
+        self.chart.axisX().rangeChanged.connect(self._x_range_changed)
+        self.chart.plotAreaChanged.connect(self._plot_area_changed)
 
         # self.chart.plotAreaChanged.connect(self._plot_area_changed)
         self.original_area = None
@@ -166,7 +186,7 @@ class CheckableChart:
         self._name = None
         self.name = "<unnamed>"
 
-        self.data = ()
+        self.pyramid = epyqlib.utils.decimation.MinMaxPyramid(x=(), y=())
 
     @property
     def name(self):
@@ -192,23 +212,43 @@ class CheckableChart:
     def _check_changed(self, state):
         self.view.setVisible(state == QtCore.Qt.Checked)
 
-    def set_data(self, data):
-        self.data = tuple(data)
+    def set_data(self, x, y):
+        self.pyramid = epyqlib.utils.decimation.MinMaxPyramid(x=x, y=y)
         self.update()
 
     def scaling_changed(self, _):
         self.update()
 
-    def update(self):
-        scale = self.scaling_spin_box.value()
+    def _x_range_changed(self, minimum, maximum):
+        self.update_series(minimum=minimum, maximum=maximum)
+
+    def _plot_area_changed(self, _):
+        axis = self.chart.axisX()
+        self.update_series(minimum=axis.min(), maximum=axis.max())
+
+    def update_series(self, minimum, maximum):
+        """Draw the samples between ``minimum`` and ``maximum`` at the level
+        of detail needed for the width of the plot."""
+        x, y = self.pyramid.query(
+            start=minimum,
+            end=maximum,
+            width=self.chart.plotArea().width(),
+        )
+        y = y * self.scaling_spin_box.value()
 
         self.series.replace(
-            QtGui.QPolygonF((QtCore.QPointF(x, y * scale) for x, y in self.data))
+            QtGui.QPolygonF([QtCore.QPointF(*point) for point in zip(x, y)])
         )
 
-        if len(self.data) > 0:
-            y_minimum = min(y for _, y in self.data) * scale
-            y_maximum = max(y for _, y in self.data) * scale
+    def update(self):
+        scale = self.scaling_spin_box.value()
+
+        if len(self.pyramid) == 0:
+            self.series.clear()
+        else:
+            y_minimum = self.pyramid.y.min() * scale
+            y_maximum = self.pyramid.y.max() * scale
+            y_minimum, y_maximum = sorted((y_minimum, y_maximum))
 
             delta = y_maximum - y_minimum
 
@@ -222,13 +262,15 @@ class CheckableChart:
                 y_maximum + extra,
             )
 
-            x_minimum = min(x for x, _ in self.data)
-            x_maximum = max(x for x, _ in self.data)
+            x_minimum = self.pyramid.x.min()
+            x_maximum = self.pyramid.x.max()
 
-            self.chart.axisX().setRange(
-                x_minimum,
-                x_maximum,
-            )
+            axis = self.chart.axisX()
+            if (axis.min(), axis.max()) == (x_minimum, x_maximum):
+                self.update_series(minimum=x_minimum, maximum=x_maximum)
+            else:
+                # the range change redraws the series
+                axis.setRange(x_minimum, x_maximum)
 
 
 class QtChartWindow(QtWidgets.QMainWindow):
@@ -303,10 +345,10 @@ class QtChartWindow(QtWidgets.QMainWindow):
             view.setRenderHint(QtGui.QPainter.Antialiasing)
 
             if ".time" in data:
-                d = zip(data[".time"], values)
+                x = data[".time"]
             else:
-                d = enumerate(values)
-            checkable_chart.set_data(data=d)
+                x = numpy.arange(len(values))
+            checkable_chart.set_data(x=x, y=values)
             self.x_axes.append(chart.axisX())
             self.checkable_charts.append(checkable_chart)
 
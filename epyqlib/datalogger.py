@@ -86,12 +86,12 @@ class DataLogger:
             nv_signal=build_hash_signal,
             meta=epyqlib.nv.MetaEnum.value,
         )
-        build_hash = f"{build_hash[0]:07x}"
+        build_hash = f"{int(build_hash[0]):07x}"
         serial_number = await self.nv_protocol.read(
             nv_signal=serial_number_signal,
             meta=epyqlib.nv.MetaEnum.value,
         )
-        serial_number = str(serial_number[0])
+        serial_number = str(int(serial_number[0]))
 
         await LogManager.get_instance().add_pending_log(path, build_hash, serial_number)
 
@@ -6,6 +6,7 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+import appdirs
 import attr
 import can
 import canmatrix.formats
@@ -33,6 +34,7 @@ import epyqlib.utils.qt
 import epyqlib.utils.j1939
 import epyqlib.variableselectionmodel
 import functools
+import hashlib
 import importlib.util
 import io
 import itertools
@@ -223,6 +225,90 @@ def load_matrix(path):
     return matrix
 
 
+zip_cache_path = pathlib.Path(appdirs.user_cache_dir("Epyq", "EPC Power"), "devices")
+zip_cache_size = 20
+zip_cache_manifest_name = "epz.json"
+
+
+def check_zip_code(zip_file, code):
+    """Raise :class:`RuntimeError` if ``code`` does not open the encrypted
+    members of ``zip_file``.  Only the encryption headers are read."""
+    for info in zip_file.infolist():
+        if info.flag_bits & 0x1:
+            zip_file.open(info, pwd=code).close()
+
+
+def cached_zip_epc(zip_file, digest, code):
+    """Get the path to the .epc of the device in ``zip_file``, extracted and
+    updated to the latest format.
+
+    Extracted devices are kept in :data:`zip_cache_path` by the ``digest``
+    of the archive so reopening a package skips the extraction and
+    conversion.  Only the :data:`zip_cache_size` most recently opened
+    packages are kept.
+    """
+    directory = zip_cache_path / digest
+    manifest = directory / zip_cache_manifest_name
+
+    try:
+        with open(manifest) as f:
+            epc = directory / json.load(f)["epc"]
+    except FileNotFoundError:
+        pass
+    else:
+        os.utime(manifest)
+        return epc
+
+    zip_cache_path.mkdir(parents=True, exist_ok=True)
+    staging = pathlib.Path(tempfile.mkdtemp(prefix=".staging-", dir=zip_cache_path))
+
+    try:
+        extracted = staging / "archive"
+        zip_file.extractall(path=extracted, pwd=code)
+
+        # TODO error dialog if no .epc found in zip file
+        epc = min(extracted.glob("**/*.epc"), key=lambda path: len(path.parts))
+
+        if not epyqlib.updateepc.is_latest(os.fspath(epc)):
+            epc = pathlib.Path(
+                epyqlib.updateepc.convert(
+                    os.fspath(epc),
+                    os.fspath(staging / "converted"),
+                )
+            )
+
+        with open(staging / zip_cache_manifest_name, "w") as f:
+            json.dump({"epc": epc.relative_to(staging).as_posix()}, f)
+
+        try:
+            staging.rename(directory)
+        except OSError:
+            # another instance cached the same archive first
+            pass
+        else:
+            prune_zip_cache()
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    with open(manifest) as f:
+        return directory / json.load(f)["epc"]
+
+
+def prune_zip_cache(size=None):
+    """Remove all but the ``size`` most recently opened cached devices."""
+    if size is None:
+        size = zip_cache_size
+
+    manifests = sorted(
+        zip_cache_path.glob("*/" + zip_cache_manifest_name),
+        key=lambda path: path.stat().st_mtime,
+        reverse=True,
+    )
+
+    for manifest in manifests[size:]:
+        shutil.rmtree(manifest.parent, ignore_errors=True)
+
+
 class Device:
     def __init__(self, *args, **kwargs):
         self.bus = None
@@ -294,8 +380,15 @@ class Device:
         extension = os.path.splitext(file)[1].casefold()
 
         if extension in (".epz", ".zip"):
-            zip_file = zipfile.ZipFile(file)
-            self._init_from_zip(zip_file, **kwargs)
+            with open(file, "rb") as f:
+                archive = f.read()
+
+            zip_file = zipfile.ZipFile(io.BytesIO(archive))
+            self._init_from_zip(
+                zip_file,
+                digest=hashlib.sha256(archive).hexdigest(),
+                **kwargs,
+            )
         else:
             try:
                 self.config_path = os.path.abspath(file)
@@ -500,22 +593,22 @@ class Device:
     def _init_from_zip(
         self,
         zip_file,
+        digest,
         rx_interval=0,
         archive_code=None,
         **kwargs,
     ):
         self.from_zip = True
-        path = tempfile.mkdtemp()
 
         code = epyqlib.utils.qt.get_code()
 
         if archive_code is not None:
             code = archive_code.encode("ascii")
-            zip_file.extractall(path=path, pwd=code)
+            check_zip_code(zip_file=zip_file, code=code)
         else:
             while True:
                 try:
-                    zip_file.extractall(path=path, pwd=code)
+                    check_zip_code(zip_file=zip_file, code=code)
                 except RuntimeError:
                     code, ok = QInputDialog.getText(
                         None, ".epz Password", ".epz Password", QLineEdit.Password
@@ -528,33 +621,12 @@ class Device:
                 else:
                     break
 
-        # TODO error dialog if no .epc found in zip file
-        filename = None
-        for directory, directories, files in os.walk(path):
-            for f in files:
-                logger.info(f)
-                if os.path.splitext(f)[1] == ".epc":
-                    filename = os.path.join(path, directory, f)
-                    break
-
-            if filename is not None:
-                break
-
+        filename = cached_zip_epc(zip_file=zip_file, digest=digest, code=code)
         self.config_path = os.path.abspath(filename)
 
-        converted_directory = None
-        if not epyqlib.updateepc.is_latest(filename):
-            converted_directory = tempfile.TemporaryDirectory()
-            file = epyqlib.updateepc.convert(filename, converted_directory.name)
-            self.config_path = os.path.abspath(file)
-
         with open(filename, "r") as f:
             self._load_config(f, rx_interval=rx_interval, **kwargs)
 
-        if converted_directory is not None:
-            converted_directory.cleanup()
-        shutil.rmtree(path)
-
     def traverse(self, dict_node):
         for key, value in dict_node.items():
             if isinstance(value, dict):
@@ -839,6 +911,7 @@ class Device:
 
                     sort_proxy = epyqlib.utils.qt.PySortFilterProxyModel(
                         filter_column=column,
+                        search_columns=(epyqlib.nv.Columns.indexes.comment,),
                     )
                     sort_proxy.setSortCaseSensitivity(Qt.CaseInsensitive)
                     sort_proxy.setSourceModel(nv_model)
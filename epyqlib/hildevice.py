@@ -1,3 +1,4 @@
+import collections.abc
 import contextlib
 import decimal
 import functools
@@ -17,10 +18,13 @@ import epcsunspecdemo.utils
 import sunspec.core.client
 import twisted.internet.defer
 
+import epyqlib.asyncio.busproxy
+import epyqlib.asyncio.nvs
 import epyqlib.busproxy
 import epyqlib.canneo
 import epyqlib.device
 import epyqlib.nv
+import epyqlib.utils.asyncio
 import epyqlib.utils.qt
 import epyqlib.utils.twisted
 import epyqlib.utils.units
@@ -149,6 +153,23 @@ operator_map = {
 reverse_operator_map = {v: k for k, v in operator_map.items()}
 
 
+# limits are written before the values they constrain
+meta_write_order = (
+    epyqlib.nv.MetaEnum.maximum,
+    epyqlib.nv.MetaEnum.minimum,
+    epyqlib.nv.MetaEnum.factory_default,
+    epyqlib.nv.MetaEnum.user_default,
+    epyqlib.nv.MetaEnum.value,
+)
+
+
+def values_by_meta(values):
+    if isinstance(values, collections.abc.Mapping):
+        return dict(values)
+
+    return {epyqlib.nv.MetaEnum.value: values}
+
+
 @attr.s
 class Signal:
     signal = attr.ib()
@@ -161,7 +182,7 @@ class Signal:
         last_received = self.signal.last_received()
 
         if last_received is None or last_received <= start - stale_after:
-            await epyqlib.utils.qt.signal_as_deferred(
+            await self.device.scheduler.signal_as_awaitable(
                 self.signal.value_set,
                 timeout=timeout,
             )
@@ -208,8 +229,14 @@ class Signal:
             present_value = await self.get()
             return op(present_value, value)
 
-        await epyqlib.utils.twisted.wait_for(
+        def passive_check(_):
+            present_value = self._to_human(enumeration_as_string=True)
+            return op(present_value, value)
+
+        await self.device.scheduler.wait_for(
             check=check,
+            signal=self.signal.value_set,
+            passive_check=passive_check,
             timeout=timeout,
             message=(
                 f"{self.signal.name} not {operator_string} {value} "
@@ -283,18 +310,26 @@ class Nv:
         for meta, value in values.items():
             await self.set_meta(value=value, meta=meta)
 
-    async def set_meta(self, value, meta):
+    def set_local(self, value, meta):
+        """Set the local copy of the meta and return the raw value."""
         units = self.units()
         if units != epyqlib.utils.units.registry.dimensionless:
             value = value.to(units).magnitude
 
         if meta == epyqlib.nv.MetaEnum.value:
-            self.nv.set_human_value(value)
+            signal = self.nv
         else:
-            getattr(self.nv.meta, meta.name).set_human_value(value)
+            signal = getattr(self.nv.meta, meta.name)
+
+        signal.set_human_value(value)
+
+        return signal.value
+
+    async def set_meta(self, value, meta):
+        self.set_local(value=value, meta=meta)
 
         # TODO: verify value was accepted
-        await self.device.nvs.protocol.write(
+        await self.device.nv_protocol.write(
             nv_signal=self.nv,
             meta=meta,
         )
@@ -351,7 +386,7 @@ class Nv:
                     await self.set_meta(value=value, meta=meta)
 
     async def get(self, meta=epyqlib.nv.MetaEnum.value):
-        value, _meta = await self.device.nvs.protocol.read(
+        value, _meta = await self.device.nv_protocol.read(
             nv_signal=self.nv,
             meta=meta,
         )
@@ -361,7 +396,15 @@ class Nv:
     def units(self):
         return parse_units(unit_string=self.nv.unit)
 
-    async def wait_for(self, op, value, timeout, ignore_read_failures=False):
+    async def wait_for(
+        self,
+        op,
+        value,
+        timeout,
+        ignore_read_failures=False,
+        period=0.1,
+        maximum_period=1,
+    ):
         op = operator_map.get(op, op)
         operator_string = reverse_operator_map.get(op, str(op))
 
@@ -376,8 +419,22 @@ class Nv:
 
             return op(own_value, value)
 
-        await epyqlib.utils.twisted.wait_for(
+        def passive_check(values):
+            own_value = values.get(self.nv)
+            if own_value is None:
+                # not in this status message so it says nothing either way
+                return None
+
+            return op(own_value * self.units(), value)
+
+        # values received in the cyclic status messages are checked as they
+        # arrive and the NV is only read when the device isn't sending them
+        await self.device.scheduler.wait_for(
             check=check,
+            signal=self.device.nv_status.values_received,
+            passive_check=passive_check,
+            period=period,
+            maximum_period=maximum_period,
             timeout=timeout,
             message=(
                 f"{self.nv.name} not {operator_string} {value} "
@@ -403,6 +460,11 @@ class Device:
     save_nv = attr.ib(default=None)
     save_nv_value = attr.ib(default=None)
     uuid = attr.ib(default=uuid.uuid4)
+    nv_protocol = attr.ib(default=None)
+    nv_status = attr.ib(default=None)
+    # provides sleep(), wait_for() and signal_as_awaitable() for the event
+    # loop in use, either epyqlib.utils.twisted or epyqlib.utils.asyncio
+    scheduler = attr.ib(default=epyqlib.utils.twisted)
 
     def load(self):
         if self.definition is not None:
@@ -436,6 +498,8 @@ class Device:
             access_level_path=self.definition.access_level_path,
             access_password_path=self.definition.access_password_path,
         )
+        self.nv_protocol = self.nvs.protocol
+        self.nv_status = epyqlib.nv.StatusListener(nvs=self.nvs)
 
         self.save_nv = self.nv(
             self.nvs.save_frame.mux_name,
@@ -457,10 +521,34 @@ class Device:
 
         self.bus = bus
         self.bus.notifier.add(self.neo)
+        self.bus.notifier.add(self.nv_status)
         # TODO: really think through what is proper...  won't this keep the
         #       nv objects from getting updated?
         # self.bus.notifier.add(self.nvs)
 
+    def set_asyncio_bus(self, bus, loop=None, window=4):
+        """Use a python-can ``bus`` directly from :mod:`asyncio` instead of
+        an :class:`epyqlib.busproxy.BusProxy` serviced by the Twisted reactor.
+        """
+        if self.bus is not None:
+            raise BusAlreadySetError()
+
+        try:
+            self.bus = epyqlib.asyncio.busproxy.BusProxy(
+                bus=bus,
+                listeners=[self.neo, self.nv_status],
+                loop=loop,
+            )
+            self.neo.set_bus(bus=self.bus)
+        except:
+            # TODO: actually rollback a partial setting
+            self.bus = object()
+            raise
+
+        self.nv_protocol = epyqlib.asyncio.nvs.Protocol(window=window)
+        self.bus.add_protocol(self.nv_protocol)
+        self.scheduler = epyqlib.utils.asyncio
+
     # @functools.lru_cache(maxsize=512)
     def signal(self, *path):
         return Signal(
@@ -493,6 +581,119 @@ class Device:
         except KeyError:
             return self.signal_from_uuid(uuid_=uuid_)
 
+    def nv_from_key(self, key):
+        """Look up an NV by :class:`Nv`, UUID or path.  A path is either a
+        sequence of names or a single ``"frame:signal"`` string.
+        """
+        if isinstance(key, Nv):
+            return key
+
+        if isinstance(key, uuid.UUID):
+            return self.nv_from_uuid(uuid_=key)
+
+        if isinstance(key, str):
+            key = key.rsplit(":", 1)
+
+        return self.nv(*key)
+
+    async def get_many(self, parameters, metas=(epyqlib.nv.MetaEnum.value,)):
+        """Read NVs using a single request per frame and meta.
+
+        ``parameters`` holds keys as accepted by :meth:`nv_from_key`.  It may
+        be a mapping of keys to the metas to read for each, otherwise
+        ``metas`` are read for all of them.  The result maps each key to a
+        dict of the values by meta.
+        """
+        if isinstance(parameters, collections.abc.Mapping):
+            requested = {key: tuple(metas) for key, metas in parameters.items()}
+        else:
+            requested = {key: tuple(metas) for key in parameters}
+
+        nvs = {key: self.nv_from_key(key) for key in requested}
+
+        groups = {}
+        for key, key_metas in requested.items():
+            nv = nvs[key].nv
+            for meta in key_metas:
+                groups.setdefault((nv.frame, meta), {})[nv] = None
+
+        async def read(nv_signals, meta):
+            values, _ = await self.nv_protocol.read_multiple(
+                nv_signals=nv_signals,
+                meta=meta,
+                all_values=True,
+            )
+
+            return meta, values
+
+        results = await self.scheduler.gather(
+            *(
+                read(nv_signals=tuple(signals), meta=meta)
+                for (_, meta), signals in groups.items()
+            )
+        )
+
+        received = {
+            (meta, status_signal): value
+            for meta, values in results
+            for status_signal, value in values.items()
+        }
+
+        return {
+            key: {
+                meta: received[meta, nvs[key].nv.status_signal] * nvs[key].units()
+                for meta in key_metas
+            }
+            for key, key_metas in requested.items()
+        }
+
+    async def set_many(self, values):
+        """Write NVs using a single request per frame and meta.
+
+        ``values`` maps keys as accepted by :meth:`nv_from_key` to either a
+        value or a dict of values by meta.  A bare value is written to the
+        value meta.  Metas are written in the same order as by
+        :meth:`Nv.set`.
+        """
+        groups = {}
+        for key, meta_values in values.items():
+            nv = self.nv_from_key(key)
+            for meta, value in values_by_meta(meta_values).items():
+                raw = nv.set_local(value=value, meta=meta)
+                groups.setdefault(meta, {}).setdefault(nv.nv.frame, {})[nv.nv] = raw
+
+        for meta in meta_write_order:
+            frames = groups.get(meta, {})
+            await self.scheduler.gather(
+                *(
+                    self.nv_protocol.write_multiple(
+                        nv_signals=nv_signals,
+                        meta=meta,
+                        all_values=True,
+                    )
+                    for nv_signals in frames.values()
+                )
+            )
+
+    @contextlib.asynccontextmanager
+    async def temporary_set_many(self, values):
+        """Apply :meth:`set_many` and restore the original values on exit.
+
+        The originals are read and restored in bulk as well.
+        """
+        original = await self.get_many(
+            parameters={
+                key: values_by_meta(meta_values).keys()
+                for key, meta_values in values.items()
+            },
+        )
+
+        try:
+            await self.set_many(values=values)
+            yield
+        finally:
+            await self.set_many(values=original)
+
     async def active_to_nv(self, wait=False):
         # TODO: dedupe 8795477695t46542676781543768139
         await self.save_nv.set(value=self.save_nv_value)
@@ -503,7 +704,7 @@ class Device:
     async def wait_for_nv_save_completion(self):
         nv = self.nv("StatusWarnings", "eeSaveInProgress")
 
-        await epyqlib.utils.twisted.sleep(2)
+        await self.scheduler.sleep(2)
 
         await nv.wait_for(
             op="==",
@@ -569,10 +770,23 @@ class Device:
             if node is not None
         )
 
-        await self.nvs.write_all_to_device(
-            only_these=selected_nodes,
-            meta=[epyqlib.nv.MetaEnum.value],
-        )
+        frames = {}
+        for node in selected_nodes:
+            if node.value is not None:
+                frames.setdefault(node.frame, {})[node] = node.value
+
+        for frame, values in frames.items():
+            if frame.read_write.min > 0:
+                continue
+
+            frame.update_from_signals()
+            await self.nv_protocol.write_multiple(
+                nv_signals=values,
+                meta=epyqlib.nv.MetaEnum.value,
+                priority=epyqlib.twisted.nvs.Priority.user,
+                passive=True,
+                all_values=True,
+            )
 
     @contextlib.asynccontextmanager
     async def temporary_access_level(
@@ -626,7 +840,7 @@ class Device:
         self.bus.reset()
 
         if sleep > 0:
-            await epyqlib.utils.twisted.sleep(sleep)
+            await self.scheduler.sleep(sleep)
 
         await self.reconnect(timeout=timeout)
 
@@ -642,13 +856,13 @@ class Device:
             self.bus.transmit = False
             self.bus.reset()
             self.bus.reconnect()
-            await epyqlib.utils.twisted.sleep(0.500)
+            await self.scheduler.sleep(0.500)
             self.bus.reset()
             self.bus.transmit = True
 
             try:
                 for _ in range(5):
-                    await epyqlib.utils.twisted.sleep(0.2)
+                    await self.scheduler.sleep(0.2)
                     await a_parameter_that_can_be_read.get()
             except (
                 epyqlib.twisted.nvs.RequestTimeoutError,
@@ -677,7 +891,10 @@ class Device:
 
     async def to_nv(self):
         # TODO: dedupe 8795477695t46542676781543768139
-        await self.nvs.module_to_nv()
+        await self.nvs.module_to_nv(
+            protocol=self.nv_protocol,
+            sleep=self.scheduler.sleep,
+        )
 
     async def get_serial_number(self):
         nv = self.nv_from_uuid(
@@ -24,6 +24,7 @@ import epyqlib.utils.twisted
 import functools
 import itertools
 import json
+import math
 import epyqlib.pyqabstractitemmodel
 from epyqlib.treenode import TreeNode
 from PyQt5.QtCore import Qt, QVariant, QModelIndex, pyqtSignal, pyqtSlot
@@ -176,6 +177,31 @@ class Meta:
     pass
 
 
+class StatusListener(epyqlib.canneo.QtCanListener):
+    """Report the values passively received in NV status messages.
+
+    :attr:`values_received` is emitted with the result of
+    :meth:`Nvs.status_values` for each status message of the present values.
+    """
+
+    values_received = epyqlib.utils.qt.Signal("PyQt_PyObject")
+
+    def __init__(self, nvs, parent=None):
+        epyqlib.canneo.QtCanListener.__init__(
+            self,
+            receiver=self.message_received,
+            parent=parent,
+        )
+
+        self.nvs = nvs
+
+    def message_received(self, msg):
+        values = self.nvs.status_values(msg)
+
+        if values is not None:
+            self.values_received.emit(values)
+
+
 class Nvs(TreeNode, epyqlib.canneo.QtCanListener):
     changed = epyqlib.utils.qt.Signal(
         TreeNode,
@@ -511,6 +537,8 @@ class Nvs(TreeNode, epyqlib.canneo.QtCanListener):
         for nv in self.all_nv():
             nv.set_stale()
 
+        self.cyclic_reader.invalidate()
+
     def set_bus(self, bus):
         self.transport.set_bus(bus=bus)
         self.bus = bus
@@ -708,6 +736,43 @@ class Nvs(TreeNode, epyqlib.canneo.QtCanListener):
                 for status, set in zip(status_signals, set_signals):
                     set.set_value(status.value)
 
+    def status_values(self, msg):
+        """Decode a status message into human values keyed by set signal.
+
+        Unlike :meth:`message_received` the NVs are left untouched.  Messages
+        which are not status messages for the present value, as opposed to
+        another meta, result in ``None``.
+        """
+        status_frame = self.status_frames[0]
+        if not (
+            msg.arbitration_id == status_frame.id
+            and bool(msg.is_extended_id) == status_frame.extended
+        ):
+            return None
+
+        multiplex_message, multiplex_value = self.neo.get_multiplex(msg)
+
+        if multiplex_value is None:
+            return None
+
+        if self.status_frames.get(multiplex_value) is not multiplex_message:
+            return None
+
+        values = multiplex_message.unpack(msg.data, only_return=True)
+
+        if multiplex_message.meta_signal is not None:
+            meta = MetaEnum(values[multiplex_message.meta_signal])
+            if meta != MetaEnum.value:
+                return None
+
+        set_frame = getattr(multiplex_message, "set_frame", None)
+        parameter_signals = getattr(set_frame, "parameter_signals", ())
+
+        return {
+            nv: nv.status_signal.to_human(value=values[nv.status_signal])
+            for nv in parameter_signals
+        }
+
     def unique(self):
         # TODO: actually identify the object
         return "-"
@@ -902,12 +967,15 @@ class Nvs(TreeNode, epyqlib.canneo.QtCanListener):
                 "defaults from dict".format(name)
             )
 
-    async def module_to_nv(self):
+    async def module_to_nv(self, protocol=None, sleep=None):
+        if protocol is None:
+            protocol = self.protocol
+
         for value in [not self.save_value, self.save_value, not self.save_value]:
             self.save_signal.set_value(value)
             self.save_frame.update_from_signals()
 
-            result = await self.protocol.write(
+            result = await protocol.write(
                 nv_signal=self.save_signal,
                 passive=True,
                 meta=MetaEnum.value,
@@ -920,18 +988,24 @@ class Nvs(TreeNode, epyqlib.canneo.QtCanListener):
                 )
 
         if self.nv_save_in_progress_signal is not None:
-            await self.wait_for_nv_save_complete()
+            await self.wait_for_nv_save_complete(protocol=protocol, sleep=sleep)
+
+    async def wait_for_nv_save_complete(self, protocol=None, sleep=None):
+        if protocol is None:
+            protocol = self.protocol
+
+        if sleep is None:
+            sleep = epyqlib.utils.twisted.sleep
 
-    async def wait_for_nv_save_complete(self):
         while True:
-            result = await self.protocol.read(
+            result = await protocol.read(
                 nv_signal=self.nv_save_in_progress_signal,
                 meta=MetaEnum.value,
             )
             save_active = result[0]
             if not save_active:
                 break
-            await epyqlib.utils.twisted.sleep(0.5)
+            await sleep(0.5)
 
     def logger_set_frames(self):
         frames = [
@@ -969,12 +1043,49 @@ class Nvs(TreeNode, epyqlib.canneo.QtCanListener):
         self.cyclic_reader.cancel()
 
 
+@attr.s
+class CyclicReadEntry:
+    """The schedule for cyclically reading one meta of one frame."""
+
+    frame = attr.ib()
+    meta = attr.ib()
+    nvs = attr.ib()
+    static = attr.ib(default=False)
+    due = attr.ib(default=0)
+    backoff = attr.ib(default=1)
+    values = attr.ib(default=None)
+    last_read = attr.ib(default=None)
+    refresh_period = attr.ib(default=None)
+
+
 @attr.s
 class CyclicReader:
+    """Cyclically read the NVs from the device.
+
+    Each frame and meta is read on its own schedule.  Static metas are read
+    once and again only after :meth:`invalidate`.  Frames visible in a view,
+    as reported by :meth:`set_visible`, are read every ``visible_interval``
+    and others every ``interval``.  Each read that finds the values unchanged
+    doubles the interval up to ``maximum_interval``.  No more than
+    ``budget`` requests are sent per second.
+    """
+
+    refreshed = epyqlib.utils.qt.Signal(object, object, float)
+
     nvs = attr.ib()
     read_call = attr.ib()
     metas = attr.ib()
     pause_requests = attr.ib(factory=weakref.WeakSet)
+    visible = attr.ib(factory=weakref.WeakKeyDictionary)
+    static_metas = attr.ib(
+        default=(MetaEnum.minimum, MetaEnum.maximum, MetaEnum.factory_default),
+    )
+    budget = attr.ib(default=50)
+    visible_interval = attr.ib(default=0.5)
+    interval = attr.ib(default=2)
+    maximum_interval = attr.ib(default=30)
+    entries = attr.ib(factory=list)
+    _last_request = attr.ib(init=False, default=None)
     _deferred = attr.ib(init=False, default=None)
 
     def start(self):
@@ -999,42 +1110,157 @@ class CyclicReader:
     def unpause(self, id):
         self.pause_requests.discard(id)
 
+    def set_visible(self, id, nvs):
+        """Record the NVs presently visible in the view ``id``."""
+        previous = self.visible_frames()
+        self.visible[id] = frozenset(nv.frame for nv in nvs)
+        visible = self.visible_frames()
+
+        now = time.monotonic()
+        for entry in self.entries:
+            if entry.static or entry.frame not in visible:
+                continue
+
+            if previous is None or entry.frame not in previous:
+                entry.backoff = 1
+                entry.due = min(entry.due, now)
+
+    def clear_visible(self, id):
+        self.visible.pop(id, None)
+
+    def visible_frames(self):
+        """The frames visible in any view or :obj:`None` when no view has
+        reported what it shows in which case all frames are treated as
+        visible.
+        """
+        if len(self.visible) == 0:
+            return None
+
+        return frozenset(itertools.chain.from_iterable(self.visible.values()))
+
+    def invalidate(self, metas=None):
+        """Read the ``metas``, all by default, again as soon as possible."""
+        for entry in self.entries:
+            if metas is None or entry.meta in metas:
+                entry.due = 0
+                entry.backoff = 1
+
+    def refresh_periods(self):
+        """The time between the last two reads of each frame and meta."""
+        return {
+            (entry.frame, entry.meta): entry.refresh_period
+            for entry in self.entries
+            if entry.refresh_period is not None
+        }
+
+    def create_entries(self):
+        by_frame = collections.defaultdict(list)
+        for nv in self.nvs:
+            by_frame[nv.frame].append(nv)
+
+        self.entries = [
+            CyclicReadEntry(
+                frame=frame,
+                meta=meta,
+                nvs=nvs,
+                static=meta in self.static_metas,
+            )
+            for meta in self.metas
+            for frame, nvs in by_frame.items()
+        ]
+
+    def next_entry(self):
+        visible = self.visible_frames()
+
+        return min(
+            self.entries,
+            key=lambda entry: (
+                entry.due,
+                visible is not None and entry.frame not in visible,
+            ),
+        )
+
+    def ready_time(self, entry):
+        if self._last_request is None:
+            return entry.due
+
+        return max(entry.due, self._last_request + 1 / self.budget)
+
+    def completed(self, entry, values, now):
+        if entry.last_read is not None:
+            entry.refresh_period = now - entry.last_read
+        entry.last_read = now
+
+        if entry.static:
+            entry.due = math.inf
+        else:
+            if values == entry.values:
+                entry.backoff *= 2
+            else:
+                entry.backoff = 1
+
+            visible = self.visible_frames()
+            if visible is None or entry.frame in visible:
+                interval = self.visible_interval
+            else:
+                interval = self.interval
+
+            entry.due = now + min(interval * entry.backoff, self.maximum_interval)
+
+        entry.values = values
+
+        if entry.refresh_period is not None:
+            self.refreshed.emit(entry.frame, entry.meta, entry.refresh_period)
+
     @epyqlib.utils.twisted.ensure_deferred
     @epyqlib.utils.twisted.errback_dialog
     @epyqlib.utils.twisted.ignore_cancelled
     async def _cyclic_read_all(self):
-        x = collections.defaultdict(list)
-        for nv in self.nvs:
-            x[nv.frame].append(nv)
+        self.create_entries()
+
+        if len(self.entries) == 0:
+            return
 
         while True:
-            for meta in self.metas:
-                for frame, nvs in x.items():
-                    try:
-                        while len(self.pause_requests) > 0:
-                            await epyqlib.utils.twisted.sleep(0.250)
-
-                        await epyqlib.utils.twisted.sleep(0.02)
-
-                        d, _ = await self.read_call(
-                            only_these=nvs,
-                            background=True,
-                            meta=(meta,),
-                        )
-                    except (
-                        epyqlib.twisted.nvs.CanceledError,
-                        epyqlib.twisted.nvs.SendFailedError,
-                    ):
-                        continue
+            while len(self.pause_requests) > 0:
+                await epyqlib.utils.twisted.sleep(0.250)
 
-                    # TODO: CAMPid 0347987975t427567139419439349
-                    for nv in nvs:
-                        if not nv.status_signal.write_only:
-                            value = d[nv.status_signal]
-                            nv.set_meta(value, meta=meta, check_range=False)
-                            nv.set_from_device(
-                                column=getattr(Columns.indexes, meta.name),
-                            )
+            entry = self.next_entry()
+            now = time.monotonic()
+            ready = self.ready_time(entry)
+
+            if ready > now:
+                # wake periodically to notice visibility changes and pauses
+                await epyqlib.utils.twisted.sleep(min(ready - now, 0.250))
+                continue
+
+            self._last_request = now
+
+            try:
+                d, _ = await self.read_call(
+                    only_these=entry.nvs,
+                    background=True,
+                    meta=(entry.meta,),
+                )
+            except (
+                epyqlib.twisted.nvs.CanceledError,
+                epyqlib.twisted.nvs.SendFailedError,
+            ):
+                continue
+
+            values = {}
+
+            # TODO: CAMPid 0347987975t427567139419439349
+            for nv in entry.nvs:
+                if not nv.status_signal.write_only:
+                    value = d[nv.status_signal]
+                    values[nv] = value
+                    nv.set_meta(value, meta=entry.meta, check_range=False)
+                    nv.set_from_device(
+                        column=getattr(Columns.indexes, entry.meta.name),
+                    )
+
+            self.completed(entry=entry, values=values, now=time.monotonic())
 
 
 class Nv(epyqlib.canneo.Signal, TreeNode):
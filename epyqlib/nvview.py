@@ -189,6 +189,11 @@ class NvView(QtWidgets.QWidget):
 
         self.auth_key = None
 
+        self.visible_nvs_timer = QtCore.QTimer()
+        self.visible_nvs_timer.setSingleShot(True)
+        self.visible_nvs_timer.setInterval(100)
+        self.visible_nvs_timer.timeout.connect(self.update_visible_nvs)
+
     def terminate(self):
         self.device = None
 
@@ -252,7 +257,7 @@ class NvView(QtWidgets.QWidget):
         self.update_diff_reference_columns()
 
     def filter_text_changed(self, text):
-        self.ui.tree_view.model().setFilterWildcard(text)
+        epyqlib.utils.qt.filter_view(view=self.ui.tree_view, text=text)
 
     # TODO: CAMPid 07943342700734207878034207087
     def nonproxy_model(self):
@@ -646,6 +651,39 @@ class NvView(QtWidgets.QWidget):
         else:
             model.root.cyclic_reader.pause(self)
 
+        # report the visible rows so the cyclic reader can favor them
+        view = self.ui.tree_view
+        view.verticalScrollBar().valueChanged.connect(
+            self.visible_nvs_timer.start,
+        )
+        view.expanded.connect(self.visible_nvs_timer.start)
+        view.collapsed.connect(self.visible_nvs_timer.start)
+        view.model().layoutChanged.connect(self.visible_nvs_timer.start)
+        view.model().rowsInserted.connect(self.visible_nvs_timer.start)
+        view.model().rowsRemoved.connect(self.visible_nvs_timer.start)
+        self.visible_nvs_timer.start()
+
+    def update_visible_nvs(self):
+        model = self.nonproxy_model()
+        if model is None:
+            return
+
+        view = self.ui.tree_view
+        bottom = view.viewport().height()
+
+        nvs = []
+        index = view.indexAt(QtCore.QPoint(0, 0))
+        while index.isValid() and view.visualRect(index).top() < bottom:
+            node = model.node_from_index(
+                epyqlib.utils.qt.resolve_index_to_model(index),
+            )
+            if isinstance(node, epyqlib.nv.Nv):
+                nvs.append(node)
+
+            index = view.indexBelow(index)
+
+        model.root.cyclic_reader.set_visible(self, nvs)
+
     def update_diff_reference_columns(self):
         model = self.nonproxy_model()
 
@@ -1034,6 +1034,34 @@ class TableEnumerationReference(epyqlib.treenode.TreeNode):
     check = epyqlib.attrsmodel.check_just_children
 
 
+def set_if_changed(node, name, value):
+    if getattr(node, name) != value:
+        setattr(node, name, value)
+
+
+def patch_children(node, children):
+    """Make ``node.children`` hold exactly ``children``, in order, with the
+    fewest removals and insertions."""
+    if len(node.children) == len(children) and all(
+        present is child for present, child in zip(node.children, children)
+    ):
+        return
+
+    ids = {id(child) for child in children}
+    for row in reversed(range(len(node.children))):
+        if id(node.children[row]) not in ids:
+            node.remove_child(row=row)
+
+    for row, child in enumerate(children):
+        if row < len(node.children) and node.children[row] is child:
+            continue
+
+        if child.tree_parent is not None:
+            child.tree_parent.remove_child(child=child)
+
+        node.insert_child(row, child)
+
+
 @graham.schemify(tag="table", register=True)
 @epyqlib.attrsmodel.ify()
 @epyqlib.utils.qt.pyqtify()
@@ -1212,11 +1240,7 @@ class Table(epyqlib.treenode.TreeNode):
                 )
                 self.append_child(old_group)
 
-            self.group = old_group
-
-            nodes = old_group.recursively_remove_children()
-
-            old_by_path = {node.path: node for node in nodes}
+        self.group = old_group
 
         product = list(itertools.product(*enumerations))
 
@@ -1237,6 +1261,35 @@ class Table(epyqlib.treenode.TreeNode):
 
         model = self.find_root().model
 
+        nodes = []
+        old_group.traverse(
+            call_this=lambda node, payload: payload.append(node),
+            payload=nodes,
+            internal_nodes=True,
+        )
+        by_path = {node.path: node for node in nodes if node is not old_group}
+
+        # the wanted children of each node, keyed by id() since nodes compare
+        # by value
+        wanted = {id(old_group): (old_group, [])}
+
+        def place(parent, path, type_, original):
+            current = by_path.get(path)
+            if current is None:
+                current = type_(original=original, path=path)
+                by_path[path] = current
+            else:
+                if current.original is None:
+                    current.original = current.path[-1]
+                if isinstance(current.original, uuid.UUID):
+                    current.original = model.node_from_uuid(current.original)
+
+            if id(current) not in wanted:
+                wanted[id(current)] = (current, [])
+                wanted[id(parent)][1].append(current)
+
+            return current
+
         for combination in product:
             present = old_group
 
@@ -1245,80 +1298,47 @@ class Table(epyqlib.treenode.TreeNode):
             for layer in combination:
                 path += (layer.uuid,)
 
-                previous = old_by_path.get(path)
-                if previous is None:
-                    current = TableGroupElement(
-                        original=layer,
-                        path=path,
-                    )
-                    old_by_path[path] = current
-                else:
-                    current = previous
-                    if current.original is None:
-                        current.original = current.path[-1]
-                    if isinstance(current.original, uuid.UUID):
-                        current.original = model.node_from_uuid(current.original)
+                present = place(
+                    parent=present,
+                    path=path,
+                    type_=TableGroupElement,
+                    original=layer,
+                )
 
                 if layer.tree_parent.name == "Curves":
-                    current.curve_index = int(layer.value)
-
-                if current.tree_parent is None:
-                    present.append_child(current)
+                    set_if_changed(present, "curve_index", int(layer.value))
 
-                present = current
-
-            axes = ["x", "y", "z"]
-            axes_iterator = iter(axes)
+            axes = iter(["x", "y", "z"])
             for array in arrays:
                 if isinstance(array, Array):
-                    try:
-                        axis = next(axes_iterator)
-                    except StopIteration:
-                        raise
+                    axis = next(axes)
                 else:
                     axis = None
-                array_path = path + (array.uuid,)
-                previous = old_by_path.get(array_path)
-                if previous is None:
-                    current = TableGroupElement(
-                        original=array,
-                        path=array_path,
-                    )
-                    old_by_path[array_path] = current
-                else:
-                    current = previous
-                    if current.original is None:
-                        current.original = current.path[-1]
-                    if isinstance(current.original, uuid.UUID):
-                        current.original = model.node_from_uuid(current.original)
 
-                current.axis = axis
-
-                if current.tree_parent is None:
-                    present.append_child(current)
+                array_path = path + (array.uuid,)
+                current = place(
+                    parent=present,
+                    path=array_path,
+                    type_=TableGroupElement,
+                    original=array,
+                )
+                set_if_changed(current, "axis", axis)
 
                 for index, element in enumerate(array.children):
-                    element_path = array_path + (element.uuid,)
-                    previous_element = old_by_path.get(element_path)
-                    if previous_element is None:
-                        current_element = TableArrayElement(
-                            original=element,
-                            path=element_path,
-                        )
-                        old_by_path[element_path] = current_element
-                    else:
-                        current_element = previous_element
-                        if current_element.original is None:
-                            current_element.original = current_element.path[-1]
-                        if isinstance(current_element.original, uuid.UUID):
-                            current_element.original = model.node_from_uuid(
-                                current_element.original
-                            )
-
-                    current_element.index = index
-
-                    if current_element.tree_parent is None:
-                        current.append_child(current_element)
+                    current_element = place(
+                        parent=current,
+                        path=array_path + (element.uuid,),
+                        type_=TableArrayElement,
+                        original=element,
+                    )
+                    set_if_changed(current_element, "index", index)
+
+        # Only nodes that were added, removed or moved are touched so an
+        # edit costs model updates in proportion to its size, not the
+        # table's.  Parents come before their children.
+        with self._ignore_children(), model.batch():
+            for node, children in wanted.values():
+                patch_children(node=node, children=children)
 
     def addable_types(self):
         return epyqlib.attrsmodel.create_addable_types(
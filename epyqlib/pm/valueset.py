@@ -1,6 +1,9 @@
 import collections
+import concurrent.futures
+import hashlib
+import itertools
+import json
 import os
-import math
 import pathlib
 
 import attr
@@ -76,32 +79,208 @@ class OverlayConfiguration:
     def recipe_overlay_pmvs_paths(self, recipe):
         return [self.reference_path / path for path in recipe.overlay_pmvs_paths]
 
-    def raw(self, echo=lambda *args, **kwargs: None):
-        input_modification_times = []
-        output_modification_times = []
+    def cook_state_path(self):
+        return self.reference_path / self.output_path / cook_state_file_name
+
+    def load_cook_state(self):
+        try:
+            with open(self.cook_state_path()) as f:
+                state = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+        if state.get("format") != cook_format:
+            return {}
+
+        return state["outputs"]
+
+    def save_cook_state(self, outputs):
+        path = self.cook_state_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        with open(path, "w") as f:
+            json.dump({"format": cook_format, "outputs": outputs}, f, indent=4)
+            f.write("\n")
+
+    def tasks(self):
+        """Create a :class:`CookTask` per recipe, reading each distinct
+        input file once to hash it."""
+        digests = {}
 
-        input_modification_times.append(self.path.stat().st_mtime)
+        def digest(path):
+            if path not in digests:
+                digests[path] = hash_file(path)
 
+            return digests[path]
+
+        tasks = []
         for recipe in self.recipes:
-            output_path = self.recipe_output_path(recipe=recipe)
-            echo(f"Checking: {os.fspath(output_path)}")
+            base_pmvs_path = self.recipe_base_pmvs_path(recipe=recipe)
+            overlay_pmvs_paths = self.recipe_overlay_pmvs_paths(recipe=recipe)
+
+            key = hashlib.sha256()
+            for path in [base_pmvs_path, *overlay_pmvs_paths]:
+                key.update(digest(path).encode("ascii"))
+
+            tasks.append(
+                CookTask(
+                    name=os.fspath(self.output_path / recipe.output_path),
+                    output_path=self.recipe_output_path(recipe=recipe),
+                    base_pmvs_path=base_pmvs_path,
+                    overlay_pmvs_paths=tuple(overlay_pmvs_paths),
+                    key=key.hexdigest(),
+                ),
+            )
+
+        return tasks
+
+    def stale_tasks(self, tasks, echo=lambda *args, **kwargs: None):
+        """The tasks whose inputs changed since they were last cooked or
+        whose output is missing or was modified."""
+        state = self.load_cook_state()
+
+        stale = []
+        for task in tasks:
+            echo(f"Checking: {os.fspath(task.output_path)}")
+
+            cooked = state.get(task.name)
+            if cooked is None or cooked["key"] != task.key:
+                stale.append(task)
+                continue
 
             try:
-                stat = output_path.stat()
+                output_digest = hash_file(task.output_path)
             except FileNotFoundError:
-                output_modification_time = -math.inf
+                stale.append(task)
+                continue
+
+            if output_digest != cooked["output"]:
+                stale.append(task)
+
+        return stale
+
+    def raw(self, echo=lambda *args, **kwargs: None):
+        return len(self.stale_tasks(tasks=self.tasks(), echo=echo)) > 0
+
+    def cook(self, processes=1, only_stale=True, echo=lambda *args, **kwargs: None):
+        """Cook the recipes, by default only those whose inputs changed.
+        Recipes sharing a base value set are cooked together so it is only
+        parsed once.  With more than one process the groups are cooked in
+        parallel."""
+        tasks = self.tasks()
+        selected = self.stale_tasks(tasks=tasks) if only_stale else tasks
+
+        for task in tasks:
+            if task not in selected:
+                echo(f"Up to date: {os.fspath(task.output_path)}")
+
+        for task in selected:
+            echo(f"Creating: {os.fspath(task.output_path)}")
+            echo(
+                "\n".join(
+                    f"    {os.fspath(path)}"
+                    for path in [task.base_pmvs_path, *task.overlay_pmvs_paths]
+                ),
+            )
+
+        groups = [
+            list(group)
+            for _, group in itertools.groupby(
+                sorted(selected, key=lambda task: task.base_pmvs_path),
+                key=lambda task: task.base_pmvs_path,
+            )
+        ]
+
+        names = {task.name for task in tasks}
+        outputs = {
+            name: cooked
+            for name, cooked in self.load_cook_state().items()
+            if name in names
+        }
+
+        try:
+            if processes <= 1 or len(groups) <= 1:
+                results = map(cook_tasks, groups)
+                for cooked in results:
+                    outputs.update(cooked)
             else:
-                output_modification_time = stat.st_mtime
-            output_modification_times.append(output_modification_time)
+                with concurrent.futures.ProcessPoolExecutor(
+                    max_workers=processes,
+                ) as executor:
+                    for cooked in executor.map(cook_tasks, groups):
+                        outputs.update(cooked)
+        finally:
+            self.save_cook_state(outputs=outputs)
 
-            overlay_pmvs_paths = self.recipe_overlay_pmvs_paths(recipe=recipe)
+        return selected
+
+
+# Bump when cooking would produce different output from the same inputs
+cook_format = 1
+cook_state_file_name = ".cook-state.json"
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
 
-            for overlay_pmvs_path in overlay_pmvs_paths:
-                input_modification_times.append(
-                    overlay_pmvs_path.stat().st_mtime,
-                )
+    return digest.hexdigest()
 
-        return min(output_modification_times) < max(input_modification_times)
+
+@attr.s(frozen=True)
+class CookTask:
+    name = attr.ib()
+    output_path = attr.ib()
+    base_pmvs_path = attr.ib()
+    overlay_pmvs_paths = attr.ib()
+    key = attr.ib()
+
+
+def copy_value_set(value_set):
+    root = attr.evolve(value_set.model.root, children=[])
+
+    for parameter in value_set.model.root.children:
+        root.append_child(attr.evolve(parameter))
+
+    return epyqlib.pm.valuesetmodel.ValueSet(
+        path=value_set.path,
+        model=epyqlib.attrsmodel.Model(
+            root=root,
+            columns=epyqlib.pm.valuesetmodel.columns,
+        ),
+    )
+
+
+def cook_tasks(tasks):
+    """Cook ``tasks`` parsing each input value set once.  Returns the cook
+    state entry of each output."""
+    value_sets = {}
+
+    def load(path):
+        if path not in value_sets:
+            value_sets[path] = epyqlib.pm.valuesetmodel.loadp(path)
+
+        return value_sets[path]
+
+    cooked = {}
+    for task in tasks:
+        result_value_set = copy_value_set(load(task.base_pmvs_path))
+
+        for path in task.overlay_pmvs_paths:
+            result_value_set.overlay(load(path))
+
+        task.output_path.parent.mkdir(parents=True, exist_ok=True)
+        result_value_set.save(path=task.output_path)
+
+        cooked[task.name] = {
+            "key": task.key,
+            "output": hash_file(task.output_path),
+        }
+
+    return cooked
 
 
 @click.group(name="value-sets")
@@ -191,43 +370,21 @@ def generate_recipes(value_set_path_strings, common_output_path_string):
     "--if-raw/--assume-raw",
     "only_if_raw",
     default=False,
+    help="Cook only recipes whose inputs or output changed since last cooked",
 )
-def cli(configuration_path_string, only_if_raw):
+@click.option("--processes", type=int, default=1, show_default=True)
+def cli(configuration_path_string, only_if_raw, processes):
     configuration_path = pathlib.Path(configuration_path_string)
 
     configuration = OverlayConfiguration.load(configuration_path)
 
-    if only_if_raw:
-        if not configuration.raw(echo=click.echo):
-            click.echo(
-                "Generated files appear to be up to date, skipping cooking",
-            )
-
-            return
-
-        click.echo("Generated files appear to be out of date, starting cooking")
-
-    for recipe in configuration.recipes:
-        output_path = configuration.recipe_output_path(recipe=recipe)
-        click.echo(f"Creating: {os.fspath(output_path)}")
-
-        base_pmvs_path = configuration.recipe_base_pmvs_path(recipe=recipe)
-
-        overlay_pmvs_paths = configuration.recipe_overlay_pmvs_paths(
-            recipe=recipe,
-        )
-
-        all_pmvs_paths = [base_pmvs_path, *overlay_pmvs_paths]
+    cooked = configuration.cook(
+        processes=processes,
+        only_stale=only_if_raw,
+        echo=click.echo,
+    )
 
+    if len(cooked) == 0:
         click.echo(
-            "\n".join(f"    {os.fspath(path)}" for path in all_pmvs_paths),
+            "Generated files appear to be up to date, skipping cooking",
         )
-
-        result_value_set = epyqlib.pm.valuesetmodel.loadp(base_pmvs_path)
-
-        for path in overlay_pmvs_paths:
-            overlay_value_set = epyqlib.pm.valuesetmodel.loadp(path)
-            result_value_set.overlay(overlay_value_set)
-
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        result_value_set.save(path=output_path)
@@ -5,9 +5,12 @@ import graham
 import marshmallow
 
 import epyqlib.attrsmodel
-import epyqlib.nv
 import epyqlib.pm.parametermodel
 import epyqlib.treenode
+import epyqlib.utils.graham
+import epyqlib.utils.lazy
+
+epyqlib.utils.lazy.lazy_import("epyqlib.nv")
 
 
 class SaveCancelled(Exception):
@@ -22,7 +25,7 @@ def create_blank(parameter_model=None):
 
 
 def loads(s, path=None):
-    root = graham.schema(Root).loads(s).data
+    root = epyqlib.utils.graham.loads(Root, s)
     value_set = ValueSet(path=path)
 
     if path is not None:
@@ -62,6 +65,8 @@ def copy_parameter_data(
     calculate_unspecified_min_max=False,
     can_root=None,
 ):
+    parameters = []
+
     def traverse(node, _):
         if isinstance(node, epyqlib.pm.parametermodel.Parameter):
             if human_names:
@@ -95,7 +100,7 @@ def copy_parameter_data(
                 if maximum is None:
                     maximum = calculated_maximum
 
-            value_set.model.root.append_child(
+            parameters.append(
                 Parameter(
                     name=name,
                     parameter_uuid=node.uuid,
@@ -105,8 +110,6 @@ def copy_parameter_data(
                 ),
             )
 
-            value_set.model.root.children.sort()
-
     if base_node is None:
         base_node = value_set.parameter_model.root
 
@@ -115,6 +118,17 @@ def copy_parameter_data(
         internal_nodes=False,
     )
 
+    # any existing children are taken out so the result is sorted as a whole
+    root = value_set.model.root
+    existing = list(root.children)
+    for child in reversed(existing):
+        root.remove_child(child=child)
+
+    value_set.model.append_children(
+        parent=root,
+        children=sorted([*existing, *parameters]),
+    )
+
 
 def decimal_attrib(load_only=False, **kwargs):
     attrib = attr.ib(
@@ -232,17 +246,19 @@ class ValueSet:
 
             self.path = pathlib.Path(path)
 
-        sorted_children = sorted(self.model.root.children)
-
-        sorted_root = attr.evolve(self.model.root, children=sorted_children)
+        with open(path, "w") as f:
+            epyqlib.utils.graham.dump(self._sorted_root(), f, indent=4)
+            # JSON text never ends with a newline of its own
+            f.write("\n")
 
-        s = graham.dumps(sorted_root, indent=4).data
+    def dumps(self):
+        """The text :meth:`save` writes."""
+        return epyqlib.utils.graham.dumps(self._sorted_root(), indent=4) + "\n"
 
-        with open(path, "w") as f:
-            f.write(s)
+    def _sorted_root(self):
+        sorted_children = sorted(self.model.root.children)
 
-            if not s.endswith("\n"):
-                f.write("\n")
+        return attr.evolve(self.model.root, children=sorted_children)
 
     def overlay(self, overlay):
         attribute_names = [
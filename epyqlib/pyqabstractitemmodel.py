@@ -2,8 +2,6 @@
 
 # TODO: """DocString if there is one"""
 
-import weakref
-
 from epyqlib.treenode import TreeNode
 import epyqlib.utils.qt
 from PyQt5.QtCore import (
@@ -42,8 +40,6 @@ class PyQAbstractItemModel(QAbstractItemModel):
         else:
             self.alignment = Qt.AlignTop | Qt.AlignLeft
 
-        self.index_from_node_cache = weakref.WeakKeyDictionary()
-
         self.role_functions = {
             Qt.DisplayRole: self.data_display,
             epyqlib.utils.qt.UserRoles.sort: self.data_display,
@@ -196,7 +192,7 @@ class PyQAbstractItemModel(QAbstractItemModel):
 
         parent = node.tree_parent
 
-        if parent in [None, self.root]:
+        if parent is None or parent is self.root:
             return QModelIndex()
 
         grandparent = parent.tree_parent
@@ -216,22 +212,10 @@ class PyQAbstractItemModel(QAbstractItemModel):
             return self.root
 
     def index_from_node(self, node):
-        # TODO  make up another role for identification?
-        if node in self.index_from_node_cache:
-            index = self.index_from_node_cache[node]
-        else:
-            if node is self.root:
-                index = QModelIndex()
-            else:
-                index = self.index(
-                    row=node.tree_parent.row_of_child(node),
-                    column=0,
-                    parent=self.index_from_node(node.tree_parent),
-                )
-
-                self.index_from_node_cache[node] = index
+        if node is self.root:
+            return QModelIndex()
 
-        return index
+        return self.createIndex(node.tree_parent.row_of_child(node), 0, node)
 
     @pyqtSlot(TreeNode, int, TreeNode, int, list)
     def changed(self, start_node, start_column, end_node, end_column, roles):
@@ -260,7 +244,6 @@ class PyQAbstractItemModel(QAbstractItemModel):
 
     @pyqtSlot()
     def end_insert_rows(self):
-        self.index_from_node_cache.clear()
         self.endInsertRows()
 
     @pyqtSlot(TreeNode, int, int)
@@ -269,7 +252,6 @@ class PyQAbstractItemModel(QAbstractItemModel):
 
     @pyqtSlot()
     def end_remove_rows(self):
-        self.index_from_node_cache.clear()
         self.endRemoveRows()
 
     @pyqtSlot()
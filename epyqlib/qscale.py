@@ -135,6 +135,9 @@ class QScale(QtWidgets.QWidget):
         self.colors = colors
 
     def setValue(self, val):
+        if val == self.m_value:
+            return
+
         self.m_value = val
         self.update()
 
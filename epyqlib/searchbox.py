@@ -17,6 +17,9 @@ class SearchBox(QtWidgets.QWidget):
     search_text_changed = QtCore.pyqtSignal(str)
     search_requested = QtCore.pyqtSignal()
 
+    # milliseconds of typing inactivity before a filter is requested
+    filter_delay = 150
+
     def __init__(self, parent=None, in_designer=False):
         super().__init__(parent=parent)
 
@@ -39,7 +42,20 @@ class SearchBox(QtWidgets.QWidget):
 
         self.ui.filter_text.setPlaceholderText("Filter...")
         self.ui.filter_text.textChanged.connect(self.filter_text_changed)
-        self.ui.filter_text.textChanged.connect(self.filter_requested)
+        self.ui.filter_text.textChanged.connect(self.filter_timer_start)
+        self.ui.filter_text.returnPressed.connect(self.filter_now)
+
+        self.filter_timer = QtCore.QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(self.filter_delay)
+        self.filter_timer.timeout.connect(self.filter_requested)
+
+    def filter_timer_start(self):
+        self.filter_timer.start()
+
+    def filter_now(self):
+        self.filter_timer.stop()
+        self.filter_requested.emit()
 
     @QtCore.pyqtProperty(bool)
     def hide_search(self):
@@ -89,7 +105,7 @@ class SearchBox(QtWidgets.QWidget):
         self.search_requested.connect(_search)
 
         def _filter():
-            view.model().setFilterWildcard(self.filter_text)
+            epyqlib.utils.qt.filter_view(view=view, text=self.filter_text)
 
         self.filter_requested.connect(_filter)
 
@@ -0,0 +1,510 @@
+"""A simulated device answering the NV and CCP protocols on a python-can bus.
+
+The simulation is built from the same definitions as a real device so that
+the host side protocols can be exercised, and timed, without hardware.  The
+``virtual`` python-can interface is the intended bus.
+"""
+
+import collections
+import functools
+import logging
+import random
+import threading
+import time
+
+import attr
+import can
+
+import epyqlib.canneo
+import epyqlib.device
+import epyqlib.hildevice
+import epyqlib.nv
+import epyqlib.twisted.cancalibrationprotocol as ccp
+import epyqlib.updateepc
+
+__copyright__ = "Copyright 2020, EPC Power Corp."
+__license__ = "GPLv2+"
+
+
+logger = logging.getLogger(__name__)
+
+
+@attr.s
+class Link:
+    """Characteristics of the simulated connection to the device.
+
+    Each response is delayed by ``latency`` plus a uniformly distributed
+    ``jitter`` and dropped with a probability of ``loss``.
+    """
+
+    latency = attr.ib(default=0)
+    jitter = attr.ib(default=0)
+    loss = attr.ib(default=0)
+    random = attr.ib(default=attr.Factory(random.Random), repr=False)
+
+    def delay(self):
+        return max(0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+
+    def lost(self):
+        return self.loss > 0 and self.random.random() < self.loss
+
+
+class Transmitter:
+    """Send messages after the delay chosen by ``link``.
+
+    Messages are sent from a worker thread and in the order they were
+    queued, as a single node on a CAN bus would.
+    """
+
+    def __init__(self, bus, link):
+        self.bus = bus
+        self.link = link
+
+        self.sent = 0
+        self.lost = 0
+
+        self._queue = collections.deque()
+        self._last_due = 0
+        self._condition = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run,
+            name="{} {}".format(type(self).__name__, bus),
+            daemon=True,
+        )
+        self._thread.start()
+
+    def send(self, msg):
+        if self.link.lost():
+            self.lost += 1
+            return
+
+        delay = self.link.delay()
+
+        with self._condition:
+            if delay <= 0 and len(self._queue) == 0:
+                self._send(msg)
+                return
+
+            due = max(time.monotonic() + delay, self._last_due)
+            self._last_due = due
+            self._queue.append((due, msg))
+            self._condition.notify()
+
+    def _send(self, msg):
+        try:
+            self.bus.send(msg)
+        except can.CanError:
+            logger.debug("Failed to send %s", msg, exc_info=True)
+        else:
+            self.sent += 1
+
+    def _run(self):
+        with self._condition:
+            while self._running:
+                if len(self._queue) == 0:
+                    self._condition.wait()
+                    continue
+
+                due, msg = self._queue[0]
+                remaining = due - time.monotonic()
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                    continue
+
+                self._queue.popleft()
+                self._send(msg)
+
+    def stop(self):
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+
+        self._thread.join()
+
+
+def initial_raw_value(signal, meta):
+    candidates = {
+        epyqlib.nv.MetaEnum.minimum: signal.min,
+        epyqlib.nv.MetaEnum.maximum: signal.max,
+    }.get(meta)
+
+    for value in (candidates, signal.default_value, signal.min, signal.max):
+        if value is not None:
+            return signal.from_human(value)
+
+    return 0
+
+
+class NvResponder(can.Listener):
+    """Answer NV parameter requests from an in memory parameter store.
+
+    Each frame and meta is stored separately.  Reads report the stored values
+    while writes update them before reporting them back.
+    """
+
+    def __init__(self, nvs, transmitter):
+        self.nvs = nvs
+        self.transmitter = transmitter
+
+        self.requests = 0
+        self.memory = {}
+
+        set_frame = self.nvs.set_frames[0]
+        self._set_id = set_frame.id
+        self._extended = set_frame.extended
+
+        self._status_sources = {}
+        self._read = {}
+        for frame in self.nvs.set_frames.values():
+            status_frame = getattr(frame, "status_frame", None)
+            if status_frame is None:
+                continue
+
+            self._status_sources[frame] = [
+                next(
+                    (
+                        s
+                        for s in frame.signals
+                        if s.start_bit == status.start_bit
+                        and s.signal_size == status.signal_size
+                    ),
+                    None,
+                )
+                for status in status_frame.signals
+            ]
+            (self._read[frame],) = (
+                k for k, v in frame.read_write.enumeration.items() if v == "Read"
+            )
+
+    def _stored(self, frame, meta):
+        key = (frame, meta)
+        stored = self.memory.get(key)
+
+        if stored is None:
+            meta = epyqlib.nv.MetaEnum(meta)
+            stored = {
+                signal: initial_raw_value(signal=signal, meta=meta)
+                for signal in frame.parameter_signals
+            }
+            self.memory[key] = stored
+
+        return stored
+
+    def set_value(self, nv, value, meta=epyqlib.nv.MetaEnum.value):
+        """Set the human ``value`` of ``nv``, one of :attr:`nvs` set signals."""
+        self._stored(frame=nv.frame, meta=meta)[nv] = nv.from_human(value)
+
+    def get_value(self, nv, meta=epyqlib.nv.MetaEnum.value):
+        return nv.to_human(self._stored(frame=nv.frame, meta=meta)[nv])
+
+    def on_message_received(self, msg):
+        if not (
+            msg.arbitration_id == self._set_id
+            and bool(msg.is_extended_id) == self._extended
+        ):
+            return
+
+        frame, multiplex_value = self.nvs.neo.get_multiplex(msg)
+        if multiplex_value is None or frame not in self._status_sources:
+            return
+
+        values = frame.unpack(msg.data, only_return=True)
+
+        if frame.meta_signal is None:
+            meta = epyqlib.nv.MetaEnum.value
+        else:
+            meta = values[frame.meta_signal]
+
+        stored = self._stored(frame=frame, meta=meta)
+
+        if values[frame.read_write] != self._read[frame]:
+            for signal in frame.parameter_signals:
+                stored[signal] = values[signal]
+
+        data = tuple(
+            stored.get(source, values.get(source, 0))
+            for source in self._status_sources[frame]
+        )
+        status_frame = frame.status_frame
+
+        self.requests += 1
+        self.transmitter.send(
+            can.Message(
+                arbitration_id=status_frame.id,
+                extended_id=status_frame.extended,
+                data=status_frame.update_from_signals(data=data, only_return=True),
+            )
+        )
+
+
+@attr.s
+class Memory:
+    """A byte addressed memory space which grows as it is written."""
+
+    data = attr.ib(default=attr.Factory(bytearray))
+
+    def write(self, offset, data):
+        end = offset + len(data)
+        if end > len(self.data):
+            self.data.extend(bytes(end - len(self.data)))
+
+        self.data[offset:end] = data
+
+    def read(self, offset, length):
+        chunk = bytes(self.data[offset : offset + length])
+        return chunk + bytes(length - len(chunk))
+
+
+# TODO: magic number 5!
+reply_payload_length = 5
+
+
+class CcpResponder(can.Listener):
+    """Answer CCP commands for the bootloader or the application.
+
+    Downloads are written to, and uploads read from, the :class:`Memory` for
+    each address extension in :attr:`memory`.  Checksums are verified against
+    the CRC of the downloaded data.
+    """
+
+    def __init__(
+        self,
+        transmitter,
+        endianness,
+        rx_id=ccp.bootloader_can_id,
+        tx_id=ccp.bootloader_can_id,
+    ):
+        self.transmitter = transmitter
+        self.endianness = endianness
+        self.rx_id = rx_id
+        self.tx_id = tx_id
+
+        self.memory = collections.defaultdict(Memory)
+        self.commands = collections.Counter()
+
+        self.connected = False
+        self.extension = None
+        self.offset = 0
+        self.block_crc = None
+        self.continuous_crc = None
+
+        self._handlers = {
+            ccp.CommandCode.connect: self._connect,
+            ccp.CommandCode.disconnect: self._disconnect,
+            ccp.CommandCode.set_mta: self._set_mta,
+            ccp.CommandCode.unlock: self._acknowledge,
+            ccp.CommandCode.clear_memory: self._clear_memory,
+            ccp.CommandCode.download: self._download,
+            ccp.CommandCode.download_6: self._download_6,
+            ccp.CommandCode.build_checksum: self._build_checksum,
+            ccp.CommandCode.upload: self._upload,
+        }
+
+    def _octets_per_address(self):
+        if self.extension == ccp.AddressExtension.flash_memory:
+            return 2
+
+        return 1
+
+    def _reply(self, command, code=ccp.CommandStatus.acknowledge, payload=()):
+        packet = ccp.BootloaderReply(code=code, arbitration_id=self.tx_id)
+        packet.message.data[0] = 0xFF
+        packet.command_counter = command.command_counter
+        payload = tuple(payload)
+        packet.payload[0 : len(payload)] = payload
+
+        self.transmitter.send(packet.message)
+
+    def on_message_received(self, msg):
+        if not (msg.arbitration_id == self.rx_id and msg.is_extended_id):
+            return
+
+        command = ccp.Packet.from_message(message=msg)
+        if not isinstance(command, ccp.HostCommand):
+            return
+
+        try:
+            handler = self._handlers[command.command_code]
+        except (KeyError, ValueError):
+            handler = functools.partial(
+                self._reply,
+                code=ccp.CommandStatus.unknown_command,
+            )
+        else:
+            self.commands[command.command_code] += 1
+
+        handler(command)
+
+    def _acknowledge(self, command):
+        self._reply(command)
+
+    def _connect(self, command):
+        self.connected = True
+        self._reply(command, payload=(1, 0, *ccp.DspCode._28069PZP.to_bytes(2, "big")))
+
+    def _disconnect(self, command):
+        self.connected = False
+        self._reply(command)
+
+    def _set_mta(self, command):
+        self.extension = ccp.AddressExtension(command.payload[1])
+        address = int.from_bytes(bytes(command.payload[2:6]), self.endianness)
+        self.offset = address * self._octets_per_address()
+        self.block_crc = None
+        self._reply(command)
+
+    def _clear_memory(self, command):
+        self.memory.pop(ccp.AddressExtension.flash_memory, None)
+        self.continuous_crc = None
+        self._reply(command)
+
+    def _store(self, command, payload):
+        self.block_crc = ccp.crc(data=payload, crc=self.block_crc)
+        self.continuous_crc = ccp.crc(data=payload, crc=self.continuous_crc)
+
+        data = bytes(ccp.endianness_swap_2byte(payload))
+        self.memory[self.extension].write(offset=self.offset, data=data)
+        self.offset += len(data)
+
+        self._reply(command)
+
+    def _download(self, command):
+        length = command.payload[0]
+        self._store(command, payload=bytes(command.payload[1 : length + 1]))
+
+    def _download_6(self, command):
+        self._store(command, payload=bytes(command.payload[0:6]))
+
+    def _build_checksum(self, command):
+        length = int.from_bytes(bytes(command.payload[:4]), self.endianness)
+        checksum = int.from_bytes(bytes(command.payload[4:6]), self.endianness)
+
+        expected = self.continuous_crc if length == 0 else self.block_crc
+        self.block_crc = None
+
+        if checksum != expected:
+            self._reply(command, code=ccp.CommandStatus.operational_failure)
+            return
+
+        self._reply(command)
+
+    def _upload(self, command):
+        remaining = command.payload[0]
+        memory = self.memory[self.extension]
+
+        while remaining > 0:
+            length = min(remaining, reply_payload_length)
+            self._reply(command, payload=memory.read(self.offset, length))
+            self.offset += length
+            remaining -= length
+
+
+@attr.s
+class Device:
+    """A simulated device built from a :class:`epyqlib.hildevice.Definition`.
+
+    Requests received on ``bus`` are answered with responses shaped by
+    ``link``.  The bootloader answers on the default CCP identifier and the
+    application, including the data logger, on its ``CCP`` and
+    ``CCPResponse`` frames.
+    """
+
+    definition = attr.ib()
+    bus = attr.ib()
+    link = attr.ib(default=attr.Factory(Link))
+    neo = attr.ib(default=None)
+    nvs = attr.ib(default=None)
+    transmitter = attr.ib(default=None)
+    nv_responder = attr.ib(default=None)
+    ccp_responder = attr.ib(default=None)
+    bootloader_responder = attr.ib(default=None)
+    notifier = attr.ib(default=None)
+
+    @classmethod
+    def from_path(cls, path, bus, link=None):
+        if link is None:
+            link = Link()
+
+        with epyqlib.updateepc.updated(path) as updated:
+            definition = epyqlib.hildevice.Definition.loadp(updated)
+            device = cls(definition=definition, bus=bus, link=link)
+            device.load()
+
+        return device
+
+    def load(self):
+        matrix = self.definition.load_can()
+
+        node_id_adjust = functools.partial(
+            epyqlib.device.node_id_types[self.definition.node_id_type],
+            device_id=self.definition.node_id,
+            controller_id=self.definition.controller_id,
+        )
+
+        self.neo = epyqlib.canneo.Neo(
+            matrix=matrix,
+            node_id_adjust=node_id_adjust,
+        )
+
+        nv_neo = epyqlib.canneo.Neo(
+            matrix=matrix,
+            frame_class=epyqlib.nv.Frame,
+            signal_class=epyqlib.nv.Nv,
+            strip_summary=False,
+            node_id_adjust=node_id_adjust,
+        )
+        self.nvs = epyqlib.nv.Nvs(
+            neo=nv_neo,
+            configuration=self.definition.nv_configuration,
+        )
+
+        self.transmitter = Transmitter(bus=self.bus, link=self.link)
+        self.nv_responder = NvResponder(nvs=self.nvs, transmitter=self.transmitter)
+        listeners = [self.nv_responder]
+
+        self.bootloader_responder = CcpResponder(
+            transmitter=self.transmitter,
+            endianness="big",
+        )
+        listeners.append(self.bootloader_responder)
+
+        host_frame = self.neo.frame_by_name("CCP")
+        device_frame = self.neo.frame_by_name("CCPResponse")
+        if host_frame is not None and device_frame is not None:
+            signal = self.neo.signal_by_path("CCP", "Connect", "CommandCounter")
+            self.ccp_responder = CcpResponder(
+                transmitter=self.transmitter,
+                endianness="little" if signal.little_endian else "big",
+                rx_id=host_frame.id,
+                tx_id=device_frame.id,
+            )
+            listeners.append(self.ccp_responder)
+
+        self.notifier = can.Notifier(bus=self.bus, listeners=listeners)
+
+    def stop(self):
+        self.notifier.stop()
+        self.transmitter.stop()
+
+    def nv(self, *path):
+        return self.nvs.signal_from_names(*path)
+
+    def set_log(self, data):
+        """Provide ``data`` as the raw log held by the data logger."""
+        self.nv_responder.set_value(
+            nv=self.nv("DataloggerStatus", "DataloggerRecording"),
+            value=0,
+        )
+        self.nv_responder.set_value(
+            nv=self.nv("LoggerStatus01", "ReadableOctets"),
+            value=len(data),
+        )
+
+        memory = self.ccp_responder.memory[ccp.AddressExtension.data_logger]
+        memory.data = bytearray(data)
+
+    def flash_image(self):
+        return bytes(
+            self.bootloader_responder.memory[ccp.AddressExtension.flash_memory].data
+        )
@@ -2,7 +2,10 @@
 
 # TODO: """DocString if there is one"""
 
-from PyQt5.QtCore import pyqtProperty, QMarginsF, QSize
+from collections import OrderedDict
+
+from PyQt5.QtCore import pyqtProperty, QMarginsF, QRectF, QSize, Qt
+from PyQt5.QtGui import QPainter, QPixmap
 from PyQt5.QtSvg import QSvgWidget
 
 # See file COPYING in this source tree
@@ -10,6 +13,33 @@ __copyright__ = "Copyright 2016, EPC Power Corp."
 __license__ = "GPLv2+"
 
 
+class PixmapCache:
+    """Least recently used cache of rendered SVG images shared by all
+    :class:`SvgWidget` instances, keyed by the SVG contents, the element
+    framed and the rendered size."""
+
+    def __init__(self, size=256):
+        self.size = size
+        self.pixmaps = OrderedDict()
+
+    def get(self, key):
+        pixmap = self.pixmaps.get(key)
+        if pixmap is not None:
+            self.pixmaps.move_to_end(key)
+
+        return pixmap
+
+    def put(self, key, pixmap):
+        self.pixmaps[key] = pixmap
+        self.pixmaps.move_to_end(key)
+
+        while len(self.pixmaps) > self.size:
+            self.pixmaps.popitem(last=False)
+
+
+pixmap_cache = PixmapCache()
+
+
 class SvgWidget(QSvgWidget):
     def __init__(self, parent=None, in_designer=False):
         QSvgWidget.__init__(self, parent=parent)
@@ -17,6 +47,15 @@ class SvgWidget(QSvgWidget):
         self.in_designer = in_designer
 
         self._main_element = ""
+        self._contents = None
+
+    def load(self, contents):
+        if isinstance(contents, str):
+            self._contents = contents
+        else:
+            self._contents = bytes(contents)
+
+        QSvgWidget.load(self, contents)
 
     @pyqtProperty(str)
     def main_element(self):
@@ -41,8 +80,21 @@ class SvgWidget(QSvgWidget):
         return svg_dy / svg_dx
 
     def paintEvent(self, event):
+        ratio = self.devicePixelRatioF()
+        key = (self._contents, self.main_element, self.width(), self.height(), ratio)
+
+        pixmap = pixmap_cache.get(key)
+        if pixmap is None:
+            pixmap = self.render_pixmap(ratio=ratio)
+            pixmap_cache.put(key, pixmap)
+
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, pixmap)
+
+    def render_pixmap(self, ratio):
+        renderer = self.renderer()
+
         if len(self.main_element) > 0:
-            renderer = self.renderer()
             bounds = renderer.boundsOnElement(self.main_element)
             svg_dx = bounds.width()
             svg_dy = bounds.height()
@@ -69,7 +121,15 @@ class SvgWidget(QSvgWidget):
 
             renderer.setViewBox(bounds)
 
-        QSvgWidget.paintEvent(self, event)
+        pixmap = QPixmap(self.size() * ratio)
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.transparent)
+
+        painter = QPainter(pixmap)
+        renderer.render(painter, QRectF(0, 0, self.width(), self.height()))
+        painter.end()
+
+        return pixmap
 
 
 if __name__ == "__main__":
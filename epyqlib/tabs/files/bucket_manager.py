@@ -1,5 +1,6 @@
 from epyqlib.tabs.files.aws_login_manager import AwsLoginManager
 from epyqlib.tabs.files.sync_config import SyncConfig
+from epyqlib.tabs.files.transfer_manager import TransferManager
 
 
 class BucketManager:
@@ -14,6 +15,10 @@ class BucketManager:
     def __init__(self):
         self._aws = AwsLoginManager.get_instance()
         self._uploaded_logs: set[str] = None
+        self._transfers = TransferManager(
+            get_client=lambda: self._aws.get_s3_resource().meta.client,
+            bucket=self._bucket_name,
+        )
 
     async def download_file(self, hash: str, filename: str):
         return await self._download(filename, "files/" + hash)
@@ -24,8 +29,7 @@ class BucketManager:
 
     async def _download(self, filename: str, key: str):
         try:
-            bucket = self._aws.get_s3_resource().Bucket(self._bucket_name)
-            bucket.download_file(Filename=filename, Key=key)
+            await self._transfers.download(key=key, filename=filename)
             print(f"{self._tag} Finished downloading {key}")
         except Exception as ex:
             import sys
@@ -41,10 +45,9 @@ class BucketManager:
         print(f"{self._tag} Starting to upload log {dest_filename}")
 
         # TODO: Figure out if logs should really be uploaded to their own folder
-        with open(source_path, "rb") as source_file:
-            s3_resource = self._aws.get_s3_resource()
-            bucket = s3_resource.Bucket(self._bucket_name)
-            bucket.put_object(Key=self._logs_path + dest_filename, Body=source_file)
+        await self._transfers.upload(
+            filename=source_path, key=self._logs_path + dest_filename
+        )
 
         print(f"{self._tag} Finished upload of log {dest_filename}")
         if self._uploaded_logs is not None:
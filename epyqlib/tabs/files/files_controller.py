@@ -15,10 +15,12 @@ from epyqlib.tabs.files.files_manager import FilesManager
 from epyqlib.tabs.files.filesview import Cols, get_values
 from epyqlib.tabs.files.log_manager import LogManager, PendingLog
 from epyqlib.tabs.files.sync_config import SyncConfig, Vars
+from epyqlib.tabs.files.transfer_manager import gather
 from epyqlib.utils.twisted import errbackhook
 import twisted.internet
 from twisted.internet.error import DNSLookupError
 from twisted.internet.task import deferLater
+from twisted.internet.threads import deferToThread
 from typing import Dict
 
 from .graphql import API, InverterNotFoundException
@@ -232,9 +234,11 @@ class FilesController:
             )
             return
 
-        # TODO: Figure out how to download multiple files at a time. Just trying to wrap in asyncio task fails.
-        for hash in missing_hashes:
-            await self.sync_file(hash)
+        # Concurrency is bounded by the bucket manager's transfers
+        results = await gather(self.sync_file(hash) for hash in missing_hashes)
+        for success, result in results:
+            if not success:
+                result.raiseException()
 
     async def sync_file(self, hash):
         await self.download_file(hash)
@@ -291,7 +295,7 @@ class FilesController:
 
     ## Lifecycle events
     async def tab_selected(self):
-        self.cache_manager.verify_cache()
+        await deferToThread(self.cache_manager.verify_cache)
 
         self.view.serial_number.setText(self._serial_number)
         self.view.disable_serial_number_input(
@@ -433,14 +437,17 @@ class FilesController:
             self.association_cache.put_associations(serial, association_list)
 
         # Fetch missing files
-        for hash in self.association_cache.get_all_known_file_hashes():
-            if not self.cache_manager.has_hash(hash):
-                try:
-                    await self.download_file(hash)
-                except Exception:
-                    self.view.add_log_error_line(
-                        f"Error caching file {hash}. See epyq.log for details."
-                    )
+        missing_hashes = [
+            hash
+            for hash in self.association_cache.get_all_known_file_hashes()
+            if not self.cache_manager.has_hash(hash)
+        ]
+        results = await gather(self.download_file(hash) for hash in missing_hashes)
+        for hash, (success, result) in zip(missing_hashes, results):
+            if not success:
+                self.view.add_log_error_line(
+                    f"Error caching file {hash}. See epyq.log for details."
+                )
 
         self.view.add_log_line("Completed syncing all associations for organization.")
 
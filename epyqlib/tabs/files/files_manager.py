@@ -1,8 +1,56 @@
-import hashlib
+import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from os import path
+from typing import Dict
 
-from epyqlib.tabs.files.files_utils import ensure_dir
+from epyqlib.tabs.files.files_utils import ensure_dir, md5
+from epyqlib.tabs.files.transfer_manager import transfer_suffixes
+
+
+class HashIndex:
+    """MD5 of each cached file along with the size and modification time it
+    was computed for.  Files unchanged since are not hashed again."""
+
+    def __init__(self, index_path: str):
+        self._index_path = index_path
+        self._entries: Dict[str, dict] = {}
+
+        if path.exists(index_path):
+            try:
+                with open(index_path, "r") as file:
+                    self._entries = json.load(file)
+            except ValueError:
+                print(f"Hash index {index_path} is corrupt. Rebuilding.")
+
+    def get(self, filename: str, stat: os.stat_result):
+        entry = self._entries.get(filename)
+        if entry is None:
+            return None
+
+        if entry["size"] != stat.st_size or entry["mtime_ns"] != stat.st_mtime_ns:
+            return None
+
+        return entry["md5"]
+
+    def put(self, filename: str, stat: os.stat_result, md5: str):
+        self._entries[filename] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "md5": md5,
+        }
+
+    def retain(self, filenames):
+        filenames = set(filenames)
+        self._entries = {
+            filename: entry
+            for filename, entry in self._entries.items()
+            if filename in filenames
+        }
+
+    def save(self):
+        with open(self._index_path, "w") as file:
+            json.dump(self._entries, file, indent=2)
 
 
 class FilesManager:
@@ -10,23 +58,44 @@ class FilesManager:
         cache_dir = path.join(files_dir, "files")
         ensure_dir(cache_dir)
         self._cache_dir = cache_dir
+        self._hash_index = HashIndex(path.join(files_dir, "file-hashes.json"))
+
+    def verify_cache(self, max_workers: int = None):
+        filenames = self.hashes()
+        stats = {filename: self.stat(filename) for filename in filenames}
 
-    def verify_cache(self):
-        for filename in self.hashes():
-            hash = self._md5(filename)
+        hashes = {}
+        to_hash = []
+        for filename, stat in stats.items():
+            hash = self._hash_index.get(filename, stat)
+            if hash is None:
+                to_hash.append(filename)
+            else:
+                hashes[filename] = hash
+
+        # hashlib releases the GIL while digesting large buffers
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for filename, hash in zip(to_hash, executor.map(self._md5, to_hash)):
+                self._hash_index.put(filename, stats[filename], hash)
+                hashes[filename] = hash
+
+        for filename, hash in hashes.items():
             if hash != filename:
                 print(f"File {filename} failed hash verification. Deleting.")
                 os.unlink(path.join(self._cache_dir, filename))
 
+        self._hash_index.retain(self.hashes())
+        self._hash_index.save()
+
     def _md5(self, filename: str) -> str:
-        md5 = hashlib.md5()
-        with open(path.join(self._cache_dir, filename), "rb") as file:
-            for chunk in iter(lambda: file.read(4096), b""):
-                md5.update(chunk)
-        return md5.hexdigest()
+        return md5(path.join(self._cache_dir, filename))
 
     def hashes(self):
-        return os.listdir(self._cache_dir)
+        return [
+            filename
+            for filename in os.listdir(self._cache_dir)
+            if not filename.endswith(transfer_suffixes)
+        ]
 
     def has_hash(self, hash: str) -> bool:
         return path.exists(path.join(self._cache_dir, hash))
@@ -1,7 +1,12 @@
+import hashlib
 import json
 import os
+import shutil
 from base64 import b64decode
 
+# Large reads keep hashing bound by the digest rather than by Python calls
+hash_buffer_size = 1024 * 1024
+
 
 def ensure_dir(dir_name: str):
     if os.path.exists(dir_name):
@@ -15,6 +20,25 @@ def ensure_dir(dir_name: str):
     os.makedirs(dir_name, exist_ok=True)
 
 
+def md5(file_path: str) -> str:
+    md5 = hashlib.md5()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(hash_buffer_size), b""):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+def copy_with_md5(source_path: str, dest_path: str) -> str:
+    """Copy like :func:`shutil.copy2` while hashing, reading the source once."""
+    md5 = hashlib.md5()
+    with open(source_path, "rb") as source, open(dest_path, "wb") as dest:
+        for chunk in iter(lambda: source.read(hash_buffer_size), b""):
+            md5.update(chunk)
+            dest.write(chunk)
+    shutil.copystat(source_path, dest_path)
+    return md5.hexdigest()
+
+
 def decode(s: str) -> str:
     # Add missing padding just in case
     return json.loads(b64decode(s + "==="))
@@ -1,16 +1,16 @@
-import hashlib
 import inspect
 import json
 import os
-import shutil
+import tempfile
 from datetime import datetime
 from enum import Enum
 from os import path
 from typing import Union, List, Callable, Coroutine
 
 import attr
+from twisted.internet.threads import deferToThread
 
-from epyqlib.tabs.files.files_utils import ensure_dir
+from epyqlib.tabs.files.files_utils import copy_with_md5, ensure_dir
 
 NewLogListener = Callable[[str], Coroutine]
 
@@ -60,8 +60,7 @@ class LogManager:
 
     async def add_pending_log(self, file_path: str, build_id: str, serial_number: str):
         basename = os.path.basename(file_path)
-        hash = self._md5(file_path)
-        shutil.copy2(file_path, path.join(self._cache_dir, hash))
+        hash = await deferToThread(self._copy_into_cache, file_path)
 
         new_log = PendingLog(hash, basename, build_id, serial_number)
         self._pending_logs.append(new_log)
@@ -105,12 +104,17 @@ class LogManager:
         self._pending_logs.remove(log)
         self._save_pending_log_file()
 
-    def _md5(self, filename: str) -> str:
-        md5 = hashlib.md5()
-        with open(filename, "rb") as file:
-            for chunk in iter(lambda: file.read(4096), b""):
-                md5.update(chunk)
-        return md5.hexdigest()
+    def _copy_into_cache(self, file_path: str) -> str:
+        """Copy into the cache named by the MD5, hashing during the copy."""
+        fd, temp_path = tempfile.mkstemp(dir=self._cache_dir, suffix=".copying")
+        os.close(fd)
+        try:
+            hash = copy_with_md5(file_path, temp_path)
+            os.replace(temp_path, path.join(self._cache_dir, hash))
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        return hash
 
     def get_file_ref(self, filename: str, mode: str):
         return open(path.join(self._cache_dir, filename), mode)
@@ -0,0 +1,300 @@
+import functools
+import json
+import os
+from typing import Callable, Dict, Iterable, List, Tuple
+
+import attr
+from botocore.exceptions import ClientError
+from twisted.internet.defer import DeferredList, DeferredSemaphore, ensureDeferred
+from twisted.internet.threads import deferToThread
+
+# Suffixes of the files kept beside a destination while a transfer is incomplete
+partial_suffix = ".part"
+download_state_suffix = ".part.json"
+upload_state_suffix = ".upload.json"
+
+transfer_suffixes = (partial_suffix, download_state_suffix, upload_state_suffix)
+
+megabyte = 1024 * 1024
+
+
+async def gather(coroutines: Iterable) -> List[Tuple[bool, object]]:
+    """Run the coroutines concurrently and return a ``(success, result)``
+    pair for each, in order.  The result of a failure is its
+    :class:`twisted.python.failure.Failure`."""
+    return await DeferredList(
+        [ensureDeferred(coroutine) for coroutine in coroutines],
+        consumeErrors=True,
+    )
+
+
+def _read_state(state_path: str):
+    try:
+        with open(state_path, "r") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_state(state_path: str, state: dict):
+    with open(state_path, "w") as file:
+        json.dump(state, file, indent=2)
+
+
+def _remove(file_path: str):
+    try:
+        os.unlink(file_path)
+    except FileNotFoundError:
+        pass
+
+
+def _write_body(body, file_path: str, offset: int):
+    with open(file_path, "r+b") as file:
+        file.seek(offset)
+        for chunk in iter(lambda: body.read(megabyte), b""):
+            file.write(chunk)
+
+
+def _read_part(file_path: str, offset: int, size: int) -> bytes:
+    with open(file_path, "rb") as file:
+        file.seek(offset)
+        return file.read(size)
+
+
+def _allocate(file_path: str, size: int):
+    with open(file_path, "wb") as file:
+        file.truncate(size)
+
+
+@attr.s
+class TransferManager:
+    """Transfers files to and from an S3 bucket with at most ``concurrency``
+    requests in flight.  Each request runs in the reactor's thread pool.
+
+    Files larger than ``multipart_threshold`` are moved in ``part_size``
+    pieces, in parallel.  The progress of those is kept in a JSON file
+    beside the local file so an interrupted transfer resumes with only the
+    missing parts.  ``get_client`` is called for each request so refreshed
+    credentials are used.  Any client with the boto3 S3 client interface
+    will do.
+    """
+
+    _tag = "[Transfer Manager]"
+
+    get_client: Callable = attr.ib()
+    bucket: str = attr.ib()
+    concurrency: int = attr.ib(default=4)
+    part_size: int = attr.ib(default=8 * megabyte)
+    multipart_threshold: int = attr.ib(default=16 * megabyte)
+    _semaphore: DeferredSemaphore = attr.ib(default=None)
+
+    def __attrs_post_init__(self):
+        if self._semaphore is None:
+            self._semaphore = DeferredSemaphore(self.concurrency)
+
+    async def _run(self, function, *args, **kwargs):
+        return await self._semaphore.run(
+            deferToThread, functools.partial(function, *args, **kwargs)
+        )
+
+    async def _request(self, method: str, **kwargs):
+        def request():
+            return getattr(self.get_client(), method)(Bucket=self.bucket, **kwargs)
+
+        return await self._run(request)
+
+    def _parts(self, size: int) -> List[Tuple[int, int]]:
+        """Offset and size of each part, numbered from 1 in S3."""
+        return [
+            (offset, min(self.part_size, size - offset))
+            for offset in range(0, size, self.part_size)
+        ]
+
+    ## Downloads
+    async def download(self, key: str, filename: str):
+        head = await self._request("head_object", Key=key)
+        size = head["ContentLength"]
+
+        if size <= self.multipart_threshold:
+            await self._download_whole(key, filename)
+        else:
+            await self._download_ranges(key, filename, size, head["ETag"])
+
+    async def _download_whole(self, key: str, filename: str):
+        partial_path = filename + partial_suffix
+
+        def get():
+            response = self.get_client().get_object(Bucket=self.bucket, Key=key)
+            _allocate(partial_path, 0)
+            _write_body(response["Body"], partial_path, 0)
+
+        await self._run(get)
+        os.replace(partial_path, filename)
+
+    async def _download_ranges(self, key: str, filename: str, size: int, etag: str):
+        partial_path = filename + partial_suffix
+        state_path = filename + download_state_suffix
+
+        state = _read_state(state_path)
+        resumable = (
+            state is not None
+            and state["key"] == key
+            and state["etag"] == etag
+            and state["part_size"] == self.part_size
+            and os.path.exists(partial_path)
+        )
+        if not resumable:
+            await deferToThread(_allocate, partial_path, size)
+            state = {
+                "key": key,
+                "etag": etag,
+                "size": size,
+                "part_size": self.part_size,
+                "completed": [],
+            }
+            _write_state(state_path, state)
+        else:
+            print(
+                f"{self._tag} Resuming download of {key} with "
+                f"{len(state['completed'])} parts already present"
+            )
+
+        completed = set(state["completed"])
+
+        async def download_part(number: int, offset: int, part_size: int):
+            def get():
+                response = self.get_client().get_object(
+                    Bucket=self.bucket,
+                    Key=key,
+                    Range=f"bytes={offset}-{offset + part_size - 1}",
+                    IfMatch=etag,
+                )
+                _write_body(response["Body"], partial_path, offset)
+
+            await self._run(get)
+
+            # Runs in the reactor thread so the state is never written concurrently
+            completed.add(number)
+            state["completed"] = sorted(completed)
+            _write_state(state_path, state)
+
+        await self._all(
+            download_part(number, offset, part_size)
+            for number, (offset, part_size) in enumerate(self._parts(size), start=1)
+            if number not in completed
+        )
+
+        os.replace(partial_path, filename)
+        _remove(state_path)
+
+    ## Uploads
+    async def upload(self, filename: str, key: str):
+        size = os.stat(filename).st_size
+
+        if size <= self.multipart_threshold:
+
+            def put():
+                with open(filename, "rb") as file:
+                    self.get_client().put_object(Bucket=self.bucket, Key=key, Body=file)
+
+            await self._run(put)
+        else:
+            await self._upload_parts(filename, key, size)
+
+    async def _upload_parts(self, filename: str, key: str, size: int):
+        state_path = filename + upload_state_suffix
+
+        etags = None
+        state = _read_state(state_path)
+        if (
+            state is not None
+            and state["key"] == key
+            and state["size"] == size
+            and state["part_size"] == self.part_size
+        ):
+            etags = await self._uploaded_parts(key, state["upload_id"])
+
+        if etags is None:
+            response = await self._request("create_multipart_upload", Key=key)
+            state = {
+                "key": key,
+                "upload_id": response["UploadId"],
+                "size": size,
+                "part_size": self.part_size,
+            }
+            _write_state(state_path, state)
+            etags = {}
+        else:
+            print(
+                f"{self._tag} Resuming upload of {key} with "
+                f"{len(etags)} parts already uploaded"
+            )
+
+        upload_id = state["upload_id"]
+
+        async def upload_part(number: int, offset: int, part_size: int):
+            def put():
+                body = _read_part(filename, offset, part_size)
+                return self.get_client().upload_part(
+                    Bucket=self.bucket,
+                    Key=key,
+                    UploadId=upload_id,
+                    PartNumber=number,
+                    Body=body,
+                )
+
+            response = await self._run(put)
+            etags[number] = response["ETag"]
+
+        # An incomplete upload is left in place to be resumed by the next attempt
+        await self._all(
+            upload_part(number, offset, part_size)
+            for number, (offset, part_size) in enumerate(self._parts(size), start=1)
+            if number not in etags
+        )
+
+        await self._request(
+            "complete_multipart_upload",
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={
+                "Parts": [
+                    {"PartNumber": number, "ETag": etag}
+                    for number, etag in sorted(etags.items())
+                ]
+            },
+        )
+        _remove(state_path)
+
+    async def _uploaded_parts(self, key: str, upload_id: str) -> Dict[int, str]:
+        """ETag of each part already uploaded, or ``None`` if the upload is
+        no longer known to the bucket."""
+        etags = {}
+        marker = 0
+
+        while True:
+            try:
+                response = await self._request(
+                    "list_parts",
+                    Key=key,
+                    UploadId=upload_id,
+                    PartNumberMarker=marker,
+                )
+            except ClientError as e:
+                if e.response["Error"]["Code"] == "NoSuchUpload":
+                    return None
+                raise
+
+            for part in response.get("Parts", []):
+                etags[part["PartNumber"]] = part["ETag"]
+
+            if not response.get("IsTruncated", False):
+                return etags
+
+            marker = response["NextPartNumberMarker"]
+
+    async def _all(self, coroutines: Iterable):
+        """Wait for all, then raise the first failure if any."""
+        for success, result in await gather(coroutines):
+            if not success:
+                result.raiseException()
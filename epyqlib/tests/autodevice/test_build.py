@@ -38,6 +38,7 @@ def create_example_auto_device(
     serial_number=None,
     parameter_type="pmvs",
     template=epyqlib.autodevice.build.raw_template / "auto_parameters.epc",
+    create=True,
 ):
     builder = epyqlib.autodevice.build.Builder()
     builder.archive_code = archive_code
@@ -84,6 +85,9 @@ def create_example_auto_device(
     with open(device_files.can, "rb") as f:
         can_contents = f.read()
 
+    if not create:
+        return builder, can_contents
+
     builder.create(can_contents=can_contents)
 
     return AutoDevice(version=version, path=target)
@@ -180,6 +184,39 @@ def test_from_zip(version, parameter_type, access_password, tmpdir):
         assert any(name.endswith(".epc") for name in z.namelist())
 
 
+def test_archive_readable_with_code(auto_device):
+    with zipfile.ZipFile(auto_device.path) as z:
+        z.setpassword(example_archive_code.encode("ascii"))
+        (epc_name,) = (name for name in z.namelist() if name.endswith(".epc"))
+        raw_dict = json.loads(z.read(epc_name))
+
+    assert pathlib.PurePosixPath(epc_name).parent.name == "auto_device"
+    assert raw_dict["serial_number_names"] == ["SN", "SerialNumber"]
+
+
+def test_create_all(version, access_password, tmpdir):
+    temporary_directory = pathlib.Path(tmpdir)
+    targets = [temporary_directory / f"auto_device_{i}.epz" for i in range(3)]
+
+    builds = [
+        create_example_auto_device(
+            version=version,
+            target=target,
+            access_password=access_password,
+            create=False,
+        )
+        for target in targets
+    ]
+
+    written = epyqlib.autodevice.build.create_all(builds=builds, processes=2)
+
+    assert written == targets
+    for target in targets:
+        with zipfile.ZipFile(target) as z:
+            z.setpassword(example_archive_code.encode("ascii"))
+            assert z.testzip() is None
+
+
 @pytest.mark.require_device
 @pytest_twisted.inlineCallbacks
 def test_general_load(qapp, auto_device):
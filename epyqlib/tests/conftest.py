@@ -37,3 +37,13 @@ def customer_device_path(tmpdir, zipped_customer_device_path):
     (path,) = glob.glob(os.path.join(tmpdir, "**", "*.epc"), recursive=True)
 
     return path
+
+
+@pytest.fixture
+def zip_cache(tmp_path, monkeypatch):
+    import epyqlib.device
+
+    path = tmp_path / "zip_cache"
+    monkeypatch.setattr(epyqlib.device, "zip_cache_path", path)
+
+    return path
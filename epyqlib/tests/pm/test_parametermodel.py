@@ -703,6 +703,37 @@ def test_move_enumeration_in_table(sample):
     assert names_before != names_after
 
 
+def test_table_update_patches_in_place(sample):
+    def nodes():
+        return {
+            node.uuid: node
+            for node in sample.table.group.nodes_by_filter(lambda node: True)
+        }
+
+    before = nodes()
+
+    enumerator = epyqlib.pm.parametermodel.Enumerator(name="c")
+    sample.letters_enumeration.append_child(enumerator)
+    sample.table.update()
+
+    verify_table_automatic_groups(sample)
+    with_c = nodes()
+    added = [node for uuid, node in with_c.items() if uuid not in before]
+    assert all(with_c[uuid] is node for uuid, node in before.items())
+    assert len(added) > 0
+    assert all(node.path[0] == enumerator.uuid for node in added)
+    for node in added:
+        assert sample.model.node_from_index(sample.model.index_from_node(node)) is node
+
+    sample.letters_enumeration.remove_child(child=enumerator)
+    sample.table.update()
+
+    verify_table_automatic_groups(sample)
+    after = nodes()
+    assert after.keys() == before.keys()
+    assert all(after[uuid] is node for uuid, node in before.items())
+
+
 TestAttrsModel = epyqlib.attrsmodel.build_tests(
     types=epyqlib.pm.parametermodel.types,
     root_type=epyqlib.pm.parametermodel.Root,
@@ -0,0 +1,105 @@
+import pathlib
+import uuid
+
+import graham
+import pytest
+
+import epyqlib.pm.valueset
+import epyqlib.pm.valuesetmodel
+
+
+def write_value_set(path, values, name="Value Set"):
+    value_set = epyqlib.pm.valuesetmodel.create_blank()
+    value_set.model.root.name = name
+
+    for parameter_name, (parameter_uuid, value) in values.items():
+        value_set.model.root.append_child(
+            epyqlib.pm.valuesetmodel.Parameter(
+                name=parameter_name,
+                value=value,
+                parameter_uuid=parameter_uuid,
+            ),
+        )
+
+    value_set.save(path=path)
+
+
+@pytest.fixture
+def configuration(tmp_path):
+    uuids = [uuid.UUID(int=i) for i in range(4)]
+
+    write_value_set(
+        tmp_path / "base.pmvs",
+        {"a": (uuids[0], 1), "b": (uuids[1], 2), "c": (uuids[2], 3)},
+        name="Base",
+    )
+    write_value_set(tmp_path / "first.pmvs", {"a": (uuids[0], 10)})
+    write_value_set(
+        tmp_path / "second.pmvs",
+        {"b": (uuids[1], 20), "d": (uuids[3], 40)},
+    )
+
+    configuration = epyqlib.pm.valueset.OverlayConfiguration(
+        output_path="out",
+        recipes=[
+            epyqlib.pm.valueset.OverlayRecipe(
+                output_path=output_path,
+                base_pmvs_path="base.pmvs",
+                overlay_pmvs_paths=overlay_pmvs_paths,
+            )
+            for output_path, overlay_pmvs_paths in (
+                ("one.pmvs", ["first.pmvs"]),
+                ("both.pmvs", ["first.pmvs", "second.pmvs"]),
+                ("plain.pmvs", []),
+            )
+        ],
+    )
+
+    path = tmp_path / "recipes.json"
+    path.write_text(graham.dumps(configuration, indent=4).data, encoding="utf-8")
+
+    return epyqlib.pm.valueset.OverlayConfiguration.load(path)
+
+
+def expected_output(configuration, recipe):
+    value_set = epyqlib.pm.valuesetmodel.loadp(
+        configuration.recipe_base_pmvs_path(recipe=recipe),
+    )
+    for path in configuration.recipe_overlay_pmvs_paths(recipe=recipe):
+        value_set.overlay(epyqlib.pm.valuesetmodel.loadp(path))
+
+    path = configuration.reference_path / "expected.pmvs"
+    value_set.save(path=path)
+
+    return path.read_text()
+
+
+@pytest.mark.parametrize("processes", (1, 2))
+def test_cook_matches_overlaying(configuration, processes):
+    cooked = configuration.cook(processes=processes)
+
+    assert len(cooked) == 3
+    for recipe in configuration.recipes:
+        output_path = configuration.recipe_output_path(recipe=recipe)
+        assert output_path.read_text() == expected_output(configuration, recipe)
+
+
+def test_cook_skips_unchanged(configuration):
+    configuration.cook()
+    assert not configuration.raw()
+    assert configuration.cook() == []
+
+    second = configuration.reference_path / "second.pmvs"
+    second.write_text(second.read_text().replace('"20"', '"21"'))
+    assert configuration.raw()
+    assert [task.name for task in configuration.cook()] == [
+        str(pathlib.Path("out", "both.pmvs"))
+    ]
+
+    plain = configuration.reference_path / "out" / "plain.pmvs"
+    plain.unlink()
+    assert [task.name for task in configuration.cook()] == [
+        str(pathlib.Path("out", "plain.pmvs"))
+    ]
+
+    assert len(configuration.cook(only_stale=False)) == 3
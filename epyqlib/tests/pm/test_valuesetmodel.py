@@ -1,3 +1,4 @@
+import epyqlib.benchmark
 import epyqlib.pm.valuesetmodel
 import epyqlib.tests.test_attrsmodel
 
@@ -11,3 +12,25 @@ TestAttrsModel = epyqlib.attrsmodel.build_tests(
     root_type=epyqlib.pm.valuesetmodel.Root,
     columns=epyqlib.pm.valuesetmodel.columns,
 )
+
+
+def test_copy_parameter_data_sorted_and_in_model():
+    root = epyqlib.benchmark.parameter_model_root(count=30, width=7)
+    value_set = epyqlib.pm.valuesetmodel.create_blank()
+    value_set.model.root.append_child(
+        epyqlib.pm.valuesetmodel.Parameter(name="parameter 15a"),
+    )
+
+    epyqlib.pm.valuesetmodel.copy_parameter_data(value_set=value_set, base_node=root)
+
+    children = value_set.model.root.children
+    assert children == sorted(children)
+    assert len(children) == 31
+
+    item = value_set.model.model.invisibleRootItem()
+    assert [item.child(row, 0).text() for row in range(item.rowCount())] == [
+        child.name for child in children
+    ]
+    assert all(
+        value_set.model.node_from_uuid(child.uuid) is child for child in children
+    )
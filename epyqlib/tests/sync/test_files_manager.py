@@ -19,3 +19,32 @@ def test_hashing(temp_dir):
 
     assert empty_file_hash in manager.hashes()
     assert "test" not in manager.hashes()
+
+
+def test_hash_index_skips_unchanged_files(temp_dir, monkeypatch):
+    empty_file_hash = "d41d8cd98f00b204e9800998ecf8427e"
+
+    manager = FilesManager(temp_dir)
+    file_path = path.join(manager._cache_dir, empty_file_hash)
+    open(file_path, "w").close()
+    open(file_path + ".part", "w").close()
+
+    hashed = []
+    md5 = FilesManager._md5
+
+    def counting_md5(self, filename):
+        hashed.append(filename)
+        return md5(self, filename)
+
+    monkeypatch.setattr(FilesManager, "_md5", counting_md5)
+
+    manager.verify_cache()
+    FilesManager(temp_dir).verify_cache()
+    assert hashed == [empty_file_hash]
+
+    with open(file_path, "w") as file:
+        file.write("changed")
+
+    FilesManager(temp_dir).verify_cache()
+    assert hashed == [empty_file_hash] * 2
+    assert manager.hashes() == []
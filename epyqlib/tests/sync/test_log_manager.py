@@ -0,0 +1,26 @@
+from os import path
+
+import pytest
+from twisted.internet.defer import ensureDeferred
+
+from epyqlib.tabs.files.log_manager import LogManager
+
+# noinspection PyUnresolvedReferences
+from epyqlib.tests.utils.test_fixtures import temp_dir
+
+
+@pytest.inlineCallbacks
+def test_add_pending_log(temp_dir):
+    test_file_hash = "098f6bcd4621d373cade4e832627b4f6"
+
+    log_path = path.join(temp_dir, "log.raw")
+    with open(log_path, "w") as file:
+        file.write("test")
+
+    manager = LogManager(temp_dir)
+    yield ensureDeferred(manager.add_pending_log(log_path, "build", "1234"))
+
+    (log,) = manager.get_pending_logs()
+    assert (log.hash, log.filename) == (test_file_hash, "log.raw")
+    with open(manager.get_path_to_log(test_file_hash)) as file:
+        assert file.read() == "test"
@@ -0,0 +1,287 @@
+import collections
+import hashlib
+import io
+import os
+import threading
+import time
+import uuid
+from os import path
+
+import pytest
+from botocore.exceptions import ClientError
+from twisted.internet.defer import ensureDeferred
+
+from epyqlib.tabs.files import transfer_manager
+from epyqlib.tabs.files.transfer_manager import TransferManager
+
+# noinspection PyUnresolvedReferences
+from epyqlib.tests.utils.test_fixtures import temp_dir
+
+
+def client_error(code, operation):
+    return ClientError({"Error": {"Code": code, "Message": code}}, operation)
+
+
+class LocalS3Client:
+    """The subset of the boto3 S3 client used for transfers, storing objects
+    as files in a directory.  ``failures`` maps a method name to the number
+    of calls that succeed before each further call fails.  Each get takes
+    at least ``delay`` seconds."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.calls = collections.Counter()
+        self.failures = {}
+        self.concurrent = 0
+        self.max_concurrent = 0
+        self.delay = 0
+        self._uploads = {}
+        self._lock = threading.Lock()
+
+    def _enter(self, operation):
+        with self._lock:
+            self.calls[operation] += 1
+            if self.calls[operation] > self.failures.get(operation, float("inf")):
+                raise client_error("InternalError", operation)
+            self.concurrent += 1
+            self.max_concurrent = max(self.max_concurrent, self.concurrent)
+
+    def _exit(self):
+        with self._lock:
+            self.concurrent -= 1
+
+    def _path(self, bucket, key):
+        return path.join(self.directory, bucket, key.replace("/", "_"))
+
+    def _read(self, bucket, key, operation):
+        try:
+            with open(self._path(bucket, key), "rb") as file:
+                return file.read()
+        except FileNotFoundError:
+            raise client_error("NoSuchKey", operation)
+
+    def put(self, bucket, key, data):
+        os.makedirs(path.join(self.directory, bucket), exist_ok=True)
+        with open(self._path(bucket, key), "wb") as file:
+            file.write(data)
+
+    def put_object(self, Bucket, Key, Body):
+        self._enter("put_object")
+        try:
+            self.put(Bucket, Key, Body if isinstance(Body, bytes) else Body.read())
+        finally:
+            self._exit()
+
+    def head_object(self, Bucket, Key):
+        data = self._read(Bucket, Key, "head_object")
+        return {
+            "ContentLength": len(data),
+            "ETag": '"{}"'.format(hashlib.md5(data).hexdigest()),
+        }
+
+    def get_object(self, Bucket, Key, Range=None, IfMatch=None):
+        self._enter("get_object")
+        try:
+            time.sleep(self.delay)
+            data = self._read(Bucket, Key, "get_object")
+            if IfMatch is not None and IfMatch != self.head_object(Bucket, Key)["ETag"]:
+                raise client_error("PreconditionFailed", "get_object")
+            if Range is not None:
+                start, end = Range[len("bytes=") :].split("-")
+                data = data[int(start) : int(end) + 1]
+            return {"Body": io.BytesIO(data)}
+        finally:
+            self._exit()
+
+    def create_multipart_upload(self, Bucket, Key):
+        upload_id = uuid.uuid4().hex
+        self._uploads[upload_id] = {}
+        return {"UploadId": upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self._enter("upload_part")
+        try:
+            etag = '"{}"'.format(hashlib.md5(Body).hexdigest())
+            self._uploads[UploadId][PartNumber] = (etag, Body)
+            return {"ETag": etag}
+        finally:
+            self._exit()
+
+    def list_parts(self, Bucket, Key, UploadId, PartNumberMarker=0, MaxParts=2):
+        if UploadId not in self._uploads:
+            raise client_error("NoSuchUpload", "list_parts")
+
+        numbers = sorted(n for n in self._uploads[UploadId] if n > PartNumberMarker)
+        page = numbers[:MaxParts]
+        return {
+            "Parts": [
+                {"PartNumber": n, "ETag": self._uploads[UploadId][n][0]} for n in page
+            ],
+            "IsTruncated": len(numbers) > MaxParts,
+            "NextPartNumberMarker": page[-1] if page else PartNumberMarker,
+        }
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        parts = self._uploads.pop(UploadId)
+        data = b""
+        for part in MultipartUpload["Parts"]:
+            etag, body = parts[part["PartNumber"]]
+            assert etag == part["ETag"]
+            data += body
+        self.put(Bucket, Key, data)
+
+
+def data(size):
+    return bytes(i % 251 for i in range(size))
+
+
+def manager(client, **kwargs):
+    return TransferManager(
+        get_client=lambda: client,
+        bucket="bucket",
+        part_size=1000,
+        multipart_threshold=2000,
+        **kwargs,
+    )
+
+
+@pytest.inlineCallbacks
+def test_small_transfers(temp_dir):
+    client = LocalS3Client(temp_dir)
+    transfers = manager(client)
+    source = path.join(temp_dir, "source")
+    destination = path.join(temp_dir, "destination")
+    with open(source, "wb") as file:
+        file.write(data(1500))
+
+    yield ensureDeferred(transfers.upload(filename=source, key="logs/a"))
+    yield ensureDeferred(transfers.download(key="logs/a", filename=destination))
+
+    with open(destination, "rb") as file:
+        assert file.read() == data(1500)
+    assert client.calls["put_object"] == 1
+    assert client.calls["upload_part"] == 0
+
+
+@pytest.inlineCallbacks
+def test_multipart_upload_resumes(temp_dir):
+    client = LocalS3Client(temp_dir)
+    source = path.join(temp_dir, "source")
+    with open(source, "wb") as file:
+        file.write(data(9500))
+
+    client.failures["upload_part"] = 4
+    with pytest.raises(ClientError):
+        yield ensureDeferred(
+            manager(client, concurrency=1).upload(filename=source, key="logs/b")
+        )
+    assert path.exists(source + transfer_manager.upload_state_suffix)
+
+    del client.failures["upload_part"]
+    client.calls.clear()
+    yield ensureDeferred(manager(client).upload(filename=source, key="logs/b"))
+
+    # only the 6 parts missing after the failure are sent again
+    assert client.calls["upload_part"] == 6
+    assert client.head_object("bucket", "logs/b")["ContentLength"] == 9500
+    assert client._read("bucket", "logs/b", "test") == data(9500)
+    assert not path.exists(source + transfer_manager.upload_state_suffix)
+
+
+@pytest.inlineCallbacks
+def test_multipart_upload_restarts_unknown_upload(temp_dir):
+    client = LocalS3Client(temp_dir)
+    source = path.join(temp_dir, "source")
+    with open(source, "wb") as file:
+        file.write(data(5000))
+
+    client.failures["upload_part"] = 2
+    with pytest.raises(ClientError):
+        yield ensureDeferred(manager(client).upload(filename=source, key="logs/c"))
+
+    del client.failures["upload_part"]
+    client._uploads.clear()
+    client.calls.clear()
+    yield ensureDeferred(manager(client).upload(filename=source, key="logs/c"))
+
+    assert client.calls["upload_part"] == 5
+    assert client._read("bucket", "logs/c", "test") == data(5000)
+
+
+@pytest.inlineCallbacks
+def test_ranged_download_resumes(temp_dir):
+    client = LocalS3Client(temp_dir)
+    client.put("bucket", "files/d", data(9500))
+    destination = path.join(temp_dir, "destination")
+
+    client.failures["get_object"] = 3
+    with pytest.raises(ClientError):
+        yield ensureDeferred(
+            manager(client, concurrency=1).download(key="files/d", filename=destination)
+        )
+    assert not path.exists(destination)
+
+    del client.failures["get_object"]
+    client.calls.clear()
+    yield ensureDeferred(manager(client).download(key="files/d", filename=destination))
+
+    assert client.calls["get_object"] == 7
+    with open(destination, "rb") as file:
+        assert file.read() == data(9500)
+    assert sorted(os.listdir(temp_dir)) == ["bucket", "destination"]
+
+
+@pytest.inlineCallbacks
+def test_ranged_download_restarts_changed_object(temp_dir):
+    client = LocalS3Client(temp_dir)
+    client.put("bucket", "files/e", data(5000))
+    destination = path.join(temp_dir, "destination")
+
+    client.failures["get_object"] = 2
+    with pytest.raises(ClientError):
+        yield ensureDeferred(
+            manager(client, concurrency=1).download(key="files/e", filename=destination)
+        )
+
+    del client.failures["get_object"]
+    client.put("bucket", "files/e", data(5000)[::-1])
+    client.calls.clear()
+    yield ensureDeferred(manager(client).download(key="files/e", filename=destination))
+
+    assert client.calls["get_object"] == 5
+    with open(destination, "rb") as file:
+        assert file.read() == data(5000)[::-1]
+
+
+@pytest.inlineCallbacks
+def test_concurrency_is_bounded(temp_dir):
+    client = LocalS3Client(temp_dir)
+    client.delay = 0.01
+    transfers = manager(client, concurrency=3)
+    for i in range(8):
+        client.put("bucket", f"files/{i}", data(5000 + i))
+
+    results = yield ensureDeferred(
+        transfer_manager.gather(
+            transfers.download(key=f"files/{i}", filename=path.join(temp_dir, str(i)))
+            for i in range(8)
+        )
+    )
+
+    assert [success for success, result in results] == [True] * 8
+    assert 1 < client.max_concurrent <= 3
+
+
+@pytest.inlineCallbacks
+def test_gather_reports_each_result():
+    async def succeed():
+        return 1
+
+    async def fail():
+        raise ValueError("nope")
+
+    results = yield ensureDeferred(transfer_manager.gather([succeed(), fail()]))
+
+    assert results[0] == (True, 1)
+    assert results[1][0] is False
+    assert results[1][1].check(ValueError)
@@ -0,0 +1,109 @@
+import asyncio
+
+import can
+import pytest
+
+import epyqlib.asyncio.busproxy
+import epyqlib.asyncio.cancalibrationprotocol as ccp
+
+
+class Bootloader(can.Listener):
+    """Acknowledge every command and serve uploads from ``memory``."""
+
+    def __init__(self, bus, memory):
+        self.bus = bus
+        self.memory = memory
+        self.address = 0
+        self.commands = []
+
+    def on_message_received(self, msg):
+        command = ccp.Packet.from_message(message=msg)
+        if not isinstance(command, ccp.HostCommand):
+            return
+
+        self.commands.append(command.command_code)
+
+        def reply(payload=()):
+            packet = ccp.BootloaderReply(code=ccp.CommandStatus.acknowledge)
+            packet.message.data[0] = 0xFF
+            packet.command_counter = command.command_counter
+            packet.payload[0 : len(payload)] = payload
+            self.bus.send(packet.message)
+
+        if command.command_code == ccp.CommandCode.set_mta:
+            self.address = int.from_bytes(bytes(command.payload[2:6]), "little")
+            reply()
+        elif command.command_code == ccp.CommandCode.upload:
+            remaining = command.payload[0]
+            while remaining > 0:
+                count = min(remaining, 5)
+                reply(self.memory[self.address : self.address + count])
+                self.address += count
+                remaining -= count
+        else:
+            reply(payload=(1, 2, 0, 0x9E))
+
+
+def run(f, memory=b""):
+    async def main():
+        device_bus = can.interface.Bus(bustype="virtual", channel="asyncio_ccp")
+        bootloader = Bootloader(bus=device_bus, memory=memory)
+        device_notifier = can.Notifier(bus=device_bus, listeners=[bootloader])
+
+        bus = can.interface.Bus(bustype="virtual", channel="asyncio_ccp")
+        handler = ccp.Handler(endianness="little")
+        transport = epyqlib.asyncio.busproxy.BusProxy(bus=bus, protocols=[handler])
+
+        try:
+            return await f(handler=handler, bootloader=bootloader)
+        finally:
+            transport.close()
+            device_notifier.stop()
+            bus.shutdown()
+            device_bus.shutdown()
+
+    return asyncio.get_event_loop().run_until_complete(main())
+
+
+def test_upload_block():
+    memory = bytes(range(256)) * 4
+
+    async def f(handler, bootloader):
+        await handler.connect()
+        data = await handler.upload_block(
+            address_extension=ccp.AddressExtension.raw,
+            address=3,
+            octets=600,
+        )
+        await handler.disconnect()
+
+        return data
+
+    assert run(f=f, memory=memory) == memory[3:603]
+
+
+def test_download_block_checksums():
+    async def f(handler, bootloader):
+        await handler.connect()
+        await handler.download_block(
+            address_extension=ccp.AddressExtension.flash_memory,
+            address=0x310000,
+            data=bytes(range(66)),
+        )
+
+        return bootloader.commands
+
+    commands = run(f=f)
+
+    # eleven six byte chunks with a checksum and new MTA after every fifth
+    assert commands.count(ccp.CommandCode.download_6) == 11
+    assert commands.count(ccp.CommandCode.build_checksum) == 3
+    assert commands.count(ccp.CommandCode.set_mta) == 3
+
+
+def test_busy():
+    async def f(handler, bootloader):
+        with pytest.raises(ccp.HandlerBusy):
+            await handler.disconnect()
+
+    run(f=f)
@@ -0,0 +1,341 @@
+import asyncio
+import functools
+import threading
+import time
+
+import can
+import canmatrix.formats
+import pytest
+
+import epyqlib.asyncio.busproxy
+import epyqlib.asyncio.nvs
+import epyqlib.canneo
+import epyqlib.device
+import epyqlib.nv
+import epyqlib.tests.common
+import epyqlib.utils.asyncio
+
+
+@pytest.fixture(scope="module")
+def nvs():
+    (matrix,) = canmatrix.formats.loadp(
+        str(epyqlib.tests.common.symbol_files["factory"]),
+        symImportEncoding="utf-8",
+    ).values()
+
+    node_id_adjust = functools.partial(
+        epyqlib.device.node_id_types["j1939"],
+        device_id=247,
+        controller_id=65,
+    )
+
+    neo = epyqlib.canneo.Neo(
+        matrix=matrix,
+        frame_class=epyqlib.nv.Frame,
+        signal_class=epyqlib.nv.Nv,
+        strip_summary=False,
+        node_id_adjust=node_id_adjust,
+    )
+
+    return epyqlib.nv.Nvs(neo=neo, configuration="j1939")
+
+
+class Responder(can.Listener):
+    """Answer NV requests by echoing them with stored parameter data."""
+
+    def __init__(self, bus, nvs, delay=0):
+        self.bus = bus
+        self.delay = delay
+        self.set_id = nvs.set_frames[0].id
+        self.status_id = nvs.status_frames[0].id
+        self.memory = {}
+        self.outstanding = 0
+        self.maximum_outstanding = 0
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def on_message_received(self, msg):
+        if msg.arbitration_id != self.set_id:
+            return
+
+        data = bytearray(msg.data)
+        # multiplexer and meta precede the two read/write bits
+        key = (data[0], data[1] & 0x3F)
+        read = (data[1] >> 6) == 1
+
+        if read:
+            data[2:] = self.memory.get(key, bytes(len(data) - 2))
+        else:
+            self.memory[key] = bytes(data[2:])
+
+        response = can.Message(
+            arbitration_id=self.status_id,
+            extended_id=True,
+            data=data,
+        )
+
+        with self.lock:
+            self.requests += 1
+            self.outstanding += 1
+            self.maximum_outstanding = max(
+                self.maximum_outstanding,
+                self.outstanding,
+            )
+
+        def respond():
+            with self.lock:
+                self.outstanding -= 1
+            self.bus.send(response)
+
+        if self.delay > 0:
+            threading.Timer(self.delay, respond).start()
+        else:
+            respond()
+
+    def status(self, key):
+        """Build the cyclic status message for a stored parameter."""
+        read = 1 << 6
+
+        return can.Message(
+            arbitration_id=self.status_id,
+            extended_id=True,
+            data=bytes((key[0], key[1] | read)) + self.memory[key],
+        )
+
+
+def run(nvs, f, delay=0, window=4, listeners=()):
+    async def main():
+        device_bus = can.interface.Bus(bustype="virtual", channel="asyncio_nvs")
+        responder = Responder(bus=device_bus, nvs=nvs, delay=delay)
+        device_notifier = can.Notifier(bus=device_bus, listeners=[responder])
+
+        bus = can.interface.Bus(bustype="virtual", channel="asyncio_nvs")
+        protocol = epyqlib.asyncio.nvs.Protocol(window=window)
+        transport = epyqlib.asyncio.busproxy.BusProxy(
+            bus=bus,
+            protocols=[protocol],
+            listeners=listeners,
+        )
+
+        try:
+            return await f(protocol=protocol, responder=responder)
+        finally:
+            transport.close()
+            device_notifier.stop()
+            bus.shutdown()
+            device_bus.shutdown()
+
+    return asyncio.get_event_loop().run_until_complete(main())
+
+
+def single_signal_frames(nvs, count):
+    frames = [
+        frame
+        for frame in nvs.set_frames.values()
+        if len(getattr(frame, "parameter_signals", ())) == 1
+        and frame.read_write.min <= 0
+    ]
+
+    return [frame.parameter_signals[0] for frame in frames[:count]]
+
+
+def test_write_then_read(nvs):
+    (nv,) = single_signal_frames(nvs=nvs, count=1)
+    value = nv.to_human(nv.from_human(nv.max if nv.max is not None else 1))
+
+    async def f(protocol, responder):
+        nv.set_human_value(value)
+        written, _ = await protocol.write(
+            nv_signal=nv,
+            meta=epyqlib.nv.MetaEnum.value,
+        )
+        read, _ = await protocol.read(nv_signal=nv, meta=epyqlib.nv.MetaEnum.value)
+
+        return written, read
+
+    written, read = run(nvs=nvs, f=f)
+
+    assert written == pytest.approx(value)
+    assert read == pytest.approx(value)
+
+
+def test_read_timeout(nvs):
+    (nv,) = single_signal_frames(nvs=nvs, count=1)
+
+    async def f(protocol, responder):
+        protocol._timeout = 0.05
+        responder.set_id = None
+
+        with pytest.raises(epyqlib.twisted.nvs.RequestTimeoutError):
+            await protocol.read(nv_signal=nv, meta=epyqlib.nv.MetaEnum.value)
+
+    run(nvs=nvs, f=f)
+
+
+@pytest.mark.parametrize("window", [1, 4])
+def test_gathered_reads_are_pipelined(nvs, window):
+    nvs_to_read = single_signal_frames(nvs=nvs, count=8)
+
+    async def f(protocol, responder):
+        results = await asyncio.gather(
+            *(
+                protocol.read(nv_signal=nv, meta=epyqlib.nv.MetaEnum.value)
+                for nv in nvs_to_read
+            )
+        )
+
+        return results, responder.maximum_outstanding
+
+    results, maximum_outstanding = run(nvs=nvs, f=f, delay=0.02, window=window)
+
+    assert len(results) == len(nvs_to_read)
+    assert maximum_outstanding == window
+
+
+def wait_for_change(nvs, passive):
+    (nv,) = single_signal_frames(nvs=nvs, count=1)
+    target = nv.to_human(1)
+    status = epyqlib.nv.StatusListener(nvs=nvs)
+
+    async def f(protocol, responder):
+        loop = asyncio.get_event_loop()
+
+        nv.set_value(1)
+        await protocol.write(nv_signal=nv, meta=epyqlib.nv.MetaEnum.value)
+        ((key, target_data),) = responder.memory.items()
+        nv.set_value(0)
+        await protocol.write(nv_signal=nv, meta=epyqlib.nv.MetaEnum.value)
+
+        changed = None
+
+        def change():
+            nonlocal changed
+            responder.memory[key] = target_data
+            changed = time.monotonic()
+
+        async def broadcast():
+            while True:
+                responder.bus.send(responder.status(key))
+                await asyncio.sleep(0.01)
+
+        polls = 0
+
+        async def check():
+            nonlocal polls
+            value, _ = await protocol.read(
+                nv_signal=nv,
+                meta=epyqlib.nv.MetaEnum.value,
+            )
+            polls += 1
+            if polls == 3:
+                # change just after a poll to expose the polling latency
+                loop.call_later(0.01, change)
+
+            return value == target
+
+        requests = responder.requests
+
+        if passive:
+            broadcaster = loop.create_task(broadcast())
+            loop.call_later(0.25, change)
+            try:
+                await epyqlib.utils.asyncio.wait_for(
+                    check=check,
+                    signal=status.values_received,
+                    passive_check=lambda values: (
+                        None if nv not in values else values[nv] == target
+                    ),
+                    maximum_period=1,
+                    timeout=2,
+                )
+            finally:
+                broadcaster.cancel()
+        else:
+            await epyqlib.utils.asyncio.wait_for(check=check, timeout=2)
+
+        return responder.requests - requests, time.monotonic() - changed
+
+    return run(nvs=nvs, f=f, listeners=[status])
+
+
+def test_wait_for_passive_status(nvs):
+    polled_requests, polled_latency = wait_for_change(nvs=nvs, passive=False)
+    passive_requests, passive_latency = wait_for_change(nvs=nvs, passive=True)
+
+    assert polled_requests >= 4
+    assert passive_requests == 0
+    assert passive_latency < polled_latency
+
+
+def test_wait_for_falls_back_to_polling(nvs):
+    (nv,) = single_signal_frames(nvs=nvs, count=1)
+    status = epyqlib.nv.StatusListener(nvs=nvs)
+
+    async def f(protocol, responder):
+        reads = 0
+
+        async def check():
+            nonlocal reads
+            await protocol.read(nv_signal=nv, meta=epyqlib.nv.MetaEnum.value)
+            reads += 1
+            return False
+
+        with pytest.raises(epyqlib.utils.asyncio.WaitForTimedOut):
+            await epyqlib.utils.asyncio.wait_for(
+                check=check,
+                signal=status.values_received,
+                passive_check=lambda values: False,
+                maximum_period=0.4,
+                timeout=1.5,
+            )
+
+        return reads
+
+    # 0.1, 0.2, 0.4, 0.4, 0.4 rather than fifteen reads every 0.1 seconds
+    assert run(nvs=nvs, f=f, listeners=[status]) <= 5
+
+
+def test_wait_for_polls_despite_unrelated_status(nvs):
+    (nv, other) = single_signal_frames(nvs=nvs, count=2)
+    target = nv.to_human(1)
+    status = epyqlib.nv.StatusListener(nvs=nvs)
+
+    async def f(protocol, responder):
+        loop = asyncio.get_event_loop()
+
+        other.set_value(0)
+        await protocol.write(nv_signal=other, meta=epyqlib.nv.MetaEnum.value)
+        (other_key,) = responder.memory.keys()
+
+        nv.set_value(1)
+        await protocol.write(nv_signal=nv, meta=epyqlib.nv.MetaEnum.value)
+
+        async def broadcast():
+            while True:
+                responder.bus.send(responder.status(other_key))
+                await asyncio.sleep(0.01)
+
+        async def check():
+            value, _ = await protocol.read(
+                nv_signal=nv,
+                meta=epyqlib.nv.MetaEnum.value,
+            )
+            return value == target
+
+        broadcaster = loop.create_task(broadcast())
+        start = time.monotonic()
+        try:
+            await epyqlib.utils.asyncio.wait_for(
+                check=check,
+                signal=status.values_received,
+                passive_check=lambda values: (
+                    None if nv not in values else values[nv] == target
+                ),
+                timeout=2,
+            )
+        finally:
+            broadcaster.cancel()
+
+        return time.monotonic() - start
+
+    assert run(nvs=nvs, f=f, listeners=[status]) < 1
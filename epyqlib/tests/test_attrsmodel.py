@@ -513,6 +513,96 @@ def test_postpopulated_connections(qtbot):
     assert tuple(values.expected) == tuple(values.collected)
 
 
+def shown_tree(model, item=None):
+    if item is None:
+        item = model.model.invisibleRootItem()
+
+    return [
+        (
+            item.child(row, 0).data(epyqlib.utils.qt.UserRoles.node),
+            shown_tree(model=model, item=item.child(row, 0)),
+        )
+        for row in range(item.rowCount())
+    ]
+
+
+def node_tree(node):
+    return [(child, node_tree(child)) for child in node.children]
+
+
+def test_batch_applies_structure_once(qtmodeltester):
+    model = make_a_model()
+    root = model.root
+    group_a, parameter_b, group_c, parameter_d = root.children
+
+    resets = []
+    inserts = []
+    model.model.modelReset.connect(lambda: resets.append(None))
+    model.model.rowsInserted.connect(lambda *args: inserts.append(args))
+
+    new_group = Group(name="New Group")
+    new_parameter = Parameter(name="New Parameter")
+
+    with model.batch():
+        root.append_child(new_group)
+        new_group.append_child(new_parameter)
+        group_c.append_child(Parameter(name="Parameter C A"))
+        root.remove_child(child=parameter_b)
+        root.remove_child(child=parameter_d)
+        root.insert_child(0, parameter_d)
+
+        # lookups keep working while the items are deferred
+        assert model.node_from_uuid(new_group.uuid) is new_group
+        assert model.uuid_to_node.get(parameter_b.uuid) is None
+        assert shown_tree(model)[1][0] is parameter_b
+
+    assert (len(resets), len(inserts)) == (1, 0)
+    assert shown_tree(model) == node_tree(root)
+    assert model.node_from_uuid(new_parameter.uuid) is new_parameter
+    assert set(model.uuid_to_node.values()) == set(
+        root.nodes_by_filter(lambda node: True, collection=[])
+    )
+    qtmodeltester.check(model.model)
+
+    new_parameter.value = 37
+    index = model.index_from_node(new_parameter).siblingAtColumn(1)
+    assert model.model.data(index) == "37"
+
+    root.remove_child(child=new_group)
+    assert shown_tree(model) == node_tree(root)
+
+
+def test_nested_batches_apply_once():
+    model = make_a_model()
+    root = model.root
+    resets = []
+    model.model.modelReset.connect(lambda: resets.append(None))
+
+    with model.batch():
+        with model.batch():
+            root.append_child(Parameter(name="Inner"))
+
+        assert len(resets) == 0
+        root.append_child(Parameter(name="Outer"))
+
+    assert len(resets) == 1
+    assert shown_tree(model) == node_tree(root)
+
+
+def test_drop_source_sharing_uuid_rejected():
+    model = make_a_model()
+    (parameter_b,) = model.root.nodes_by_attribute(
+        attribute_value="Parameter B",
+        attribute_name="name",
+    )
+
+    other = epyqlib.attrsmodel.Model(root=Root(), columns=columns)
+    other.root.append_child(Parameter(uuid=parameter_b.uuid))
+
+    with pytest.raises(Exception, match="Duplicate uuid"):
+        model.add_drop_sources(other)
+
+
 def test_with_pyqtpropertys(qtbot):
     @graham.schemify(tag="pyqtproperty_parameter")
     @epyqlib.attrsmodel.ify()
@@ -0,0 +1,50 @@
+import epyqlib.benchmark
+import epyqlib.ticoff
+
+
+def test_synthetic_coff():
+    data = bytes(range(7))
+
+    coff = epyqlib.ticoff.Coff()
+    coff.from_stream(epyqlib.benchmark.synthetic_coff(data=data, address=0x1234))
+
+    (section,) = [s for s in coff.sections if s.data is not None]
+
+    assert section.name == ".text"
+    assert section.virt_addr == 0x1234
+    assert section.data == data + b"\x00"
+
+
+def test_tree_results():
+    results = list(epyqlib.benchmark.tree_results(count=5000, lookups=100))
+
+    assert [result.quantity for result in results[:2]] == [4999, 4999]
+
+
+def test_filter_results(qtbot):
+    results = list(epyqlib.benchmark.filter_results(count=3000))
+
+    assert [result.quantity for result in results] == [
+        3000,
+        len(epyqlib.benchmark.filter_queries),
+        len(epyqlib.benchmark.filter_queries),
+    ]
+
+
+def test_value_set_results():
+    results = list(epyqlib.benchmark.value_set_results(count=1500))
+
+    assert [result.name for result in results] == [
+        "copy_parameter_data",
+        "graham.dumps",
+        "compiled dumps",
+        "graham loads",
+        "compiled loads",
+    ]
+    assert all(result.quantity == 1500 for result in results)
+
+
+def test_table_results():
+    results = list(epyqlib.benchmark.table_results(count=20))
+
+    assert [result.quantity for result in results] == [20, 20, 20]
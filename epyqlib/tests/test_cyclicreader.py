@@ -0,0 +1,72 @@
+import types
+
+import epyqlib.nv
+
+
+def reader(frames=2, metas=(epyqlib.nv.MetaEnum.value,)):
+    nvs = [
+        types.SimpleNamespace(frame="frame {}".format(i), name="nv {}".format(i))
+        for i in range(frames)
+    ]
+
+    reader = epyqlib.nv.CyclicReader(
+        nvs=nvs,
+        read_call=None,
+        metas=metas,
+        visible_interval=1,
+        interval=4,
+        maximum_interval=10,
+    )
+    reader.create_entries()
+
+    return reader
+
+
+def test_static_metas_read_once():
+    r = reader(metas=(epyqlib.nv.MetaEnum.value, epyqlib.nv.MetaEnum.maximum))
+    (static,) = [e for e in r.entries if e.meta == epyqlib.nv.MetaEnum.maximum][:1]
+
+    r.completed(entry=static, values={}, now=0)
+    assert static.due == float("inf")
+
+    r.invalidate(metas=[epyqlib.nv.MetaEnum.maximum])
+    assert static.due == 0
+
+
+def test_unchanged_values_back_off():
+    r = reader(frames=1)
+    (entry,) = r.entries
+
+    dues = []
+    for now in range(5):
+        r.completed(entry=entry, values={"nv": 1}, now=now)
+        dues.append(entry.due - now)
+
+    assert dues == [1, 2, 4, 8, 10]
+
+    r.completed(entry=entry, values={"nv": 2}, now=10)
+    assert entry.due == 11
+    assert entry.refresh_period == 6
+
+
+def test_visible_frames_first():
+    r = reader()
+    hidden, visible = r.entries
+
+    r.set_visible(id=test_visible_frames_first, nvs=visible.nvs)
+    assert r.next_entry() is visible
+
+    r.completed(entry=hidden, values={}, now=0)
+    r.completed(entry=visible, values={}, now=0)
+    assert (hidden.due, visible.due) == (4, 1)
+
+
+def test_budget_spaces_requests():
+    r = reader(frames=1)
+    r.budget = 10
+    (entry,) = r.entries
+
+    assert r.ready_time(entry) == 0
+
+    r._last_request = 5
+    assert r.ready_time(entry) == 5.1
@@ -1,11 +1,15 @@
 import logging
 import os
 import shutil
+import zipfile
+
+import pytest
 
 import epyqlib.busproxy
 import epyqlib.device
 import epyqlib.twisted.busproxy
 import epyqlib.tests.common
+import epyqlib.utils.zipcrypto
 
 
 def assert_device_ok(device):
@@ -44,7 +48,7 @@ def test_json(customer_device_path, qtbot):
     device.terminate()
 
 
-def test_epz(qtbot, zipped_customer_device_path, tmpdir):
+def test_epz(qtbot, zipped_customer_device_path, tmpdir, zip_cache):
     path = os.path.join(tmpdir, "customer.ePZ")
 
     shutil.move(
@@ -61,7 +65,7 @@ def test_epz(qtbot, zipped_customer_device_path, tmpdir):
     device.terminate()
 
 
-def test_zip(qtbot, zipped_customer_device_path, tmpdir):
+def test_zip(qtbot, zipped_customer_device_path, tmpdir, zip_cache):
     path = os.path.join(tmpdir, "customer.zIP")
 
     shutil.move(
@@ -76,3 +80,49 @@ def test_zip(qtbot, zipped_customer_device_path, tmpdir):
 
     assert_device_ok(device)
     device.terminate()
+
+
+def encrypted_copy(path, target, code):
+    with zipfile.ZipFile(path) as z:
+        files = {
+            info.filename: z.read(info) for info in z.infolist() if not info.is_dir()
+        }
+
+    epyqlib.utils.zipcrypto.write(path=target, files=files, password=code)
+
+
+def test_epz_cached(qtbot, zipped_customer_device_path, tmpdir, zip_cache, monkeypatch):
+    path = os.path.join(tmpdir, "encrypted.epz")
+    encrypted_copy(zipped_customer_device_path, path, code="the code")
+
+    device = epyqlib.device.Device(file=path, node_id=247, archive_code="the code")
+    assert_device_ok(device)
+    device.terminate()
+
+    (cached,) = zip_cache.iterdir()
+    assert device.config_path.startswith(str(cached))
+
+    def extractall(*args, **kwargs):
+        raise AssertionError("cached device extracted again")
+
+    monkeypatch.setattr(zipfile.ZipFile, "extractall", extractall)
+
+    device = epyqlib.device.Device(file=path, node_id=247, archive_code="the code")
+    assert_device_ok(device)
+    device.terminate()
+
+    assert list(zip_cache.iterdir()) == [cached]
+
+    with pytest.raises(RuntimeError):
+        epyqlib.device.Device(file=path, node_id=247, archive_code="wrong")
+
+
+def test_zip_cache_pruned(zipped_customer_device_path, tmpdir, zip_cache):
+    with zipfile.ZipFile(zipped_customer_device_path) as z:
+        for digest in ("a", "b", "c"):
+            epyqlib.device.cached_zip_epc(zip_file=z, digest=digest, code=None)
+            os.utime(zip_cache / digest / epyqlib.device.zip_cache_manifest_name)
+
+    epyqlib.device.prune_zip_cache(size=2)
+
+    assert sorted(path.name for path in zip_cache.iterdir()) == ["b", "c"]
@@ -1,10 +1,14 @@
+import asyncio
 import pathlib
 
 import attr
+import can
 import pytest
 
 import epyqlib.tests.common
 import epyqlib.hildevice
+import epyqlib.nv
+import epyqlib.simulateddevice
 
 
 @pytest.fixture
@@ -53,3 +57,103 @@ def test_device_reload():
 
     with pytest.raises(epyqlib.hildevice.AlreadyLoadedError):
         device.load()
+
+
+def test_nv_from_key():
+    device = epyqlib.hildevice.Device(
+        definition_path=epyqlib.tests.common.devices["factory"],
+    )
+    device.load()
+
+    frame = next(
+        frame
+        for frame in device.nvs.set_frames.values()
+        if len(getattr(frame, "parameter_signals", ())) > 0
+    )
+    nv = frame.parameter_signals[0]
+    path = (frame.mux_name, nv.name)
+
+    assert device.nv_from_key(path).nv is nv
+    assert device.nv_from_key("{}:{}".format(*path)).nv is nv
+
+
+def test_set_many_groups_by_frame_and_meta():
+    device = epyqlib.hildevice.Device(
+        definition_path=epyqlib.tests.common.devices["factory"],
+    )
+    device.load()
+
+    frames = [
+        frame
+        for frame in device.nvs.set_frames.values()
+        if len(getattr(frame, "parameter_signals", ())) >= 2
+        and frame.read_write.min <= 0
+    ][:3]
+
+    paths = [
+        (frame.mux_name, nv.name) for frame in frames for nv in frame.parameter_signals
+    ]
+
+    def value(path, raw):
+        nv = device.nv(*path)
+        return nv.nv.to_human(raw) * nv.units()
+
+    values = {
+        path: {
+            epyqlib.nv.MetaEnum.value: value(path=path, raw=1),
+            epyqlib.nv.MetaEnum.user_default: value(path=path, raw=2),
+        }
+        for path in paths
+    }
+
+    async def f(responder):
+        await device.set_many(values=values)
+        written = responder.requests
+
+        read = await device.get_many(
+            parameters=paths,
+            metas=(epyqlib.nv.MetaEnum.value, epyqlib.nv.MetaEnum.user_default),
+        )
+
+        read_requests = responder.requests - written
+
+        temporary = {path: value(path=path, raw=3) for path in paths}
+        async with device.temporary_set_many(values=temporary):
+            during = await device.get_many(parameters=paths)
+        after = await device.get_many(parameters=paths)
+
+        assert during == {
+            path: {epyqlib.nv.MetaEnum.value: v} for path, v in temporary.items()
+        }
+        assert after == {
+            path: {epyqlib.nv.MetaEnum.value: v[epyqlib.nv.MetaEnum.value]}
+            for path, v in values.items()
+        }
+
+        return written, read_requests, read
+
+    async def main():
+        device_bus = can.interface.Bus(bustype="virtual", channel="hildevice")
+        responder = epyqlib.simulateddevice.NvResponder(
+            nvs=device.nvs,
+            transmitter=device_bus,
+        )
+        device_notifier = can.Notifier(bus=device_bus, listeners=[responder])
+
+        bus = can.interface.Bus(bustype="virtual", channel="hildevice")
+        device.set_asyncio_bus(bus=bus)
+
+        try:
+            return await f(responder=responder)
+        finally:
+            device.bus.close()
+            device_notifier.stop()
+            bus.shutdown()
+            device_bus.shutdown()
+
+    written, read_requests, read = asyncio.get_event_loop().run_until_complete(main())
+
+    # one request per frame and meta rather than one per NV and meta
+    assert written == len(frames) * 2
+    assert read_requests == len(frames) * 2
+    assert read == values
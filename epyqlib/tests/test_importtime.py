@@ -0,0 +1,98 @@
+import json
+import os
+import pathlib
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+import epyqlib
+
+root = pathlib.Path(epyqlib.__file__).parents[1]
+
+# Generous enough for slow CI machines while still catching a GUI, Twisted
+# or canmatrix import sneaking back into a headless command.
+budget = 2.5
+
+heavy = ("twisted", "canmatrix", "elftools", "PyQt5.uic", "numpy")
+
+
+def cold_start(module, arguments, cwd):
+    """Run the click command ``cli`` of ``module`` with ``arguments`` in a
+    new interpreter.  Return the total import time in seconds and the
+    modules executed."""
+    script = textwrap.dedent(
+        f"""\
+        import atexit
+        import importlib.util
+        import json
+        import sys
+
+        def report():
+            executed = [
+                name
+                for name, module in sys.modules.items()
+                if not isinstance(module, importlib.util._LazyModule)
+            ]
+            sys.stderr.write("modules: " + json.dumps(executed) + "\\n")
+
+        atexit.register(report)
+
+        import {module}
+        {module}.cli({arguments!r}, standalone_mode=False)
+        """
+    )
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [os.fspath(root), *filter(None, [env.get("PYTHONPATH")])]
+    )
+
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        cwd=cwd,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+
+    microseconds = 0
+    executed = None
+    for line in completed.stderr.splitlines():
+        if line.startswith("modules: "):
+            executed = json.loads(line[len("modules: ") :])
+        elif line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            # only count top level imports, nested ones are in their totals
+            if cumulative.strip().isdigit() and not name.startswith("  "):
+                microseconds += int(cumulative)
+
+    return microseconds / 1e6, executed
+
+
+@pytest.mark.parametrize(
+    "module, arguments, allowed",
+    (
+        (
+            "epyqlib.cli.main",
+            ["value-sets", "recipes", "cook", "--help"],
+            ("PyQt5.QtCore", "PyQt5.QtGui", "PyQt5.QtWidgets"),
+        ),
+        ("epyqlib.autodevice.cli", ["create", "template", "--help"], ()),
+        ("epyqlib.autodevice.cli", ["create", "template", "--zip", "t.zip"], ()),
+    ),
+)
+def test_headless_cold_start(module, arguments, allowed, tmp_path):
+    seconds, executed = cold_start(module=module, arguments=arguments, cwd=tmp_path)
+
+    unexpected = [
+        name
+        for name in executed
+        if any(name == h or name.startswith(h + ".") for h in heavy)
+        or (name.startswith("PyQt5.Qt") and name not in allowed)
+    ]
+    assert unexpected == []
+    assert seconds < budget
@@ -0,0 +1,169 @@
+import asyncio
+import time
+
+import can
+import pytest
+
+import epyqlib.asyncio.busproxy
+import epyqlib.asyncio.cancalibrationprotocol
+import epyqlib.asyncio.nvs
+import epyqlib.nv
+import epyqlib.simulateddevice
+import epyqlib.tests.common
+import epyqlib.twisted.cancalibrationprotocol as ccp
+
+
+def run(f, link=None):
+    async def main():
+        device_bus = can.interface.Bus(bustype="virtual", channel="simulated")
+        device = epyqlib.simulateddevice.Device.from_path(
+            path=epyqlib.tests.common.devices["customer"],
+            bus=device_bus,
+            link=link,
+        )
+
+        bus = can.interface.Bus(bustype="virtual", channel="simulated")
+        transport = epyqlib.asyncio.busproxy.BusProxy(bus=bus)
+
+        try:
+            return await f(device=device, transport=transport)
+        finally:
+            transport.close()
+            device.stop()
+            bus.shutdown()
+            device_bus.shutdown()
+
+    return asyncio.get_event_loop().run_until_complete(main())
+
+
+def nv_protocol(transport, timeout=1):
+    protocol = epyqlib.asyncio.nvs.Protocol(timeout=timeout)
+    transport.add_protocol(protocol)
+
+    return protocol
+
+
+def test_nv_write_then_read():
+    async def f(device, transport):
+        protocol = nv_protocol(transport=transport)
+        nv = device.nv("SN", "SerialNumber")
+
+        nv.set_human_value(1234)
+        await protocol.write(nv_signal=nv, meta=epyqlib.nv.MetaEnum.value)
+        nv.set_human_value(0)
+        value, _ = await protocol.read(nv_signal=nv, meta=epyqlib.nv.MetaEnum.value)
+
+        return value, device.nv_responder.get_value(nv=nv)
+
+    assert run(f=f) == (1234, 1234)
+
+
+def test_nv_latency():
+    link = epyqlib.simulateddevice.Link(latency=0.05)
+
+    async def f(device, transport):
+        protocol = nv_protocol(transport=transport)
+        nv = device.nv("SN", "SerialNumber")
+
+        start = time.monotonic()
+        await protocol.read(nv_signal=nv, meta=epyqlib.nv.MetaEnum.value)
+
+        return time.monotonic() - start
+
+    assert run(f=f, link=link) >= 0.05
+
+
+def test_nv_loss():
+    link = epyqlib.simulateddevice.Link(loss=1)
+
+    async def f(device, transport):
+        protocol = nv_protocol(transport=transport, timeout=0.1)
+        nv = device.nv("SN", "SerialNumber")
+
+        with pytest.raises(epyqlib.asyncio.nvs.RequestTimeoutError):
+            await protocol.read(nv_signal=nv, meta=epyqlib.nv.MetaEnum.value)
+
+        return device.transmitter.lost
+
+    assert run(f=f, link=link) == 1
+
+
+def test_bootloader_download_and_upload():
+    image = bytes(range(256)) * 3
+
+    async def f(device, transport):
+        handler = epyqlib.asyncio.cancalibrationprotocol.Handler(endianness="big")
+        transport.add_protocol(handler)
+
+        await handler.connect()
+        await handler.clear_memory()
+        await handler.download_block(
+            address_extension=ccp.AddressExtension.flash_memory,
+            address=0,
+            data=image,
+        )
+        await handler.build_checksum(checksum=handler.continuous_crc, length=0)
+        uploaded = await handler.upload_block(
+            address_extension=ccp.AddressExtension.flash_memory,
+            address=0,
+            octets=len(image),
+        )
+        await handler.disconnect()
+
+        return uploaded, device.flash_image()
+
+    uploaded, flashed = run(f=f)
+
+    assert uploaded == image
+    assert flashed == image
+
+
+def test_bootloader_rejects_bad_checksum():
+    async def f(device, transport):
+        handler = epyqlib.asyncio.cancalibrationprotocol.Handler(endianness="big")
+        transport.add_protocol(handler)
+
+        await handler.connect()
+        await handler.download_block(
+            address_extension=ccp.AddressExtension.flash_memory,
+            address=0,
+            data=bytes(12),
+        )
+
+        with pytest.raises(ccp.UnexpectedMessageReceived):
+            await handler.build_checksum(checksum=handler.continuous_crc ^ 1, length=0)
+
+    run(f=f)
+
+
+def test_data_logger_upload():
+    log = bytes(range(250)) * 5
+
+    async def f(device, transport):
+        device.set_log(log)
+
+        protocol = nv_protocol(transport=transport)
+        octets, _ = await protocol.read(
+            nv_signal=device.nv("LoggerStatus01", "ReadableOctets"),
+            meta=epyqlib.nv.MetaEnum.value,
+        )
+
+        signal = device.neo.signal_by_path("CCP", "Connect", "CommandCounter")
+        handler = epyqlib.asyncio.cancalibrationprotocol.Handler(
+            endianness="little" if signal.little_endian else "big",
+            tx_id=device.neo.frame_by_name("CCP").id,
+            rx_id=device.neo.frame_by_name("CCPResponse").id,
+        )
+        transport.add_protocol(handler)
+
+        await handler.connect(station_address=0)
+        data = await handler.upload_block(
+            address_extension=ccp.AddressExtension.data_logger,
+            address=0,
+            octets=int(octets),
+        )
+        await handler.disconnect(end_of_session=1)
+
+        return data
+
+    assert run(f=f) == log
@@ -0,0 +1,110 @@
+import pytest
+
+import epyqlib.pyqabstractitemmodel
+import epyqlib.treenode
+
+
+class Node(epyqlib.treenode.TreeNode):
+    def __init__(self, name, **kwargs):
+        self.name = name
+        super().__init__(**kwargs)
+
+
+def make_tree():
+    root = Node(name="root")
+
+    for group_name in ("a", "b"):
+        group = Node(name=group_name)
+        root.append_child(group)
+        for i in range(5):
+            group.append_child(Node(name="{}{}".format(group_name, i)))
+
+    return root
+
+
+def assert_rows(node):
+    for row, child in enumerate(node.children):
+        assert node.row_of_child(child) == row
+        assert_rows(child)
+
+
+def test_row_of_child_follows_changes():
+    root = make_tree()
+    (a, b) = root.children
+    assert_rows(root)
+
+    a.insert_child(0, Node(name="first"))
+    a.insert_child(len(a.children), Node(name="last"))
+    assert_rows(root)
+
+    a.remove_child(row=2)
+    a.remove_child(child=a.children[-1])
+    assert_rows(root)
+
+    # direct changes to the list are also noticed
+    b.children.reverse()
+    assert_rows(root)
+
+    assert a.row_of_child(b.children[0]) == -1
+
+
+def test_remove_child_is_by_identity():
+    root = Node(name="root")
+    first = Node(name="x")
+    second = Node(name="x")
+    root.append_child(first)
+    root.append_child(second)
+
+    root.remove_child(child=second)
+
+    assert root.children == [first]
+    assert first.tree_parent is root
+    assert second.tree_parent is None
+
+
+def test_attribute_index_follows_changes():
+    root = make_tree()
+    (a, b) = root.children
+
+    index = root.attribute_index("name")
+    assert root.attribute_index("name") is index
+
+    assert root.nodes_by_attribute("a3", "name") == {a.children[3]}
+
+    moved = a.children[3]
+    a.remove_child(child=moved)
+    assert root.nodes_by_attribute("a3", "name", raise_=False) == set()
+
+    b.append_child(moved)
+    assert root.nodes_by_attribute("a3", "name") == {moved}
+    assert b.child_by_name("a3") is moved
+    with pytest.raises(epyqlib.treenode.NotFoundError):
+        a.child_by_name("a3")
+
+    moved.name = "renamed"
+    index.update(moved)
+    assert root.nodes_by_attribute("renamed", "name") == {moved}
+    assert root.nodes_by_attribute("a3", "name", raise_=False) == set()
+
+
+def test_attribute_index_matches_scan():
+    root = make_tree()
+    root.children[0].children[0].name = "b1"
+    root.attribute_index("name")
+
+    for name in ("root", "a", "b1", "a4", "missing"):
+        expected = root.nodes_by_filter(filter=lambda node: node.name == name)
+        assert root.nodes_by_attribute(name, "name", raise_=False) == expected
+
+
+def test_model_indexes(qtbot):
+    root = make_tree()
+    model = epyqlib.pyqabstractitemmodel.PyQAbstractItemModel(root=root)
+
+    for node in epyqlib.treenode.subtree(root):
+        if node is root:
+            continue
+
+        index = model.index_from_node(node)
+        assert model.node_from_index(index) is node
+        assert model.node_from_index(model.parent(index)) is node.tree_parent
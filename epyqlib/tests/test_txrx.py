@@ -0,0 +1,109 @@
+import can
+import canmatrix.formats
+import pytest
+from PyQt5.QtCore import QModelIndex, Qt
+
+import epyqlib.canneo
+import epyqlib.tests.common
+import epyqlib.txrx
+
+
+def load_neo():
+    (matrix,) = canmatrix.formats.loadp(
+        str(epyqlib.tests.common.symbol_files["customer"]),
+        symImportEncoding="utf-8",
+    ).values()
+
+    return epyqlib.canneo.Neo(
+        matrix=matrix,
+        frame_class=epyqlib.txrx.MessageNode,
+        signal_class=epyqlib.txrx.SignalNode,
+        strip_summary=False,
+    )
+
+
+@pytest.fixture
+def rx(qtbot):
+    rx = epyqlib.txrx.TxRx(tx=False, neo=load_neo())
+    rx.update_timer.stop()
+
+    model = epyqlib.txrx.TxRxModel(rx)
+    rx.changed.connect(model.changed)
+    rx.begin_insert_rows.connect(model.begin_insert_rows)
+    rx.end_insert_rows.connect(model.end_insert_rows)
+
+    return rx, model
+
+
+def message(frame, data=bytes(8), timestamp=0):
+    return can.Message(
+        timestamp=timestamp,
+        arbitration_id=frame.id,
+        extended_id=frame.extended,
+        data=data,
+    )
+
+
+def test_generate_id_matches_neo(rx):
+    rx, _ = rx
+    neo = load_neo()
+
+    multiplexed = next(f for f in neo.frames if hasattr(f, "multiplex_frames"))
+    plain = next(f for f in neo.frames if f.mux_frame is None and f is not multiplexed)
+    value = next(iter(multiplexed.multiplex_frames))
+
+    messages = [
+        message(plain),
+        message(multiplexed, data=bytes([value, 0, 0, 0, 0, 0, 0, 0])),
+        # not a defined multiplex value
+        message(multiplexed, data=bytes([0xFF, 0x7, 0, 0, 0, 0, 0, 0])),
+    ]
+
+    for m in messages:
+        assert rx.generate_id(m) == (
+            m.arbitration_id,
+            m.id_type,
+            neo.get_multiplex(m)[1],
+        )
+
+
+def test_only_dirty_rows_are_reported(rx):
+    rx, model = rx
+    frames = [f for f in rx.neo.frames if f.mux_frame is None][:3]
+
+    for frame in frames:
+        rx.message_received(message(frame))
+    rx.gui_update()
+
+    changes = []
+    model.dataChanged.connect(
+        lambda top_left, bottom_right, roles: changes.append(top_left.internalPointer())
+    )
+
+    for i in range(50):
+        rx.message_received(message(frames[1], timestamp=i))
+
+    rx.gui_update()
+    reported = [node for node in changes if isinstance(node, epyqlib.txrx.MessageNode)]
+    assert reported == [frames[1]]
+
+    changes.clear()
+    rx.gui_update()
+    assert changes == []
+
+
+def test_rows_are_formatted_when_displayed(rx):
+    rx, model = rx
+    [frame] = [f for f in rx.neo.frames if f.mux_frame is None][:1]
+
+    rx.message_received(message(frame, data=bytes(range(8)), timestamp=1))
+    rx.message_received(message(frame, data=bytes(range(8)), timestamp=1.5))
+
+    assert frame.stale
+    assert frame.count["rx"] == 2
+
+    index = model.index(0, epyqlib.txrx.Columns.indexes.dt, QModelIndex())
+    assert model.data(index, Qt.DisplayRole) == "0.5000"
+    assert not frame.stale
+    assert frame.fields.count == "2"
+    assert frame.fields.value == epyqlib.canneo.format_data(tuple(range(8)))
@@ -0,0 +1,52 @@
+import epyqlib.svgwidget
+import epyqlib.widgets.abstractwidget
+import epyqlib.widgets.led
+import epyqlib.widgets.ringbar
+
+
+def test_values_coalesced(qtbot):
+    widget = epyqlib.widgets.ringbar.RingBar()
+    qtbot.addWidget(widget)
+
+    values = []
+    widget.set_value = values.append
+
+    for value in range(10):
+        widget.meta_set_value(value)
+
+    assert values == []
+
+    scheduler = epyqlib.widgets.abstractwidget.refresh_scheduler()
+    qtbot.waitUntil(lambda: not scheduler.timer.isActive())
+
+    assert values == [9]
+
+
+def test_svg_pixmaps_shared(qtbot, monkeypatch):
+    cache = epyqlib.svgwidget.PixmapCache()
+    monkeypatch.setattr(epyqlib.svgwidget, "pixmap_cache", cache)
+
+    leds = [epyqlib.widgets.led.Led() for _ in range(3)]
+    for led in leds:
+        qtbot.addWidget(led)
+        led.show()
+        led.set_value(led.on_value)
+
+    rendered = []
+    original = epyqlib.svgwidget.SvgWidget.render_pixmap
+
+    def render_pixmap(self, ratio):
+        rendered.append(self)
+        return original(self, ratio)
+
+    monkeypatch.setattr(epyqlib.svgwidget.SvgWidget, "render_pixmap", render_pixmap)
+
+    for led in leds:
+        led.set_value(not led.on_value)
+
+    for _ in range(2):
+        for led in leds:
+            led.ui.value.repaint()
+
+    assert rendered == [leds[0].ui.value]
+    assert len(cache.pixmaps) == 2
@@ -0,0 +1,228 @@
+import csv
+import subprocess
+import sys
+
+import canmatrix.formats
+import numpy
+import pytest
+
+import epyqlib.canneo
+import epyqlib.tests.common
+import epyqlib.utils.canlog
+import epyqlib.utils.canlogio
+import epyqlib.utils.candecode
+
+FrameFlags = epyqlib.utils.canlog.FrameFlags
+
+
+@pytest.fixture(scope="module")
+def neo():
+    (matrix,) = canmatrix.formats.loadp(
+        str(epyqlib.tests.common.symbol_files["customer"]),
+        symImportEncoding="utf-8",
+    ).values()
+
+    return epyqlib.canneo.Neo(matrix=matrix)
+
+
+@pytest.fixture(scope="module")
+def decoder(neo):
+    return epyqlib.utils.candecode.Decoder.from_neo(neo)
+
+
+def random_frames(neo, per_frame=3, seed=0):
+    state = numpy.random.RandomState(seed)
+    ids = sorted({frame.id for frame in neo.frames})
+
+    frames = numpy.zeros(len(ids) * per_frame, dtype=epyqlib.utils.canlog.frame_dtype)
+    frames["timestamp"] = numpy.arange(len(frames)) / 1000
+    frames["id"] = numpy.repeat(ids, per_frame)
+    frames["flags"] = FrameFlags.extended
+    frames["dlc"] = 8
+    frames["data"] = state.randint(0, 256, (len(frames), 8))
+
+    return frames
+
+
+def select_multiplexed(frames, decoder, seed=0):
+    """Set the multiplexer of each multiplexed frame to a defined value."""
+    state = numpy.random.RandomState(seed)
+    payloads = numpy.ascontiguousarray(frames["data"]).view("<u8")[:, 0]
+
+    for spec in decoder.frames.values():
+        if spec.multiplexer is None:
+            continue
+
+        assert spec.multiplexer.little_endian
+        shift = numpy.uint64(spec.multiplexer.start_bit)
+        mask = numpy.uint64((1 << spec.multiplexer.size) - 1) << shift
+
+        selected = frames["id"] == spec.id
+        values = state.choice(list(spec.multiplexed), selected.sum())
+        payloads[selected] &= ~mask
+        payloads[selected] |= values.astype("<u8") << shift
+
+    frames["data"] = payloads.view("u1").reshape(-1, 8)
+
+
+def test_matches_neo(neo, decoder):
+    frames = random_frames(neo, per_frame=20)
+    select_multiplexed(frames=frames, decoder=decoder)
+    decoded = decoder.decode(frames)
+
+    compared = 0
+
+    for frame in epyqlib.utils.canlogio.messages_to_pythoncan(frames):
+        neo_frame, multiplex_value = neo.get_multiplex(frame)
+        if neo_frame is None:
+            continue
+
+        expected = neo_frame.unpack(frame.data, only_return=True)
+        for signal, raw in expected.items():
+            mux_name = None
+            if multiplex_value is not None and signal.multiplex is not True:
+                # the multiplexer itself belongs to the base frame
+                mux_name = neo_frame.mux_name
+
+            [series] = [
+                series
+                for spec, series in decoded.items()
+                if spec.path
+                == tuple(
+                    element
+                    for element in (neo_frame.name, mux_name, signal.name)
+                    if element is not None
+                )
+            ]
+
+            index = series.timestamps.tolist().index(frame.timestamp)
+            assert series.values[index] == pytest.approx(float(signal.to_human(raw)))
+            compared += 1
+
+    assert compared > 1000
+
+
+def test_skips_wrong_length_and_error_frames(neo, decoder):
+    frames = random_frames(neo, per_frame=1)
+    frames["dlc"] = 7
+    frames["flags"][0] = FrameFlags.error
+
+    assert decoder.decode(frames) == {}
+
+
+def test_multiplexed_signals_are_split(neo, decoder):
+    frame = neo.frame_by_name("ParameterQuery")
+    spec = decoder.frames[(frame.id, frame.extended)]
+    [(value, signals)] = list(spec.multiplexed.items())[:1]
+
+    frames = numpy.zeros(2, dtype=epyqlib.utils.canlog.frame_dtype)
+    frames["id"] = frame.id
+    frames["flags"] = FrameFlags.extended
+    frames["dlc"] = 8
+    # select a different multiplexed frame with the second
+    frames["data"][1][0] = value + 1
+
+    decoded = decoder.decode(frames)
+
+    assert decoded[spec.multiplexer].values.tolist() == [value, value + 1]
+    assert len(decoded[signals[0]].timestamps) == 1
+
+
+def test_decode_to_csv(tmp_path, neo):
+    trace = tmp_path / "trace.log"
+    output = tmp_path / "decoded.csv"
+    frames = random_frames(neo, per_frame=2)
+    epyqlib.utils.canlogio.write(frames, trace)
+
+    epyqlib.utils.candecode.decode(
+        trace=trace,
+        device=epyqlib.tests.common.devices["customer"],
+        output=output,
+        chunk_size=100,
+    )
+
+    with open(output, newline="") as f:
+        rows = list(csv.DictReader(f))
+
+    assert len(rows) > len(frames)
+    assert set(rows[0]) == set(epyqlib.utils.candecode.columns)
+
+
+def test_processes_match(neo, decoder):
+    frames = random_frames(neo)
+    chunks = list(epyqlib.utils.canlogio.chunks(frames, chunk_size=500))
+
+    single = decoder.decode_all(chunks)
+    multiple = decoder.decode_all(chunks, processes=2)
+
+    assert single.keys() == multiple.keys()
+    for signal, series in single.items():
+        assert series.values.tolist() == multiple[signal].values.tolist()
+
+
+def signal_spec(frame, **kwargs):
+    fields = dict(
+        frame=frame,
+        multiplex=None,
+        name="Value",
+        start_bit=0,
+        size=8,
+        little_endian=True,
+        signed=False,
+        float=False,
+        factor=1.0,
+        offset=0.0,
+        unit="",
+        enumeration={},
+    )
+    fields.update(kwargs)
+
+    return epyqlib.utils.candecode.SignalSpec(**fields)
+
+
+def test_standard_and_extended_frames_share_an_id():
+    specs = {
+        extended: epyqlib.utils.candecode.FrameSpec(
+            id=0x10,
+            extended=extended,
+            name=name,
+            size=8,
+            signals=(signal_spec(frame=name),),
+        )
+        for extended, name in ((False, "Standard"), (True, "Extended"))
+    }
+    decoder = epyqlib.utils.candecode.Decoder(
+        frames={(0x10, extended): spec for extended, spec in specs.items()},
+    )
+
+    frames = numpy.zeros(3, dtype=epyqlib.utils.canlog.frame_dtype)
+    frames["id"] = 0x10
+    frames["flags"] = [0, FrameFlags.extended, 0]
+    frames["dlc"] = 8
+    frames["data"][:, 0] = [1, 2, 3]
+
+    decoded = decoder.decode(frames)
+
+    assert decoded[specs[False].signals[0]].values.tolist() == [1, 3]
+    assert decoded[specs[True].signals[0]].values.tolist() == [2]
+
+
+def test_enumeration_text_uses_raw_value():
+    signal = signal_spec(frame="Frame", factor=0.5, enumeration={2: "Two"})
+    decoded = {
+        signal: epyqlib.utils.candecode._series(
+            signal=signal,
+            timestamps=numpy.array([0.0, 1.0]),
+            raw=numpy.array([2, 3], dtype="<u8"),
+        ),
+    }
+
+    rows = list(epyqlib.utils.candecode._rows(decoded))
+
+    assert [(row[4], row[6]) for row in rows] == [(1.0, "Two"), (1.5, "")]
+
+
+def test_txrx_does_not_import_device():
+    code = "import sys, epyqlib.txrx; sys.exit('epyqlib.device' in sys.modules)"
+
+    subprocess.run([sys.executable, "-c", code], check=True)
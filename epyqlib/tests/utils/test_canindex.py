@@ -0,0 +1,127 @@
+import numpy
+import pytest
+
+import epyqlib.utils.canindex
+import epyqlib.utils.canlog
+import epyqlib.utils.canlogio
+
+
+def frames(count, ids=(0x10, 0x20, 0x30)):
+    result = numpy.zeros(count, dtype=epyqlib.utils.canlog.frame_dtype)
+    result["timestamp"] = numpy.arange(count) / 10
+    result["id"] = numpy.resize(ids, count)
+    result["dlc"] = 8
+    result["data"][:, 0] = numpy.arange(count) % 256
+
+    return result
+
+
+@pytest.fixture
+def indexed(tmp_path):
+    path = tmp_path / "capture.cix"
+    written = frames(100)
+
+    with epyqlib.utils.canindex.Writer(path=path, chunk_size=16) as writer:
+        # uneven writes are regrouped into full chunks
+        writer.write(written[:5])
+        writer.write(written[5:])
+
+    return written, epyqlib.utils.canindex.Reader(path=path)
+
+
+def test_round_trip(indexed):
+    written, reader = indexed
+
+    assert len(reader) == len(written)
+    assert reader.chunk_table["count"].tolist() == [16] * 6 + [4]
+    assert (reader.read() == written).all()
+    assert reader.ids().tolist() == [0x10, 0x20, 0x30]
+
+
+def test_time_range_touches_only_overlapping_chunks(indexed):
+    written, reader = indexed
+
+    assert reader.chunk_indexes(start=2, end=4).tolist() == [1, 2]
+
+    read = reader.read(start=2, end=4)
+    expected = written[(written["timestamp"] >= 2) & (written["timestamp"] < 4)]
+    assert (read == expected).all()
+
+
+def test_id_filter(indexed):
+    written, reader = indexed
+
+    read = reader.read(start=3, ids=[0x20])
+    expected = written[(written["timestamp"] >= 3) & (written["id"] == 0x20)]
+
+    assert (read == expected).all()
+
+
+def test_id_index_skips_chunks(tmp_path):
+    path = tmp_path / "capture.cix"
+    written = frames(64)
+    written["id"][40] = 0x99
+    epyqlib.utils.canindex.write(written, path, chunk_size=16)
+
+    reader = epyqlib.utils.canindex.Reader(path=path)
+
+    assert reader.chunk_indexes(ids=[0x99]).tolist() == [2]
+    assert reader.read(ids=[0x99])["timestamp"].tolist() == [4.0]
+
+
+def test_latest(indexed):
+    written, reader = indexed
+
+    frame = reader.latest(time=5.05, id=0x10)
+
+    assert frame["timestamp"] == pytest.approx(4.8)
+    assert reader.latest(time=0.05, id=0x20) is None
+
+
+def test_overlapping_chunks(tmp_path):
+    path = tmp_path / "capture.cix"
+    written = frames(32)
+    # the second chunk starts before the first ends
+    written["timestamp"][16:] -= 1
+
+    epyqlib.utils.canindex.write(written, path, chunk_size=16)
+    reader = epyqlib.utils.canindex.Reader(path=path)
+
+    read = reader.read(start=0.55, end=0.85)
+
+    assert sorted(read["timestamp"].tolist()) == pytest.approx(
+        [0.6, 0.6, 0.7, 0.7, 0.8, 0.8]
+    )
+
+
+def test_unclosed_file_is_rejected(tmp_path):
+    path = tmp_path / "capture.cix"
+    writer = epyqlib.utils.canindex.Writer(path=path)
+    writer.write(frames(3))
+    writer.file.flush()
+
+    with pytest.raises(epyqlib.utils.canindex.InvalidFileError):
+        epyqlib.utils.canindex.Reader(path=path)
+
+    writer.close()
+
+
+def test_canlogio_suffix(tmp_path):
+    path = tmp_path / "capture.cix"
+    written = frames(10)
+
+    epyqlib.utils.canlogio.write(written, path)
+    read = epyqlib.utils.canlogio.concatenate(epyqlib.utils.canlogio.read(path))
+
+    assert (read == written).all()
+
+
+def test_log_writes_indexed(tmp_path):
+    path = tmp_path / "capture.cix"
+    log = epyqlib.utils.canlog.Log(name="log")
+    log.messages.extend(epyqlib.utils.canlog.messages_from_frames(frames(5)))
+
+    log.write_indexed(path)
+
+    reader = epyqlib.utils.canindex.Reader(path=path)
+    assert reader.read()["id"].tolist() == [0x10, 0x20, 0x30, 0x10, 0x20]
@@ -0,0 +1,93 @@
+import io
+
+import can
+import numpy
+
+import epyqlib.utils.canlog
+
+
+def messages(count):
+    return [
+        can.Message(
+            timestamp=i / 1000,
+            arbitration_id=0x100 + i,
+            extended_id=i % 2 == 0,
+            data=bytes(range(i % 9)),
+        )
+        for i in range(count)
+    ]
+
+
+def test_capture_ring_keeps_newest():
+    capture = epyqlib.utils.canlog.Capture(capacity=4)
+    capture.start()
+
+    for message in messages(6):
+        capture.on_message_received(message)
+
+    frames = capture.frames()
+
+    assert capture.overwritten == 2
+    assert frames["id"].tolist() == [0x102, 0x103, 0x104, 0x105]
+    assert frames["dlc"].tolist() == [2, 3, 4, 5]
+    assert bytes(frames["data"][2][:4]) == bytes(range(4))
+
+
+def test_capture_inactive_ignores():
+    capture = epyqlib.utils.canlog.Capture(capacity=4)
+
+    for message in messages(3):
+        capture.on_message_received(message)
+
+    assert len(capture) == 0
+
+
+def test_capture_spills_to_file(tmp_path):
+    path = tmp_path / "capture.bin"
+    capture = epyqlib.utils.canlog.Capture(capacity=4, path=path)
+    capture.start()
+
+    for message in messages(10):
+        capture.on_message_received(message)
+
+    capture.close()
+
+    frames = epyqlib.utils.canlog.load_capture(path)
+
+    assert frames["id"].tolist() == [0x100 + i for i in range(10)]
+    extended = epyqlib.utils.canlog.FrameFlags.extended
+    assert ((frames["flags"] & extended) != 0).tolist() == [
+        i % 2 == 0 for i in range(10)
+    ]
+
+
+def test_frames_to_trc_v1_1_matches_messages():
+    capture = epyqlib.utils.canlog.Capture(capacity=16)
+    capture.start()
+    for message in messages(12):
+        capture.on_message_received(message)
+
+    from_frames = io.StringIO()
+    from_frames.name = "test.trc"
+    epyqlib.utils.canlog.to_trc_v1_1(capture, from_frames)
+
+    from_messages = io.StringIO()
+    from_messages.name = "test.trc"
+    epyqlib.utils.canlog.to_trc_v1_1(list(capture.messages()), from_messages)
+
+    assert from_frames.getvalue() == from_messages.getvalue()
+    assert "    12)        11.0  Rx         010B  2  00 01 \n" in from_frames.getvalue()
+
+
+def test_frames_from_messages_round_trip():
+    frames = epyqlib.utils.canlog.Capture(capacity=8)
+    frames.start()
+    for message in messages(8):
+        frames.on_message_received(message)
+    frames = frames.frames()
+
+    converted = epyqlib.utils.canlog.frames_from_messages(
+        epyqlib.utils.canlog.messages_from_frames(frames),
+    )
+
+    numpy.testing.assert_array_equal(converted, frames)
@@ -0,0 +1,139 @@
+import io
+
+import numpy
+import pytest
+
+import epyqlib.utils.canlog
+import epyqlib.utils.canlogio
+
+FrameFlags = epyqlib.utils.canlog.FrameFlags
+
+
+def frames(count, flags=FrameFlags.extended):
+    result = numpy.zeros(count, dtype=epyqlib.utils.canlog.frame_dtype)
+    result["timestamp"] = numpy.arange(count) / 1000
+    result["id"] = 0x100 + numpy.arange(count)
+    result["flags"] = flags
+    result["dlc"] = numpy.arange(count) % 9
+    for i in range(count):
+        result["data"][i][: i % 9] = range(i % 9)
+
+    return result
+
+
+def assert_frames_equal(actual, expected):
+    assert actual["timestamp"] == pytest.approx(expected["timestamp"], abs=1e-4)
+    assert actual["id"].tolist() == expected["id"].tolist()
+    assert actual["flags"].tolist() == expected["flags"].tolist()
+    assert actual["dlc"].tolist() == expected["dlc"].tolist()
+    assert actual["data"].tolist() == expected["data"].tolist()
+
+
+def round_trip(write, read, expected, **kwargs):
+    f = io.StringIO()
+    write(expected, f, **kwargs)
+    f.seek(0)
+
+    return epyqlib.utils.canlogio.concatenate(read(f, chunk_size=7))
+
+
+def test_chunks():
+    chunked = list(epyqlib.utils.canlogio.chunks(frames(20), chunk_size=8))
+
+    assert [len(chunk) for chunk in chunked] == [8, 8, 4]
+
+
+def test_trc_v1_1_round_trip():
+    expected = frames(20)
+    expected["flags"][::2] = 0
+
+    actual = round_trip(
+        write=epyqlib.utils.canlogio.write_trc,
+        read=epyqlib.utils.canlogio.read_trc,
+        expected=expected,
+        version="1.1",
+    )
+
+    assert_frames_equal(actual, expected)
+
+
+def test_trc_v1_3_round_trip_keeps_standard_ids():
+    expected = frames(20)
+    expected["flags"][::2] = 0
+    expected["flags"][3] = FrameFlags.extended | FrameFlags.remote
+    expected["data"][3] = 0
+
+    actual = round_trip(
+        write=epyqlib.utils.canlogio.write_trc,
+        read=epyqlib.utils.canlogio.read_trc,
+        expected=expected,
+        version="1.3",
+    )
+
+    assert_frames_equal(actual, expected)
+
+
+def test_candump_round_trip():
+    expected = frames(20)
+    expected["flags"][::2] = 0
+    expected["flags"][5] = FrameFlags.remote
+    expected["data"][5] = 0
+    expected["flags"][7] = FrameFlags.error
+    expected["id"][7] = 0x4
+
+    actual = round_trip(
+        write=epyqlib.utils.canlogio.write_candump,
+        read=epyqlib.utils.canlogio.read_candump,
+        expected=expected,
+    )
+
+    assert_frames_equal(actual, expected)
+
+
+def test_candump_reads_fd_frames():
+    f = io.StringIO("(1.000000) can0 123##00011223344556677\n")
+
+    (frame,) = epyqlib.utils.canlogio.concatenate(
+        epyqlib.utils.canlogio.read_candump(f),
+    )
+
+    assert frame["id"] == 0x123
+    assert frame["dlc"] == 8
+    assert bytes(frame["data"]) == bytes.fromhex("0011223344556677")
+
+
+@pytest.mark.parametrize("suffix", [".trc", ".log", ".blf", ".asc", ".cap"])
+def test_path_round_trip(tmp_path, suffix):
+    expected = frames(20)
+    path = tmp_path / ("trace" + suffix)
+
+    epyqlib.utils.canlogio.write(expected, path)
+    actual = epyqlib.utils.canlogio.concatenate(epyqlib.utils.canlogio.read(path))
+
+    assert_frames_equal(actual, expected)
+
+
+def test_unsupported_suffix(tmp_path):
+    with pytest.raises(epyqlib.utils.canlogio.UnsupportedFormatError):
+        epyqlib.utils.canlogio.read(tmp_path / "trace.xyz")
+
+
+def test_to_trc_v1_3_merges_buses():
+    first = frames(2, flags=0)
+    first["timestamp"] = [0.001, 0.003]
+    first["id"] = [0x10, 0x30]
+    second = frames(1)
+    second["timestamp"] = 0.002
+    second["id"] = 0x20
+
+    f = io.StringIO()
+    epyqlib.utils.canlog.to_trc_v1_3(messages={1: first, 2: second}, f=f)
+    f.seek(0)
+
+    lines = [line for line in f if not line.startswith(";")]
+
+    assert [line.split()[2:5] for line in lines] == [
+        ["1", "Rx", "0010"],
+        ["2", "Rx", "00000020"],
+        ["1", "Rx", "0030"],
+    ]
@@ -0,0 +1,176 @@
+import threading
+import time
+
+import can
+import click.testing
+import numpy
+import pytest
+
+import epyqlib.utils.canlog
+import epyqlib.utils.canlogio
+import epyqlib.utils.canreplay
+
+FrameFlags = epyqlib.utils.canlog.FrameFlags
+
+
+def frames(count, interval=0.002):
+    result = numpy.zeros(count, dtype=epyqlib.utils.canlog.frame_dtype)
+    result["timestamp"] = 100 + numpy.arange(count) * interval
+    result["id"] = numpy.resize([0x10, 0x20], count)
+    result["dlc"] = 1
+    result["data"][:, 0] = numpy.arange(count)
+
+    return result
+
+
+def replay(**kwargs):
+    sender = can.interface.Bus(bustype="virtual", channel="replay")
+    receiver = can.interface.Bus(bustype="virtual", channel="replay")
+
+    try:
+        statistics = epyqlib.utils.canreplay.Replay(bus=sender, **kwargs).run()
+
+        received = []
+        while True:
+            message = receiver.recv(timeout=0)
+            if message is None:
+                break
+            received.append(message)
+    finally:
+        sender.shutdown()
+        receiver.shutdown()
+
+    return statistics, received
+
+
+def test_wait_until():
+    deadline = time.perf_counter() + 0.01
+
+    assert not epyqlib.utils.canreplay.wait_until(deadline=deadline)
+    assert time.perf_counter() >= deadline
+
+
+def test_wait_until_stopped():
+    stopped = threading.Event()
+    stopped.set()
+
+    assert epyqlib.utils.canreplay.wait_until(
+        deadline=time.perf_counter() + 10,
+        stopped=stopped,
+    )
+
+
+def test_timing():
+    statistics, received = replay(frames=frames(50))
+
+    assert [bytes(message.data)[0] for message in received] == list(range(50))
+    assert statistics.count == 50
+    assert statistics.minimum >= 0
+
+    times = numpy.array([message.timestamp for message in received])
+    assert times[-1] - times[0] == pytest.approx(0.098, abs=0.01)
+
+
+def test_speed():
+    start = time.perf_counter()
+    replay(frames=frames(50), speed=4)
+
+    assert time.perf_counter() - start < 0.098
+
+
+def test_loop_from_path(tmp_path):
+    path = tmp_path / "trace.log"
+    epyqlib.utils.canlogio.write(frames(5), path)
+
+    sender = can.interface.Bus(bustype="virtual", channel="replay")
+    try:
+        looping = epyqlib.utils.canreplay.Replay(bus=sender, frames=path, loop=True)
+        looping.start()
+        time.sleep(0.05)
+        looping.stop()
+        statistics = looping.join(timeout=1)
+    finally:
+        sender.shutdown()
+
+    assert not looping.running()
+    # 4 intervals of 2 ms per pass
+    assert 10 < statistics.count < 40
+
+
+def test_id_filter_and_remap():
+    written = frames(10)
+    written["flags"][0] = FrameFlags.error
+
+    statistics, received = replay(
+        frames=written,
+        ids=[0x10],
+        remap=epyqlib.utils.canreplay.node_id_remap(
+            node_id_type="simple",
+            device_id=3,
+            controller_id=None,
+            to_device=True,
+        ),
+    )
+
+    assert [message.arbitration_id for message in received] == [0x13] * 4
+    assert not any(message.is_error_frame for message in received)
+
+
+def test_statistics():
+    statistics = epyqlib.utils.canreplay.Statistics()
+
+    assert statistics.mean is None
+
+    for lateness in [1, 2, 3]:
+        statistics.add(lateness)
+
+    assert statistics.mean == 2
+    assert statistics.standard_deviation == pytest.approx((2 / 3) ** 0.5)
+    assert (statistics.minimum, statistics.maximum) == (1, 3)
+
+
+def test_loop_keeps_interval_between_passes():
+    sent = []
+
+    class Bus:
+        def send(self, message):
+            sent.append(time.perf_counter())
+            if len(sent) == 6:
+                looping.stop()
+
+    looping = epyqlib.utils.canreplay.Replay(
+        bus=Bus(),
+        frames=frames(3, interval=0.02),
+        loop=True,
+        spin=0.02,
+    )
+    looping.run()
+
+    # the second pass starts one interval after the first pass ended
+    assert sent[3] - sent[2] == pytest.approx(0.02, abs=0.005)
+
+
+def test_join_raises_thread_exception():
+    class Bus:
+        def send(self, message):
+            raise can.CanError("bus off")
+
+    replaying = epyqlib.utils.canreplay.Replay(bus=Bus(), frames=frames(3))
+    replaying.start()
+
+    with pytest.raises(can.CanError, match="bus off"):
+        replaying.join(timeout=1)
+
+
+def test_cli_node_id_type_requires_ids(tmp_path):
+    path = tmp_path / "trace.log"
+    epyqlib.utils.canlogio.write(frames(3), path)
+
+    runner = click.testing.CliRunner()
+    result = runner.invoke(
+        epyqlib.utils.canreplay.create_command(),
+        [str(path), "--interface", "virtual", "--node-id-type", "j1939"],
+    )
+
+    assert result.exit_code == 2
+    assert "--node-id" in result.output
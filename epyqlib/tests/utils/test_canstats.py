@@ -0,0 +1,88 @@
+import can
+import numpy
+import pytest
+
+import epyqlib.utils.canlog
+import epyqlib.utils.canstats
+
+
+def test_frame_bits():
+    assert epyqlib.utils.canstats.frame_bits(extended=False, dlc=8, stuffing=0) == 111
+    assert epyqlib.utils.canstats.frame_bits(extended=True, dlc=8, stuffing=0) == 131
+    # worst case stuffing of a standard 8 byte frame
+    assert epyqlib.utils.canstats.frame_bits(extended=False, dlc=8) == 135
+
+
+def test_window_slides():
+    window = epyqlib.utils.canstats.Window(duration=1, buckets=10)
+
+    for i in range(20):
+        window.add(time=i / 10)
+
+    assert window.total() == 10
+    assert window.total(now=2.45) == 5
+    assert window.total(now=10) == 0
+
+
+def test_periods_and_missed():
+    statistics = epyqlib.utils.canstats.BusStatistics(
+        cycle_times={(0x10, False): 0.01},
+    )
+
+    times = [i / 100 for i in range(10)] + [0.15]
+    for time in times:
+        statistics.add(timestamp=time, id=0x10, extended=False, dlc=8)
+
+    [snapshot] = statistics.snapshot().ids
+
+    assert snapshot.count == 11
+    assert snapshot.minimum_period == pytest.approx(0.01)
+    assert snapshot.maximum_period == pytest.approx(0.06)
+    assert snapshot.missed == 5
+    assert snapshot.rate == pytest.approx(11)
+
+
+def test_jitter():
+    statistics = epyqlib.utils.canstats.BusStatistics()
+
+    steady = [i / 100 for i in range(200)]
+    for time in steady:
+        statistics.add(timestamp=time, id=1, extended=False, dlc=1)
+
+    jittery = [2 + i / 100 + (0.002 if i % 2 else 0) for i in range(200)]
+    for time in jittery:
+        statistics.add(timestamp=time, id=2, extended=False, dlc=1)
+
+    first, second = statistics.snapshot().ids
+
+    assert first.jitter == pytest.approx(0, abs=1e-6)
+    assert second.jitter > 0.001
+    assert second.mean_period == pytest.approx(0.01, abs=0.001)
+
+
+def test_load_and_dlc_changes():
+    statistics = epyqlib.utils.canstats.BusStatistics(bitrate=125_000, stuffing=0)
+
+    frames = numpy.zeros(1000, dtype=epyqlib.utils.canlog.frame_dtype)
+    frames["timestamp"] = numpy.arange(1000) / 1000
+    frames["id"] = 0x20
+    frames["dlc"] = numpy.resize([8, 8, 4], 1000)
+
+    statistics.add_frames(frames)
+    snapshot = statistics.snapshot()
+
+    bits = (2 * 111 + 79) / 3 * 1000
+    assert snapshot.load == pytest.approx(100 * bits / 125_000, rel=0.01)
+    assert snapshot.rate == pytest.approx(1000, rel=0.01)
+    assert snapshot.ids[0].dlc_changes == 666
+
+
+def test_listener_skips_error_frames():
+    statistics = epyqlib.utils.canstats.BusStatistics()
+
+    statistics.on_message_received(can.Message(timestamp=1, arbitration_id=5))
+    statistics.on_message_received(can.Message(timestamp=2, is_error_frame=True))
+
+    assert statistics.snapshot().count == 1
+    assert statistics.id_snapshot(id=5, extended=True).count == 1
+    assert statistics.id_snapshot(id=6, extended=True) is None
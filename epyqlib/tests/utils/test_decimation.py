@@ -0,0 +1,52 @@
+import numpy
+import pytest
+
+import epyqlib.utils.decimation
+
+
+@pytest.fixture
+def series():
+    random = numpy.random.RandomState(0)
+    x = numpy.arange(100_003) * 0.01
+    y = numpy.sin(x) + random.normal(size=len(x))
+
+    return x, y
+
+
+def test_short_range_is_not_decimated(series):
+    x, y = series
+    pyramid = epyqlib.utils.decimation.MinMaxPyramid(x=x, y=y)
+
+    drawn_x, drawn_y = pyramid.query(start=x[100], end=x[199], width=500)
+
+    assert (drawn_x == x[99:201]).all()
+    assert (drawn_y == y[99:201]).all()
+
+
+@pytest.mark.parametrize("width", (1, 100, 1000))
+@pytest.mark.parametrize("start, end", ((0, 1e6), (10, 20), (123.45, 678.9)))
+def test_decimated_keeps_envelope(series, width, start, end):
+    x, y = series
+    pyramid = epyqlib.utils.decimation.MinMaxPyramid(x=x, y=y)
+
+    drawn_x, drawn_y = pyramid.query(start=start, end=end, width=width)
+
+    visible = (x >= start) & (x <= end)
+    assert len(drawn_x) <= 4 * (width + 2)
+    assert (numpy.diff(drawn_x) >= 0).all()
+    assert drawn_y.min() <= y[visible].min()
+    assert drawn_y.max() >= y[visible].max()
+    assert set(zip(drawn_x, drawn_y)) <= set(zip(x, y))
+
+
+def test_empty():
+    pyramid = epyqlib.utils.decimation.MinMaxPyramid(x=(), y=())
+
+    drawn_x, drawn_y = pyramid.query(start=0, end=1, width=100)
+
+    assert len(pyramid) == len(drawn_x) == len(drawn_y) == 0
+
+
+def test_mismatched_lengths():
+    with pytest.raises(ValueError):
+        epyqlib.utils.decimation.MinMaxPyramid(x=(1, 2), y=(1,))
@@ -0,0 +1,77 @@
+import json
+
+import graham
+import marshmallow
+import pytest
+
+import epyqlib.pm.parametermodel
+import epyqlib.pm.valuesetmodel
+import epyqlib.tests.common
+import epyqlib.tests.pm.test_parametermodel
+import epyqlib.utils.graham
+
+
+def documents():
+    yield epyqlib.pm.parametermodel.Root, (
+        epyqlib.tests.pm.test_parametermodel.serialized_sample
+    )
+
+    for path in (
+        epyqlib.tests.common.default_parameters_path,
+        epyqlib.tests.common.small_parameters_path,
+    ):
+        yield epyqlib.pm.valuesetmodel.Root, path.read_text()
+
+
+@pytest.fixture(
+    params=list(documents()),
+    ids=["parameter model", "default value set", "small value set"],
+)
+def document(request):
+    return request.param
+
+
+@pytest.mark.parametrize("indent", (4, None))
+def test_dumps_matches_graham(document, indent):
+    cls, s = document
+    root = graham.schema(cls).loads(s).data
+
+    expected = graham.dumps(root, indent=indent).data
+
+    assert epyqlib.utils.graham.dumps(root, indent=indent) == expected
+
+
+def test_loads_matches_graham(document):
+    cls, s = document
+
+    loaded = epyqlib.utils.graham.loads(cls, s)
+    expected = graham.schema(cls).loads(s).data
+
+    assert type(loaded) is cls
+    assert graham.dumps(loaded).data == graham.dumps(expected).data
+
+
+def test_dump_streams_to_file(document, tmp_path):
+    cls, s = document
+    root = epyqlib.utils.graham.loads(cls, s)
+    path = tmp_path / "document.json"
+
+    with open(path, "w") as f:
+        epyqlib.utils.graham.dump(root, f, indent=4)
+
+    assert path.read_text() == graham.dumps(root, indent=4).data
+
+
+def test_loads_reports_marshmallow_errors():
+    s = epyqlib.tests.common.small_parameters_path.read_text()
+    data = json.loads(s)
+    data["children"][0]["value"] = "nope"
+    s = json.dumps(data)
+
+    with pytest.raises(marshmallow.ValidationError) as expected:
+        graham.schema(epyqlib.pm.valuesetmodel.Root).loads(s)
+
+    with pytest.raises(marshmallow.ValidationError) as raised:
+        epyqlib.utils.graham.loads(epyqlib.pm.valuesetmodel.Root, s)
+
+    assert raised.value.messages == expected.value.messages
@@ -0,0 +1,45 @@
+import sys
+
+import pytest
+
+import epyqlib.utils.lazy
+
+
+@pytest.fixture
+def forget():
+    """Restore ``sys.modules`` to its state before the test."""
+    before = dict(sys.modules)
+
+    yield
+
+    for name in set(sys.modules) - set(before):
+        del sys.modules[name]
+    sys.modules.update(before)
+
+
+def test_executed_on_attribute_access(forget):
+    name = "xml.dom.minidom"
+    for each in ("xml", "xml.dom", name):
+        sys.modules.pop(each, None)
+
+    module = epyqlib.utils.lazy.lazy_import(name)
+
+    assert sys.modules[name] is module
+    assert not epyqlib.utils.lazy.loaded(name)
+    assert not epyqlib.utils.lazy.loaded("xml")
+    assert sys.modules["xml"].dom.minidom is module
+
+    assert module.parseString("<a/>").documentElement.tagName == "a"
+    assert epyqlib.utils.lazy.loaded(name)
+    assert epyqlib.utils.lazy.loaded("xml.dom")
+
+
+def test_imported_module_returned(forget):
+    import json
+
+    assert epyqlib.utils.lazy.lazy_import("json") is json
+
+
+def test_missing_module():
+    with pytest.raises(ModuleNotFoundError):
+        epyqlib.utils.lazy.lazy_import("epyqlib.utils.no_such_module")
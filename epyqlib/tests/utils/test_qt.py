@@ -597,3 +597,148 @@ def test_diffproxymodel_edit_nonreference_emits(diff_proxy_test_model):
     assert expected == changes.results(
         container=diff_proxy_test_model.role_lists(fill=False),
     )
+
+
+def filter_test_model():
+    model = PyQt5.QtGui.QStandardItemModel()
+
+    for group in ("Grid", "Motor"):
+        parent = PyQt5.QtGui.QStandardItem(group)
+        for name, comment in (
+            ("Voltage", "line to line"),
+            ("Current", "phase a"),
+            ("{} Limit".format(group), ""),
+        ):
+            parent.appendRow(
+                [PyQt5.QtGui.QStandardItem(name), PyQt5.QtGui.QStandardItem(comment)]
+            )
+        model.appendRow([parent, PyQt5.QtGui.QStandardItem("")])
+
+    return model
+
+
+def visible_text(proxy, parent=PyQt5.QtCore.QModelIndex()):
+    texts = []
+
+    for row in range(proxy.rowCount(parent)):
+        index = proxy.index(row, 0, parent)
+        texts.append(proxy.data(index))
+        texts.extend(visible_text(proxy, index))
+
+    return texts
+
+
+def test_wildcard_regex():
+    search = epyqlib.utils.qt.wildcard_regex
+
+    assert search("v*age").search("grid voltage")
+    assert search("v?l").search("voltage")
+    assert search("[mv]ol").search("voltage")
+    assert not search("grid*limit").search("grid\nlimit")
+    assert search("a[b").search("a[b")
+
+
+def matching_text(index, pattern):
+    matches = index.query(pattern)
+    return {key.data() for key, id_ in index.ids.items() if id_ in matches}
+
+
+@pytest.mark.parametrize(
+    "pattern", ("vol", "oltage", "LIMIT", "v*e", "t l", "grid li", "?o", "zz")
+)
+def test_search_index_matches_scan(qtbot, pattern):
+    model = filter_test_model()
+    index = epyqlib.utils.qt.SearchIndex(model=model, columns=(0, 1))
+
+    matches = matching_text(index, pattern)
+
+    regex = epyqlib.utils.qt.wildcard_regex(pattern.casefold())
+    expected = {
+        key.data()
+        for key, id_ in index.ids.items()
+        if regex.search(index.texts[id_]) is not None
+    }
+
+    assert matches == expected
+
+
+def test_search_index_follows_model(qtbot):
+    model = filter_test_model()
+    index = epyqlib.utils.qt.SearchIndex(model=model, columns=(0,))
+
+    assert matching_text(index, "motor") == {"Motor", "Motor Limit"}
+
+    grid = model.item(0)
+    grid.child(0).setText("Motor Voltage")
+    assert "Motor Voltage" in matching_text(index, "motor")
+
+    model.removeRow(1)
+    assert matching_text(index, "motor") == {"Motor Voltage"}
+
+    grid.insertRow(0, PyQt5.QtGui.QStandardItem("Motor Speed"))
+    assert matching_text(index, "motor") == {
+        "Motor Voltage",
+        "Motor Speed",
+    }
+
+    model.clear()
+    assert index.query("motor") == set()
+
+
+def test_proxy_filters_names_paths_and_comments(qtbot):
+    model = filter_test_model()
+    proxy = epyqlib.utils.qt.PySortFilterProxyModel(
+        filter_column=0,
+        search_columns=(1,),
+    )
+    proxy.setSourceModel(model)
+
+    proxy.setFilterWildcard("limit")
+    assert visible_text(proxy) == ["Grid", "Grid Limit", "Motor", "Motor Limit"]
+
+    # a matching parent keeps all of its children
+    proxy.setFilterWildcard("gRiD")
+    assert visible_text(proxy) == ["Grid", "Voltage", "Current", "Grid Limit"]
+
+    proxy.setFilterWildcard("phase")
+    assert visible_text(proxy) == ["Grid", "Current", "Motor", "Current"]
+
+    model.item(1).child(1).setText("Torque")
+    assert visible_text(proxy) == ["Grid", "Current", "Motor", "Torque"]
+
+    proxy.setFilterWildcard("")
+    assert len(visible_text(proxy)) == 8
+
+
+def test_proxy_search_wraps(qtbot):
+    model = filter_test_model()
+    proxy = epyqlib.utils.qt.PySortFilterProxyModel(filter_column=0)
+    proxy.setSourceModel(model)
+
+    first = proxy.search(text="v*ge", search_from=PyQt5.QtCore.QModelIndex(), column=0)
+    second = proxy.search(text="v*ge", search_from=first, column=0)
+    third = proxy.search(text="v*ge", search_from=second, column=0)
+
+    assert first.parent().data() == "Grid"
+    assert second.parent().data() == "Motor"
+    assert third == first
+
+    assert proxy.search(text="line", search_from=first, column=1).data() == (
+        "line to line"
+    )
+    assert proxy.search(text="zz", search_from=first, column=0) is None
+
+
+def test_proxy_search_without_match_from_other_column(qtbot):
+    model = filter_test_model()
+    proxy = epyqlib.utils.qt.PySortFilterProxyModel(filter_column=0)
+    proxy.setSourceModel(model)
+
+    grid = proxy.index(0, 0, PyQt5.QtCore.QModelIndex())
+    comment = proxy.index(1, 1, grid)
+
+    assert proxy.search(text="zz", search_from=comment, column=1) is None
+    assert proxy.search(text="zz", search_from=comment, column=0) is None
+    assert proxy.search(text="phase", search_from=comment, column=1).data() == (
+        "phase a"
+    )
@@ -0,0 +1,49 @@
+import io
+import os
+import zipfile
+
+import pytest
+
+import epyqlib.utils.zipcrypto
+
+files = {
+    "directory/text.txt": b"some text\n" * 1000,
+    "directory/random.bin": os.urandom(5000),
+    "directory/empty": b"",
+    "directory/\N{MICRO SIGN}.txt": b"micro",
+}
+
+
+def read(data, password=None):
+    with zipfile.ZipFile(io.BytesIO(data)) as z:
+        return {name: z.read(name, pwd=password) for name in z.namelist()}
+
+
+@pytest.mark.parametrize("password", ("the archive code", b"the archive code"))
+def test_encrypted_readable_by_zipfile(password):
+    data = epyqlib.utils.zipcrypto.dumps(files=files, password=password)
+
+    assert read(data, password=b"the archive code") == files
+
+    with pytest.raises(RuntimeError, match="password"):
+        read(data)
+
+    with pytest.raises(RuntimeError, match="password"):
+        read(data, password=b"wrong")
+
+
+@pytest.mark.parametrize("password", (None, ""))
+def test_without_password(password):
+    data = epyqlib.utils.zipcrypto.dumps(files=files, password=password)
+
+    assert read(data) == files
+
+
+def test_write_replaces_existing(tmp_path):
+    path = tmp_path / "archive.zip"
+    path.write_bytes(b"previous")
+
+    epyqlib.utils.zipcrypto.write(path=path, files=files, password="code")
+
+    assert read(path.read_bytes(), password=b"code") == files
+    assert os.listdir(tmp_path) == ["archive.zip"]
@@ -1,3 +1,5 @@
+import types
+
 import PyQt5.QtCore
 
 # See file COPYING in this source tree
@@ -24,7 +26,108 @@ class Signals(PyQt5.QtCore.QObject):
     child_removed_complete = PyQt5.QtCore.pyqtSignal("PyQt_PyObject")
 
 
+class AttributeIndex:
+    """The nodes of a subtree keyed by the value of one of their attributes.
+
+    Nodes are added and removed as they are inserted into or removed from
+    the subtree through :class:`TreeNode`.  The value is read when a node is
+    added so :meth:`update` must be called after changing it on a node
+    already in the tree.  Lookups recheck the value and that the node is
+    still in the subtree so stale entries are never returned.
+    """
+
+    def __init__(self, root, name):
+        self.root = root
+        self.name = name
+
+        # value -> {id(node): node}
+        self.nodes = {}
+        # id(node) -> value
+        self.values = {}
+        # nodes with unhashable values are checked on each lookup
+        self.unhashable = {}
+
+        self.add(self.root)
+
+    def add(self, node):
+        for node in subtree(node):
+            self.add_one(node)
+
+    def remove(self, node):
+        for node in subtree(node):
+            self.remove_one(node)
+
+    def update(self, node):
+        self.remove_one(node)
+        self.add_one(node)
+
+    def add_one(self, node):
+        value = getattr(node, self.name, _sentinel)
+        if value is _sentinel:
+            return
+
+        try:
+            nodes = self.nodes.setdefault(value, {})
+        except TypeError:
+            self.unhashable[id(node)] = node
+        else:
+            nodes[id(node)] = node
+            self.values[id(node)] = value
+
+    def remove_one(self, node):
+        self.unhashable.pop(id(node), None)
+
+        value = self.values.pop(id(node), _sentinel)
+        if value is _sentinel:
+            return
+
+        nodes = self.nodes[value]
+        del nodes[id(node)]
+        if len(nodes) == 0:
+            del self.nodes[value]
+
+    def contains(self, node):
+        return node is self.root or any(
+            ancestor is self.root for ancestor in node.ancestors()
+        )
+
+    def find(self, value):
+        try:
+            candidates = list(self.nodes.get(value, {}).values())
+        except TypeError:
+            candidates = []
+
+        candidates.extend(self.unhashable.values())
+
+        return [
+            node
+            for node in candidates
+            if getattr(node, self.name, _sentinel) == value and self.contains(node)
+        ]
+
+
+_sentinel = object()
+
+
+def subtree(node):
+    """Yield the node and all of its descendants."""
+    nodes = [node]
+
+    while len(nodes) > 0:
+        node = nodes.pop()
+        yield node
+        nodes.extend(reversed(getattr(node, "children", ())))
+
+
 class TreeNode:
+    # class level defaults for subclasses that use these before calling
+    # __init__()
+
+    # id(child) -> row, rebuilt when found to be out of date
+    _child_rows = None
+    # attribute name -> AttributeIndex over this subtree
+    _attribute_indexes = types.MappingProxyType({})
+
     def __init__(self, tx=False, parent=None, children=None):
         self.last = None
 
@@ -55,17 +158,40 @@ class TreeNode:
             self.tree_parent.append_child(self)
 
     def insert_child(self, i, child):
+        if i < len(self.children):
+            self._child_rows = None
+        elif self._child_rows is not None:
+            self._child_rows[id(child)] = len(self.children)
+
         self.children.insert(i, child)
         child.tree_parent = self
+        self._indexes_add(child)
         self.pyqt_signals.child_added.emit(child, i)
         self.pyqt_signals.child_added_complete.emit(child)
 
     def append_child(self, child):
+        if self._child_rows is not None:
+            self._child_rows[id(child)] = len(self.children)
+
         self.children.append(child)
         child.tree_parent = self
+        self._indexes_add(child)
         self.pyqt_signals.child_added.emit(child, len(self.children) - 1)
         self.pyqt_signals.child_added_complete.emit(child)
 
+    def extend_children(self, children):
+        """Append ``children`` without emitting signals per child.  Anything
+        tracking the children, such as :class:`epyqlib.attrsmodel.Model`,
+        must be updated by the caller."""
+        rows = self._child_rows
+        for child in children:
+            if rows is not None:
+                rows[id(child)] = len(self.children)
+
+            self.children.append(child)
+            child.tree_parent = self
+            self._indexes_add(child)
+
     def child_at_row(self, row):
         if row < len(self.children):
             return self.children[row]
@@ -73,22 +199,40 @@ class TreeNode:
             return None
 
     def row_of_child(self, child):
-        for i, item in enumerate(self.children):
-            if item is child:
-                return i
-        return -1
+        # the children list may also be modified directly, such as sorting,
+        # so a cached row is only used after checking it
+        rows = self._child_rows
+        if rows is not None:
+            row = rows.get(id(child))
+            if (
+                row is not None
+                and row < len(self.children)
+                and self.children[row] is child
+            ):
+                return row
+
+        rows = {id(item): i for i, item in enumerate(self.children)}
+        self._child_rows = rows
+
+        return rows.get(id(child), -1)
 
     def remove_child(self, row=None, child=None):
         if child is None:
             child = self.children[row]
         elif row is None:
-            row = self.children.index(child)
+            row = self.row_of_child(child)
 
         tree_parent = child.tree_parent
 
+        self._indexes_remove(child)
         child.parent = None
         child.tree_parent = None
-        self.children.remove(child)
+        del self.children[row]
+
+        if row == len(self.children) and self._child_rows is not None:
+            self._child_rows.pop(id(child), None)
+        else:
+            self._child_rows = None
 
         self.pyqt_signals.child_removed.emit(tree_parent, child, row)
         self.pyqt_signals.child_removed_complete.emit(child)
@@ -127,6 +271,34 @@ class TreeNode:
             node = node.tree_parent
             yield node
 
+    def attribute_index(self, name):
+        """Return an index of the nodes in this subtree by the named
+        attribute, creating it if needed.  Once created it is used by
+        :meth:`nodes_by_attribute` and :meth:`child_by_name`.
+        """
+        index = self._attribute_indexes.get(name)
+
+        if index is None:
+            index = AttributeIndex(root=self, name=name)
+            self._attribute_indexes = {**self._attribute_indexes, name: index}
+
+        return index
+
+    def _indexes(self):
+        node = self
+
+        while node is not None:
+            yield from node._attribute_indexes.values()
+            node = node.tree_parent
+
+    def _indexes_add(self, child):
+        for index in self._indexes():
+            index.add(child)
+
+    def _indexes_remove(self, child):
+        for index in self._indexes():
+            index.remove(child)
+
     def children_by_attribute(self, value, name):
         return [
             child
@@ -144,7 +316,11 @@ class TreeNode:
 
             return getattr(node, attribute_name) == attribute_value
 
-        nodes = self.nodes_by_filter(filter=matches)
+        index = self._attribute_indexes.get(attribute_name)
+        if index is None:
+            nodes = self.nodes_by_filter(filter=matches)
+        else:
+            nodes = set(index.find(attribute_value))
 
         if len(nodes) == 0 and raise_:
             raise NotFoundError(
@@ -192,11 +368,17 @@ class TreeNode:
         return nodes
 
     def child_by_name(self, name):
-        sentinel = object()
-
-        children = [
-            child for child in self.children if getattr(child, "name", sentinel) == name
-        ]
+        index = self._attribute_indexes.get("name")
+        if index is None:
+            children = [
+                child
+                for child in self.children
+                if getattr(child, "name", _sentinel) == name
+            ]
+        else:
+            children = [
+                child for child in index.find(name) if child.tree_parent is self
+            ]
 
         if len(children) == 0:
             raise NotFoundError(f"Child with name {name!r} not found")
@@ -83,6 +83,92 @@ class Request:
     send_time = attr.ib(default=None)
 
 
+unmatched = object()
+
+
+def request_data(request):
+    (read_write,) = (
+        k
+        for k, v in request.frame.read_write.enumeration.items()
+        if v == ("Read" if request.read else "Write")
+    )
+
+    data = collections.OrderedDict()
+    for signal in request.frame.signals:
+        if signal is request.frame.read_write:
+            data[signal] = read_write
+        elif signal.enumeration_name == "Meta":
+            data[signal] = request.meta.value
+        elif signal not in request.frame.parameter_signals:
+            data[signal] = signal.value
+        elif signal in request.signals and not request.read:
+            data[signal] = request.signals[signal]
+        else:
+            data[signal] = None
+
+        if data[signal] is None:
+            v = next(
+                v
+                for v in (
+                    signal.from_human(signal.default_value),
+                    signal.from_human(signal.min),
+                    signal.from_human(signal.max),
+                    0,
+                )
+                if v is not None
+            )
+            data[signal] = v
+
+        data[signal] = int(data[signal])
+
+    return request.frame.update_from_signals(
+        data=data.values(),
+        only_return=True,
+    )
+
+
+def response_value(request, msg):
+    if not (
+        msg.arbitration_id == request.frame.status_frame.id
+        and (bool(msg.is_extended_id) == request.frame.status_frame.extended)
+    ):
+        return unmatched
+
+    status_signal = tuple(request.signals)[0].status_signal
+
+    if status_signal is None:
+        return unmatched
+
+    signals = status_signal.frame.unpack(msg.data, only_return=True)
+
+    mux = status_signal.set_signal.frame.mux.value
+    (response_mux_value,) = (v for k, v in signals.items() if k.name.endswith("_MUX"))
+    if response_mux_value != mux:
+        return unmatched
+    meta_mux_value = tuple(
+        v for k, v in signals.items() if k.enumeration_name == "Meta"
+    )
+    if len(meta_mux_value) == 1:
+        (meta_mux_value,) = meta_mux_value
+        if meta_mux_value != request.meta.value:
+            logger.debug("skipping due to unmatched meta")
+            return unmatched
+
+    response_read_write_value = signals[status_signal.frame.command_signal]
+    # TODO: handle the enumeration
+    if response_read_write_value != request.read:
+        return unmatched
+
+    if request.all_values:
+        status_signals = {s.status_signal for s in request.signals}
+        return {
+            s: s.to_human(value=v) for s, v in signals.items() if s in status_signals
+        }
+
+    raw_value = signals[status_signal]
+    return status_signal.to_human(value=raw_value)
+
+
 class Protocol(twisted.protocols.policies.TimeoutMixin):
     def __init__(self, timeout=1):
         self._deferred = None
@@ -345,44 +431,7 @@ class Protocol(twisted.protocols.policies.TimeoutMixin):
             self._start_transaction()
             self.state = State.reading if request.read else State.writing
 
-            (read_write,) = (
-                k
-                for k, v in request.frame.read_write.enumeration.items()
-                if v == ("Read" if request.read else "Write")
-            )
-
-            data = collections.OrderedDict()
-            for signal in request.frame.signals:
-                if signal is request.frame.read_write:
-                    data[signal] = read_write
-                elif signal.enumeration_name == "Meta":
-                    data[signal] = request.meta.value
-                elif signal not in request.frame.parameter_signals:
-                    data[signal] = signal.value
-                elif signal in request.signals and not request.read:
-                    data[signal] = request.signals[signal]
-                else:
-                    data[signal] = None
-
-                if data[signal] is None:
-                    v = next(
-                        v
-                        for v in (
-                            signal.from_human(signal.default_value),
-                            signal.from_human(signal.min),
-                            signal.from_human(signal.max),
-                            0,
-                        )
-                        if v is not None
-                    )
-                    data[signal] = v
-
-                data[signal] = int(data[signal])
-
-            data = request.frame.update_from_signals(
-                data=data.values(),
-                only_return=True,
-            )
+            data = request_data(request)
 
             if request.passive:
                 write = self._transport.write_passive
@@ -413,52 +462,12 @@ class Protocol(twisted.protocols.policies.TimeoutMixin):
         if request is None:
             return
 
-        if not (
-            msg.arbitration_id == request.frame.status_frame.id
-            and (bool(msg.is_extended_id) == request.frame.status_frame.extended)
-        ):
-            return
-
-        status_signal = tuple(request.signals)[0].status_signal
-
-        if status_signal is None:
-            return
-
-        signals = status_signal.frame.unpack(msg.data, only_return=True)
-
-        mux = status_signal.set_signal.frame.mux.value
-        (response_mux_value,) = (
-            v for k, v in signals.items() if k.name.endswith("_MUX")
-        )
-        if response_mux_value != mux:
-            return
-        meta_mux_value = tuple(
-            v for k, v in signals.items() if k.enumeration_name == "Meta"
-        )
-        if len(meta_mux_value) == 1:
-            (meta_mux_value,) = meta_mux_value
-            if meta_mux_value != request.meta.value:
-                print(" -- skipping due to unmatched meta")
-                return
-
-        response_read_write_value = signals[status_signal.frame.command_signal]
-        # TODO: handle the enumeration
-        if response_read_write_value != request.read:
+        value = response_value(request=request, msg=msg)
+        if value is unmatched:
             return
 
         self.setTimeout(None)
 
-        if request.all_values:
-            status_signals = {s.status_signal for s in request.signals}
-            value = {
-                s: s.to_human(value=v)
-                for s, v in signals.items()
-                if s in status_signals
-            }
-        else:
-            raw_value = signals[status_signal]
-            value = status_signal.to_human(value=raw_value)
-
         self.callback(value, request.meta)
 
     def send_failed(self):
@@ -3,6 +3,7 @@ import canmatrix.canmatrix
 import epyqlib.pyqabstractitemmodel
 from epyqlib.abstractcolumns import AbstractColumns
 import epyqlib.canneo
+import epyqlib.utils.canstats
 from epyqlib.treenode import TreeNode
 from PyQt5.QtCore import Qt, QVariant, QModelIndex, pyqtSignal, QTimer
 
@@ -74,6 +75,9 @@ class MessageNode(epyqlib.canneo.Frame, TreeNode):
 
         self.fields = Columns()
         self.last_time = None
+        self.previous_time = None
+        self.received = None
+        self.stale = False
 
         self.tx = tx
         self._send_checked = False
@@ -163,8 +167,22 @@ class MessageNode(epyqlib.canneo.Frame, TreeNode):
             # TODO: make sure the message matches the id/type and length
             pass
 
-        # TODO: I think this is not needed
-        # self.message = message
+        # Formatting and unpacking are left to refresh() so that only rows
+        # which are actually displayed pay for them.
+        self.received = message
+        self.previous_time = self.last_time
+        self.last_time = message.timestamp
+
+        self.count["rx"] += 1
+        self.stale = True
+
+    def refresh(self):
+        """Update the fields and signals from the latest received message."""
+        if not self.stale:
+            return
+
+        self.stale = False
+        message = self.received
 
         self.fields.id = epyqlib.canneo.format_identifier(
             message.arbitration_id, message.id_type
@@ -177,13 +195,10 @@ class MessageNode(epyqlib.canneo.Frame, TreeNode):
         # if self.last_time == message.timestamp:
         #     raise Exception('message already received {message}'
         #                     .format(**locals()))
-        if self.last_time is None:
+        if self.previous_time is None:
             self.fields.dt = "-"
         else:
-            self.fields.dt = "{:.4f}".format(message.timestamp - self.last_time)
-        self.last_time = message.timestamp
-
-        self.count["rx"] += 1
+            self.fields.dt = "{:.4f}".format(message.timestamp - self.previous_time)
 
         if not self.tx:
             self.fields.count = str(self.count["rx"])
@@ -250,9 +265,23 @@ class TxRx(TreeNode, epyqlib.canneo.QtCanListener):
         self.neo = neo
         self.messages = {}
 
+        self.statistics = None
+
+        # received message nodes not yet reported as changed to the model
+        self.dirty = set()
+        # arbitration id to the frame identifying its multiplexing, if any
+        self.base_frames = {}
+
         if self.rx:
             self.message_received_signal.connect(self.message_received)
 
+            if self.neo is None:
+                self.statistics = epyqlib.utils.canstats.BusStatistics()
+            else:
+                self.statistics = epyqlib.utils.canstats.BusStatistics.from_neo(
+                    neo=self.neo,
+                )
+
         if self.tx:
             for frame in self.neo.frames:
                 self.add_message_node(node=frame)
@@ -281,8 +310,25 @@ class TxRx(TreeNode, epyqlib.canneo.QtCanListener):
         # TODO: this is hacky but without it the tx widget would get values
         #       overwritten while they were being edited keeping the user
         #       from actually being able to change them
-        if self.rx:
-            self.changed.emit(self, 0, self, 1, [Qt.DisplayRole])
+        if not self.rx:
+            return
+
+        dirty = self.dirty
+        self.dirty = set()
+
+        last_column = len(Columns.indexes) - 1
+
+        for node in dirty:
+            self.changed.emit(node, 0, node, last_column, [Qt.DisplayRole])
+
+            if len(node.children) > 0:
+                self.changed.emit(
+                    node.children[0],
+                    Columns.indexes.value,
+                    node.children[-1],
+                    Columns.indexes.value,
+                    [Qt.DisplayRole],
+                )
 
     def set_node_id(self, node_id):
         # TODO: I think this can go away
@@ -306,6 +352,7 @@ class TxRx(TreeNode, epyqlib.canneo.QtCanListener):
             )
             message_node = MessageNode(message=message, tx=tx, frame=frame)
             self.neo.frames = self.neo.frames + (message_node,)
+            self.base_frames.pop(message.arbitration_id, None)
 
         message_node.send.connect(self.send)
         self.messages[id] = message_node
@@ -326,11 +373,32 @@ class TxRx(TreeNode, epyqlib.canneo.QtCanListener):
         self.end_insert_rows.emit()
 
     def generate_id(self, message):
-        multiplex_value = self.neo.get_multiplex(message)[1]
+        # equivalent to self.neo.get_multiplex(message)[1] but without the
+        # frame search and the Qt signals from unpacking into the frame
+        try:
+            base_frame = self.base_frames[message.arbitration_id]
+        except KeyError:
+            base_frame = self.neo.frame_by_id(message.arbitration_id)
+            self.base_frames[message.arbitration_id] = base_frame
+
+        multiplex_value = None
+
+        multiplex_frames = getattr(base_frame, "multiplex_frames", None)
+        if multiplex_frames is not None:
+            little, big = epyqlib.canneo.bytes_to_bitstrings(bytes(message.data))
+            (value,) = epyqlib.canneo.bitstring_to_signal_list(
+                (base_frame.multiplex_signal,),
+                big,
+                little,
+            )
+            if value in multiplex_frames:
+                multiplex_value = value
 
         return (message.arbitration_id, message.id_type, multiplex_value)
 
     def message_received(self, msg):
+        self.statistics.on_message_received(msg)
+
         id = self.generate_id(message=msg)
 
         try:
@@ -340,6 +408,7 @@ class TxRx(TreeNode, epyqlib.canneo.QtCanListener):
             message = self.messages[id]
 
         message.extract_message(msg)
+        self.dirty.add(message)
 
         # for column in [Columns.indexes.value, Columns.indexes.dt,
         #                Columns.indexes.count]:
@@ -408,6 +477,32 @@ class TxRxModel(epyqlib.pyqabstractitemmodel.PyQAbstractItemModel):
             count="Count",
         )
 
+    def data_display(self, index):
+        node = index.internalPointer()
+
+        frame = node if isinstance(node, MessageNode) else node.frame
+        if frame.stale:
+            frame.refresh()
+
+        return super().data_display(index)
+
+    def data_tool_tip(self, index):
+        if self.root.statistics is None:
+            return None
+
+        if index.column() not in {Columns.indexes.dt, Columns.indexes.count}:
+            return None
+
+        node = self.node_from_index(index)
+        if not isinstance(node, MessageNode):
+            return None
+
+        snapshot = self.root.statistics.id_snapshot(id=node.id, extended=node.extended)
+        if snapshot is None:
+            return None
+
+        return epyqlib.utils.canstats.format_id_snapshot(snapshot)
+
     def flags(self, index):
         flags = epyqlib.pyqabstractitemmodel.PyQAbstractItemModel.flags(self, index)
 
@@ -0,0 +1,136 @@
+import asyncio
+import decimal
+import logging
+import time
+
+import epyqlib.utils.twisted
+
+__copyright__ = "Copyright 2020, EPC Power Corp."
+__license__ = "GPLv2+"
+
+
+logger = logging.getLogger(__name__)
+
+
+# Share the exception types with the Twisted utilities so that callers such as
+# epyqlib.hildevice can handle either flavor with the same except clauses.
+RequestTimeoutError = epyqlib.utils.twisted.RequestTimeoutError
+WaitForTimedOut = epyqlib.utils.twisted.WaitForTimedOut
+
+
+async def sleep(seconds=None):
+    if seconds is None:
+        await asyncio.get_event_loop().create_future()
+
+    if isinstance(seconds, decimal.Decimal):
+        seconds = float(seconds)
+
+    await asyncio.sleep(seconds)
+
+
+async def wait_for(
+    check,
+    period=0.1,
+    timeout=10,
+    message=None,
+    signal=None,
+    passive_check=None,
+    maximum_period=None,
+):
+    """:mod:`asyncio` counterpart of :func:`epyqlib.utils.twisted.wait_for`."""
+    if message is None:
+        message = f"Condition not satisfied within {timeout:.1f} seconds"
+
+    if maximum_period is None:
+        maximum_period = period
+
+    start = time.monotonic()
+
+    if signal is None:
+        while True:
+            done = await check()
+            if done:
+                return
+
+            if time.monotonic() - start > timeout:
+                raise WaitForTimedOut(message)
+
+            await sleep(period)
+            period = min(2 * period, maximum_period)
+
+    satisfied = asyncio.Event()
+    received = False
+
+    def slot(*args):
+        nonlocal received
+
+        if satisfied.is_set():
+            return
+
+        result = passive_check(*args)
+        if result is None:
+            return
+
+        received = True
+        if result:
+            satisfied.set()
+
+    signal.connect(slot)
+
+    try:
+        while not satisfied.is_set():
+            remaining = timeout - (time.monotonic() - start)
+            if remaining <= 0:
+                raise WaitForTimedOut(message)
+
+            received = False
+            try:
+                await asyncio.wait_for(
+                    satisfied.wait(),
+                    timeout=min(period, remaining),
+                )
+            except asyncio.TimeoutError:
+                pass
+
+            if satisfied.is_set() or received:
+                continue
+
+            done = await check()
+            if done:
+                return
+
+            period = min(2 * period, maximum_period)
+    finally:
+        signal.disconnect(slot)
+
+
+async def gather(*awaitables):
+    return await asyncio.gather(*awaitables)
+
+
+def signal_as_awaitable(signal, timeout=None, loop=None):
+    if loop is None:
+        loop = asyncio.get_event_loop()
+
+    future = loop.create_future()
+
+    def slot(*args):
+        if not future.done():
+            future.set_result(args)
+
+    def disconnect(_):
+        signal.disconnect(slot)
+
+    signal.connect(slot)
+    future.add_done_callback(disconnect)
+
+    if timeout is None:
+        return future
+
+    async def with_timeout():
+        try:
+            return await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError as e:
+            raise RequestTimeoutError() from e
+
+    return loop.create_task(with_timeout())
@@ -0,0 +1,558 @@
+"""Offline decoding of CAN traces into per signal time series.
+
+The CAN database is loaded through :class:`epyqlib.canneo.Neo` so node id
+adjustment and multiplexing are resolved exactly as in the GUI.  The
+resulting frame layouts are then copied to plain picklable specifications
+and each chunk of a trace is decoded with NumPy, a column of frames per
+signal at a time, rather than by emitting Qt signals per frame.  Large
+traces may be spread across several processes.
+"""
+
+import collections
+import concurrent.futures
+import csv
+import functools
+import itertools
+import json
+import pathlib
+
+import attr
+import canmatrix.formats
+import click
+import numpy
+
+import epyqlib.canneo
+import epyqlib.utils.canlogio
+from epyqlib.utils.canlog import FrameFlags
+
+# See file COPYING in this source tree
+__copyright__ = "Copyright 2020, EPC Power Corp."
+__license__ = "GPLv2+"
+
+
+def load_neo(path, node_id=None, controller_id=None):
+    """Load from a ``.sym`` or a ``.epc`` referencing one.  Node id
+    adjustment uses the ``.epc`` settings unless overridden."""
+    # imported here since epyqlib.txrx imports this module by way of
+    # epyqlib.utils.canstats and epyqlib.device imports epyqlib.txrx
+    import epyqlib.device
+
+    path = pathlib.Path(path)
+    node_id_type = None
+
+    if path.suffix.casefold() == ".epc":
+        with open(path) as f:
+            raw = json.load(f)
+
+        node_id_type = raw.get("node_id_type", next(iter(epyqlib.device.node_id_types)))
+        node_id = raw.get("node_id") if node_id is None else node_id
+        controller_id = (
+            raw.get("controller_id") if controller_id is None else controller_id
+        )
+        path = path.parent / raw["can_path"]
+
+    (matrix,) = canmatrix.formats.loadp(
+        str(path),
+        symImportEncoding="utf-8",
+    ).values()
+
+    node_id_adjust = None
+    if node_id_type is not None and node_id is not None:
+        node_id_adjust = functools.partial(
+            epyqlib.device.node_id_types[node_id_type.casefold()],
+            device_id=node_id,
+            controller_id=65 if controller_id is None else controller_id,
+        )
+
+    return epyqlib.canneo.Neo(matrix=matrix, node_id_adjust=node_id_adjust)
+
+
+@attr.s(frozen=True)
+class SignalSpec:
+    frame = attr.ib()
+    multiplex = attr.ib()
+    name = attr.ib()
+    start_bit = attr.ib()
+    size = attr.ib()
+    little_endian = attr.ib()
+    signed = attr.ib()
+    float = attr.ib()
+    factor = attr.ib()
+    offset = attr.ib()
+    unit = attr.ib()
+    enumeration = attr.ib(hash=False)
+
+    @classmethod
+    def from_neo(cls, signal, frame, multiplex):
+        return cls(
+            frame=frame,
+            multiplex=multiplex,
+            name=signal.name,
+            start_bit=signal.start_bit,
+            size=signal.signal_size,
+            little_endian=bool(signal.little_endian),
+            signed=bool(signal.signed),
+            float=bool(signal.float),
+            factor=float(1 if signal.factor is None else signal.factor),
+            offset=float(0 if signal.offset is None else signal.offset),
+            unit=signal.unit,
+            enumeration=dict(signal.enumeration),
+        )
+
+    @property
+    def path(self):
+        return tuple(
+            element
+            for element in (self.frame, self.multiplex, self.name)
+            if element is not None
+        )
+
+    def raw(self, little, big):
+        """Unpack the raw values from the frame payloads as unsigned 64 bit
+        integers in both byte orders, see :meth:`FrameSpec.payloads`."""
+        if self.little_endian:
+            shift = self.start_bit
+            source = little
+        else:
+            # matching epyqlib.canneo.bitstring_to_signal_list()
+            shift = 64 - self.start_bit - self.size
+            source = big
+
+        mask = numpy.uint64((1 << self.size) - 1)
+        raw = (source >> numpy.uint64(shift)) & mask
+
+        if self.float:
+            types = {32: ("<u4", "<f4"), 64: ("<u8", "<f8")}
+            integer, floating = types[self.size]
+
+            return raw.astype(integer).view(floating)
+
+        if self.signed:
+            raw = raw.astype("<i8")
+            if self.size < 64:
+                negative = raw >= (1 << (self.size - 1))
+                raw[negative] -= 1 << self.size
+
+        return raw
+
+    def scale(self, raw):
+        return self.offset + raw * self.factor
+
+
+@attr.s(frozen=True)
+class FrameSpec:
+    id = attr.ib()
+    extended = attr.ib()
+    name = attr.ib()
+    size = attr.ib()
+    signals = attr.ib()
+    multiplexer = attr.ib(default=None)
+    multiplexed = attr.ib(factory=dict, hash=False)
+
+    @classmethod
+    def from_neo(cls, frame):
+        multiplex_frames = getattr(frame, "multiplex_frames", None)
+
+        if multiplex_frames is None:
+            return cls(
+                id=frame.id,
+                extended=frame.extended,
+                name=frame.name,
+                size=frame.size,
+                signals=tuple(
+                    SignalSpec.from_neo(signal=signal, frame=frame.name, multiplex=None)
+                    for signal in frame.signals
+                ),
+            )
+
+        return cls(
+            id=frame.id,
+            extended=frame.extended,
+            name=frame.name,
+            size=frame.size,
+            signals=(),
+            multiplexer=SignalSpec.from_neo(
+                signal=frame.multiplex_signal,
+                frame=frame.name,
+                multiplex=None,
+            ),
+            multiplexed={
+                int(value): tuple(
+                    SignalSpec.from_neo(
+                        signal=signal,
+                        frame=frame.name,
+                        multiplex=multiplex_frame.mux_name,
+                    )
+                    for signal in multiplex_frame.signals
+                    if signal.multiplex is not True
+                )
+                for value, multiplex_frame in multiplex_frames.items()
+            },
+        )
+
+    def all_signals(self):
+        if self.multiplexer is not None:
+            yield self.multiplexer
+
+        yield from self.signals
+
+        for signals in self.multiplexed.values():
+            yield from signals
+
+    @staticmethod
+    def payloads(frames):
+        data = numpy.ascontiguousarray(frames["data"])
+
+        return data.view("<u8")[:, 0], data.view(">u8")[:, 0]
+
+
+@attr.s
+class Series:
+    """Scaled ``values``.  ``raw`` holds the unscaled integers as well for
+    enumerated signals since their names are keyed by those."""
+
+    timestamps = attr.ib()
+    values = attr.ib()
+    raw = attr.ib(default=None)
+
+
+def _series(signal, timestamps, raw):
+    return Series(
+        timestamps=timestamps,
+        values=signal.scale(raw),
+        raw=raw if len(signal.enumeration) > 0 else None,
+    )
+
+
+def _decode_signals(signals, timestamps, little, big, result):
+    for signal in signals:
+        result[signal] = _series(
+            signal=signal,
+            timestamps=timestamps,
+            raw=signal.raw(little=little, big=big),
+        )
+
+
+@attr.s(frozen=True)
+class Decoder:
+    """Decodes chunks of :data:`epyqlib.utils.canlog.frame_dtype` records.
+    Frames whose length differs from the database are skipped as in
+    :meth:`epyqlib.canneo.Frame.unpack`.  ``frames`` is keyed by
+    ``(id, extended)``."""
+
+    frames = attr.ib()
+
+    @classmethod
+    def from_neo(cls, neo):
+        return cls(
+            frames={
+                (frame.id, bool(frame.extended)): FrameSpec.from_neo(frame)
+                for frame in neo.frames
+                if frame.mux_frame is None or frame.mux_frame is frame
+            },
+        )
+
+    @classmethod
+    def from_path(cls, path, node_id=None, controller_id=None):
+        return cls.from_neo(
+            load_neo(path=path, node_id=node_id, controller_id=controller_id),
+        )
+
+    def signals(self):
+        for frame in self.frames.values():
+            yield from frame.all_signals()
+
+    def decode(self, frames):
+        """Map each :class:`SignalSpec` present in ``frames`` to a
+        :class:`Series`."""
+        result = {}
+
+        frames = frames[(frames["flags"] & (FrameFlags.error | FrameFlags.remote)) == 0]
+        # a standard and an extended frame may share an id
+        extended = (frames["flags"] & FrameFlags.extended) != 0
+        keys = frames["id"].astype(numpy.uint64) | (
+            extended.astype(numpy.uint64) << numpy.uint64(32)
+        )
+        keys, inverse = numpy.unique(keys, return_inverse=True)
+
+        for index, key in enumerate(keys.tolist()):
+            spec = self.frames.get((key & 0xFFFFFFFF, key >> 32 != 0))
+            if spec is None:
+                continue
+
+            selected = frames[inverse == index]
+            selected = selected[selected["dlc"] == spec.size]
+
+            if len(selected) == 0:
+                continue
+
+            timestamps = selected["timestamp"]
+            little, big = spec.payloads(selected)
+
+            _decode_signals(
+                signals=spec.signals,
+                timestamps=timestamps,
+                little=little,
+                big=big,
+                result=result,
+            )
+
+            if spec.multiplexer is None:
+                continue
+
+            multiplex = spec.multiplexer.raw(little=little, big=big)
+            result[spec.multiplexer] = _series(
+                signal=spec.multiplexer,
+                timestamps=timestamps,
+                raw=multiplex,
+            )
+
+            for value, signals in spec.multiplexed.items():
+                matches = multiplex == value
+
+                if not matches.any():
+                    continue
+
+                _decode_signals(
+                    signals=signals,
+                    timestamps=timestamps[matches],
+                    little=little[matches],
+                    big=big[matches],
+                    result=result,
+                )
+
+        return result
+
+    def decode_chunks(self, chunks, processes=1):
+        """Yield :meth:`decode` results for each chunk, in order.  With more
+        than one process only a few chunks per process are read ahead."""
+        if processes <= 1:
+            yield from (self.decode(chunk) for chunk in chunks)
+            return
+
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=processes,
+            initializer=_initialize_worker,
+            initargs=(self,),
+        ) as executor:
+            pending = collections.deque()
+
+            for chunk in chunks:
+                pending.append(executor.submit(_decode_in_worker, chunk))
+
+                if len(pending) >= 2 * processes:
+                    yield pending.popleft().result()
+
+            while len(pending) > 0:
+                yield pending.popleft().result()
+
+    def decode_all(self, chunks, processes=1):
+        """Collect each signal's complete :class:`Series`."""
+        collected = collections.defaultdict(list)
+
+        for decoded in self.decode_chunks(chunks=chunks, processes=processes):
+            for signal, series in decoded.items():
+                collected[signal].append(series)
+
+        return {
+            signal: Series(
+                timestamps=numpy.concatenate([s.timestamps for s in series]),
+                values=numpy.concatenate([s.values for s in series]),
+                raw=(
+                    None
+                    if series[0].raw is None
+                    else numpy.concatenate([s.raw for s in series])
+                ),
+            )
+            for signal, series in collected.items()
+        }
+
+
+# each worker process receives the decoder once rather than with every chunk
+_worker_decoder = None
+
+
+def _initialize_worker(decoder):
+    global _worker_decoder
+    _worker_decoder = decoder
+
+
+def _decode_in_worker(frames):
+    return _worker_decoder.decode(frames)
+
+
+columns = ("timestamp", "frame", "multiplex", "signal", "value", "unit", "text")
+
+
+def _rows(decoded):
+    for signal, series in decoded.items():
+        enumeration = signal.enumeration
+        if series.raw is None:
+            texts = itertools.repeat("")
+        else:
+            texts = (enumeration.get(raw, "") for raw in series.raw.tolist())
+
+        for timestamp, value, text in zip(
+            series.timestamps.tolist(),
+            series.values.tolist(),
+            texts,
+        ):
+            yield (
+                timestamp,
+                signal.frame,
+                signal.multiplex or "",
+                signal.name,
+                value,
+                signal.unit,
+                text,
+            )
+
+
+def write_csv(decoded_chunks, path):
+    """Write long format rows, one per decoded value."""
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+
+        for decoded in decoded_chunks:
+            writer.writerows(_rows(decoded))
+
+
+def write_parquet(decoded_chunks, path):
+    """Write the :func:`write_csv` rows as Parquet, a row group per chunk."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Package pyarrow expected but not found") from e
+
+    schema = pyarrow.schema(
+        [
+            ("timestamp", pyarrow.float64()),
+            ("frame", pyarrow.string()),
+            ("multiplex", pyarrow.string()),
+            ("signal", pyarrow.string()),
+            ("value", pyarrow.float64()),
+            ("unit", pyarrow.string()),
+            ("text", pyarrow.string()),
+        ]
+    )
+
+    with pyarrow.parquet.ParquetWriter(str(path), schema) as writer:
+        for decoded in decoded_chunks:
+            rows = list(zip(*_rows(decoded)))
+            if len(rows) == 0:
+                continue
+
+            writer.write_table(
+                pyarrow.Table.from_arrays(
+                    [pyarrow.array(column) for column in rows],
+                    schema=schema,
+                ),
+            )
+
+
+def write_hdf5(decoded_chunks, path):
+    """Write a group per signal, named by its path, holding ``timestamp``
+    and ``value`` datasets."""
+    try:
+        import h5py
+    except ImportError as e:
+        raise ImportError("Package h5py expected but not found") from e
+
+    with h5py.File(str(path), "w") as f:
+        for decoded in decoded_chunks:
+            for signal, series in decoded.items():
+                name = "/".join(signal.path)
+
+                if name not in f:
+                    group = f.create_group(name)
+                    group.attrs["unit"] = signal.unit
+                    group.attrs["enumeration"] = json.dumps(signal.enumeration)
+                    for dataset in ("timestamp", "value"):
+                        group.create_dataset(
+                            dataset,
+                            shape=(0,),
+                            maxshape=(None,),
+                            dtype="f8",
+                            chunks=True,
+                        )
+
+                group = f[name]
+                for dataset, values in (
+                    ("timestamp", series.timestamps),
+                    ("value", series.values),
+                ):
+                    dataset = group[dataset]
+                    start = len(dataset)
+                    dataset.resize((start + len(values),))
+                    dataset[start:] = values
+
+
+writers = {
+    ".csv": write_csv,
+    ".parquet": write_parquet,
+    ".h5": write_hdf5,
+    ".hdf5": write_hdf5,
+}
+
+
+def decode(
+    trace,
+    device,
+    output,
+    processes=1,
+    node_id=None,
+    controller_id=None,
+    chunk_size=epyqlib.utils.canlogio.default_chunk_size,
+):
+    """Decode ``trace`` using the ``.epc`` or ``.sym`` ``device`` to
+    ``output`` in the format indicated by its suffix."""
+    suffix = pathlib.Path(output).suffix.casefold()
+
+    try:
+        writer = writers[suffix]
+    except KeyError as e:
+        raise epyqlib.utils.canlogio.UnsupportedFormatError(
+            "No decoded output format known for {!r}".format(suffix),
+        ) from e
+
+    decoder = Decoder.from_path(
+        path=device,
+        node_id=node_id,
+        controller_id=controller_id,
+    )
+
+    writer(
+        decoder.decode_chunks(
+            chunks=epyqlib.utils.canlogio.read(trace, chunk_size=chunk_size),
+            processes=processes,
+        ),
+        output,
+    )
+
+
+def create_command():
+    @click.command()
+    @click.argument("trace", type=click.Path(exists=True, dir_okay=False))
+    @click.argument("device", type=click.Path(exists=True, dir_okay=False))
+    @click.argument("output", type=click.Path(dir_okay=False, writable=True))
+    @click.option("--processes", type=int, default=1, show_default=True)
+    @click.option("--node-id", type=int, default=None)
+    @click.option("--controller-id", type=int, default=None)
+    def cli(trace, device, output, processes, node_id, controller_id):
+        """Decode a trace into signal time series using a .epc or .sym.
+
+        The output format is chosen by the suffix of OUTPUT: .csv, .parquet
+        or .h5.
+        """
+        decode(
+            trace=trace,
+            device=device,
+            output=output,
+            processes=processes,
+            node_id=node_id,
+            controller_id=controller_id,
+        )
+
+    return cli
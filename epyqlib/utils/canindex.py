@@ -0,0 +1,363 @@
+"""Indexed CAN capture files.
+
+Frames are stored in chunks of columns (timestamps, ids, flags, DLCs and
+data) followed by a chunk table and an arbitration id table.  The chunk
+table holds each chunk's time range and the id table lists which chunks
+contain each id so a reader can binary search for the chunks overlapping a
+time range or id set and only touch those.  Frames within a chunk are kept
+in time order.
+
+The layout is::
+
+    magic
+    chunk 0 columns
+    ...
+    chunk n columns
+    chunk table
+    id table
+    trailer
+"""
+
+import struct
+
+import attr
+import numpy
+
+import epyqlib.utils.canlogio
+from epyqlib.utils.canlog import frame_dtype
+
+# See file COPYING in this source tree
+__copyright__ = "Copyright 2020, EPC Power Corp."
+__license__ = "GPLv2+"
+
+
+magic = b"EPYQCIX1"
+
+default_chunk_size = 65536
+
+chunk_dtype = numpy.dtype(
+    [
+        ("offset", "<u8"),
+        ("count", "<u4"),
+        ("first", "<f8"),
+        ("last", "<f8"),
+    ]
+)
+
+id_dtype = numpy.dtype([("id", "<u4"), ("chunk", "<u4")])
+
+_trailer = struct.Struct("<QQQQ8s")
+
+# (name, little endian scalar dtype, per frame shape) of each column
+_columns = tuple(
+    (
+        name,
+        frame_dtype.fields[name][0].base.newbyteorder("<"),
+        frame_dtype.fields[name][0].shape,
+    )
+    for name in frame_dtype.names
+)
+
+
+class InvalidFileError(Exception):
+    pass
+
+
+def _ids(ids):
+    if ids is None:
+        return None
+
+    return numpy.unique(numpy.asarray(list(ids), dtype="<u4"))
+
+
+class Writer:
+    """Write frames to an indexed capture file.  Frames may be written in
+    any number of :meth:`write` calls and are regrouped into chunks of
+    ``chunk_size`` frames.  :meth:`close` must be called, or the writer used
+    as a context manager, to write the index.
+    """
+
+    def __init__(self, path, chunk_size=default_chunk_size):
+        self.chunk_size = chunk_size
+        self.file = open(path, "wb")
+        self.file.write(magic)
+
+        self.pending = []
+        self.pending_count = 0
+        self.chunks = []
+        self.id_chunks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, frames):
+        for chunk in epyqlib.utils.canlogio.chunks(
+            frames,
+            chunk_size=self.chunk_size,
+        ):
+            self.pending.append(chunk)
+            self.pending_count += len(chunk)
+
+            if self.pending_count >= self.chunk_size:
+                self._flush(partial=False)
+
+    def _flush(self, partial):
+        frames = numpy.concatenate(
+            [numpy.zeros(0, dtype=frame_dtype), *self.pending],
+        )
+
+        end = len(frames) if partial else len(frames) - len(frames) % self.chunk_size
+
+        for start in range(0, end, self.chunk_size):
+            self._write_chunk(frames[start : start + self.chunk_size])
+
+        self.pending = [frames[end:]]
+        self.pending_count = len(frames) - end
+
+    def _write_chunk(self, frames):
+        if len(frames) == 0:
+            return
+
+        frames = frames[numpy.argsort(frames["timestamp"], kind="mergesort")]
+
+        self.chunks.append(
+            (
+                self.file.tell(),
+                len(frames),
+                frames["timestamp"][0],
+                frames["timestamp"][-1],
+            )
+        )
+
+        for name, dtype, _ in _columns:
+            self.file.write(numpy.ascontiguousarray(frames[name], dtype=dtype))
+
+        ids = numpy.unique(frames["id"])
+        chunk_ids = numpy.zeros(len(ids), dtype=id_dtype)
+        chunk_ids["id"] = ids
+        chunk_ids["chunk"] = len(self.chunks) - 1
+        self.id_chunks.append(chunk_ids)
+
+    def close(self):
+        if self.file is None:
+            return
+
+        self._flush(partial=True)
+
+        chunk_table = numpy.array(self.chunks, dtype=chunk_dtype)
+        id_table = numpy.concatenate([numpy.zeros(0, dtype=id_dtype), *self.id_chunks])
+        id_table = id_table[numpy.argsort(id_table, order=("id", "chunk"))]
+
+        chunk_table_offset = self.file.tell()
+        self.file.write(chunk_table.tobytes())
+        id_table_offset = self.file.tell()
+        self.file.write(id_table.tobytes())
+        self.file.write(
+            _trailer.pack(
+                chunk_table_offset,
+                len(chunk_table),
+                id_table_offset,
+                len(id_table),
+                magic,
+            )
+        )
+
+        self.file.close()
+        self.file = None
+
+
+def write(frames, path, chunk_size=default_chunk_size):
+    with Writer(path=path, chunk_size=chunk_size) as writer:
+        writer.write(frames)
+
+
+@attr.s
+class Reader:
+    """Random access to an indexed capture file written by :class:`Writer`.
+    The file is memory mapped so only the chunks actually read are loaded.
+    """
+
+    path = attr.ib()
+    data = attr.ib(init=False)
+    chunk_table = attr.ib(init=False)
+    id_table = attr.ib(init=False)
+    _latest_last = attr.ib(init=False)
+    _earliest_first = attr.ib(init=False)
+
+    def __attrs_post_init__(self):
+        self.data = numpy.memmap(self.path, dtype="u1", mode="r")
+
+        if len(self.data) < len(magic) + _trailer.size or (
+            bytes(self.data[: len(magic)]) != magic
+        ):
+            raise InvalidFileError(
+                "{} is not an indexed capture file".format(self.path),
+            )
+
+        (
+            chunk_table_offset,
+            chunk_count,
+            id_table_offset,
+            id_count,
+            trailing_magic,
+        ) = _trailer.unpack(bytes(self.data[-_trailer.size :]))
+
+        if trailing_magic != magic:
+            raise InvalidFileError(
+                "{} has no index, was it closed?".format(self.path),
+            )
+
+        self.chunk_table = numpy.frombuffer(
+            self.data,
+            dtype=chunk_dtype,
+            count=chunk_count,
+            offset=chunk_table_offset,
+        )
+        self.id_table = numpy.frombuffer(
+            self.data,
+            dtype=id_dtype,
+            count=id_count,
+            offset=id_table_offset,
+        )
+
+        # Chunks are only required to be sorted internally.  These running
+        # bounds keep the chunk search a binary search even when the chunks
+        # themselves overlap in time.
+        self._latest_last = numpy.maximum.accumulate(self.chunk_table["last"])
+        self._earliest_first = numpy.minimum.accumulate(
+            self.chunk_table["first"][::-1],
+        )[::-1]
+
+    def __len__(self):
+        return int(self.chunk_table["count"].sum())
+
+    def start_time(self):
+        if len(self.chunk_table) == 0:
+            return None
+
+        return float(self._earliest_first[0])
+
+    def end_time(self):
+        if len(self.chunk_table) == 0:
+            return None
+
+        return float(self._latest_last[-1])
+
+    def ids(self):
+        return numpy.unique(self.id_table["id"])
+
+    def chunk(self, index):
+        """All frames of the chunk at ``index``, in time order."""
+        offset, count, _, _ = self.chunk_table[index]
+        offset = int(offset)
+        count = int(count)
+
+        frames = numpy.zeros(count, dtype=frame_dtype)
+
+        for name, dtype, shape in _columns:
+            values = count * int(numpy.prod(shape))
+            column = numpy.frombuffer(
+                self.data,
+                dtype=dtype,
+                count=values,
+                offset=offset,
+            )
+            frames[name] = column.reshape((count, *shape))
+            offset += values * dtype.itemsize
+
+        return frames
+
+    def chunk_indexes(self, start=None, end=None, ids=None):
+        """Indexes of the chunks which may hold frames with ``start <= time <
+        end`` and an arbitration id in ``ids``.  ``None`` leaves that
+        criterion open."""
+        first = 0
+        stop = len(self.chunk_table)
+
+        if start is not None:
+            first = numpy.searchsorted(self._latest_last, start, side="left")
+
+        if end is not None:
+            stop = numpy.searchsorted(self._earliest_first, end, side="left")
+
+        indexes = numpy.arange(first, max(first, stop))
+
+        ids = _ids(ids)
+        if ids is not None:
+            left = numpy.searchsorted(self.id_table["id"], ids, side="left")
+            right = numpy.searchsorted(self.id_table["id"], ids, side="right")
+            with_ids = numpy.unique(
+                numpy.concatenate(
+                    [
+                        numpy.zeros(0, dtype="<u4"),
+                        *(self.id_table["chunk"][l:r] for l, r in zip(left, right)),
+                    ]
+                )
+            )
+            indexes = numpy.intersect1d(indexes, with_ids, assume_unique=True)
+
+        return indexes
+
+    def chunks(self, start=None, end=None, ids=None):
+        """Yield the matching frames of each chunk that has any."""
+        ids = _ids(ids)
+
+        for index in self.chunk_indexes(start=start, end=end, ids=ids):
+            frames = self.chunk(index)
+            timestamps = frames["timestamp"]
+
+            begin = 0
+            finish = len(frames)
+            if start is not None:
+                begin = numpy.searchsorted(timestamps, start, side="left")
+            if end is not None:
+                finish = numpy.searchsorted(timestamps, end, side="left")
+
+            frames = frames[begin:finish]
+
+            if ids is not None:
+                frames = frames[numpy.isin(frames["id"], ids)]
+
+            if len(frames) > 0:
+                yield frames
+
+    def read(self, start=None, end=None, ids=None):
+        """Frames with ``start <= time < end`` and an arbitration id in
+        ``ids``, in order of chunk."""
+        return epyqlib.utils.canlogio.concatenate(
+            self.chunks(start=start, end=end, ids=ids),
+        )
+
+    def latest(self, time, id):
+        """The last frame with arbitration ``id`` at or before ``time``, or
+        ``None`` if there is none."""
+        indexes = self.chunk_indexes(end=numpy.nextafter(time, numpy.inf), ids=[id])
+
+        best = None
+
+        for index in indexes[::-1]:
+            if best is not None and self._latest_last[index] < best["timestamp"]:
+                # no earlier chunk can hold anything later than best
+                break
+
+            frames = self.chunk(index)
+            frames = frames[: numpy.searchsorted(frames["timestamp"], time, "right")]
+            frames = frames[frames["id"] == id]
+
+            if len(frames) > 0 and (
+                best is None or frames[-1]["timestamp"] >= best["timestamp"]
+            ):
+                best = frames[-1]
+
+        return best
+
+
+def read(path):
+    """Yield all chunks of the indexed capture at ``path``."""
+    reader = Reader(path=path)
+
+    for index in range(len(reader.chunk_table)):
+        yield reader.chunk(index)
@@ -1,9 +1,16 @@
 import collections
+import enum
 import io
+import itertools
 import math
+import os
+import struct
 import textwrap
+import threading
 
 import attr
+import can
+import numpy
 
 import epyqlib.utils.general
 import epyqlib.canneo
@@ -48,6 +55,17 @@ class Log(epyqlib.canneo.QtCanListener):
         self.clear()
         self.start()
 
+    def frames(self):
+        return frames_from_messages(self.messages)
+
+    def write_indexed(self, path):
+        """Write the logged messages to an indexed capture file, see
+        :mod:`epyqlib.utils.canindex`."""
+        # canindex builds on this module so it can't be imported at the top
+        import epyqlib.utils.canindex
+
+        epyqlib.utils.canindex.write(self.frames(), path)
+
     def minimum_timestamp(self):
         timestamps = (m.time for m in self.messages if m.time is not None)
 
@@ -57,6 +75,244 @@ class Log(epyqlib.canneo.QtCanListener):
         return None
 
 
+class FrameFlags(enum.IntFlag):
+    extended = 0x01
+    remote = 0x02
+    error = 0x04
+    tx = 0x08
+
+
+frame_dtype = numpy.dtype(
+    [
+        ("timestamp", "f8"),
+        ("id", "u4"),
+        ("flags", "u1"),
+        ("dlc", "u1"),
+        ("data", "u1", (8,)),
+    ]
+)
+
+_frame_struct = struct.Struct("<dIBB8s")
+assert _frame_struct.size == frame_dtype.itemsize
+
+
+# plain ints since IntFlag operations are slow for per frame use
+_extended = int(FrameFlags.extended)
+_remote = int(FrameFlags.remote)
+_error = int(FrameFlags.error)
+
+
+def flags_from_pythoncan(message):
+    flags = 0
+
+    if message.is_extended_id:
+        flags |= _extended
+    if message.is_remote_frame:
+        flags |= _remote
+    if message.is_error_frame:
+        flags |= _error
+
+    return flags
+
+
+def message_types(flags):
+    """The :class:`MessageType` values for an array of :class:`FrameFlags`."""
+    types = numpy.full(len(flags), MessageType.Rx, dtype="u1")
+    types[(flags & FrameFlags.tx) != 0] = MessageType.Tx
+    types[(flags & FrameFlags.error) != 0] = MessageType.Error
+
+    return types
+
+
+class Capture(can.Listener):
+    """Record frames into preallocated :data:`frame_dtype` records.
+
+    Frames are stored from the python-can notifier thread, such as by
+    :meth:`epyqlib.busproxy.BusProxy.add_capture`, without passing through
+    Qt.  Without a ``path`` the newest ``capacity`` frames are kept and
+    :attr:`overwritten` counts those discarded.  With a ``path`` the records
+    are a memory mapped file which grows by ``capacity`` frames whenever it
+    fills so captures are limited only by disk space.  After :meth:`close`
+    the file holds exactly the captured records and may be read with
+    :func:`load_capture`.
+    """
+
+    def __init__(self, capacity=2 ** 20, path=None):
+        self.capacity = capacity
+        self.path = path
+
+        self._lock = threading.Lock()
+        self._active = False
+        self._records = None
+        self._buffer = None
+        self._count = 0
+        self.overwritten = 0
+
+        self.clear()
+
+    def __len__(self):
+        return min(self._count, len(self._records))
+
+    def _release(self):
+        if self._buffer is not None:
+            self._buffer.release()
+            self._buffer = None
+
+        if isinstance(self._records, numpy.memmap):
+            self._records.flush()
+
+        self._records = None
+
+    def _allocate(self, size):
+        self._release()
+
+        if self.path is None:
+            self._records = numpy.zeros(size, dtype=frame_dtype)
+        else:
+            # existing records are kept when growing
+            with open(self.path, "ab") as f:
+                f.truncate(size * frame_dtype.itemsize)
+
+            self._records = numpy.memmap(
+                self.path,
+                dtype=frame_dtype,
+                mode="r+",
+                shape=(size,),
+            )
+
+        self._buffer = memoryview(self._records).cast("B")
+
+    def on_message_received(self, msg):
+        if not self._active:
+            return
+
+        with self._lock:
+            size = len(self._records)
+
+            if self._count >= size:
+                if self.path is None:
+                    self.overwritten += 1
+                else:
+                    self._allocate(size=size + self.capacity)
+                    size = len(self._records)
+
+            _frame_struct.pack_into(
+                self._buffer,
+                (self._count % size) * frame_dtype.itemsize,
+                msg.timestamp,
+                msg.arbitration_id,
+                flags_from_pythoncan(msg),
+                msg.dlc,
+                bytes(msg.data[:8]),
+            )
+            self._count += 1
+
+    def start(self):
+        self._active = True
+
+    def stop(self):
+        self._active = False
+
+    def clear(self):
+        with self._lock:
+            self._release()
+            self._count = 0
+            self.overwritten = 0
+
+            if self.path is not None:
+                with open(self.path, "wb"):
+                    pass
+
+            self._allocate(size=self.capacity)
+
+    def restart(self):
+        self.clear()
+        self.start()
+
+    def close(self):
+        """Stop capturing and trim the file, if any, to the captured frames."""
+        self.stop()
+
+        if self.path is None:
+            return
+
+        with self._lock:
+            self._release()
+
+            with open(self.path, "r+b") as f:
+                f.truncate(self._count * frame_dtype.itemsize)
+
+    def frames(self):
+        """A chronologically ordered copy of the captured records."""
+        with self._lock:
+            size = len(self._records)
+            if self._count <= size:
+                return numpy.array(self._records[: self._count])
+
+            start = self._count % size
+            return numpy.concatenate(
+                (self._records[start:], self._records[:start]),
+            )
+
+    def minimum_timestamp(self):
+        frames = self.frames()
+
+        if len(frames) == 0:
+            return None
+
+        return frames["timestamp"].min()
+
+    def messages(self):
+        return messages_from_frames(self.frames())
+
+
+def load_capture(path, mode="r"):
+    """Memory map a capture file written by :class:`Capture`."""
+    if os.path.getsize(path) == 0:
+        # empty files can't be mapped
+        return numpy.zeros(0, dtype=frame_dtype)
+
+    return numpy.memmap(path, dtype=frame_dtype, mode=mode)
+
+
+def frames_from_messages(messages):
+    """Convert :class:`Message` objects to :data:`frame_dtype` records."""
+    messages = list(messages)
+    frames = numpy.zeros(len(messages), dtype=frame_dtype)
+
+    for frame, message in zip(frames, messages):
+        flags = 0
+        if message.id.extended:
+            flags |= FrameFlags.extended
+        if message.type == MessageType.Tx:
+            flags |= FrameFlags.tx
+        elif message.type == MessageType.Error:
+            flags |= FrameFlags.error
+
+        frame["timestamp"] = message.time
+        frame["id"] = message.id.value
+        frame["flags"] = flags
+        frame["dlc"] = message.length
+        frame["data"][: message.length] = tuple(message.data)
+
+    return frames
+
+
+def messages_from_frames(frames):
+    types = message_types(frames["flags"])
+
+    for frame, type in zip(frames, types):
+        yield Message(
+            time=float(frame["timestamp"]),
+            type=MessageType(type),
+            id=Id(
+                value=int(frame["id"]),
+                extended=bool(frame["flags"] & FrameFlags.extended),
+            ),
+            data=bytearray(frame["data"][: frame["dlc"]]),
+        )
+
+
 @attr.s
 class Id:
     value = attr.ib()
@@ -115,56 +371,231 @@ def to_trc_v1_1_s(messages):
     return s.read()
 
 
-def to_trc_v1_1(messages, f):
-    header = textwrap.dedent(
-        """\
-        ;$FILEVERSION=1.1
-        ;$STARTTIME={start_time}
-        ;
-        ;   {path}
-        ;
-        ;   Start time: {start_string}
-        ;   Generated by EPyQ {version_string}
-        ;
-        ;   Message Number
-        ;   |         Time Offset (ms)
-        ;   |         |        Type
-        ;   |         |        |        ID (hex)
-        ;   |         |        |        |     Data Length
-        ;   |         |        |        |     |   Data Bytes (hex) ...
-        ;   |         |        |        |     |   |
-        ;---+--   ----+----  --+--  ----+---  +  -+ -- -- -- -- -- -- --"""
-    ).format(start_time=0, path=f.name, start_string="", version_string="")
-
-    format = "  ".join(
+trc_v1_1_header = textwrap.dedent(
+    """\
+    ;$FILEVERSION=1.1
+    ;$STARTTIME={start_time}
+    ;
+    ;   {path}
+    ;
+    ;   Start time: {start_string}
+    ;   Generated by EPyQ {version_string}
+    ;
+    ;   Message Number
+    ;   |         Time Offset (ms)
+    ;   |         |        Type
+    ;   |         |        |        ID (hex)
+    ;   |         |        |        |     Data Length
+    ;   |         |        |        |     |   Data Bytes (hex) ...
+    ;   |         |        |        |     |   |
+    ;---+--   ----+----  --+--  ----+---  +  -+ -- -- -- -- -- -- --"""
+)
+
+trc_v1_1_format = (
+    "  ".join(
         (
             "{i: 6d})",
             "{ms: 10.1f}",
             "{type:<5s}",
-            "{id:08X}",
+            "{id:>8s}",
             "{length:1d}",
             "{data}",
         )
     )
-    format += " \n"
+    + " \n"
+)
+
+trc_v1_3_header = textwrap.dedent(
+    """\
+    ;$FILEVERSION=1.3
+    ;$STARTTIME={start_time}
+    ;
+    ;   {path}
+    ;
+    ;   Start time: {start_string}
+    ;   Generated by EPyQ {version_string}
+    ;
+    ;   Message   Time    Bus  Type   ID    Reserved
+    ;   Number    Offset  |    |      [hex] |   Data Length Code
+    ;   |         [ms]    |    |      |     |   |    Data [hex] ...
+    ;   |         |       |    |      |     |   |    |
+    ;---+-- ------+------ +- --+-- ----+--- +- -+-- -+ -- -- -- -- -- -- --"""
+)
+
+trc_v1_3_format = (
+    " ".join(
+        (
+            "{i:6d})",
+            "{ms:11.1f}",
+            "{bus:<2d}",
+            "{type:<5s}",
+            "{id:>8s}",
+            "- ",
+            "{length:<4d}",
+            "{data}",
+        )
+    )
+    + " \n"
+)
+
+
+def write_trc_header(f, header):
+    header = header.format(
+        start_time=0,
+        path=getattr(f, "name", ""),
+        start_string="",
+        version_string="",
+    )
 
     for line in header.splitlines():
         f.write(line.rstrip() + "\n")
 
+
+def to_trc_v1_1(messages, f):
+    write_trc_header(f=f, header=trc_v1_1_header)
+
+    if isinstance(messages, Capture):
+        messages = messages.frames()
+
+    if isinstance(messages, numpy.ndarray):
+        write_trc_v1_1_frames(frames=messages, f=f)
+        return
+
     for i, message in enumerate(messages, start=1):
         f.write(
-            format.format(
+            trc_v1_1_format.format(
                 i=i,
                 ms=message.ms,
                 type=message.type.name,
-                id=message.id.value,
+                id=trc_id(id=message.id.value, extended=message.id.extended),
                 length=message.length,
                 data=message.data_string_spaced,
             )
         )
 
 
-def to_trc_v1_3(messages, bus):
+def trc_id(id, extended):
+    # readers take ids of more than four digits to be extended
+    return ("{:08X}" if extended else "{:04X}").format(id)
+
+
+_hex_bytes = tuple("{:02X}".format(b) for b in range(256))
+
+_type_names = {int(type): type.name for type in MessageType}
+
+
+def _trc_columns(frames):
+    """Python lists of the TRC columns of ``frames`` for fast formatting."""
+    remote = ((frames["flags"] & FrameFlags.remote) != 0).tolist()
+    lengths = frames["dlc"].tolist()
+
+    data = [
+        "RTR" if r else " ".join([_hex_bytes[b] for b in d[:length]])
+        for r, d, length in zip(remote, frames["data"].tolist(), lengths)
+    ]
+
+    extended = ((frames["flags"] & FrameFlags.extended) != 0).tolist()
+
+    return {
+        "ms": (frames["timestamp"] * 1000).tolist(),
+        "id": [
+            trc_id(id=id, extended=e) for e, id in zip(extended, frames["id"].tolist())
+        ],
+        "type": [_type_names[t] for t in message_types(frames["flags"]).tolist()],
+        "length": lengths,
+        "data": data,
+    }
+
+
+def write_trc_v1_1_frames(frames, f, first=1, chunk_size=65536):
+    """Write the lines for :data:`frame_dtype` records numbered from
+    ``first``.  Returns the next number.
+    """
+    for start in range(0, len(frames), chunk_size):
+        chunk = frames[start : start + chunk_size]
+        columns = _trc_columns(chunk)
+
+        f.write(
+            "".join(
+                trc_v1_1_format.format(
+                    i=i,
+                    ms=ms,
+                    type=type,
+                    id=id,
+                    length=length,
+                    data=data,
+                )
+                for i, ms, type, id, length, data in zip(
+                    itertools.count(first + start),
+                    columns["ms"],
+                    columns["type"],
+                    columns["id"],
+                    columns["length"],
+                    columns["data"],
+                )
+            )
+        )
+
+    return first + len(frames)
+
+
+def write_trc_v1_3_frames(frames, buses, f, first=1, chunk_size=65536):
+    """Write the lines for :data:`frame_dtype` records received on the
+    corresponding ``buses`` numbered from ``first``.  Returns the next
+    number.
+    """
+    buses = numpy.broadcast_to(buses, frames.shape)
+
+    for start in range(0, len(frames), chunk_size):
+        chunk = frames[start : start + chunk_size]
+        columns = _trc_columns(chunk)
+
+        f.write(
+            "".join(
+                trc_v1_3_format.format(
+                    i=i,
+                    ms=ms,
+                    bus=bus,
+                    type=type,
+                    id=id,
+                    length=length,
+                    data=data,
+                )
+                for i, ms, bus, type, id, length, data in zip(
+                    itertools.count(first + start),
+                    columns["ms"],
+                    buses[start : start + chunk_size].tolist(),
+                    columns["type"],
+                    columns["id"],
+                    columns["length"],
+                    columns["data"],
+                )
+            )
+        )
+
+    return first + len(frames)
+
+
+def to_trc_v1_3(messages, f):
     """`messages` should be a dict.  Keys are bus numbers and values are
-    iterables of messages"""
-    raise Exception("Not implemented")
+    iterables of messages, :class:`Capture` objects or :data:`frame_dtype`
+    records.  The messages from all buses are written in time order."""
+    all_frames = []
+    all_buses = []
+
+    for bus, frames in messages.items():
+        if isinstance(frames, Capture):
+            frames = frames.frames()
+        elif not isinstance(frames, numpy.ndarray):
+            frames = frames_from_messages(frames)
+
+        all_frames.append(frames)
+        all_buses.append(numpy.full(len(frames), bus, dtype="u1"))
+
+    frames = numpy.concatenate(all_frames or [numpy.zeros(0, dtype=frame_dtype)])
+    buses = numpy.concatenate(all_buses or [numpy.zeros(0, dtype="u1")])
+
+    order = numpy.argsort(frames["timestamp"], kind="mergesort")
+
+    write_trc_header(f=f, header=trc_v1_3_header)
+    write_trc_v1_3_frames(frames=frames[order], buses=buses[order], f=f)
@@ -0,0 +1,470 @@
+"""Chunked readers and writers of CAN trace files.
+
+Readers yield :data:`epyqlib.utils.canlog.frame_dtype` record arrays of up
+to ``chunk_size`` frames so arbitrarily long traces can be streamed.  Writers
+accept a record array, a :class:`epyqlib.utils.canlog.Capture` or an
+iterable of record arrays.  Text lines are split in Python while the
+numeric conversion of each chunk is done by NumPy.
+"""
+
+import functools
+import itertools
+import pathlib
+
+import can
+import numpy
+
+import epyqlib.utils.canindex
+import epyqlib.utils.canlog
+from epyqlib.utils.canlog import FrameFlags, frame_dtype
+
+# See file COPYING in this source tree
+__copyright__ = "Copyright 2020, EPC Power Corp."
+__license__ = "GPLv2+"
+
+
+default_chunk_size = 65536
+
+# days from the OLE automation epoch used by TRC $STARTTIME to the Unix epoch
+_ole_to_unix_days = 25569
+
+_can_error_flag = 0x20000000
+
+# plain ints since IntFlag operations are slow for per line use
+_extended = int(FrameFlags.extended)
+_remote = int(FrameFlags.remote)
+
+
+class UnsupportedFormatError(Exception):
+    pass
+
+
+def chunks(frames, chunk_size=default_chunk_size):
+    """Normalize a record array, capture or iterable of record arrays to an
+    iterable of record arrays."""
+    if isinstance(frames, epyqlib.utils.canlog.Capture):
+        frames = frames.frames()
+
+    if isinstance(frames, numpy.ndarray):
+        for start in range(0, len(frames), chunk_size):
+            yield frames[start : start + chunk_size]
+
+        return
+
+    yield from frames
+
+
+def concatenate(frames):
+    """Collect all frames from :func:`chunks` compatible ``frames``."""
+    return numpy.concatenate(
+        [numpy.zeros(0, dtype=frame_dtype), *chunks(frames)],
+    )
+
+
+def _lines(f, chunk_size):
+    while True:
+        lines = list(itertools.islice(f, chunk_size))
+        if len(lines) == 0:
+            return
+
+        yield lines
+
+
+def _frames(timestamps, ids, flags, dlcs, data):
+    """Build records from the per line columns collected by a parser.
+
+    ``ids`` are hex strings and ``data`` are hex strings of up to 16
+    characters.
+    """
+    frames = numpy.zeros(len(timestamps), dtype=frame_dtype)
+
+    if len(frames) == 0:
+        return frames
+
+    frames["timestamp"] = numpy.array(timestamps, dtype="f8")
+    frames["id"] = numpy.frombuffer(
+        bytes.fromhex("".join([id.zfill(8) for id in ids])),
+        dtype=">u4",
+    )
+    frames["flags"] = flags
+    frames["dlc"] = dlcs
+    frames["data"] = numpy.frombuffer(
+        bytes.fromhex("".join([d.ljust(16, "0")[:16] for d in data])),
+        dtype="u1",
+    ).reshape(-1, 8)
+
+    return frames
+
+
+_trc_types = {
+    "Rx": 0,
+    "Tx": int(FrameFlags.tx),
+    "Error": int(FrameFlags.error),
+}
+
+
+def read_trc(f, chunk_size=default_chunk_size):
+    """Read PCAN TRC 1.1 or 1.3 text from ``f``.
+
+    Frame times are the offsets from ``$STARTTIME``, or from the Unix epoch
+    when it is present and not zero.  The 1.3 bus column is not kept.
+    Lines of other types, such as warnings, are skipped.
+    """
+    version = "1.1"
+    start = 0
+
+    for lines in _lines(f, chunk_size=chunk_size):
+        timestamps = []
+        ids = []
+        flags = []
+        dlcs = []
+        data = []
+
+        for line in lines:
+            tokens = line.split()
+
+            if len(tokens) == 0:
+                continue
+
+            if tokens[0].startswith(";"):
+                if tokens[0].startswith(";$FILEVERSION="):
+                    version = tokens[0].partition("=")[2]
+                elif tokens[0].startswith(";$STARTTIME="):
+                    days = float(tokens[0].partition("=")[2])
+                    if days != 0:
+                        start = (days - _ole_to_unix_days) * 24 * 60 * 60
+                continue
+
+            if version == "1.1":
+                _, ms, type, id, dlc, *payload = tokens
+            elif version == "1.3":
+                _, ms, _, type, id, _, dlc, *payload = tokens
+            else:
+                raise UnsupportedFormatError(
+                    "TRC version {} is not supported".format(version),
+                )
+
+            type_flags = _trc_types.get(type)
+            if type_flags is None:
+                continue
+
+            if len(id) > 4:
+                type_flags |= _extended
+
+            if payload[:1] == ["RTR"]:
+                type_flags |= _remote
+                payload = ()
+            else:
+                # anything after the data is a comment
+                payload = payload[: int(dlc)]
+
+            timestamps.append(ms)
+            ids.append(id)
+            flags.append(type_flags)
+            dlcs.append(dlc)
+            data.append("".join(payload))
+
+        frames = _frames(
+            timestamps=timestamps,
+            ids=ids,
+            flags=flags,
+            dlcs=dlcs,
+            data=data,
+        )
+        frames["timestamp"] /= 1000
+        frames["timestamp"] += start
+
+        yield frames
+
+
+def write_trc(frames, f, version="1.1", bus=1, chunk_size=default_chunk_size):
+    """Write PCAN TRC 1.1 or 1.3, all on ``bus`` for 1.3, to ``f``."""
+    if version == "1.1":
+        epyqlib.utils.canlog.write_trc_header(
+            f=f,
+            header=epyqlib.utils.canlog.trc_v1_1_header,
+        )
+        write = epyqlib.utils.canlog.write_trc_v1_1_frames
+    elif version == "1.3":
+        epyqlib.utils.canlog.write_trc_header(
+            f=f,
+            header=epyqlib.utils.canlog.trc_v1_3_header,
+        )
+        write = functools.partial(
+            epyqlib.utils.canlog.write_trc_v1_3_frames,
+            buses=bus,
+        )
+    else:
+        raise UnsupportedFormatError(
+            "TRC version {} is not supported".format(version),
+        )
+
+    first = 1
+    for chunk in chunks(frames, chunk_size=chunk_size):
+        first = write(frames=chunk, f=f, first=first)
+
+
+def read_candump(f, chunk_size=default_chunk_size):
+    """Read the SocketCAN ``candump -l`` log format from ``f``.
+
+    CAN FD frames are truncated to their first eight bytes.
+    """
+    for lines in _lines(f, chunk_size=chunk_size):
+        timestamps = []
+        ids = []
+        flags = []
+        dlcs = []
+        data = []
+
+        for line in lines:
+            tokens = line.split()
+
+            if len(tokens) < 3:
+                continue
+
+            id, _, payload = tokens[2].partition("#")
+
+            if id == "FFFFFFFF":
+                # comment markers, not frames
+                continue
+
+            frame_flags = 0
+
+            if len(id) > 3:
+                frame_flags |= _extended
+
+            if payload.startswith("#"):
+                # CAN FD, skip the flags nibble
+                payload = payload[2:18]
+                dlc = len(payload) // 2
+            elif payload.startswith("R"):
+                frame_flags |= _remote
+                dlc = int(payload[1:] or 0)
+                payload = ""
+            else:
+                dlc = len(payload) // 2
+
+            timestamps.append(tokens[0].strip("()"))
+            ids.append(id)
+            flags.append(frame_flags)
+            dlcs.append(min(dlc, 8))
+            data.append(payload)
+
+        frames = _frames(
+            timestamps=timestamps,
+            ids=ids,
+            flags=flags,
+            dlcs=dlcs,
+            data=data,
+        )
+
+        error = (frames["flags"] & FrameFlags.extended != 0) & (
+            frames["id"] & _can_error_flag != 0
+        )
+        frames["flags"][error] |= numpy.uint8(FrameFlags.error)
+        frames["flags"][error] &= ~numpy.uint8(FrameFlags.extended)
+        frames["id"][error] &= ~numpy.uint32(_can_error_flag)
+
+        yield frames
+
+
+def write_candump(frames, f, channel="can0", chunk_size=default_chunk_size):
+    """Write the SocketCAN ``candump -l`` log format to ``f``."""
+    for chunk in chunks(frames, chunk_size=chunk_size):
+        flags = chunk["flags"]
+        error = (flags & FrameFlags.error) != 0
+        extended = ((flags & FrameFlags.extended) != 0) | error
+        remote = ((flags & FrameFlags.remote) != 0).tolist()
+
+        ids = numpy.where(error, chunk["id"] | _can_error_flag, chunk["id"])
+        hexed = chunk["data"].tobytes().hex().upper()
+
+        f.write(
+            "".join(
+                "({:.6f}) {} {}#{}\n".format(
+                    timestamp,
+                    channel,
+                    ("{:08X}" if e else "{:03X}").format(id),
+                    (
+                        "R{}".format(dlc or "")
+                        if r
+                        else hexed[16 * i : 16 * i + 2 * dlc]
+                    ),
+                )
+                for i, (timestamp, e, r, id, dlc) in enumerate(
+                    zip(
+                        chunk["timestamp"].tolist(),
+                        extended.tolist(),
+                        remote,
+                        ids.tolist(),
+                        chunk["dlc"].tolist(),
+                    )
+                )
+            )
+        )
+
+
+def frames_from_pythoncan(messages):
+    """Convert :class:`can.Message` objects to records."""
+    messages = list(messages)
+    frames = numpy.zeros(len(messages), dtype=frame_dtype)
+
+    if len(messages) == 0:
+        return frames
+
+    frames["timestamp"] = [message.timestamp for message in messages]
+    frames["id"] = [message.arbitration_id for message in messages]
+    frames["flags"] = [
+        epyqlib.utils.canlog.flags_from_pythoncan(message) for message in messages
+    ]
+    frames["dlc"] = [min(message.dlc, 8) for message in messages]
+    frames["data"] = numpy.frombuffer(
+        b"".join(bytes(message.data[:8]).ljust(8, b"\0") for message in messages),
+        dtype="u1",
+    ).reshape(-1, 8)
+
+    return frames
+
+
+def messages_to_pythoncan(frames, chunk_size=default_chunk_size):
+    """Convert records to :class:`can.Message` objects."""
+    for chunk in chunks(frames, chunk_size=chunk_size):
+        flags = chunk["flags"]
+
+        yield from (
+            can.Message(
+                timestamp=timestamp,
+                arbitration_id=id,
+                is_extended_id=extended,
+                is_remote_frame=remote,
+                is_error_frame=error,
+                dlc=dlc,
+                data=data[:dlc],
+            )
+            for timestamp, id, extended, remote, error, dlc, data in zip(
+                chunk["timestamp"].tolist(),
+                chunk["id"].tolist(),
+                ((flags & FrameFlags.extended) != 0).tolist(),
+                ((flags & FrameFlags.remote) != 0).tolist(),
+                ((flags & FrameFlags.error) != 0).tolist(),
+                chunk["dlc"].tolist(),
+                chunk["data"].tolist(),
+            )
+        )
+
+
+def read_pythoncan(reader, chunk_size=default_chunk_size):
+    """Read records from a python-can reader such as :class:`can.BLFReader`."""
+    messages = iter(reader)
+
+    while True:
+        frames = frames_from_pythoncan(itertools.islice(messages, chunk_size))
+
+        if len(frames) == 0:
+            return
+
+        yield frames
+
+
+def write_pythoncan(frames, writer, chunk_size=default_chunk_size):
+    """Write records to a python-can writer such as :class:`can.BLFWriter`."""
+    try:
+        for message in messages_to_pythoncan(frames, chunk_size=chunk_size):
+            writer.on_message_received(message)
+    finally:
+        writer.stop()
+
+
+def read_blf(path, chunk_size=default_chunk_size):
+    yield from read_pythoncan(can.BLFReader(str(path)), chunk_size=chunk_size)
+
+
+def write_blf(frames, path, chunk_size=default_chunk_size):
+    write_pythoncan(frames, can.BLFWriter(str(path)), chunk_size=chunk_size)
+
+
+def read_asc(path, chunk_size=default_chunk_size):
+    yield from read_pythoncan(can.ASCReader(str(path)), chunk_size=chunk_size)
+
+
+def write_asc(frames, path, chunk_size=default_chunk_size):
+    write_pythoncan(frames, can.ASCWriter(str(path)), chunk_size=chunk_size)
+
+
+def read_capture(path, chunk_size=default_chunk_size):
+    """Read a file written by :class:`epyqlib.utils.canlog.Capture`."""
+    yield from chunks(epyqlib.utils.canlog.load_capture(path), chunk_size=chunk_size)
+
+
+def write_capture(frames, path, chunk_size=default_chunk_size):
+    with open(path, "wb") as f:
+        for chunk in chunks(frames, chunk_size=chunk_size):
+            f.write(numpy.ascontiguousarray(chunk).tobytes())
+
+
+def read_indexed(path, chunk_size=default_chunk_size):
+    yield from chunks(epyqlib.utils.canindex.read(path), chunk_size=chunk_size)
+
+
+def write_indexed(frames, path, chunk_size=default_chunk_size):
+    epyqlib.utils.canindex.write(frames, path, chunk_size=chunk_size)
+
+
+def _read_text(read):
+    def read_path(path, chunk_size=default_chunk_size):
+        with open(path) as f:
+            yield from read(f, chunk_size=chunk_size)
+
+    return read_path
+
+
+def _write_text(write):
+    def write_path(frames, path, chunk_size=default_chunk_size):
+        with open(path, "w") as f:
+            write(frames, f, chunk_size=chunk_size)
+
+    return write_path
+
+
+readers = {
+    ".trc": _read_text(read_trc),
+    ".log": _read_text(read_candump),
+    ".blf": read_blf,
+    ".asc": read_asc,
+    ".cap": read_capture,
+    ".cix": read_indexed,
+}
+
+writers = {
+    ".trc": _write_text(write_trc),
+    ".log": _write_text(write_candump),
+    ".blf": write_blf,
+    ".asc": write_asc,
+    ".cap": write_capture,
+    ".cix": write_indexed,
+}
+
+
+def _lookup(table, path):
+    suffix = pathlib.Path(path).suffix.lower()
+
+    try:
+        return table[suffix]
+    except KeyError as e:
+        raise UnsupportedFormatError(
+            "No CAN trace format known for {!r}".format(suffix),
+        ) from e
+
+
+def read(path, chunk_size=default_chunk_size):
+    """Read the trace at ``path`` in the format indicated by its suffix."""
+    return _lookup(readers, path)(path, chunk_size=chunk_size)
+
+
+def write(frames, path, chunk_size=default_chunk_size):
+    """Write a trace to ``path`` in the format indicated by its suffix."""
+    _lookup(writers, path)(frames, path, chunk_size=chunk_size)
+
+
+def convert(source, destination, chunk_size=default_chunk_size):
+    write(read(source, chunk_size=chunk_size), destination, chunk_size=chunk_size)
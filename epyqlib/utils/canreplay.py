@@ -0,0 +1,341 @@
+"""Replay captured CAN traffic onto a python-can bus with its original timing.
+
+Frames are streamed from any trace :mod:`epyqlib.utils.canlogio` can read so
+long captures are not loaded at once.  Sends are scheduled from a dedicated
+thread which sleeps until shortly before each deadline and then busy waits
+on :func:`time.perf_counter` for the remainder.  Sleeping alone is only good
+to a millisecond or so, and worse on Windows.
+"""
+
+import functools
+import math
+import threading
+import time
+
+import attr
+import can
+import click
+import numpy
+
+import epyqlib.device
+import epyqlib.utils.canlogio
+from epyqlib.utils.canlog import FrameFlags
+
+# See file COPYING in this source tree
+__copyright__ = "Copyright 2020, EPC Power Corp."
+__license__ = "GPLv2+"
+
+
+def wait_until(deadline, spin=0.002, stopped=None, clock=time.perf_counter):
+    """Return at ``deadline`` as measured by ``clock``.  The final ``spin``
+    seconds are busy waited.  Returns ``True`` if ``stopped`` is set first.
+    """
+    while True:
+        remaining = deadline - clock()
+
+        if remaining <= 0:
+            return False
+
+        if remaining > spin:
+            if stopped is None:
+                time.sleep(remaining - spin)
+            elif stopped.wait(remaining - spin):
+                return True
+        elif stopped is not None and stopped.is_set():
+            return True
+
+
+def node_id_remap(node_id_type, device_id, controller_id, to_device):
+    """Create an id remapping for :class:`Replay` using the adjuster that
+    :mod:`epyqlib.device` applies to the CAN database for ``node_id_type``.
+    """
+    return functools.partial(
+        epyqlib.device.node_id_types[node_id_type],
+        device_id=device_id,
+        controller_id=controller_id,
+        to_device=to_device,
+    )
+
+
+def remap_ids(frames, remap):
+    """Apply ``remap``, a callable from one arbitration id to another, to
+    each distinct id in ``frames`` rather than to each frame."""
+    ids, inverse = numpy.unique(frames["id"], return_inverse=True)
+    remapped = numpy.array(
+        [remap(message_id=id) for id in ids.tolist()],
+        dtype=frames.dtype["id"],
+    )
+
+    frames = frames.copy()
+    frames["id"] = remapped[inverse]
+
+    return frames
+
+
+@attr.s
+class Statistics:
+    """Lateness of each send relative to its scheduled time, in seconds."""
+
+    count = attr.ib(default=0)
+    total = attr.ib(default=0.0)
+    total_squares = attr.ib(default=0.0)
+    minimum = attr.ib(default=math.inf)
+    maximum = attr.ib(default=-math.inf)
+
+    def add(self, lateness):
+        self.count += 1
+        self.total += lateness
+        self.total_squares += lateness ** 2
+        self.minimum = min(self.minimum, lateness)
+        self.maximum = max(self.maximum, lateness)
+
+    @property
+    def mean(self):
+        if self.count == 0:
+            return None
+
+        return self.total / self.count
+
+    @property
+    def standard_deviation(self):
+        if self.count == 0:
+            return None
+
+        variance = self.total_squares / self.count - self.mean ** 2
+
+        return math.sqrt(max(variance, 0))
+
+    def __str__(self):
+        if self.count == 0:
+            return "no frames sent"
+
+        return (
+            "{} frames sent, lateness mean {:.1f} us, standard deviation"
+            " {:.1f} us, minimum {:.1f} us, maximum {:.1f} us".format(
+                self.count,
+                self.mean * 1e6,
+                self.standard_deviation * 1e6,
+                self.minimum * 1e6,
+                self.maximum * 1e6,
+            )
+        )
+
+
+@attr.s
+class Replay:
+    """Send ``frames`` on ``bus`` spaced as they were captured.
+
+    ``frames`` is a trace path or anything :func:`epyqlib.utils.canlogio.chunks`
+    accepts.  Only a path or record array can be looped.  Each further pass
+    starts one mean frame interval after the previous pass ended.  Time is
+    divided by ``speed``.  ``ids`` limits the replay to those arbitration ids, as
+    captured.  ``remap`` is applied to the ids before sending, see
+    :func:`node_id_remap`.  Error frames are never sent.
+    """
+
+    bus = attr.ib()
+    frames = attr.ib()
+    speed = attr.ib(default=1)
+    loop = attr.ib(default=False)
+    ids = attr.ib(default=None)
+    remap = attr.ib(default=None)
+    spin = attr.ib(default=0.002)
+    statistics = attr.ib(factory=Statistics)
+    chunk_size = attr.ib(default=epyqlib.utils.canlogio.default_chunk_size)
+    _stopped = attr.ib(factory=threading.Event)
+    _thread = attr.ib(default=None)
+    _error = attr.ib(default=None)
+
+    def _chunks(self):
+        if isinstance(self.frames, numpy.ndarray):
+            return epyqlib.utils.canlogio.chunks(
+                self.frames,
+                chunk_size=self.chunk_size,
+            )
+
+        if isinstance(self.frames, (str, bytes)) or hasattr(self.frames, "__fspath__"):
+            return epyqlib.utils.canlogio.read(
+                self.frames,
+                chunk_size=self.chunk_size,
+            )
+
+        if self.loop:
+            raise Exception("Only a path or record array can be looped")
+
+        return epyqlib.utils.canlogio.chunks(self.frames)
+
+    def _prepare(self, frames):
+        keep = (frames["flags"] & FrameFlags.error) == 0
+        if self.ids is not None:
+            keep &= numpy.isin(frames["id"], list(self.ids))
+
+        frames = frames[keep]
+
+        if self.remap is not None and len(frames) > 0:
+            frames = remap_ids(frames=frames, remap=self.remap)
+
+        return frames
+
+    def run(self):
+        """Replay in the calling thread until done or :meth:`stop`."""
+        self._stopped.clear()
+
+        start = None
+        offset = 0
+
+        while True:
+            first = None
+            last = None
+            count = 0
+
+            for chunk in self._chunks():
+                frames = self._prepare(chunk)
+
+                if len(frames) == 0:
+                    continue
+
+                if first is None:
+                    first = float(frames["timestamp"][0])
+
+                if start is None:
+                    start = time.perf_counter()
+                    offset = -first
+
+                deadlines = (
+                    start + (frames["timestamp"] + offset) / self.speed
+                ).tolist()
+                messages = epyqlib.utils.canlogio.messages_to_pythoncan(frames)
+
+                for deadline, message in zip(deadlines, messages):
+                    if wait_until(
+                        deadline=deadline,
+                        spin=self.spin,
+                        stopped=self._stopped,
+                    ):
+                        return self.statistics
+
+                    self.statistics.add(time.perf_counter() - deadline)
+                    self.bus.send(message)
+
+                last = float(frames["timestamp"][-1])
+                count += len(frames)
+
+            if not self.loop or last is None:
+                return self.statistics
+
+            # the next pass starts one mean interval after this one ended
+            # rather than sending its first frame along with the last
+            span = last - first
+            offset += span
+            if count > 1:
+                offset += span / (count - 1)
+
+    def start(self):
+        """Replay in a dedicated thread.  An exception raised there is
+        raised again from :meth:`join`."""
+        self._error = None
+        self._thread = threading.Thread(target=self._run_thread, daemon=True)
+        self._thread.start()
+
+    def _run_thread(self):
+        try:
+            self.run()
+        except Exception as e:
+            self._error = e
+
+    def stop(self):
+        self._stopped.set()
+
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def join(self, timeout=None):
+        self._thread.join(timeout=timeout)
+
+        if self._error is not None and not self._thread.is_alive():
+            error = self._error
+            self._error = None
+            raise error
+
+        return self.statistics
+
+
+def create_command():
+    @click.command()
+    @click.argument("trace", type=click.Path(exists=True, dir_okay=False))
+    @click.option("--interface", default="socketcan", show_default=True)
+    @click.option("--channel", default="can0", show_default=True)
+    @click.option("--bitrate", type=int, default=None)
+    @click.option("--speed", type=float, default=1, show_default=True)
+    @click.option("--loop/--once", default=False)
+    @click.option(
+        "--id",
+        "ids",
+        multiple=True,
+        help="Replay only this arbitration id, in hex as captured",
+    )
+    @click.option(
+        "--node-id-type",
+        type=click.Choice(epyqlib.device.node_id_types),
+        default=None,
+        help="Adjust ids to --node-id and --controller-id before sending",
+    )
+    @click.option("--node-id", type=int, default=None)
+    @click.option("--controller-id", type=int, default=None)
+    @click.option("--to-device/--from-device", default=True)
+    def cli(
+        trace,
+        interface,
+        channel,
+        bitrate,
+        speed,
+        loop,
+        ids,
+        node_id_type,
+        node_id,
+        controller_id,
+        to_device,
+    ):
+        """Replay a captured trace onto a bus with its original timing."""
+        remap = None
+        if node_id_type is not None:
+            if node_id is None and (node_id_type == "simple" or controller_id is None):
+                raise click.UsageError(
+                    "--node-id-type {} requires --node-id{}".format(
+                        node_id_type,
+                        "" if node_id_type == "simple" else " or --controller-id",
+                    )
+                )
+
+            remap = node_id_remap(
+                node_id_type=node_id_type,
+                device_id=node_id,
+                controller_id=controller_id,
+                to_device=to_device,
+            )
+
+        bus = can.interface.Bus(bustype=interface, channel=channel, bitrate=bitrate)
+
+        replay = Replay(
+            bus=bus,
+            frames=trace,
+            speed=speed,
+            loop=loop,
+            ids=[int(id, 16) for id in ids] if len(ids) > 0 else None,
+            remap=remap,
+        )
+
+        try:
+            replay.start()
+            while replay.running():
+                replay.join(timeout=0.1)
+            replay.join()
+        except KeyboardInterrupt:
+            replay.stop()
+            replay.join()
+        finally:
+            bus.shutdown()
+
+        click.echo(str(replay.statistics))
+
+    return cli
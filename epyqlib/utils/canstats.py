@@ -0,0 +1,443 @@
+"""Bus load and per arbitration id statistics.
+
+Every update is constant time and each id holds a fixed amount of state so
+this can sit directly on the receive path at full bus rate.  Periods are
+tracked with exponentially weighted mean and variance so the jitter reflects
+recent traffic.  Rates and bus load come from a sliding window of time
+buckets.
+"""
+
+import math
+import threading
+
+import attr
+import can
+import click
+
+import epyqlib.utils.candecode
+import epyqlib.utils.canlogio
+from epyqlib.utils.canlog import FrameFlags
+
+# See file COPYING in this source tree
+__copyright__ = "Copyright 2020, EPC Power Corp."
+__license__ = "GPLv2+"
+
+
+# SOF, arbitration, control, CRC, delimiters, ACK, EOF and interframe space
+_overhead_bits = {False: 47, True: 67}
+# bits from SOF through CRC which are subject to stuffing, excluding data
+_stuffed_bits = {False: 34, True: 54}
+
+
+def frame_bits(extended, dlc, stuffing=1):
+    """Bits on the wire for a classic CAN frame.  ``stuffing`` scales the
+    worst case number of stuff bits, ``0`` ignores stuffing entirely."""
+    data_bits = 8 * min(dlc, 8)
+    worst_stuffing = (_stuffed_bits[extended] + data_bits - 1) // 4
+
+    return _overhead_bits[extended] + data_bits + stuffing * worst_stuffing
+
+
+class Window:
+    """Sum of amounts over the last ``duration`` seconds, to a resolution of
+    ``duration / buckets``."""
+
+    __slots__ = ("duration", "per_second", "counts", "current")
+
+    def __init__(self, duration=1, buckets=10):
+        self.duration = duration
+        # multiplying rather than dividing by the bucket width keeps round
+        # times on the expected buckets
+        self.per_second = buckets / duration
+        self.counts = [0] * buckets
+        self.current = None
+
+    def _advance(self, index):
+        if self.current is None:
+            self.current = index
+            return
+
+        if index <= self.current:
+            return
+
+        buckets = len(self.counts)
+        for stale in range(self.current + 1, min(index, self.current + buckets) + 1):
+            self.counts[stale % buckets] = 0
+
+        self.current = index
+
+    def add(self, time, amount=1):
+        index = math.floor(time * self.per_second)
+        self._advance(index)
+
+        if index > self.current - len(self.counts):
+            self.counts[index % len(self.counts)] += amount
+
+    def total(self, now=None):
+        if now is not None:
+            self._advance(math.floor(now * self.per_second))
+
+        return sum(self.counts)
+
+
+class IdStatistics:
+    __slots__ = (
+        "id",
+        "extended",
+        "cycle_time",
+        "count",
+        "dlc",
+        "dlc_changes",
+        "first",
+        "last",
+        "minimum_period",
+        "maximum_period",
+        "mean_period",
+        "period_variance",
+        "missed",
+        "window",
+    )
+
+    def __init__(self, id, extended, cycle_time, window_duration, window_buckets):
+        self.id = id
+        self.extended = extended
+        self.cycle_time = cycle_time
+        self.count = 0
+        self.dlc = None
+        self.dlc_changes = 0
+        self.first = None
+        self.last = None
+        self.minimum_period = math.inf
+        self.maximum_period = 0
+        self.mean_period = None
+        self.period_variance = 0
+        self.missed = 0
+        self.window = Window(duration=window_duration, buckets=window_buckets)
+
+
+@attr.s(frozen=True)
+class IdSnapshot:
+    id = attr.ib()
+    extended = attr.ib()
+    count = attr.ib()
+    rate = attr.ib()
+    mean_period = attr.ib()
+    jitter = attr.ib()
+    minimum_period = attr.ib()
+    maximum_period = attr.ib()
+    cycle_time = attr.ib()
+    missed = attr.ib()
+    dlc = attr.ib()
+    dlc_changes = attr.ib()
+    last = attr.ib()
+
+
+@attr.s(frozen=True)
+class BusSnapshot:
+    count = attr.ib()
+    rate = attr.ib()
+    load = attr.ib()
+    ids = attr.ib()
+
+
+class BusStatistics(can.Listener):
+    """Accumulate statistics for every received frame.
+
+    ``cycle_times`` maps ``(id, extended)`` to the expected period in
+    seconds, see :meth:`from_neo`.  A period longer than ``missing_factor``
+    cycles counts the cycles skipped as missed.  Bus load is relative to
+    ``bitrate`` and includes ``stuffing`` times the worst case stuff bits.
+    """
+
+    def __init__(
+        self,
+        bitrate=500_000,
+        cycle_times=None,
+        stuffing=0.5,
+        alpha=0.05,
+        missing_factor=1.5,
+        window_duration=1,
+        window_buckets=10,
+    ):
+        self.bitrate = bitrate
+        self.cycle_times = {} if cycle_times is None else dict(cycle_times)
+        self.stuffing = stuffing
+        self.alpha = alpha
+        self.missing_factor = missing_factor
+        self.window_duration = window_duration
+        self.window_buckets = window_buckets
+
+        self.lock = threading.Lock()
+        self.clear()
+
+    @classmethod
+    def from_neo(cls, neo, **kwargs):
+        """Take the expected periods from the ``.sym`` cycle times."""
+        cycle_times = {
+            (frame.id, frame.extended): frame.cycle_time / 1000
+            for frame in neo.frames
+            if frame.cycle_time is not None
+        }
+
+        return cls(cycle_times=cycle_times, **kwargs)
+
+    def clear(self):
+        with self.lock:
+            self.ids = {}
+            self.count = 0
+            self.latest = None
+            self.frames = Window(
+                duration=self.window_duration,
+                buckets=self.window_buckets,
+            )
+            self.bits = Window(
+                duration=self.window_duration,
+                buckets=self.window_buckets,
+            )
+
+    def on_message_received(self, msg):
+        if msg.is_error_frame:
+            return
+
+        self.add(
+            timestamp=msg.timestamp,
+            id=msg.arbitration_id,
+            extended=msg.is_extended_id,
+            dlc=msg.dlc,
+        )
+
+    def add_frames(self, frames):
+        """Add :data:`epyqlib.utils.canlog.frame_dtype` records."""
+        frames = frames[(frames["flags"] & FrameFlags.error) == 0]
+        extended = (frames["flags"] & FrameFlags.extended) != 0
+
+        for timestamp, id, is_extended, dlc in zip(
+            frames["timestamp"].tolist(),
+            frames["id"].tolist(),
+            extended.tolist(),
+            frames["dlc"].tolist(),
+        ):
+            self.add(timestamp=timestamp, id=id, extended=is_extended, dlc=dlc)
+
+    def add(self, timestamp, id, extended, dlc):
+        key = (id, extended)
+
+        with self.lock:
+            statistics = self.ids.get(key)
+
+            if statistics is None:
+                statistics = IdStatistics(
+                    id=id,
+                    extended=extended,
+                    cycle_time=self.cycle_times.get(key),
+                    window_duration=self.window_duration,
+                    window_buckets=self.window_buckets,
+                )
+                self.ids[key] = statistics
+                statistics.first = timestamp
+            else:
+                period = timestamp - statistics.last
+
+                statistics.minimum_period = min(statistics.minimum_period, period)
+                statistics.maximum_period = max(statistics.maximum_period, period)
+
+                if statistics.mean_period is None:
+                    statistics.mean_period = period
+                else:
+                    # exponentially weighted mean and variance
+                    difference = period - statistics.mean_period
+                    increment = self.alpha * difference
+                    statistics.mean_period += increment
+                    statistics.period_variance = (1 - self.alpha) * (
+                        statistics.period_variance + difference * increment
+                    )
+
+                cycle_time = statistics.cycle_time
+                if cycle_time and period > self.missing_factor * cycle_time:
+                    statistics.missed += max(round(period / cycle_time) - 1, 1)
+
+                if dlc != statistics.dlc:
+                    statistics.dlc_changes += 1
+
+            statistics.count += 1
+            statistics.dlc = dlc
+            statistics.last = timestamp
+            statistics.window.add(timestamp)
+
+            self.count += 1
+            self.latest = (
+                timestamp if self.latest is None else max(self.latest, timestamp)
+            )
+            self.frames.add(timestamp)
+            self.bits.add(
+                timestamp,
+                frame_bits(extended=extended, dlc=dlc, stuffing=self.stuffing),
+            )
+
+    def load(self, now=None):
+        """Percent of the bus capacity used over the window."""
+        with self.lock:
+            now = self.latest if now is None else now
+            if now is None:
+                return 0
+
+            bits = self.bits.total(now=now)
+
+        return 100 * bits / (self.bitrate * self.bits.duration)
+
+    def _id_snapshot(self, statistics, now):
+        s = statistics
+
+        return IdSnapshot(
+            id=s.id,
+            extended=s.extended,
+            count=s.count,
+            rate=0 if now is None else s.window.total(now=now) / s.window.duration,
+            mean_period=s.mean_period,
+            jitter=math.sqrt(s.period_variance),
+            minimum_period=None if math.isinf(s.minimum_period) else s.minimum_period,
+            maximum_period=s.maximum_period if s.count > 1 else None,
+            cycle_time=s.cycle_time,
+            missed=s.missed,
+            dlc=s.dlc,
+            dlc_changes=s.dlc_changes,
+            last=s.last,
+        )
+
+    def id_snapshot(self, id, extended, now=None):
+        """Freeze the statistics of a single id, ``None`` if not seen."""
+        with self.lock:
+            statistics = self.ids.get((id, extended))
+            if statistics is None:
+                return None
+
+            now = self.latest if now is None else now
+
+            return self._id_snapshot(statistics=statistics, now=now)
+
+    def snapshot(self, now=None):
+        """Freeze the current statistics.  ``now`` defaults to the latest
+        frame timestamp, pass the current time for a live bus."""
+        with self.lock:
+            now = self.latest if now is None else now
+
+            ids = tuple(
+                self._id_snapshot(statistics=s, now=now)
+                for s in sorted(self.ids.values(), key=lambda s: (s.id, s.extended))
+            )
+
+            frames = 0 if now is None else self.frames.total(now=now)
+            bits = 0 if now is None else self.bits.total(now=now)
+
+        return BusSnapshot(
+            count=self.count,
+            rate=frames / self.frames.duration,
+            load=100 * bits / (self.bitrate * self.bits.duration),
+            ids=ids,
+        )
+
+
+def _format_period(seconds):
+    if seconds is None:
+        return "-"
+
+    return "{:.2f}".format(seconds * 1000)
+
+
+def format_id_snapshot(snapshot):
+    """A short multiline summary of one id, as for a tool tip."""
+    lines = [
+        "{:.1f} frames/second".format(snapshot.rate),
+        "period {} ms, jitter {} ms".format(
+            _format_period(snapshot.mean_period),
+            _format_period(snapshot.jitter),
+        ),
+        "minimum {} ms, maximum {} ms".format(
+            _format_period(snapshot.minimum_period),
+            _format_period(snapshot.maximum_period),
+        ),
+    ]
+
+    if snapshot.cycle_time is not None:
+        lines.append(
+            "expected {} ms, {} missed".format(
+                _format_period(snapshot.cycle_time),
+                snapshot.missed,
+            )
+        )
+
+    if snapshot.dlc_changes > 0:
+        lines.append("length changed {} times".format(snapshot.dlc_changes))
+
+    return "\n".join(lines)
+
+
+def format_snapshot(snapshot):
+    lines = [
+        "{} frames, {:.0f} frames/second, {:.1f}% load".format(
+            snapshot.count,
+            snapshot.rate,
+            snapshot.load,
+        ),
+        "{:>10s} {:>9s} {:>8s} {:>9s} {:>9s} {:>9s} {:>9s} {:>7s} {:>4s}".format(
+            "id",
+            "count",
+            "rate",
+            "mean ms",
+            "jitter ms",
+            "min ms",
+            "max ms",
+            "missed",
+            "dlc",
+        ),
+    ]
+
+    for s in snapshot.ids:
+        lines.append(
+            "{:>10s} {:>9d} {:>8.1f} {:>9s} {:>9s} {:>9s} {:>9s} {:>7d} {:>4d}".format(
+                ("{:08X}" if s.extended else "{:03X}").format(s.id),
+                s.count,
+                s.rate,
+                _format_period(s.mean_period),
+                _format_period(s.jitter),
+                _format_period(s.minimum_period),
+                _format_period(s.maximum_period),
+                s.missed,
+                s.dlc,
+            )
+        )
+
+    return "\n".join(lines)
+
+
+def create_command():
+    @click.command()
+    @click.argument("trace", type=click.Path(exists=True, dir_okay=False))
+    @click.option(
+        "--device",
+        type=click.Path(exists=True, dir_okay=False),
+        default=None,
+        help=".epc or .sym with the expected cycle times",
+    )
+    @click.option("--bitrate", type=int, default=500_000, show_default=True)
+    @click.option("--window", type=float, default=1, show_default=True)
+    def cli(trace, device, bitrate, window):
+        """Report bus load and per id timing for a trace.  Rates and load
+        are for the final window of the trace."""
+        cycle_times = None
+        if device is not None:
+            neo = epyqlib.utils.candecode.load_neo(path=device)
+            cycle_times = BusStatistics.from_neo(neo).cycle_times
+
+        statistics = BusStatistics(
+            bitrate=bitrate,
+            cycle_times=cycle_times,
+            window_duration=window,
+        )
+
+        for chunk in epyqlib.utils.canlogio.read(trace):
+            statistics.add_frames(chunk)
+
+        click.echo(format_snapshot(statistics.snapshot()))
+
+    return cli
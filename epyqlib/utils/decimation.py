@@ -0,0 +1,75 @@
+"""Level of detail selection for plotting long series.
+
+A :class:`MinMaxPyramid` keeps, for successively halved resolutions, the
+indices of the minimum and maximum sample of each block of the series.  A
+query for a visible range picks the coarsest level that still has a block
+per pixel and returns the minimum and maximum of each block in sample
+order.  The drawn envelope matches the full resolution line while the
+number of points returned stays bounded by the plot width.
+"""
+import numpy
+
+__copyright__ = "Copyright 2020, EPC Power Corp."
+__license__ = "GPLv2+"
+
+
+class MinMaxPyramid:
+    def __init__(self, x, y):
+        self.x = numpy.asarray(x, dtype=float)
+        self.y = numpy.asarray(y, dtype=float)
+
+        if self.x.shape != self.y.shape or self.x.ndim != 1:
+            raise ValueError(
+                "x and y must be one dimensional and of equal length, got "
+                "{} and {}".format(self.x.shape, self.y.shape)
+            )
+
+        self.levels = []
+
+        minimum = numpy.arange(len(self.y))
+        maximum = minimum
+        while len(minimum) > 1:
+            minimum = self._combine(minimum, numpy.less_equal)
+            maximum = self._combine(maximum, numpy.greater_equal)
+            self.levels.append((minimum, maximum))
+
+    def _combine(self, indices, keep_first):
+        if len(indices) % 2 == 1:
+            indices = numpy.append(indices, indices[-1])
+
+        first = indices[0::2]
+        second = indices[1::2]
+
+        return numpy.where(keep_first(self.y[first], self.y[second]), first, second)
+
+    def __len__(self):
+        return len(self.x)
+
+    def query(self, start, end, width):
+        """Get the ``x`` and ``y`` arrays to draw for the visible ``x`` range
+        from ``start`` to ``end`` across ``width`` pixels.  One sample
+        outside each end of the range is included so the line reaches the
+        plot edges.  ``x`` is expected to be sorted."""
+        width = max(int(width), 1)
+
+        first = max(numpy.searchsorted(self.x, start, side="left") - 1, 0)
+        last = min(numpy.searchsorted(self.x, end, side="right") + 1, len(self.x))
+
+        count = last - first
+        if count <= 2 * width:
+            return self.x[first:last], self.y[first:last]
+
+        # level k has blocks of 2 ** (k + 1) samples
+        level = int(numpy.ceil(numpy.log2(count / width))) - 1
+        level = min(max(level, 0), len(self.levels) - 1)
+        shift = level + 1
+
+        minimum, maximum = self.levels[level]
+        blocks = slice(first >> shift, ((last - 1) >> shift) + 1)
+
+        indices = numpy.empty(2 * (blocks.stop - blocks.start), dtype=int)
+        indices[0::2] = minimum[blocks]
+        indices[1::2] = maximum[blocks]
+        indices.reshape(-1, 2).sort(axis=1)
+
+        return self.x[indices], self.y[indices]
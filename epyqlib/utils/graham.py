@@ -0,0 +1,409 @@
+"""Compiled serialization of :mod:`graham` documents.
+
+``graham.dumps()`` and ``graham.schema(cls).loads()`` run each node of a
+document through marshmallow's marshalling machinery, building and
+validating intermediate dictionaries at every level.  Here each schema's
+fields are instead walked once to build a plain encoding function and a
+plain decoding function which are cached and reused for every instance.
+
+Encoding writes the JSON text directly, chunk by chunk, laid out exactly as
+``json.dumps()`` would so the output is identical to ``graham.dumps()``.
+Leaf values are still formatted and parsed by their marshmallow fields.
+Schemas with processors beyond graham's own ``post_load`` are handed to
+marshmallow.  Documents that fail to decode are loaded again by
+marshmallow so the error raised is the one it reports.
+"""
+import json
+import json.encoder
+
+import graham
+import graham.fields
+import marshmallow
+import marshmallow.decorators
+import marshmallow.utils
+
+__copyright__ = "Copyright 2020, EPC Power Corp."
+__license__ = "GPLv2+"
+
+
+missing = marshmallow.missing
+
+_encoders = {}
+_decoders = {}
+
+
+def dumps(instance, indent=None):
+    """Serialize ``instance`` to a JSON string identical to
+    ``graham.dumps(instance, indent=indent).data``."""
+    return "".join(iterencode(instance, indent=indent))
+
+
+def dump(instance, file, indent=None):
+    """Serialize ``instance`` to the text file ``file`` incrementally."""
+    for chunk in iterencode(instance, indent=indent):
+        file.write(chunk)
+
+
+def iterencode(instance, indent=None):
+    """Yield the JSON text for ``instance`` in chunks."""
+    return _encoder(graham.schema(instance), indent)(instance, 0)
+
+
+def loads(cls, s):
+    """Deserialize an instance of ``cls`` from the JSON string ``s``."""
+    return load(cls, json.loads(s))
+
+
+def load(cls, data):
+    """Deserialize an instance of ``cls`` from already parsed JSON."""
+    schema = graham.schema(cls)
+
+    try:
+        return _decoder(schema)(data)
+    except (marshmallow.ValidationError, AttributeError, KeyError, TypeError):
+        return schema.load(data).data
+
+
+def _compilable(schema):
+    """Whether the only processor of ``schema`` is graham's ``post_load``."""
+    if getattr(type(schema), "data_class", None) is None:
+        return False
+
+    processors = {
+        tag: names for tag, names in schema.__processors__.items() if len(names) > 0
+    }
+
+    return processors == {(marshmallow.decorators.POST_LOAD, False): ["deserialize"]}
+
+
+def _nested_schema(field):
+    """The schema a nested field serializes with, or ``None`` if it is not
+    a plain nesting of a single graham object."""
+    if type(field) is not marshmallow.fields.Nested:
+        return None
+
+    if field.many or field.only is not None or len(field.exclude) > 0:
+        return None
+
+    schema = field.schema
+    if not _compilable(schema) or schema.many:
+        return None
+
+    return schema
+
+
+def _list_schema(field):
+    """The nested schema of the elements of a plain list field, if any."""
+    if type(field) not in (marshmallow.fields.List, graham.fields.Tuple):
+        return None
+
+    if field.container.attribute is not None:
+        return None
+
+    return _nested_schema(field.container)
+
+
+## Encoding
+def _newline(indent, level):
+    if indent is None:
+        return ""
+
+    return "\n" + " " * (indent * level)
+
+
+def _item_separator(indent):
+    return ", " if indent is None else ","
+
+
+def _encode_leaf(value, indent, level):
+    if value is missing:
+        return missing
+
+    if type(value) is str:
+        return (json.encoder.encode_basestring_ascii(value),)
+
+    if value is None:
+        return ("null",)
+
+    if value is True:
+        return ("true",)
+
+    if value is False:
+        return ("false",)
+
+    if type(value) is int:
+        return (int.__repr__(value),)
+
+    # Strings never hold a raw newline so the nested layout only needs
+    # shifting to the current level.
+    s = json.dumps(value, indent=indent)
+    if indent is not None:
+        s = s.replace("\n", _newline(indent, level))
+
+    return (s,)
+
+
+def _default(field):
+    default = field.default
+
+    return default() if callable(default) else default
+
+
+def _encode_array(items, encode_item, indent, level):
+    if len(items) == 0:
+        yield "[]"
+        return
+
+    inner = _newline(indent, level + 1)
+    separator = _item_separator(indent) + inner
+
+    yield "[" + inner
+    for i, item in enumerate(items):
+        if i > 0:
+            yield separator
+        yield from encode_item(item, level + 1)
+    yield _newline(indent, level) + "]"
+
+
+def _getter(name, field, data_class):
+    """Build the equivalent of ``field.get_value(name, obj)``.  Instances of
+    plain classes skip marshmallow's item lookup and dotted paths."""
+    if field.attribute is not None or "." in name or hasattr(data_class, "__getitem__"):
+        return lambda obj: field.get_value(name, obj)
+
+    def get(obj):
+        try:
+            value = getattr(obj, name)
+        except AttributeError:
+            return missing
+
+        return value() if callable(value) else value
+
+    return get
+
+
+def _encoder(schema, indent):
+    key = (schema, indent)
+    encoder = _encoders.get(key)
+
+    if encoder is None:
+        if _compilable(schema):
+            encoder = _compile_encoder(schema, indent)
+        else:
+
+            def encoder(obj, level):
+                return _encode_leaf(schema.dump(obj).data, indent, level)
+
+        _encoders[key] = encoder
+
+    return encoder
+
+
+def _member_encoder(name, field, indent, data_class):
+    get_value = _getter(name=name, field=field, data_class=data_class)
+
+    nested = _nested_schema(field)
+    if nested is not None:
+
+        def encode(obj, level):
+            value = get_value(obj)
+            if value is missing:
+                return _encode_leaf(_default(field), indent, level)
+            if value is None:
+                return ("null",)
+
+            return _encoder(nested, indent)(value, level)
+
+        return encode
+
+    nested = _list_schema(field)
+    if nested is not None:
+
+        def encode_item(item, level):
+            if item is None:
+                return ("null",)
+
+            return _encoder(nested, indent)(item, level)
+
+        def encode(obj, level):
+            value = get_value(obj)
+            if value is missing:
+                return _encode_leaf(_default(field), indent, level)
+            if value is None:
+                return ("null",)
+            if not marshmallow.utils.is_collection(value):
+                value = [value]
+
+            return _encode_array(list(value), encode_item, indent, level)
+
+        return encode
+
+    if type(field) is graham.fields.MixedList:
+
+        def encode_item(item, level):
+            return _encoder(graham.schema(item), indent)(item, level)
+
+        def encode(obj, level):
+            value = get_value(obj)
+            if value is missing:
+                return _encode_leaf(_default(field), indent, level)
+            if value is None:
+                return _encode_leaf(field.serialize(name, obj), indent, level)
+
+            items = [each for each in value if not isinstance(each, field.exclude)]
+
+            return _encode_array(items, encode_item, indent, level)
+
+        return encode
+
+    if not field._CHECK_ATTRIBUTE:
+
+        def encode(obj, level):
+            return _encode_leaf(field.serialize(name, obj), indent, level)
+
+        return encode
+
+    def encode(obj, level):
+        value = get_value(obj)
+        if value is missing:
+            return _encode_leaf(_default(field), indent, level)
+
+        return _encode_leaf(field._serialize(value, name, obj), indent, level)
+
+    return encode
+
+
+def _compile_encoder(schema, indent):
+    members = [
+        (
+            json.encoder.encode_basestring_ascii(field.dump_to or name) + ": ",
+            _member_encoder(
+                name=name, field=field, indent=indent, data_class=schema.data_class
+            ),
+        )
+        for name, field in schema.fields.items()
+        if not field.load_only
+    ]
+    item_separator = _item_separator(indent)
+
+    def encode(obj, level):
+        inner = _newline(indent, level + 1)
+        opening = "{" + inner
+        separator = item_separator + inner
+
+        first = True
+        for key, encode_member in members:
+            chunks = encode_member(obj, level + 1)
+            if chunks is missing:
+                continue
+
+            yield (opening if first else separator) + key
+            yield from chunks
+            first = False
+
+        yield "{}" if first else _newline(indent, level) + "}"
+
+    return encode
+
+
+## Decoding
+def _decoder(schema):
+    decoder = _decoders.get(schema)
+
+    if decoder is None:
+        if _compilable(schema):
+            decoder = _compile_decoder(schema)
+        else:
+
+            def decoder(data):
+                return schema.load(data).data
+
+        _decoders[schema] = decoder
+
+    return decoder
+
+
+def _checked(field, deserialize):
+    """Wrap ``deserialize`` with the checks of ``Field.deserialize()``."""
+
+    def checked(value):
+        field._validate_missing(value)
+        if getattr(field, "allow_none", False) is True and value is None:
+            return None
+
+        output = deserialize(value)
+        field._validate(output)
+
+        return output
+
+    return checked
+
+
+def _member_decoder(name, field):
+    nested = _nested_schema(field)
+    if nested is not None:
+        return _checked(field, lambda value: _decoder(nested)(value))
+
+    nested = _list_schema(field)
+    if nested is not None:
+        decode_item = _checked(field.container, lambda value: _decoder(nested)(value))
+        make = tuple if type(field) is graham.fields.Tuple else list
+
+        def decode(value):
+            if not marshmallow.utils.is_collection(value):
+                field.fail("invalid")
+
+            return make(decode_item(each) for each in value)
+
+        return _checked(field, decode)
+
+    if type(field) is graham.fields.MixedList:
+
+        def decode_item(each):
+            target = field.get_cls_or_instance(each[graham.core.type_attribute_name])
+            if isinstance(target, marshmallow.Schema):
+                return _decoder(target)(each)
+
+            return target.load(each).data
+
+        return _checked(field, lambda value: [decode_item(each) for each in value])
+
+    def decode(value):
+        return field.deserialize(value, field.load_from or name)
+
+    return decode
+
+
+def _compile_decoder(schema):
+    members = [
+        (
+            name,
+            field.load_from,
+            field.attribute or name,
+            field,
+            _member_decoder(name=name, field=field),
+        )
+        for name, field in schema.fields.items()
+        if not field.dump_only
+    ]
+    post_load = schema.deserialize
+
+    def decode(data):
+        result = {}
+
+        for name, load_from, attribute, field, decode_member in members:
+            value = data.get(name, missing)
+            if value is missing and load_from:
+                value = data.get(load_from, missing)
+            if value is missing:
+                value = field.missing
+                if callable(value):
+                    value = value()
+                if value is missing and not field.required:
+                    continue
+
+            result[attribute] = decode_member(value)
+
+        return post_load(result)
+
+    return decode
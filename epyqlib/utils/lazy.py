@@ -0,0 +1,76 @@
+"""Deferred module imports.
+
+Command line entry points share modules with the GUI, and many of those
+modules import PyQt5, Twisted or canmatrix at module scope for use in only a
+few functions.  :func:`lazy_import` registers a module which is executed on
+first attribute access so that ``import epyqlib.nv``-style references keep
+working while headless commands which never touch it skip loading it.
+"""
+import importlib.util
+import sys
+
+__copyright__ = "Copyright 2020, EPC Power Corp."
+__license__ = "GPLv2+"
+
+
+_specs = {}
+
+
+def _find_spec(name, path):
+    for finder in sys.meta_path:
+        find_spec = getattr(finder, "find_spec", None)
+        if find_spec is None:
+            continue
+
+        spec = find_spec(name, path)
+        if spec is not None:
+            return spec
+
+    return None
+
+
+def lazy_import(name):
+    """Get the module ``name``, deferring its execution until an attribute
+    is first accessed or it is named in an ``import`` statement.  Parent
+    packages which are not yet imported are deferred as well.  Already imported modules are returned as is.  Like
+    an ``import`` statement the module is also set as an attribute of its
+    parent package."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+
+    parent_name, _, child_name = name.rpartition(".")
+    parent = None
+    path = None
+    if parent_name:
+        parent = lazy_import(parent_name)
+        parent_spec = _specs.get(parent_name)
+        if parent_spec is None:
+            parent_spec = parent.__spec__
+        path = parent_spec.submodule_search_locations
+
+    spec = _find_spec(name, path)
+    if spec is None:
+        raise ModuleNotFoundError("No module named {!r}".format(name), name=name)
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    _specs[name] = spec
+    loader.exec_module(module)
+
+    if parent is not None:
+        setattr(parent, child_name, module)
+
+    return module
+
+
+def loaded(name):
+    """Whether the module ``name`` has been executed, as opposed to only
+    registered by :func:`lazy_import`."""
+    module = sys.modules.get(name)
+    if module is None:
+        return False
+
+    return not isinstance(module, importlib.util._LazyModule)
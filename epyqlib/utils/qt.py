@@ -1,7 +1,10 @@
+import collections
 import enum
 import functools
 import io
+import itertools
 import os
+import re
 import signal
 import sys
 import textwrap
@@ -15,8 +18,12 @@ import epyqlib.utils.general
 import attr
 from PyQt5 import QtCore
 from PyQt5 import QtWidgets
-import PyQt5.uic
-import twisted.internet.defer
+import PyQt5.QtCore
+
+import epyqlib.utils.lazy
+
+epyqlib.utils.lazy.lazy_import("PyQt5.uic")
+epyqlib.utils.lazy.lazy_import("twisted.internet.defer")
 
 __copyright__ = "Copyright 2017, EPC Power Corp."
 __license__ = "GPLv2+"
@@ -630,15 +637,327 @@ def dialog_from_file(parent, title, file_name):
     )
 
 
+def wildcard_regex(pattern):
+    """Translate a Qt style wildcard pattern into a regular expression.
+
+    ``*`` and ``?`` do not match across the line breaks separating the
+    columns of a :class:`SearchIndex` text.
+    """
+
+    translated = []
+    i = 0
+
+    while i < len(pattern):
+        c = pattern[i]
+        i += 1
+
+        if c == "*":
+            translated.append(r"[^\n]*")
+        elif c == "?":
+            translated.append(r"[^\n]")
+        elif c == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                translated.append(re.escape(c))
+            else:
+                characters = pattern[i:end].replace("\\", r"\\")
+                if characters.startswith("!"):
+                    characters = "^" + characters[1:]
+                translated.append("[{}]".format(characters))
+                i = end + 1
+        else:
+            translated.append(re.escape(c))
+
+    return re.compile("".join(translated))
+
+
+class SearchIndex:
+    """Case folded text of some columns of a model for substring and wildcard
+    queries.
+
+    The index is built on the first query and then maintained from the
+    model's row insertion, removal and data change signals.  Each row gets an
+    integer id, found from a persistent index so it survives rows being
+    inserted or removed around it.  A trigram map narrows each query to the
+    rows containing every literal fragment of the pattern before the pattern
+    itself is checked.
+    """
+
+    gram = 3
+
+    def __init__(self, model, columns):
+        self.model = model
+        self.columns = tuple(columns)
+
+        self.ids = {}
+        self.parents = {}
+        self.texts = {}
+        self.grams = collections.defaultdict(set)
+        self.queries = {}
+        self.containing_queries = {}
+        self.built = False
+        self.generation = 0
+        self.next_id = itertools.count()
+
+        self.connections = [
+            (self.model.rowsInserted, self.rows_inserted),
+            (self.model.rowsAboutToBeRemoved, self.rows_about_to_be_removed),
+            (self.model.rowsMoved, self.clear),
+            (self.model.dataChanged, self.data_changed),
+            (self.model.modelAboutToBeReset, self.clear),
+        ]
+
+        for signal, slot in self.connections:
+            signal.connect(slot)
+
+    def disconnect(self):
+        for signal, slot in self.connections:
+            signal.disconnect(slot)
+
+        self.connections = []
+
+    def id(self, index):
+        """Return the id of the row of the index, or None if not indexed."""
+
+        return self.ids.get(QtCore.QPersistentModelIndex(index.sibling(index.row(), 0)))
+
+    def row_text(self, index):
+        texts = []
+
+        for column in self.columns:
+            data = self.model.data(
+                index.sibling(index.row(), column),
+                QtCore.Qt.DisplayRole,
+            )
+            texts.append("" if data is None else str(data))
+
+        return "\n".join(texts).casefold()
+
+    def changed(self):
+        self.queries.clear()
+        self.containing_queries.clear()
+        self.generation += 1
+
+    def clear(self):
+        self.ids.clear()
+        self.parents.clear()
+        self.texts.clear()
+        self.grams.clear()
+        self.built = False
+        self.changed()
+
+    def build(self):
+        self.clear()
+        self.add_children(QtCore.QModelIndex())
+        self.built = True
+
+    def add(self, index):
+        id_ = next(self.next_id)
+        self.ids[QtCore.QPersistentModelIndex(index)] = id_
+        self.parents[id_] = self.id(index.parent())
+        self.set_text(id_=id_, text=self.row_text(index))
+
+    def remove(self, index):
+        id_ = self.ids.pop(QtCore.QPersistentModelIndex(index), None)
+        if id_ is None:
+            return
+
+        self.set_text(id_=id_, text=None)
+        del self.parents[id_]
+
+    def set_text(self, id_, text):
+        old = self.texts.pop(id_, None)
+        if old is not None:
+            for gram in self.text_grams(old):
+                ids = self.grams[gram]
+                ids.discard(id_)
+                if len(ids) == 0:
+                    del self.grams[gram]
+
+        if text is not None:
+            self.texts[id_] = text
+            for gram in self.text_grams(text):
+                self.grams[gram].add(id_)
+
+    def add_children(self, parent, first=0, last=None):
+        self.walk(parent=parent, first=first, last=last, f=self.add)
+
+    def remove_children(self, parent, first=0, last=None):
+        self.walk(parent=parent, first=first, last=last, f=self.remove)
+
+    def walk(self, parent, first, last, f):
+        if last is None:
+            last = self.model.rowCount(parent) - 1
+
+        ranges = [(parent, first, last)]
+
+        while len(ranges) > 0:
+            parent, first, last = ranges.pop()
+
+            for row in range(first, last + 1):
+                index = self.model.index(row, 0, parent)
+                f(index)
+
+                count = self.model.rowCount(index)
+                if count > 0:
+                    ranges.append((index, 0, count - 1))
+
+    def text_grams(self, text):
+        return {text[i : i + self.gram] for i in range(len(text) - self.gram + 1)}
+
+    def rows_inserted(self, parent, first, last):
+        if self.built:
+            self.add_children(parent=parent, first=first, last=last)
+            self.changed()
+
+    def rows_about_to_be_removed(self, parent, first, last):
+        if self.built:
+            self.remove_children(parent=parent, first=first, last=last)
+            self.changed()
+
+    def data_changed(self, top_left, bottom_right, roles=()):
+        if not self.built:
+            return
+
+        if len(roles) > 0 and QtCore.Qt.DisplayRole not in roles:
+            return
+
+        columns = range(top_left.column(), bottom_right.column() + 1)
+        if not any(column in columns for column in self.columns):
+            return
+
+        parent = top_left.parent()
+        for row in range(top_left.row(), bottom_right.row() + 1):
+            index = self.model.index(row, 0, parent)
+            id_ = self.id(index)
+            if id_ is not None:
+                self.set_text(id_=id_, text=self.row_text(index))
+
+        self.changed()
+
+    def candidates(self, pattern):
+        fragments = [
+            fragment
+            for fragment in re.split(r"[*?]|\[[^\]]*\]", pattern)
+            if len(fragment) >= self.gram
+        ]
+
+        if len(fragments) == 0:
+            return self.texts
+
+        grams = sorted(
+            (
+                self.grams.get(gram, set())
+                for fragment in fragments
+                for gram in self.text_grams(fragment)
+            ),
+            key=len,
+        )
+
+        return set.intersection(*grams)
+
+    def query(self, pattern):
+        """Return the ids of the rows whose text contains the wildcard
+        pattern, ignoring case."""
+
+        if not self.built:
+            self.build()
+
+        pattern = pattern.casefold()
+
+        matches = self.queries.get(pattern)
+        if matches is not None:
+            return matches
+
+        candidates = self.candidates(pattern)
+        texts = self.texts
+
+        if any(c in pattern for c in "*?["):
+            search = wildcard_regex(pattern).search
+            matches = {id_ for id_ in candidates if search(texts[id_])}
+        else:
+            matches = {id_ for id_ in candidates if pattern in texts[id_]}
+
+        self.queries[pattern] = matches
+
+        return matches
+
+    def containing(self, pattern):
+        """Return the ids of the rows with a descendant matching the
+        pattern."""
+
+        pattern = pattern.casefold()
+        matches = self.query(pattern)
+
+        containing = self.containing_queries.get(pattern)
+        if containing is not None:
+            return containing
+
+        containing = set()
+        parents = self.parents
+
+        for id_ in matches:
+            id_ = parents[id_]
+            while id_ is not None and id_ not in containing:
+                containing.add(id_)
+                id_ = parents[id_]
+
+        self.containing_queries[pattern] = containing
+
+        return containing
+
+    def accepts(self, index, pattern):
+        """Return True if the row of the index, one of its ancestors or one
+        of its descendants matches the pattern."""
+
+        matches = self.query(pattern)
+
+        id_ = self.id(index)
+        if id_ in self.containing(pattern):
+            return True
+
+        parents = self.parents
+
+        while id_ is not None:
+            if id_ in matches:
+                return True
+
+            id_ = parents[id_]
+
+        return False
+
+
 class PySortFilterProxyModel(QtCore.QSortFilterProxyModel):
-    def __init__(self, *args, filter_column, **kwargs):
+    """Sort and filter proxy using plain Python comparisons.
+
+    Rows are filtered with a :class:`SearchIndex` over the filter column and
+    any additional ``search_columns``.  A row is accepted when it, one of
+    its ancestors or one of its descendants matches the wildcard pattern.
+    Matching ignores case.
+    """
+
+    def __init__(self, *args, filter_column, search_columns=(), **kwargs):
         super().__init__(*args, **kwargs)
 
         # TODO: replace with filterKeyColumn
         self.filter_column = filter_column
+        self.search_columns = (
+            filter_column,
+            *(column for column in search_columns if column != filter_column),
+        )
+
+        self.search_index = None
+        self.setFilterCaseSensitivity(QtCore.Qt.CaseInsensitive)
+
+    def setSourceModel(self, model):
+        if self.search_index is not None:
+            self.search_index.disconnect()
+            self.search_index = None
+
+        if model is not None:
+            self.search_index = SearchIndex(model=model, columns=self.search_columns)
 
-        self.wildcard = QtCore.QRegExp()
-        self.wildcard.setPatternSyntax(QtCore.QRegExp.Wildcard)
+        super().setSourceModel(model)
 
     def lessThan(self, left, right):
         left_model = left.model()
@@ -650,24 +969,13 @@ class PySortFilterProxyModel(QtCore.QSortFilterProxyModel):
         return left_data < right_data
 
     def filterAcceptsRow(self, row, parent):
-        # TODO: do i need to invalidate any time i set the 'regexp'?
-        # http://doc.qt.io/qt-5/qsortfilterproxymodel.html#invalidateFilter
-
         pattern = self.filterRegExp().pattern()
         if pattern == "":
             return True
 
-        pattern = "*{}*".format(pattern)
-
-        model = self.sourceModel()
-        result = False
-        index = model.index(row, self.filter_column, parent)
-        self_index = self.index(row, self.filter_column, parent)
-        result |= self.hasChildren(self_index)
-        self.wildcard.setPattern(pattern)
-        result |= self.wildcard.exactMatch(model.data(index, QtCore.Qt.DisplayRole))
+        index = self.sourceModel().index(row, 0, parent)
 
-        return result
+        return self.search_index.accepts(index=index, pattern=pattern)
 
     def next_row(self, index):
         return self.sibling(
@@ -694,59 +1002,47 @@ class PySortFilterProxyModel(QtCore.QSortFilterProxyModel):
         return next_, False
 
     def search(self, text, search_from, column):
-        def set_row_column(index, row=None, column=None):
-            if row is None:
-                row = index.row()
-
-            if column is None:
-                column = index.column()
-
-            return self.index(
-                row,
-                column,
-                index.parent(),
-            )
-
         if text == "":
             return None
 
-        text = "*{}*".format(text)
+        text = str(text)
 
-        flags = (
-            QtCore.Qt.MatchContains | QtCore.Qt.MatchRecursive | QtCore.Qt.MatchWildcard
-        )
+        if self.search_columns == (column,):
+            matches = self.search_index.query(text)
 
-        wrapped = False
+            def matched(index):
+                return self.search_index.id(self.mapToSource(index)) in matches
 
-        if search_from.isValid():
-            search_from, wrapped = self.next_index(search_from)
         else:
-            search_from = self.index(0, 0, QtCore.QModelIndex())
+            search = wildcard_regex(text.casefold()).search
 
-        while True:
-            next_indexes = self.match(
-                set_row_column(index=search_from, column=column),
-                QtCore.Qt.DisplayRole,
-                text,
-                1,
-                flags,
-            )
+            def matched(index):
+                data = self.data(index, QtCore.Qt.DisplayRole)
+                return search("" if data is None else str(data).casefold())
 
-            if len(next_indexes) > 0:
-                (next_index,) = next_indexes
+        def first_column(index):
+            return self.index(index.row(), 0, index.parent())
 
-                if not next_index.isValid():
-                    break
+        if search_from.isValid():
+            search_from, _ = self.next_index(first_column(search_from))
+        else:
+            search_from = self.index(0, 0, QtCore.QModelIndex())
 
-                return next_index
-            elif wrapped:
-                break
+        if not search_from.isValid():
+            return None
 
-            search_from, wrapped = self.next_index(search_from)
+        # walk the first column so the starting index is recognized when
+        # the search wraps around to it
+        search_from = first_column(search_from)
+        index = search_from
+        while True:
+            candidate = self.index(index.row(), column, index.parent())
+            if matched(candidate):
+                return candidate
 
-        # TODO: report not found and/or wrap
-        print("reached end")
-        return None
+            index, _ = self.next_index(index)
+            if index == search_from:
+                return None
 
 
 @attr.s
@@ -851,6 +1147,15 @@ def load_ui(filepath, base_instance):
     return PyQt5.uic.loadUi(sio, base_instance)
 
 
+def filter_view(view, text):
+    model = view.model()
+
+    while not hasattr(model, "setFilterWildcard"):
+        model = model.sourceModel()
+
+    model.setFilterWildcard(text)
+
+
 def search_view(view, text, column):
     if text == "":
         return
@@ -24,21 +24,95 @@ class WaitForTimedOut(Exception):
     pass
 
 
-async def wait_for(check, period=0.1, timeout=10, message=None):
+async def wait_for(
+    check,
+    period=0.1,
+    timeout=10,
+    message=None,
+    signal=None,
+    passive_check=None,
+    maximum_period=None,
+):
+    """Wait until ``check()`` resolves true, polling every ``period``.
+
+    If ``signal`` is given then each emission is passed to
+    ``passive_check()`` and a true result completes the wait immediately.
+    ``passive_check()`` returns None when the emission holds no data for
+    the condition.  ``check()`` is then only polled after a period passes
+    without any relevant emission.  The polling period doubles after each poll up to
+    ``maximum_period``.
+    """
     if message is None:
         message = f"Condition not satisfied within {timeout:.1f} seconds"
 
+    if maximum_period is None:
+        maximum_period = period
+
     start = time.monotonic()
 
-    while True:
-        done = await check()
-        if done:
+    if signal is None:
+        while True:
+            done = await check()
+            if done:
+                return
+
+            if time.monotonic() - start > timeout:
+                raise WaitForTimedOut(message)
+
+            await epyqlib.utils.twisted.sleep(period)
+            period = min(2 * period, maximum_period)
+
+    satisfied = False
+    received = False
+    woken = None
+
+    def slot(*args):
+        nonlocal satisfied, received
+
+        if satisfied:
+            return
+
+        result = passive_check(*args)
+        if result is None:
             return
 
-        if time.monotonic() - start > timeout:
-            raise WaitForTimedOut(message)
+        received = True
+        if result:
+            satisfied = True
+            if woken is not None and not woken.called:
+                woken.callback(None)
+
+    signal.connect(slot)
+
+    try:
+        while not satisfied:
+            remaining = timeout - (time.monotonic() - start)
+            if remaining <= 0:
+                raise WaitForTimedOut(message)
+
+            received = False
+            woken = twisted.internet.defer.Deferred()
+            delayed_call = twisted.internet.reactor.callLater(
+                min(period, remaining),
+                woken.callback,
+                None,
+            )
+            try:
+                await woken
+            finally:
+                if delayed_call.active():
+                    delayed_call.cancel()
 
-        await epyqlib.utils.twisted.sleep(period)
+            if satisfied or received:
+                continue
+
+            done = await check()
+            if done:
+                return
+
+            period = min(2 * period, maximum_period)
+    finally:
+        signal.disconnect(slot)
 
 
 def ignore_cancelled(f):
@@ -155,6 +229,22 @@ def sleep(seconds=None):
     return d
 
 
+async def gather(*awaitables):
+    deferreds = [twisted.internet.defer.ensureDeferred(a) for a in awaitables]
+
+    try:
+        return await twisted.internet.defer.gatherResults(
+            deferreds,
+            consumeErrors=True,
+        )
+    except twisted.internet.defer.FirstError as e:
+        e.subFailure.raiseException()
+
+
+def signal_as_awaitable(signal, timeout=None):
+    return epyqlib.utils.qt.signal_as_deferred(signal=signal, timeout=timeout)
+
+
 class InvalidAction(Exception):
     pass
 
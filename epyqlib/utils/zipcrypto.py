@@ -0,0 +1,191 @@
+"""Writing password protected zip archives in process.
+
+:mod:`zipfile` can extract archives protected with the traditional PKWARE
+encryption (ZipCrypto) but cannot create them.  This writes such archives
+from in memory file contents so no external archiver is needed.  ZipCrypto
+rather than AES is used since that is what :mod:`zipfile`, and so
+:class:`epyqlib.device.Device`, can open.
+"""
+import io
+import os
+import struct
+import time
+import zipfile
+import zlib
+
+__copyright__ = "Copyright 2020, EPC Power Corp."
+__license__ = "GPLv2+"
+
+
+def _crc_table():
+    table = []
+    for i in range(256):
+        crc = i
+        for _ in range(8):
+            if crc & 1:
+                crc = (crc >> 1) ^ 0xEDB88320
+            else:
+                crc >>= 1
+        table.append(crc)
+
+    return table
+
+
+_crc32 = _crc_table()
+
+_local_header = struct.Struct("<IHHHHHIIIHH")
+_central_header = struct.Struct("<IHHHHHHIIIHHHHHII")
+_end_record = struct.Struct("<IHHHHIIH")
+
+_encrypted = 0x1
+_utf8 = 0x800
+_version = 20
+_maximum_size = 0xFFFFFFFF
+
+
+def encrypt(data, password, crc):
+    """Encrypt ``data`` with ``password`` including the 12 byte encryption
+    header checked against ``crc``, the CRC-32 of the uncompressed data."""
+    table = _crc32
+    key0, key1, key2 = 0x12345678, 0x23456789, 0x34567890
+
+    for c in password:
+        key0 = table[(key0 ^ c) & 0xFF] ^ (key0 >> 8)
+        key1 = ((key1 + (key0 & 0xFF)) * 134775813 + 1) & 0xFFFFFFFF
+        key2 = table[(key2 ^ (key1 >> 24)) & 0xFF] ^ (key2 >> 8)
+
+    header = os.urandom(11) + bytes([crc >> 24])
+
+    result = bytearray(len(header) + len(data))
+    for i, c in enumerate(header + data):
+        k = (key2 | 2) & 0xFFFF
+        result[i] = c ^ (((k * (k ^ 1)) >> 8) & 0xFF)
+
+        key0 = table[(key0 ^ c) & 0xFF] ^ (key0 >> 8)
+        key1 = ((key1 + (key0 & 0xFF)) * 134775813 + 1) & 0xFFFFFFFF
+        key2 = table[(key2 ^ (key1 >> 24)) & 0xFF] ^ (key2 >> 8)
+
+    return bytes(result)
+
+
+def _dos_date_time(date_time):
+    year, month, day, hour, minute, second = date_time[:6]
+
+    return (
+        ((year - 1980) << 9) | (month << 5) | day,
+        (hour << 11) | (minute << 5) | (second // 2),
+    )
+
+
+def dumps(files, password=None, date_time=None):
+    """Build a deflated zip archive holding ``files``, a mapping of archive
+    names to contents.  Each file is encrypted if a ``password`` is given.
+    """
+    if password is None or len(password) == 0:
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as z:
+            for name, data in files.items():
+                z.writestr(zipfile.ZipInfo(name, date_time=_now(date_time)), data)
+
+        return buffer.getvalue()
+
+    if isinstance(password, str):
+        password = password.encode("ascii")
+
+    date, time_ = _dos_date_time(_now(date_time))
+
+    output = bytearray()
+    central = bytearray()
+    count = 0
+
+    for name, data in files.items():
+        encoded_name = name.encode("utf-8")
+        flags = _encrypted
+        if not name.isascii():
+            flags |= _utf8
+
+        crc = zlib.crc32(data)
+        compressor = zlib.compressobj(
+            zlib.Z_DEFAULT_COMPRESSION,
+            zlib.DEFLATED,
+            -15,
+        )
+        compressed = compressor.compress(data) + compressor.flush()
+        compressed = encrypt(data=compressed, password=password, crc=crc)
+
+        if max(len(data), len(compressed), len(output)) > _maximum_size:
+            raise zipfile.LargeZipFile("Archive too large without ZIP64")
+
+        offset = len(output)
+        output += _local_header.pack(
+            0x04034B50,
+            _version,
+            flags,
+            zipfile.ZIP_DEFLATED,
+            time_,
+            date,
+            crc,
+            len(compressed),
+            len(data),
+            len(encoded_name),
+            0,
+        )
+        output += encoded_name
+        output += compressed
+
+        central += _central_header.pack(
+            0x02014B50,
+            _version,
+            _version,
+            flags,
+            zipfile.ZIP_DEFLATED,
+            time_,
+            date,
+            crc,
+            len(compressed),
+            len(data),
+            len(encoded_name),
+            0,
+            0,
+            0,
+            0,
+            0o100644 << 16,
+            offset,
+        )
+        central += encoded_name
+        count += 1
+
+    central_offset = len(output)
+    output += central
+    output += _end_record.pack(
+        0x06054B50,
+        0,
+        0,
+        count,
+        count,
+        len(central),
+        central_offset,
+        0,
+    )
+
+    return bytes(output)
+
+
+def _now(date_time):
+    if date_time is None:
+        date_time = time.localtime()[:6]
+
+    return date_time
+
+
+def write(path, files, password=None, date_time=None):
+    """Write the archive built by :func:`dumps` to ``path``.  It is written
+    beside ``path`` first and then moved into place so an existing file is
+    only replaced by a complete archive."""
+    data = dumps(files=files, password=password, date_time=date_time)
+
+    temporary_path = os.fspath(path) + ".partial"
+    with open(temporary_path, "wb") as f:
+        f.write(data)
+
+    os.replace(temporary_path, path)
@@ -4,7 +4,7 @@
 
 from collections import OrderedDict
 
-from PyQt5 import QtWidgets
+from PyQt5 import QtCore, QtWidgets, sip
 from PyQt5.QtCore import pyqtSignal, pyqtProperty, QEvent
 
 import epyqlib.form
@@ -55,9 +55,56 @@ def string_to_signal_path(s):
     return [se.strip() for se in s.split(";")]
 
 
+class RefreshScheduler(QtCore.QObject):
+    """Collect widgets with new values and refresh them together at no more
+    than ``rate`` times per second.  Only the latest value of each widget is
+    displayed so signals updating faster than the display cost a single
+    repaint per refresh."""
+
+    def __init__(self, rate=30, parent=None):
+        super().__init__(parent)
+
+        self.dirty = OrderedDict()
+
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(round(1000 / rate))
+        self.timer.timeout.connect(self.refresh)
+
+    def schedule(self, widget):
+        self.dirty[id(widget)] = widget
+
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def refresh(self):
+        dirty = self.dirty
+        self.dirty = OrderedDict()
+
+        for widget in dirty.values():
+            if not sip.isdeleted(widget):
+                widget.refresh()
+
+
+_refresh_scheduler = None
+
+
+def refresh_scheduler():
+    global _refresh_scheduler
+
+    if _refresh_scheduler is None:
+        _refresh_scheduler = RefreshScheduler()
+
+    return _refresh_scheduler
+
+
 class AbstractWidget(QtWidgets.QWidget):
     trigger_action = pyqtSignal()
 
+    # Display only widgets set this to have value updates coalesced by the
+    # refresh scheduler rather than applied as each arrives.
+    coalesce_values = False
+
     def __init__(self, ui_class=None, parent=None, in_designer=False):
         self.in_designer = in_designer
         super().__init__(parent=parent)
@@ -68,6 +115,7 @@ class AbstractWidget(QtWidgets.QWidget):
         self.right = None
 
         self.signal_object = None
+        self._pending_value = None
 
         self._label_override = ""
         self._tool_tip_override = ""
@@ -353,7 +401,14 @@ class AbstractWidget(QtWidgets.QWidget):
                 self._conversion_multiplier = 1
 
     def meta_set_value(self, value):
-        self.set_value(value)
+        if self.coalesce_values:
+            self._pending_value = value
+            refresh_scheduler().schedule(self)
+        else:
+            self.set_value(value)
+
+    def refresh(self):
+        self.set_value(self._pending_value)
 
     def set_signal(self, signal=None, force_update=False):
         if signal is not self.signal_object or force_update:
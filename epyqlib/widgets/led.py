@@ -68,6 +68,8 @@ def rgb_string(color):
 
 
 class Led(epyqlib.widgets.abstractwidget.AbstractWidget):
+    coalesce_values = True
+
     def __init__(self, parent=None, in_designer=False):
         file_name = "led.svg"
 
@@ -194,9 +196,10 @@ class Led(epyqlib.widgets.abstractwidget.AbstractWidget):
         else:
             value = value
 
-        self._value = value == self.on_value
-
-        self.update_svg()
+        value = value == self.on_value
+        if value != self._value:
+            self._value = value
+            self.update_svg()
 
     def update_svg(self):
         if self._value:
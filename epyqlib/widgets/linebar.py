@@ -17,6 +17,8 @@ def centered_rectangle(width, height):
 
 
 class LineBar(epyqlib.widgets.abstractwidget.AbstractWidget):
+    coalesce_values = True
+
     def __init__(self, parent=None, in_designer=False):
         self.in_designer = in_designer
         super().__init__(parent=parent, in_designer=in_designer)
@@ -135,6 +137,9 @@ class LineBar(epyqlib.widgets.abstractwidget.AbstractWidget):
 
     @value.setter
     def value(self, value):
+        if value == self._value:
+            return
+
         self._value = value
 
         self.update()
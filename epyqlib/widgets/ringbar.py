@@ -20,6 +20,8 @@ def arc_angle(angle):
 
 
 class RingBar(epyqlib.widgets.abstractwidget.AbstractWidget):
+    coalesce_values = True
+
     def __init__(self, parent=None, in_designer=False):
         self.in_designer = in_designer
         epyqlib.widgets.abstractwidget.AbstractWidget.__init__(self, parent=parent)
@@ -179,6 +181,9 @@ class RingBar(epyqlib.widgets.abstractwidget.AbstractWidget):
 
     @value.setter
     def value(self, value):
+        if value == self._value:
+            return
+
         self._value = value
 
         self.update()
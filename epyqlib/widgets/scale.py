@@ -18,6 +18,8 @@ __license__ = "GPLv2+"
 class Scale(
     epyqlib.widgets.abstractwidget.AbstractWidget, epyqlib.mixins.OverrideRange
 ):
+    coalesce_values = True
+
     def __init__(self, parent=None, in_designer=False):
         self.s_vertically_flipped = False
 
@@ -59,6 +59,7 @@ setuptools.setup(
         "fab",
         "python-dotenv",
         "natsort",
+        "numpy",
         "paho-mqtt",
         "pint>0.9",
         "pyelftools",
@@ -1,27 +1,14 @@
 #!/usr/bin/env python3
 
+import epyqlib.utils.canlogio
+
 
 def convert(trc, socketcan):
-    for line in trc:
-        if line.startswith(";"):
-            continue
-
-        columns = line.split()
-        counter = int(columns.pop(0)[:-1])
-        milliseconds = float(columns.pop(0))
-        seconds = milliseconds / 1000
-        # bus = int(columns.pop(0))
-        transmit = columns.pop(0) == "Tx"
-        id = int(columns.pop(0), 16)
-        # reserved = columns.pop(0)
-        data_length = int(columns.pop(0))
-        data = columns
-
-        socketcan.write(
-            "({seconds:020.6f}) can0 {id:08X}#{data}\n".format(
-                seconds=seconds, id=id, data="".join(data)
-            )
-        )
+    epyqlib.utils.canlogio.write_candump(
+        frames=epyqlib.utils.canlogio.read_trc(trc),
+        f=socketcan,
+        channel="can0",
+    )
 
 
 if __name__ == "__main__":